@@ -0,0 +1,263 @@
+import copy
+import threading
+import time
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+# Order statuses after which an order can no longer fill
+TERMINAL_STATUSES = ('FILLED', 'CANCELED', 'CANCELLED', 'REJECTED', 'EXPIRED', 'CLOSED')
+
+_refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='account-refresh')
+
+
+class _OrderWatch:
+    __slots__ = ('order_id', 'symbol', 'callback', 'expires_at')
+
+    def __init__(self, order_id, symbol: str, callback: Callable[[Dict], None], expires_at: float):
+        self.order_id = order_id
+        self.symbol = symbol
+        self.callback = callback
+        self.expires_at = expires_at
+
+
+class AccountState:
+    """Balances, open orders and positions for one API key, cached for ``ttl`` seconds.
+
+    Every PionexAPI built with the same key shares one instance, so a trading
+    cycle, its health check and the GUI all read the same snapshot instead of
+    each signing their own request. Order placement, cancels and fills drop
+    the cache and refresh it in the background. Order monitoring is a
+    callback API: one poller per key checks all watched orders with a single
+    open-orders call per symbol, and fill events pushed in through
+    ``apply_order_update`` skip polling entirely.
+    """
+
+    def __init__(self, name: str, ttl: float = 5.0, poll_interval: float = 1.0, watch_timeout: float = 300.0):
+        self.name = name
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.watch_timeout = watch_timeout
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, tuple] = {}  # kind -> (fetched_at, response)
+        self._fetchers: Dict[str, Callable[[], Dict]] = {}
+        self._inflight: Dict[str, tuple] = {}  # kind -> (future, generation it was started in)
+        self._generation = 0
+        self._watches: Dict[str, _OrderWatch] = {}
+        self._order_api = None
+        self._poller: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self.stats = {'hits': 0, 'signed_requests': 0, 'invalidations': 0, 'background_refreshes': 0,
+                      'order_events': 0, 'order_polls': 0}
+
+    # ----- Cached reads -----
+
+    def get(self, kind: str, fetch: Callable[[], Dict], fresh: bool = False) -> Dict:
+        """Cached response for ``kind``; ``fetch`` runs at most once per TTL across all callers"""
+        now = time.time()
+        with self._lock:
+            self._fetchers[kind] = fetch
+            entry = self._entries.get(kind)
+            if not fresh and entry and now - entry[0] <= self.ttl:
+                self.stats['hits'] += 1
+                return copy.deepcopy(entry[1])
+            inflight = self._inflight.get(kind)
+            # A fetch started before the last invalidation may carry the old state: don't join it
+            owner = inflight is None or inflight[1] != self._generation
+            if owner:
+                future, generation = Future(), self._generation
+                self._inflight[kind] = (future, generation)
+            else:
+                future = inflight[0]
+        if not owner:
+            with self._lock:
+                self.stats['hits'] += 1
+            return copy.deepcopy(future.result())
+        try:
+            response = fetch()
+            with self._lock:
+                self.stats['signed_requests'] += 1
+                # Errors are returned to the caller but never cached, nor is a response that raced an invalidation
+                if isinstance(response, dict) and 'error' not in response and generation == self._generation:
+                    self._entries[kind] = (time.time(), response)
+            future.set_result(response)
+            return copy.deepcopy(response)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                if self._inflight.get(kind, (None,))[0] is future:
+                    del self._inflight[kind]
+
+    def invalidate(self, kinds: List[str] = None, refresh: bool = True):
+        """Drop cached state (all kinds by default) and optionally refetch it in the background"""
+        with self._lock:
+            self._generation += 1
+            known = set(self._entries) | set(self._inflight)
+            targets = list(known) if kinds is None else [k for k in kinds if k in known]
+            for kind in targets:
+                self._entries.pop(kind, None)
+            self.stats['invalidations'] += 1
+            fetchers = {kind: self._fetchers[kind] for kind in targets if kind in self._fetchers}
+        if refresh:
+            for kind, fetch in fetchers.items():
+                self.stats['background_refreshes'] += 1
+                _refresh_pool.submit(self._background_refresh, kind, fetch)
+
+    def _background_refresh(self, kind: str, fetch: Callable[[], Dict]):
+        try:
+            self.get(kind, fetch)
+        except Exception as e:
+            self.logger.debug(f"Background refresh of {kind} failed: {e}")
+
+    # ----- Order events -----
+
+    def on_order_placed(self, order_id=None, symbol: str = None):
+        """Balances and open orders changed; refresh them now rather than after the TTL"""
+        self.invalidate()
+
+    def watch_order(self, api, order_id, symbol: str, callback: Callable[[Dict], None], timeout: float = None):
+        """Call ``callback(order)`` once the order reaches a terminal status (or times out)"""
+        with self._lock:
+            self._order_api = api
+            self._watches[str(order_id)] = _OrderWatch(order_id, symbol, callback,
+                                                       time.time() + (timeout or self.watch_timeout))
+            if self._poller is None or not self._poller.is_alive():
+                self._poller = threading.Thread(target=self._poll_orders, daemon=True,
+                                                name=f"order-watch-{self.name}")
+                self._poller.start()
+        self._wake.set()
+
+    def apply_order_update(self, order: Dict):
+        """Push entry point for order/fill events (private stream or any code that learns of a fill)"""
+        order_id = str(order.get('orderId', ''))
+        status = str(order.get('status', '')).upper()
+        self.stats['order_events'] += 1
+        if status in TERMINAL_STATUSES or status == 'PARTIALLY_FILLED':
+            self.invalidate()
+        if status not in TERMINAL_STATUSES:
+            return
+        with self._lock:
+            watch = self._watches.pop(order_id, None)
+        if watch:
+            try:
+                watch.callback(order)
+            except Exception as e:
+                self.logger.error(f"Order callback for {order_id} failed: {e}")
+
+    def _poll_orders(self):
+        """Single poller per key: one open-orders request per symbol covers every watched order"""
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            time.sleep(min(self.poll_interval, 0.5))  # Give market orders a moment to fill
+            with self._lock:
+                watches = list(self._watches.values())
+                api = self._order_api
+            if not watches:
+                with self._lock:
+                    if not self._watches:
+                        self._poller = None
+                        return
+                continue
+            now = time.time()
+            for symbol in {watch.symbol for watch in watches}:
+                try:
+                    open_orders = api.get_open_orders(symbol, fresh=True)
+                    self.stats['order_polls'] += 1
+                except Exception as e:
+                    self.logger.error(f"Order poll for {symbol} failed: {e}")
+                    continue
+                if 'error' in open_orders:
+                    continue
+                data = open_orders.get('data', {})
+                orders = data.get('orders', []) if isinstance(data, dict) else data
+                still_open = {str(order.get('orderId')) for order in orders or []}
+                for watch in watches:
+                    if watch.symbol != symbol:
+                        continue
+                    if str(watch.order_id) in still_open:
+                        if now > watch.expires_at:
+                            self._expire(watch)
+                        continue
+                    # No longer open: one lookup for its final state
+                    order = api.get_order(watch.order_id, symbol)
+                    self.stats['order_polls'] += 1
+                    if 'data' in order:
+                        self.apply_order_update(dict(order['data'], orderId=watch.order_id))
+                    # Also covers lookups that keep returning a non-terminal state
+                    if now > watch.expires_at:
+                        self._expire(watch)
+
+    def _expire(self, watch: _OrderWatch):
+        with self._lock:
+            if self._watches.pop(str(watch.order_id), None) is None:
+                return  # Already settled by an order update
+        try:
+            watch.callback({'orderId': watch.order_id, 'symbol': watch.symbol, 'status': 'UNKNOWN',
+                            'error': 'Order watch timed out'})
+        except Exception as e:
+            self.logger.error(f"Order callback for {watch.order_id} failed: {e}")
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            reads = self.stats['hits'] + self.stats['signed_requests']
+            return {
+                **self.stats,
+                'hit_rate': round(self.stats['hits'] / reads, 3) if reads else 0.0,
+                'cached_kinds': sorted(self._entries),
+                'watched_orders': len(self._watches)
+            }
+
+
+# One account state per API key, shared by every client in the process
+account_states: Dict[str, AccountState] = {}
+_account_states_lock = threading.Lock()
+
+def get_account_state(api_key: str = None, ttl: float = 5.0, poll_interval: float = 1.0,
+                      watch_timeout: float = 300.0) -> AccountState:
+    key = api_key or ''
+    with _account_states_lock:
+        state = account_states.get(key)
+        if state is None:
+            state = AccountState(f"{key[:6]}***" if key else 'default', ttl, poll_interval, watch_timeout)
+            account_states[key] = state
+        return state
+
+
+def benchmark(cycles: int = 50, users: int = 4):
+    """Signed requests per AutoTrader-style cycle with and without the shared account cache"""
+    counter = {'signed': 0}
+
+    def fetch_balances():
+        counter['signed'] += 1
+        return {'data': {'balances': [{'coin': 'USDT', 'free': '100', 'frozen': '0'}]}}
+
+    def cycle(read):
+        read()          # Balance for sizing
+        read()          # health_check: test_connection
+        read()          # health_check: balance check
+        read()          # GUI/Telegram balance view in the same window
+
+    for cycle_index in range(cycles):
+        for _ in range(users):
+            cycle(fetch_balances)
+    uncached = counter['signed']
+
+    counter['signed'] = 0
+    state = AccountState('benchmark', ttl=5.0)
+    for cycle_index in range(cycles):
+        for _ in range(users):
+            cycle(lambda: state.get('balances', fetch_balances))
+        if cycle_index % 10 == 9:
+            state.on_order_placed()  # A fill every 10 cycles forces a refresh
+    time.sleep(0.2)  # Let the last background refresh land
+    print(f"{cycles} cycles x {users} users: {uncached} signed requests uncached, "
+          f"{counter['signed']} with the account cache")
+    print(f"cache stats: {state.get_stats()}")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,182 @@
+import asyncio
+import functools
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+
+class AsyncBridge:
+    """Runs blocking calls (exchange REST, database, strategy code) on a bounded
+    thread pool so async handlers await them instead of stalling the event loop.
+
+    Every call gets a timeout. A call that times out keeps running on its
+    worker thread, but the awaiting handler gets control back immediately.
+    """
+
+    def __init__(self, max_workers: int = 16, timeout: float = 15.0, name: str = 'bridge'):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.name = name
+        self.logger = logging.getLogger(__name__)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'timeouts': 0, 'errors': 0, 'in_flight': 0, 'max_in_flight': 0}
+
+    def _track(self, key: str, delta: int = 1):
+        with self._lock:
+            self.stats[key] += delta
+            if key == 'in_flight':
+                self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.stats['in_flight'])
+
+    async def run_with_timeout(self, timeout: float, func: Callable, *args, **kwargs):
+        """Await ``func(*args, **kwargs)`` on the pool, raising asyncio.TimeoutError after ``timeout`` seconds"""
+        loop = asyncio.get_running_loop()
+        self._track('calls')
+        self._track('in_flight')
+        try:
+            future = loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self._track('timeouts')
+            self.logger.warning(f"{getattr(func, '__name__', func)} timed out after {timeout}s")
+            raise
+        except Exception:
+            self._track('errors')
+            raise
+        finally:
+            self._track('in_flight', -1)
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """Await ``func(*args, **kwargs)`` on the pool with the default timeout"""
+        return await self.run_with_timeout(self.timeout, func, *args, **kwargs)
+
+    def wrap(self, target, error_dicts: bool = False) -> 'AsyncProxy':
+        """Async view of ``target``: ``await proxy.method(...)`` runs ``target.method`` on the pool"""
+        return AsyncProxy(self, target, error_dicts)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self.stats, 'max_workers': self.max_workers, 'timeout': self.timeout}
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+
+class AsyncProxy:
+    """Mirrors a synchronous object with awaitable methods.
+
+    With ``error_dicts`` (for exchange clients, whose methods return dicts),
+    timeouts and exceptions come back as ``{'error': ...}`` like any other
+    failed request instead of being raised.
+    """
+
+    def __init__(self, bridge: AsyncBridge, target, error_dicts: bool = False):
+        self._bridge = bridge
+        self._target = target
+        self._error_dicts = error_dicts
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            if not self._error_dicts:
+                return await self._bridge.run(attr, *args, **kwargs)
+            try:
+                return await self._bridge.run(attr, *args, **kwargs)
+            except asyncio.TimeoutError:
+                return {'error': f'{name} timed out after {self._bridge.timeout}s'}
+            except Exception as e:
+                return {'error': str(e)}
+
+        call.__name__ = name
+        setattr(self, name, call)
+        return call
+
+
+# Shared bridges, one thread pool per consumer
+bridges = {}
+_bridges_lock = threading.Lock()
+
+def get_async_bridge(name: str = 'exchange', max_workers: int = 16, timeout: float = 15.0) -> AsyncBridge:
+    """Get or create the shared bridge for a consumer (e.g. 'telegram')"""
+    with _bridges_lock:
+        if name not in bridges:
+            bridges[name] = AsyncBridge(max_workers=max_workers, timeout=timeout, name=name)
+        return bridges[name]
+
+
+class _StubExchange:
+    """Local stand-in for PionexAPI with blocking, variable-latency calls"""
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.05):
+        import random
+        self._random = random.Random(11)
+        self.latency = latency
+        self.jitter = jitter
+
+    def _sleep(self):
+        time.sleep(self.latency + self._random.random() * self.jitter)
+
+    def get_balances(self) -> Dict:
+        self._sleep()
+        return {'data': {'balances': [{'coin': 'USDT', 'free': '1000', 'frozen': '0'}]}}
+
+    def get_positions(self) -> Dict:
+        self._sleep()
+        return {'data': {'positions': []}}
+
+    def get_ticker_price(self, symbol: str) -> Dict:
+        self._sleep()
+        return {'data': {'tickers': [{'symbol': symbol, 'close': '30000'}]}}
+
+
+def load_test(users: int = 50, calls_per_handler: int = 2, latency: float = 0.05, max_workers: int = 16):
+    """p50/p99 latency of 50 concurrent handlers, each making blocking exchange calls.
+
+    Compares calling the stub directly inside the coroutine (what the handlers
+    used to do) against awaiting it through the bridge.
+    """
+    exchange = _StubExchange(latency=latency)
+
+    async def blocking_handler():
+        start = time.perf_counter()
+        exchange.get_balances()
+        for _ in range(calls_per_handler - 1):
+            exchange.get_ticker_price('BTC_USDT')
+        return time.perf_counter() - start
+
+    async def bridged_handler(api):
+        start = time.perf_counter()
+        await api.get_balances()
+        for _ in range(calls_per_handler - 1):
+            await api.get_ticker_price('BTC_USDT')
+        return time.perf_counter() - start
+
+    async def run(make_handler):
+        # All users' callbacks arrive at once; latency is measured from arrival
+        arrived = time.perf_counter()
+
+        async def timed():
+            await make_handler()
+            return time.perf_counter() - arrived
+
+        return sorted(await asyncio.gather(*(timed() for _ in range(users))))
+
+    def report(label, latencies):
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{label:22s} users={users} p50={p50 * 1000:8.1f} ms  p99={p99 * 1000:8.1f} ms")
+
+    bridge = AsyncBridge(max_workers=max_workers, timeout=10.0, name='loadtest')
+    api = bridge.wrap(exchange, error_dicts=True)
+    report('blocking in handler', asyncio.run(run(blocking_handler)))
+    report(f'bridge ({max_workers} workers)', asyncio.run(run(lambda: bridged_handler(api))))
+    bridge.shutdown()
+
+
+if __name__ == '__main__':
+    load_test()
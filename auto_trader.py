@@ -1,6 +1,5 @@
 import asyncio
 import logging
-import threading
 import time
 import json
 from datetime import datetime
@@ -13,6 +12,7 @@ from config_loader import get_config, reload_config
 from pionex_api import PionexAPI
 from trading_strategies import TradingStrategies
 from database import Database
+from trading_scheduler import get_trading_scheduler, get_signal_cache
 
 class AutoTrader:
     def __init__(self, user_id: int = None):
@@ -36,10 +36,10 @@ class AutoTrader:
         
         self.setup_logging()
         
-        # Threading
-        self.trading_thread = None
-        self.stop_event = threading.Event()
-        self.is_running = False  # Add missing is_running attribute
+        # Scheduling: cycles run as a job on the shared trading scheduler
+        self.job_id = None
+        self.is_running = False
+        self._health = None  # (checked_at, health_check() result)
         
         # Restart tracking
         self.restart_count = 0
@@ -125,28 +125,29 @@ class AutoTrader:
         self.send_notification("Trading Pair Changed", f"Trading pair changed to {self.current_pair}")
     
     def start_auto_trading(self):
-        """Start the auto trading loop"""
+        """Schedule this user's trading cycle on the shared scheduler"""
         if self.is_running:
             self.logger.warning("Auto trading is already running")
             return
         
+        heartbeat_interval = self.config.get('watchdog', {}).get('heartbeat_interval', 60)
+        self.job_id = f"auto_trader:{self.user_id}"
         self.is_running = True
-        self.stop_event.clear()
-        self.trading_thread = threading.Thread(target=self._trading_loop, daemon=True)
-        self.trading_thread.start()
+        get_trading_scheduler().add_job(
+            self.job_id, self._scheduled_cycle, heartbeat_interval,
+            deadline=self.config.get('scheduler', {}).get('job_deadline', 30)
+        )
         self.logger.info(f"Auto trading started for {self.current_pair}")
     
     def stop_auto_trading(self):
-        """Stop the auto trading loop"""
+        """Remove this user's trading cycle from the scheduler"""
         if not self.is_running:
             self.logger.warning("Auto trading is not running")
             return
         
         self.is_running = False
-        self.stop_event.set()
-        
-        if self.trading_thread and self.trading_thread.is_alive():
-            self.trading_thread.join(timeout=5)
+        if self.job_id:
+            get_trading_scheduler().remove_job(self.job_id)
         
         self.logger.info("Auto trading stopped")
     
@@ -170,34 +171,27 @@ class AutoTrader:
         else:
             self.logger.info("Auto trading not restarted (disabled)")
     
-    def _trading_loop(self):
-        """Main trading loop"""
-        heartbeat_interval = self.config.get('watchdog', {}).get('heartbeat_interval', 60)
-        
-        while self.is_running and not self.stop_event.is_set():
-            try:
-                # Check if auto trading is still enabled
-                if not self.auto_trading_enabled:
-                    self.logger.info("Auto trading disabled, stopping loop")
-                    break
-                
-                # Check trading hours
-                if not self._is_trading_hours():
-                    self.logger.debug("Outside trading hours, skipping execution")
-                    time.sleep(heartbeat_interval)
-                    continue
-                
-                # Execute trading logic
-                self._execute_trading_cycle()
-                
-                # Heartbeat
-                self.logger.debug(f"Trading cycle completed, waiting {heartbeat_interval}s")
-                time.sleep(heartbeat_interval)
-                
-            except Exception as e:
-                self.logger.error(f"Error in trading loop: {e}")
-                self.send_notification("Trading Error", f"Error in trading loop: {str(e)}")
-                time.sleep(30)  # Wait before retry
+    def _scheduled_cycle(self):
+        """One trading cycle; the scheduler calls this every heartbeat interval"""
+        try:
+            # Check if auto trading is still enabled
+            if not self.auto_trading_enabled:
+                self.logger.info("Auto trading disabled, stopping schedule")
+                self.stop_auto_trading()
+                return
+            
+            # Check trading hours
+            if not self._is_trading_hours():
+                self.logger.debug("Outside trading hours, skipping execution")
+                return
+            
+            # Execute trading logic
+            self._execute_trading_cycle()
+            self.logger.debug("Trading cycle completed")
+            
+        except Exception as e:
+            self.logger.error(f"Error in trading cycle: {e}")
+            self.send_notification("Trading Error", f"Error in trading loop: {str(e)}")
     
     def _is_trading_hours(self) -> bool:
         """Check if current time is within trading hours"""
@@ -240,12 +234,6 @@ class AutoTrader:
     def _execute_trading_cycle(self):
         """Execute one trading cycle"""
         try:
-            # Get current market data with correct interval
-            df = self.strategies.get_market_data(self.current_pair, '1M', 100)
-            if df.empty:
-                self.logger.warning(f"No market data available for {self.current_pair}")
-                return
-            
             # Get user settings
             user_settings = self.db.get_user_settings(self.user_id) if self.user_id else {}
             strategy_type = user_settings.get('default_strategy', 'ADVANCED_STRATEGY')
@@ -261,167 +249,91 @@ class AutoTrader:
     
     def _execute_strategy(self, strategy_type: str, symbol: str):
         """Execute a specific trading strategy"""
-        import threading
-        import time
-        
         start_time = time.time()
-        result = [None]
-        exception = [None]
+        result = None
+        error = None
         
-        def execute_strategy():
-            try:
-                # Validate symbol - use the symbol parameter from outer scope
-                if not symbol or not isinstance(symbol, str):
-                    self.logger.error(f"Invalid symbol: {symbol}")
-                    result[0] = {"action": "HOLD", "reason": f"Invalid symbol: {symbol}"}
-                    return
-                
-                # Normalize symbol format
-                normalized_symbol = symbol.upper().replace('/', '_')
-                
-                # Validate symbol format
-                if not normalized_symbol.endswith('_USDT'):
-                    self.logger.warning(f"Symbol {normalized_symbol} may not be supported, adding USDT suffix")
-                    if not normalized_symbol.endswith('_USDT'):
-                        normalized_symbol = f"{normalized_symbol}_USDT"
-                
-                # Check if symbol is in supported list
-                supported_symbols = ['BTC_USDT', 'ETH_USDT', 'DOT_USDT', 'ADA_USDT', 'SOL_USDT']
-                if normalized_symbol not in supported_symbols:
-                    self.logger.warning(f"Symbol {normalized_symbol} may not be fully supported")
-                
-                # Get balance for position sizing - fix the response handling
-                balance_response = self.api.get_balances()
-                balance = 0
-                
-                if 'error' not in balance_response and 'data' in balance_response:
-                    balances = balance_response['data'].get('balances', [])
-                    for asset in balances:
-                        # Pionex uses 'coin' instead of 'asset'
-                        coin = asset.get('coin', asset.get('asset', ''))
-                        if coin == 'USDT':
-                            balance = float(asset.get('total', 0))
-                            break
-                else:
-                    error_msg = balance_response.get('error', 'Unknown error')
-                    self.logger.warning(f"Failed to get balance: {error_msg}")
-                    
-                    # Try to get balance from alternative source
-                    try:
-                        account_balance = self.api.get_account_balance()
-                        if 'error' not in account_balance:
-                            balance = float(account_balance.get('total', 0))
-                            self.logger.info(f"Retrieved balance from alternative source: {balance}")
-                        else:
-                            result[0] = {"action": "HOLD", "reason": f"Failed to get balance: {error_msg}"}
-                            return
-                    except Exception as alt_error:
-                        self.logger.error(f"Alternative balance retrieval also failed: {alt_error}")
-                        result[0] = {"action": "HOLD", "reason": f"Failed to get balance: {error_msg}"}
-                        return
-                
-                self.logger.info(f"Executing {strategy_type} for {normalized_symbol} with balance: {balance}")
-                
-                # Log strategy parameters
-                self.logger.info(f"Strategy parameters - Symbol: {normalized_symbol}, Balance: {balance}, Type: {strategy_type}")
-                
-                # Validate balance
-                if balance <= 0:
-                    self.logger.warning(f"Insufficient balance ({balance}) for strategy execution")
-                    result[0] = {"action": "HOLD", "reason": f"Insufficient balance: {balance}"}
-                    return
-                
-                # Check if balance is too low for meaningful trading
-                min_balance = 10  # Minimum $10 for trading
-                if balance < min_balance:
-                    self.logger.warning(f"Balance too low ({balance}) for meaningful trading")
-                    result[0] = {"action": "HOLD", "reason": f"Balance too low: ${balance} (minimum: ${min_balance})"}
-                    return
-                
-                # Log strategy execution start
-                self.logger.info(f"Starting strategy execution for {strategy_type} on {normalized_symbol}")
-                
-                # Perform health check before strategy execution
-                health_status = self.health_check()
-                if health_status['overall_status'] == 'UNHEALTHY':
-                    self.logger.error(f"System unhealthy, skipping strategy execution. Health status: {health_status}")
-                    result[0] = {"action": "HOLD", "reason": f"System unhealthy: {health_status['overall_status']}"}
-                    return
-                elif health_status['overall_status'] == 'DEGRADED':
-                    self.logger.warning(f"System degraded, proceeding with caution. Health status: {health_status}")
-                
-                # Add rate limiting delay
-                import time
-                time.sleep(0.1)  # 100ms delay to respect API rate limits
-                
-                # Validate configuration
-                if not hasattr(self, 'config') or not self.config:
-                    self.logger.error("Configuration not found")
-                    result[0] = {"action": "HOLD", "reason": "Configuration not found"}
-                    return
-                
-                # Check required configuration parameters
-                required_params = ['leverage', 'position_size', 'trading_amount']
-                missing_params = [param for param in required_params if param not in self.config]
-                if missing_params:
-                    self.logger.warning(f"Missing configuration parameters: {missing_params}")
-                    # Use default values
-                    if 'leverage' not in self.config:
-                        self.config['leverage'] = 10
-                    if 'position_size' not in self.config:
-                        self.config['position_size'] = 0.5
-                    if 'trading_amount' not in self.config:
-                        self.config['trading_amount'] = 100
-                
-                # Execute strategy based on type
-                if strategy_type == 'RSI_STRATEGY':
-                    result[0] = self.strategies.rsi_strategy(normalized_symbol, balance)
-                elif strategy_type == 'RSI_MULTI_TF':
-                    result[0] = self.strategies.rsi_multi_timeframe_strategy(normalized_symbol, balance)
-                elif strategy_type == 'VOLUME_FILTER':
-                    result[0] = self.strategies.volume_filter_strategy(normalized_symbol, balance)
-                elif strategy_type == 'ADVANCED_STRATEGY':
-                    result[0] = self.strategies.advanced_strategy(normalized_symbol, balance)
-                elif strategy_type == 'GRID_TRADING':
-                    result[0] = self.strategies.grid_trading_strategy(normalized_symbol, balance)
-                elif strategy_type == 'DCA':
-                    result[0] = self.strategies.dca_strategy(normalized_symbol, balance)
-                else:
-                    self.logger.warning(f"Unknown strategy type: {strategy_type}")
-                    result[0] = None
+        try:
+            # Validate symbol
+            if not symbol or not isinstance(symbol, str):
+                self.logger.error(f"Invalid symbol: {symbol}")
+                return {"action": "HOLD", "reason": f"Invalid symbol: {symbol}"}
+            
+            # Normalize symbol format
+            normalized_symbol = symbol.upper().replace('/', '_')
+            
+            # Validate symbol format
+            if not normalized_symbol.endswith('_USDT'):
+                self.logger.warning(f"Symbol {normalized_symbol} may not be supported, adding USDT suffix")
+                normalized_symbol = f"{normalized_symbol}_USDT"
+            
+            # Check if symbol is in supported list
+            supported_symbols = ['BTC_USDT', 'ETH_USDT', 'DOT_USDT', 'ADA_USDT', 'SOL_USDT']
+            if normalized_symbol not in supported_symbols:
+                self.logger.warning(f"Symbol {normalized_symbol} may not be fully supported")
+            
+            balance, balance_error = self._get_usdt_balance()
+            if balance_error:
+                return {"action": "HOLD", "reason": f"Failed to get balance: {balance_error}"}
+            
+            self.logger.info(f"Executing {strategy_type} for {normalized_symbol} with balance: {balance}")
+            
+            # Validate balance
+            if balance <= 0:
+                self.logger.warning(f"Insufficient balance ({balance}) for strategy execution")
+                return {"action": "HOLD", "reason": f"Insufficient balance: {balance}"}
+            
+            # Check if balance is too low for meaningful trading
+            min_balance = 10  # Minimum $10 for trading
+            if balance < min_balance:
+                self.logger.warning(f"Balance too low ({balance}) for meaningful trading")
+                return {"action": "HOLD", "reason": f"Balance too low: ${balance} (minimum: ${min_balance})"}
+            
+            # Perform health check before strategy execution
+            health_status = self._cached_health_check()
+            if health_status['overall_status'] == 'UNHEALTHY':
+                self.logger.error(f"System unhealthy, skipping strategy execution. Health status: {health_status}")
+                return {"action": "HOLD", "reason": f"System unhealthy: {health_status['overall_status']}"}
+            elif health_status['overall_status'] == 'DEGRADED':
+                self.logger.warning(f"System degraded, proceeding with caution. Health status: {health_status}")
+            
+            # Validate configuration
+            if not hasattr(self, 'config') or not self.config:
+                self.logger.error("Configuration not found")
+                return {"action": "HOLD", "reason": "Configuration not found"}
+            
+            # Check required configuration parameters
+            required_params = ['leverage', 'position_size', 'trading_amount']
+            missing_params = [param for param in required_params if param not in self.config]
+            if missing_params:
+                self.logger.warning(f"Missing configuration parameters: {missing_params}")
+                # Use default values
+                if 'leverage' not in self.config:
+                    self.config['leverage'] = 10
+                if 'position_size' not in self.config:
+                    self.config['position_size'] = 0.5
+                if 'trading_amount' not in self.config:
+                    self.config['trading_amount'] = 100
+            
+            # Market data and indicators are evaluated once per symbol/candle for all users;
+            # this user only sizes the shared signal to their own balance
+            signal = get_signal_cache().get(
+                strategy_type, normalized_symbol,
+                lambda: self._evaluate_strategy(strategy_type, normalized_symbol)
+            )
+            result = self._size_signal(signal, strategy_type, balance)
+            
+            self.logger.info(f"Strategy {strategy_type} executed successfully: {result.get('action')}")
                 
-                # Validate strategy result
-                if result[0] is None:
-                    self.logger.warning(f"Strategy {strategy_type} returned None")
-                    result[0] = {"action": "HOLD", "reason": "Strategy returned no signal"}
-                elif not isinstance(result[0], dict):
-                    self.logger.error(f"Strategy {strategy_type} returned invalid result type: {type(result[0])}")
-                    result[0] = {"action": "HOLD", "reason": "Strategy returned invalid result"}
-                elif 'action' not in result[0]:
-                    self.logger.error(f"Strategy {strategy_type} returned result without action: {result[0]}")
-                    result[0] = {"action": "HOLD", "reason": "Strategy returned result without action"}
-                else:
-                    self.logger.info(f"Strategy {strategy_type} executed successfully: {result[0].get('action')}")
-                    
-            except Exception as e:
-                exception[0] = e
-                self.logger.error(f"Error executing strategy {strategy_type}: {e}")
-                import traceback
-                self.logger.error(f"Traceback: {traceback.format_exc()}")
-        
-        # Execute strategy with timeout
-        thread = threading.Thread(target=execute_strategy)
-        thread.daemon = True
-        thread.start()
-        thread.join(timeout=30)  # 30 second timeout
+        except Exception as e:
+            error = e
+            self.logger.error(f"Error executing strategy {strategy_type}: {e}")
+            import traceback
+            self.logger.error(f"Traceback: {traceback.format_exc()}")
         
         execution_time = time.time() - start_time
         
-        if thread.is_alive():
-            self.logger.error(f"Strategy execution timed out for {strategy_type} after {execution_time:.2f}s")
-            return {"action": "HOLD", "reason": "Strategy execution timed out"}
-        
-        if exception[0]:
+        if error:
             # Try fallback strategy if main strategy fails
             self.logger.warning(f"Main strategy failed after {execution_time:.2f}s, trying fallback for {strategy_type}")
             try:
@@ -435,7 +347,7 @@ class AutoTrader:
                 self.logger.error(f"Fallback strategy also failed: {fallback_error}")
             
             # Provide specific error messages based on exception type
-            error_type = type(exception[0]).__name__
+            error_type = type(error).__name__
             if 'Timeout' in error_type:
                 error_msg = "Strategy execution timed out"
             elif 'Connection' in error_type:
@@ -443,40 +355,105 @@ class AutoTrader:
             elif 'API' in error_type:
                 error_msg = "API service error"
             else:
-                error_msg = f"Strategy execution error: {str(exception[0])}"
+                error_msg = f"Strategy execution error: {str(error)}"
             
+            self._record_execution(strategy_type, False, execution_time)
             return {"action": "HOLD", "reason": error_msg}
         
         # Log performance metrics
-        if result[0] and result[0].get('action') != 'HOLD':
+        if result and result.get('action') != 'HOLD':
             self.logger.info(f"Strategy {strategy_type} completed successfully in {execution_time:.2f}s")
         else:
             self.logger.info(f"Strategy {strategy_type} completed with HOLD signal in {execution_time:.2f}s")
         
-        # Report execution statistics
-        if hasattr(self, 'execution_stats'):
-            if strategy_type not in self.execution_stats:
-                self.execution_stats[strategy_type] = {'success': 0, 'failure': 0, 'total_time': 0}
-            
-            if exception[0]:
-                self.execution_stats[strategy_type]['failure'] += 1
-            else:
-                self.execution_stats[strategy_type]['success'] += 1
-            
-            self.execution_stats[strategy_type]['total_time'] += execution_time
-            
-            # Log statistics
-            stats = self.execution_stats[strategy_type]
-            success_rate = (stats['success'] / (stats['success'] + stats['failure'])) * 100 if (stats['success'] + stats['failure']) > 0 else 0
-            avg_time = stats['total_time'] / (stats['success'] + stats['failure']) if (stats['success'] + stats['failure']) > 0 else 0
-            
-            self.logger.info(f"Strategy {strategy_type} stats - Success rate: {success_rate:.1f}%, Avg time: {avg_time:.2f}s")
-        
-        # Clean up memory
-        import gc
-        gc.collect()
-        
-        return result[0]
+        self._record_execution(strategy_type, True, execution_time)
+        return result
+    
+    def _evaluate_strategy(self, strategy_type: str, symbol: str) -> dict:
+        """Evaluate a strategy for a unit balance (shared across users via the signal cache)"""
+        if strategy_type == 'RSI_STRATEGY':
+            signal = self.strategies.rsi_strategy(symbol, 1.0)
+        elif strategy_type == 'RSI_MULTI_TF':
+            signal = self.strategies.rsi_multi_timeframe_strategy(symbol, 1.0)
+        elif strategy_type == 'VOLUME_FILTER':
+            signal = self.strategies.volume_filter_strategy(symbol, 1.0)
+        elif strategy_type == 'ADVANCED_STRATEGY':
+            signal = self.strategies.advanced_strategy(symbol, 1.0)
+        elif strategy_type == 'GRID_TRADING':
+            signal = self.strategies.grid_trading_strategy(symbol, 1.0)
+        elif strategy_type == 'DCA':
+            signal = self.strategies.dca_strategy(symbol, 1.0)
+        else:
+            self.logger.warning(f"Unknown strategy type: {strategy_type}")
+            signal = None
+        
+        # Validate strategy result
+        if signal is None:
+            self.logger.warning(f"Strategy {strategy_type} returned None")
+            return {"action": "HOLD", "reason": "Strategy returned no signal"}
+        if not isinstance(signal, dict):
+            self.logger.error(f"Strategy {strategy_type} returned invalid result type: {type(signal)}")
+            return {"action": "HOLD", "reason": "Strategy returned invalid result"}
+        if 'action' not in signal:
+            self.logger.error(f"Strategy {strategy_type} returned result without action: {signal}")
+            return {"action": "HOLD", "reason": "Strategy returned result without action"}
+        return signal
+    
+    def _size_signal(self, signal: dict, strategy_type: str, balance: float) -> dict:
+        """Per-user copy of a shared unit-balance signal, with quantity scaled to ``balance``"""
+        sized = dict(signal)
+        # DCA buys a fixed amount; every other strategy sizes linearly with balance
+        if 'quantity' in sized and strategy_type != 'DCA':
+            sized['quantity'] = sized['quantity'] * balance
+        return sized
+    
+    def _get_usdt_balance(self):
+        """USDT balance for sizing; returns (balance, error message or None)"""
+        balance_response = self.api.get_balances()
+        
+        if 'error' not in balance_response and 'data' in balance_response:
+            balances = balance_response['data'].get('balances', [])
+            for asset in balances:
+                # Pionex uses 'coin' instead of 'asset'
+                coin = asset.get('coin', asset.get('asset', ''))
+                if coin == 'USDT':
+                    return float(asset.get('total', 0)), None
+            return 0, None
+        
+        error_msg = balance_response.get('error', 'Unknown error')
+        self.logger.warning(f"Failed to get balance: {error_msg}")
+        
+        # Try to get balance from alternative source
+        try:
+            account_balance = self.api.get_account_balance()
+            if 'error' not in account_balance:
+                balance = float(account_balance.get('total', 0))
+                self.logger.info(f"Retrieved balance from alternative source: {balance}")
+                return balance, None
+        except Exception as alt_error:
+            self.logger.error(f"Alternative balance retrieval also failed: {alt_error}")
+        return 0, error_msg
+    
+    def _cached_health_check(self) -> dict:
+        """health_check() at most once per scheduler.health_check_interval seconds"""
+        interval = self.config.get('scheduler', {}).get('health_check_interval', 300)
+        now = time.time()
+        if self._health is None or now - self._health[0] > interval:
+            self._health = (now, self.health_check())
+        return self._health[1]
+    
+    def _record_execution(self, strategy_type: str, success: bool, execution_time: float):
+        """Track per-strategy success rate and timing"""
+        if strategy_type not in self.execution_stats:
+            self.execution_stats[strategy_type] = {'success': 0, 'failure': 0, 'total_time': 0}
+        stats = self.execution_stats[strategy_type]
+        stats['success' if success else 'failure'] += 1
+        stats['total_time'] += execution_time
+        
+        runs = stats['success'] + stats['failure']
+        success_rate = stats['success'] / runs * 100
+        avg_time = stats['total_time'] / runs
+        self.logger.info(f"Strategy {strategy_type} stats - Success rate: {success_rate:.1f}%, Avg time: {avg_time:.2f}s")
     
     def _execute_trade(self, signal: dict):
         """Execute a trade based on signal with enhanced order types"""
@@ -636,40 +613,41 @@ class AutoTrader:
     def _monitor_order_status(self, order_id: str, symbol: str):
         """Monitor order status and handle fills"""
         try:
-            # Check order status after a delay
-            time.sleep(2)
-            
-            order_status = self.api.get_order(order_id, symbol)
+            # The shared order watcher calls back once the order is final; no per-order sleep/poll
+            self.api.watch_order(order_id, symbol, self._on_order_update)
+        except Exception as e:
+            self.logger.error(f"Error monitoring order status: {e}")
+
+    def _on_order_update(self, order_data: dict):
+        """Handle a final order state pushed by the account-state watcher"""
+        try:
+            order_id = order_data.get('orderId')
+            status = order_data.get('status')
             
-            if 'data' in order_status:
-                order_data = order_status['data']
-                status = order_data.get('status')
+            if status == 'FILLED':
+                # Order was filled
+                filled_qty = float(order_data.get('executedQty', order_data.get('filledSize', 0)) or 0)
+                avg_price = float(order_data.get('avgPrice', order_data.get('filledPrice', 0)) or 0)
+                
+                self.logger.info(f"Order {order_id} filled: {filled_qty} @ {avg_price}")
+                self.send_notification(
+                    "✅ Order Filled",
+                    f"Order {order_id} filled: {filled_qty} @ ${avg_price:.2f}"
+                )
+                
+            elif status in ['CANCELED', 'CANCELLED', 'REJECTED']:
+                # Order was canceled or rejected
+                self.logger.warning(f"Order {order_id} {status}")
+                self.send_notification(
+                    f"⚠️ Order {status.title()}",
+                    f"Order {order_id} was {status.lower()}"
+                )
+                
+            elif 'error' in order_data:
+                self.logger.warning(f"Order {order_id}: {order_data['error']}")
                 
-                if status == 'FILLED':
-                    # Order was filled
-                    filled_qty = float(order_data.get('executedQty', 0))
-                    avg_price = float(order_data.get('avgPrice', 0))
-                    
-                    self.logger.info(f"Order {order_id} filled: {filled_qty} @ {avg_price}")
-                    self.send_notification(
-                        "✅ Order Filled",
-                        f"Order {order_id} filled: {filled_qty} @ ${avg_price:.2f}"
-                    )
-                    
-                elif status in ['PARTIALLY_FILLED', 'PENDING']:
-                    # Order is still active
-                    self.logger.info(f"Order {order_id} status: {status}")
-                    
-                elif status in ['CANCELED', 'REJECTED']:
-                    # Order was canceled or rejected
-                    self.logger.warning(f"Order {order_id} {status}")
-                    self.send_notification(
-                        f"⚠️ Order {status.title()}",
-                        f"Order {order_id} was {status.lower()}"
-                    )
-                    
         except Exception as e:
-            self.logger.error(f"Error monitoring order status: {e}")
+            self.logger.error(f"Error handling order update: {e}")
     
     def send_notification(self, title: str, message: str):
         """Send notification via Telegram or email"""
@@ -732,7 +710,8 @@ class AutoTrader:
             'restart_count': self.restart_count,
             'last_restart': self.last_restart.isoformat() if self.last_restart else None,
             'trading_hours_active': self._is_trading_hours(),
-            'user_id': self.user_id
+            'user_id': self.user_id,
+            'account_cache': self.api.get_account_cache_stats()
         }
     
     def get_portfolio_snapshot(self) -> dict:
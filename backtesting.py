@@ -8,6 +8,270 @@ from pathlib import Path
 from config_loader import get_config
 from pionex_api import PionexAPI
 from trading_strategies import TradingStrategies
+from kline_cache import INTERVAL_MS, normalize_interval
+from candle_store import get_candle_store
+from market_state import normalize_symbol
+
+SUPPORTED_STRATEGIES = ('RSI_STRATEGY', 'RSI_MULTI_TF', 'VOLUME_FILTER', 'ADVANCED_STRATEGY', 'GRID_TRADING', 'DCA')
+
+BUY, HOLD, SELL = 1, 0, -1
+
+
+def default_backtest_params(config: Dict = None, interval: str = '5M') -> Dict:
+    """Strategy and risk parameters for the vectorized backtester, taken from config.yaml"""
+    config = config if config is not None else get_config()
+    interval_ms = INTERVAL_MS.get(normalize_interval(interval), 300_000)
+    htf_factor = max(1, round(3_600_000 / interval_ms))
+    return {
+        'rsi_period': config.get('rsi', {}).get('period', 14),
+        'oversold': config.get('rsi', {}).get('oversold', 30),
+        'overbought': config.get('rsi', {}).get('overbought', 70),
+        'volume_ema_period': config.get('volume_filter', {}).get('ema_period', 20),
+        'volume_multiplier': config.get('volume_filter', {}).get('multiplier', 1.5),
+        'ema_period': 20,
+        'macd_fast': config.get('macd', {}).get('fast', 12),
+        'macd_slow': config.get('macd', {}).get('slow', 26),
+        'macd_signal': config.get('macd', {}).get('signal', 9),
+        'grid_spacing': config.get('grid_trading', {}).get('spacing', 0.02),
+        'dca_interval_bars': max(1, int(config.get('dca_strategy', {}).get('interval_days', 7) * 86_400_000 / interval_ms)),
+        'dca_amount': config.get('dca_strategy', {}).get('amount', 100.0),
+        'dca_max_investment': config.get('dca_strategy', {}).get('max_investment', 10000.0),
+        # Higher timeframe for RSI_MULTI_TF (1H for a 5M base); 1H and above use 4 bars
+        'htf_factor': htf_factor if htf_factor > 1 else 4,
+        'stop_loss_percentage': config.get('stop_loss_percentage', 1.5),
+        'take_profit_percentage': config.get('take_profit_percentage', 2.5),
+        'fee_rate': config.get('backtesting', {}).get('fee_rate', 0.001),
+        'slippage': config.get('backtesting', {}).get('slippage', 0.0),
+        'warmup_bars': 20
+    }
+
+
+def _ema(values: np.ndarray, period: int) -> np.ndarray:
+    """EMA over a full array, identical to ta's ewm(span, adjust=False, min_periods=period)"""
+    return pd.Series(values).ewm(span=period, adjust=False, min_periods=period).mean().to_numpy()
+
+
+def _wilder_averages(close: np.ndarray, period: int):
+    """Wilder-smoothed average gain/loss arrays as used by ta's RSIIndicator"""
+    diff = np.diff(close, prepend=np.nan)
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    alpha = 1.0 / period
+    avg_up = pd.Series(up).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    avg_down = pd.Series(down).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return avg_up, avg_down
+
+
+def _rsi_from_averages(avg_up: np.ndarray, avg_down: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(avg_down == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_up / avg_down))
+
+
+def compute_rsi(close: np.ndarray, period: int) -> np.ndarray:
+    """RSI over a full array; NaN until ``period`` closes are available"""
+    rsi = _rsi_from_averages(*_wilder_averages(close, period))
+    rsi[:period - 1] = np.nan
+    return rsi
+
+
+def compute_htf_rsi(close: np.ndarray, period: int, factor: int) -> np.ndarray:
+    """RSI of a higher timeframe (``factor`` base bars per candle) seen from each base bar.
+
+    Like a live 1H kline request, the higher-timeframe candle in progress uses
+    the current base close, and only completed candles feed the smoothing state,
+    so no future data leaks into earlier bars.
+    """
+    n = len(close)
+    group = np.arange(n) // factor
+    last_of_group = np.minimum((np.arange(group[-1] + 1) + 1) * factor - 1, n - 1)
+    htf_close = close[last_of_group]
+    avg_up, avg_down = _wilder_averages(htf_close, period)
+
+    prev = group - 1
+    valid = prev >= 0
+    prev_idx = np.where(valid, prev, 0)
+    diff = close - htf_close[prev_idx]
+    alpha = 1.0 / period
+    up = (1 - alpha) * avg_up[prev_idx] + alpha * np.where(diff > 0, diff, 0.0)
+    down = (1 - alpha) * avg_down[prev_idx] + alpha * np.where(diff < 0, -diff, 0.0)
+    rsi = _rsi_from_averages(up, down)
+    rsi[~valid | (group < period - 1)] = np.nan
+    return rsi
+
+
+def compute_signals(strategy: str, open_: np.ndarray, high: np.ndarray, low: np.ndarray,
+                    close: np.ndarray, volume: np.ndarray, params: Dict) -> np.ndarray:
+    """Derive the BUY/SELL/HOLD vector for every bar in one pass over precomputed indicators"""
+    n = len(close)
+    signals = np.zeros(n, dtype=np.int8)
+
+    if strategy == 'RSI_STRATEGY':
+        rsi = compute_rsi(close, params['rsi_period'])
+        signals[rsi < params['oversold']] = BUY
+        signals[rsi > params['overbought']] = SELL
+
+    elif strategy == 'RSI_MULTI_TF':
+        rsi = compute_rsi(close, params['rsi_period'])
+        rsi_htf = compute_htf_rsi(close, params['rsi_period'], params['htf_factor'])
+        signals[(rsi < params['oversold']) & (rsi_htf < params['oversold'])] = BUY
+        signals[(rsi > params['overbought']) & (rsi_htf > params['overbought'])] = SELL
+
+    elif strategy == 'VOLUME_FILTER':
+        volume_ema = _ema(volume, params['volume_ema_period'])
+        signals[volume > volume_ema * params['volume_multiplier']] = BUY
+
+    elif strategy == 'ADVANCED_STRATEGY':
+        rsi = compute_rsi(close, params['rsi_period'])
+        ema = _ema(close, params['ema_period'])
+        macd = _ema(close, params['macd_fast']) - _ema(close, params['macd_slow'])
+        macd_signal = _ema(macd, params['macd_signal'])
+        ready = ~(np.isnan(rsi) | np.isnan(ema) | np.isnan(macd_signal))
+        buy_votes = (rsi < params['oversold']).astype(np.int8) + (close > ema) + (macd > macd_signal)
+        sell_votes = (rsi > params['overbought']).astype(np.int8) + (close <= ema) + (macd <= macd_signal)
+        signals[ready & (buy_votes >= 2)] = BUY
+        signals[ready & (buy_votes < 2) & (sell_votes >= 2)] = SELL
+
+    elif strategy == 'GRID_TRADING':
+        # Grid anchored at the first close: buy on a downward level cross, sell on an upward one
+        level = np.floor(np.log(close / close[0]) / np.log1p(params['grid_spacing']))
+        step = np.diff(level, prepend=level[0])
+        signals[step < 0] = BUY
+        signals[step > 0] = SELL
+
+    elif strategy == 'DCA':
+        signals[::params['dca_interval_bars']] = BUY
+
+    else:
+        raise ValueError(f"Unknown strategy: {strategy}")
+
+    signals[:params.get('warmup_bars', 0)] = HOLD
+    return signals
+
+
+def simulate_trades(signals: np.ndarray, open_: np.ndarray, high: np.ndarray, low: np.ndarray,
+                    close: np.ndarray, params: Dict, initial_balance: float = 1000.0, times=None,
+                    scale_in: bool = False) -> Dict:
+    """Long-only fill simulation with fees, slippage and intrabar SL/TP.
+
+    Entries fill at the signal bar's close. From the next bar on, the stop loss
+    is checked before the take profit (conservative when both are inside one
+    bar), gaps through a level fill at the open, and a SELL signal exits at close.
+    With ``scale_in`` (DCA) every BUY adds a ``dca_amount`` tranche, up to
+    ``dca_max_investment`` per position, and SL/TP follow the average entry.
+    """
+    fee = params.get('fee_rate', 0.0)
+    slip = params.get('slippage', 0.0)
+    sl_pct = params.get('stop_loss_percentage', 0) / 100
+    tp_pct = params.get('take_profit_percentage', 0) / 100
+    tranche = params.get('dca_amount', 100.0)
+    max_investment = params.get('dca_max_investment', float('inf'))
+
+    sig = signals.tolist()
+    op, hi, lo, cl = open_.tolist(), high.tolist(), low.tolist(), close.tolist()
+    tm = times.tolist() if times is not None else None
+    n = len(cl)
+    equity = [0.0] * n
+    cash = initial_balance
+    units = 0.0
+    entry = stop = target = invested = 0.0
+    trades = []
+    round_trips = []
+
+    for i in range(n):
+        exit_price = None
+        if units:
+            if sl_pct and lo[i] <= stop:
+                exit_price, reason = min(op[i], stop), 'stop_loss'
+            elif tp_pct and hi[i] >= target:
+                exit_price, reason = max(op[i], target), 'take_profit'
+            elif sig[i] == SELL:
+                exit_price, reason = cl[i], 'signal'
+            if exit_price is not None:
+                fill = exit_price * (1 - slip)
+                cash += units * fill * (1 - fee)
+                round_trips.append(fill * (1 - fee) / (entry / (1 - fee)) - 1)
+                trades.append({'type': 'SELL', 'price': fill, 'index': i, 'reason': reason,
+                               'time': tm[i] if tm else i})
+                units = invested = 0.0
+        if exit_price is None and sig[i] == BUY and cash > 0 and (scale_in or not units):
+            spend = min(tranche, cash, max_investment - invested) if scale_in else cash
+            if spend > 0:
+                fill = cl[i] * (1 + slip)
+                bought = spend * (1 - fee) / fill
+                # Average entry weighted by units, so SL/TP track the blended cost
+                entry = (units * entry + bought * fill) / (units + bought)
+                units += bought
+                cash -= spend
+                invested += spend
+                stop = entry * (1 - sl_pct)
+                target = entry * (1 + tp_pct)
+                trades.append({'type': 'BUY', 'price': fill, 'index': i, 'amount': spend,
+                               'avg_entry': entry, 'time': tm[i] if tm else i})
+        equity[i] = cash + units * cl[i]
+
+    if units:
+        fill = cl[-1] * (1 - slip)
+        cash += units * fill * (1 - fee)
+        round_trips.append(fill * (1 - fee) / (entry / (1 - fee)) - 1)
+        trades.append({'type': 'SELL', 'price': fill, 'index': n - 1, 'reason': 'end_of_data',
+                       'time': tm[-1] if tm else n - 1})
+        equity[-1] = cash
+
+    return {'equity_curve': np.asarray(equity), 'trades': trades, 'round_trips': np.asarray(round_trips),
+            'final_balance': cash}
+
+
+def summarize_backtest(equity_curve: np.ndarray, round_trips: np.ndarray, initial_balance: float) -> Dict:
+    """PnL, Sharpe, drawdown and win rate from an equity curve and per-trade returns"""
+    curve = np.concatenate(([initial_balance], equity_curve))
+    returns = np.diff(curve) / curve[:-1]
+    std = np.std(returns)
+    peaks = np.maximum.accumulate(curve)
+    drawdown = peaks - curve
+    return {
+        'final_balance': float(curve[-1]),
+        'pnl': float(curve[-1] - initial_balance),
+        'sharpe': float(np.mean(returns) / std * np.sqrt(252)) if std > 0 else 0.0,
+        'max_drawdown': float(drawdown.max()),
+        'max_drawdown_pct': float((drawdown / peaks).max() * 100),
+        'win_rate': float((round_trips > 0).mean()) if len(round_trips) else 0.0,
+        'num_trades': int(len(round_trips))
+    }
+
+
+def vectorized_backtest(ohlcv, strategy: str, initial_balance: float = 1000.0, params: Dict = None,
+                        include_trades: bool = True) -> Dict:
+    """Backtest a strategy over historical OHLCV arrays without any exchange calls.
+
+    ``ohlcv`` is a DataFrame or mapping with 'open', 'high', 'low', 'close',
+    'volume' (and optionally 'open_time') columns.
+    """
+    if strategy not in SUPPORTED_STRATEGIES:
+        return {'error': f'Unknown strategy: {strategy}'}
+    params = params if params is not None else default_backtest_params()
+    open_ = np.asarray(ohlcv['open'], dtype=np.float64)
+    high = np.asarray(ohlcv['high'], dtype=np.float64)
+    low = np.asarray(ohlcv['low'], dtype=np.float64)
+    close = np.asarray(ohlcv['close'], dtype=np.float64)
+    volume = np.asarray(ohlcv['volume'], dtype=np.float64)
+    if len(close) == 0:
+        return {'error': 'No historical data available'}
+    times = ohlcv['open_time'] if 'open_time' in ohlcv else None
+    if times is not None:
+        times = np.asarray(times)
+        if times.dtype.kind == 'M':
+            times = times.astype('datetime64[ms]').astype(np.int64)
+
+    signals = compute_signals(strategy, open_, high, low, close, volume, params)
+    sim = simulate_trades(signals, open_, high, low, close, params, initial_balance,
+                          times if include_trades else None, scale_in=strategy == 'DCA')
+    result = summarize_backtest(sim['equity_curve'], sim['round_trips'], initial_balance)
+    result.update({'strategy': strategy, 'initial_balance': initial_balance, 'bars': int(len(close))})
+    if include_trades:
+        result['trades'] = sim['trades']
+        result['equity_curve'] = sim['equity_curve'].tolist()
+    return result
+
 
 class Backtester:
     def __init__(self, user_id: int = None):
@@ -18,6 +282,8 @@ class Backtester:
         self.logger = self._setup_logging()
         self.paper_trading = self.config.get('backtesting', {}).get('paper_trading', True)
         self.ledger = []  # Simulated trades for paper trading
+        self._paper_listener = False
+        self._paper_symbols = set()  # Symbols already subscribed on the stream feeding the paper engine
 
     def _setup_logging(self):
         log_dir = Path('logs')
@@ -33,89 +299,51 @@ class Backtester:
         return logger
 
     def fetch_historical_klines(self, symbol: str, interval: str, limit: int = 1000) -> pd.DataFrame:
-        klines = self.api.get_klines(symbol, interval, limit)
-        if 'error' in klines or 'data' not in klines:
-            self.logger.error(f"Error fetching klines: {klines.get('error', 'No data')}")
+        """Latest ``limit`` closed candles from the local candle store, syncing the missing tail first"""
+        store = get_candle_store()
+        sync = store.sync(self.api, symbol, interval, min_bars=limit)
+        if 'error' in sync:
+            self.logger.error(f"Error syncing klines for {symbol} {interval}: {sync['error']}")
+        columns = store.read_last(symbol, interval, limit)
+        if len(columns['time']) == 0:
             return pd.DataFrame()
-        df = pd.DataFrame(klines['data'])
-        # Assume columns: open_time, open, high, low, close, volume, ...
-        df.columns = ['open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time', 'quote_asset_volume', 'num_trades', 'taker_buy_base', 'taker_buy_quote', 'ignore'][:len(df.columns)]
-        df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
-        df['close'] = df['close'].astype(float)
-        df['open'] = df['open'].astype(float)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-        df['volume'] = df['volume'].astype(float)
-        return df
+        return store.to_frame(columns)
 
     def run_backtest(self, symbol: str, strategy: str, interval: str = '1h', period: int = 500, initial_balance: float = 1000.0, **kwargs) -> Dict:
+        """Backtest on historical klines; signals come from the candles themselves, not live data"""
         df = self.fetch_historical_klines(symbol, interval, period)
         if df.empty:
             return {'error': 'No historical data available'}
-        balance = initial_balance
-        position = 0
-        entry_price = 0
-        trades = []
-        equity_curve = [balance]
-        for i in range(20, len(df)):
-            price = df['close'].iloc[i]
-            # Get signal from strategy
-            if strategy == 'RSI_STRATEGY':
-                signal = self.strategies.rsi_strategy(symbol, balance)
-            elif strategy == 'RSI_MULTI_TF':
-                signal = self.strategies.rsi_multi_timeframe_strategy(symbol, balance)
-            elif strategy == 'VOLUME_FILTER':
-                signal = self.strategies.volume_filter_strategy(symbol, balance)
-            elif strategy == 'ADVANCED_STRATEGY':
-                signal = self.strategies.advanced_strategy(symbol, balance)
-            elif strategy == 'GRID_TRADING':
-                signal = self.strategies.grid_trading_strategy(symbol, balance)
-            elif strategy == 'DCA':
-                signal = self.strategies.dca_strategy(symbol, balance)
-            else:
-                return {'error': f'Unknown strategy: {strategy}'}
-            action = signal.get('action')
-            # Simulate trade
-            if action == 'BUY' and position == 0:
-                position = balance / price
-                entry_price = price
-                balance = 0
-                trades.append({'type': 'BUY', 'price': price, 'time': df['open_time'].iloc[i]})
-            elif action == 'SELL' and position > 0:
-                balance = position * price
-                trades.append({'type': 'SELL', 'price': price, 'time': df['open_time'].iloc[i]})
-                position = 0
-                entry_price = 0
-            equity = balance + position * price
-            equity_curve.append(equity)
-        # Final close
-        if position > 0:
-            balance = position * df['close'].iloc[-1]
-            trades.append({'type': 'SELL', 'price': df['close'].iloc[-1], 'time': df['open_time'].iloc[-1]})
-            position = 0
-        final_equity = balance
-        pnl = final_equity - initial_balance
-        returns = np.diff(equity_curve) / equity_curve[:-1]
-        sharpe = np.mean(returns) / np.std(returns) * np.sqrt(252) if np.std(returns) > 0 else 0
-        max_drawdown = np.max(np.maximum.accumulate(equity_curve) - equity_curve)
-        win_trades = [t for t in trades if t['type'] == 'SELL' and t['price'] > entry_price]
-        win_rate = len(win_trades) / (len([t for t in trades if t['type'] == 'SELL']) or 1)
-        result = {
-            'symbol': symbol,
-            'strategy': strategy,
-            'interval': interval,
-            'initial_balance': initial_balance,
-            'final_balance': final_equity,
-            'pnl': pnl,
-            'sharpe': sharpe,
-            'max_drawdown': max_drawdown,
-            'win_rate': win_rate,
-            'trades': trades,
-            'equity_curve': equity_curve
-        }
-        self.logger.info(f"Backtest result: {result}")
+        params = default_backtest_params(self.config, interval)
+        params.update({k: v for k, v in kwargs.items() if k in params})
+        result = vectorized_backtest(df, strategy, initial_balance, params)
+        if 'error' in result:
+            return result
+        result.update({'symbol': symbol, 'interval': interval})
+        self.logger.info(f"Backtest result: {symbol} {strategy} {interval} pnl={result['pnl']:.2f} "
+                         f"sharpe={result['sharpe']:.2f} trades={result['num_trades']}")
         return result
 
+    def run_parameter_sweep(self, symbol: str, strategy: str, combinations: List[Dict], results_path: str,
+                            interval: str = '5M', period: int = 1000, initial_balance: float = 1000.0,
+                            max_workers: int = None, rank_by: str = 'sharpe') -> Dict:
+        """Backtest many parameter sets in parallel; results stream to ``results_path`` and the sweep is resumable"""
+        from parameter_sweep import pinned_ohlcv, run_parameter_sweep
+        # A resumed sweep runs on its pinned bars, so only a new one needs history
+        df = pinned_ohlcv(results_path)
+        if df is None:
+            df = self.fetch_historical_klines(symbol, interval, period)
+            if df.empty:
+                return {'error': 'No historical data available'}
+        params = default_backtest_params(self.config, interval)
+        try:
+            ranked = run_parameter_sweep(df, strategy, combinations, results_path, params, initial_balance,
+                                         max_workers=max_workers, rank_by=rank_by, symbol=symbol, interval=interval)
+        except ValueError as e:
+            return {'error': str(e)}
+        self.logger.info(f"Parameter sweep {symbol} {strategy} {interval}: {len(ranked)} results in {results_path}")
+        return {'symbol': symbol, 'strategy': strategy, 'interval': interval, 'results': ranked}
+
     def enable_paper_trading(self):
         self.paper_trading = True
         self.logger.info("Paper trading enabled")
@@ -128,6 +356,30 @@ class Backtester:
         self.ledger.append(trade)
         self.logger.info(f"Paper trade recorded: {trade}")
 
+    def place_paper_order(self, symbol: str, side: str, order_type: str, size: float, price: float = 0.0,
+                          **kwargs) -> Dict:
+        """Submit an order to this user's account on the shared paper matching engine; fills land in the ledger"""
+        if not self.paper_trading:
+            return {'error': 'Paper trading is disabled'}
+        from paper_matching import get_paper_engine
+        from pionex_ws import get_pionex_websocket
+        engine = get_paper_engine()
+        symbol = normalize_symbol(symbol)
+        # The engine only matches on streamed trades, so make sure this symbol's trades arrive
+        if symbol not in self._paper_symbols:
+            if get_pionex_websocket([symbol]) is None:
+                self.logger.warning(f"Websocket disabled: paper orders on {symbol} may never fill")
+            else:
+                self._paper_symbols.add(symbol)
+        account_id = f"user_{self.user_id}" if self.user_id else "global"
+        if not self._paper_listener:
+            def on_fill(fill: Dict):
+                if fill['account_id'] == account_id:
+                    self.record_paper_trade(fill)
+            engine.add_fill_listener(on_fill)
+            self._paper_listener = True
+        return engine.submit_order(account_id, symbol, side, order_type, size, price, **kwargs)
+
     def get_paper_trading_ledger(self) -> List[Dict]:
         return self.ledger
 
@@ -143,6 +395,10 @@ def run_backtest(user_id: int, symbol: str, strategy: str, interval: str = '1h',
     backtester = get_backtester(user_id)
     return backtester.run_backtest(symbol, strategy, interval, period, initial_balance, **kwargs)
 
+def run_parameter_sweep(user_id: int, symbol: str, strategy: str, combinations: List[Dict], results_path: str, **kwargs) -> Dict:
+    backtester = get_backtester(user_id)
+    return backtester.run_parameter_sweep(symbol, strategy, combinations, results_path, **kwargs)
+
 def enable_paper_trading(user_id: int):
     backtester = get_backtester(user_id)
     backtester.enable_paper_trading()
@@ -155,6 +411,38 @@ def record_paper_trade(user_id: int, trade: Dict):
     backtester = get_backtester(user_id)
     backtester.record_paper_trade(trade)
 
+def place_paper_order(user_id: int, symbol: str, side: str, order_type: str, size: float, price: float = 0.0,
+                      **kwargs) -> Dict:
+    backtester = get_backtester(user_id)
+    return backtester.place_paper_order(symbol, side, order_type, size, price, **kwargs)
+
 def get_paper_trading_ledger(user_id: int) -> List[Dict]:
     backtester = get_backtester(user_id)
-    return backtester.get_paper_trading_ledger() 
\ No newline at end of file
+    return backtester.get_paper_trading_ledger()
+
+
+def benchmark_vectorized_backtest(n_bars: int = 100_000):
+    """Time every supported strategy over a synthetic random-walk history"""
+    import time
+    rng = np.random.default_rng(7)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.002, n_bars)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.001, n_bars)) * close
+    ohlcv = {
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.lognormal(3, 1, n_bars)
+    }
+    params = default_backtest_params(interval='5M')
+    for strategy in SUPPORTED_STRATEGIES:
+        start = time.perf_counter()
+        result = vectorized_backtest(ohlcv, strategy, params=params, include_trades=False)
+        elapsed = time.perf_counter() - start
+        print(f"{strategy:18s} {n_bars} bars in {elapsed * 1000:7.1f} ms  "
+              f"trades={result['num_trades']:5d} pnl={result['pnl']:10.2f}")
+
+
+if __name__ == '__main__':
+    benchmark_vectorized_backtest()
@@ -20,13 +20,21 @@ import pytz
 import pandas as pd
 import numpy as np
 
+from breakout_engine import BreakoutEngine
+from bybit_ws import get_bybit_orderbook_stream
+from candle_store import get_candle_store
+from order_book import find_order_book
+from session_calendar import RangeBox, RangeTracker, SessionCalendar
+from timeframe_resampler import get_timeframe_resampler
+
 logger = logging.getLogger(__name__)
 
 class Bot2025:
     """Bot 2025 - Enhanced Trading Bot with Session-Based Breakout Strategy"""
     
-    def __init__(self, config: Dict):
+    def __init__(self, config: Dict, api=None):
         self.config = config.get('bot_2025', {})
+        self.api = api  # Syncs the 1M base series when given; otherwise only stored and fed candles are used
         self.enabled = self.config.get('enabled', False)
         
         if not self.enabled:
@@ -40,6 +48,9 @@ class Bot2025:
         self.anti_fake = self.config.get('anti_fake', {})
         self.mtf_rsi = self.config.get('mtf_rsi', {})
         self.volume_filter = self.config.get('volume_filter', {})
+        # Slippage checks read the local book of the venue the bot trades on
+        bybit_enabled = self.config.get('exchanges', {}).get('bybit', {}).get('enabled', False)
+        self.book_exchange = 'bybit' if bybit_enabled else 'pionex'
         
         # Trading state
         self.active_trades = {}
@@ -50,140 +61,121 @@ class Bot2025:
         # Timezone setup
         self.timezone = pytz.timezone('America/New_York')  # UTC-5
         
+        # Session windows are precomputed from tz rules; range boxes grow candle by candle
+        self.calendar = SessionCalendar(self.sessions)
+        self.range_tracker = RangeTracker(self.calendar, {
+            name: session.get('range_box_lookback', 90) for name, session in self.sessions.items()
+        })
+        
+        # Every configured pair is evaluated in one vectorized step per closed 1M candle round
+        symbols = self.config.get('exchanges', {}).get(self.book_exchange, {}).get('symbols', [])
+        if self.book_exchange == 'bybit' and symbols:
+            # Stream the books for anti-fake checks and the trades that keep the resampler's forming bars live
+            stream = get_bybit_orderbook_stream(symbols)
+            if stream is not None:
+                stream.subscribe_trades(symbols)
+        self.breakout_engine = BreakoutEngine(self, symbols)
+        self.breakout_engine.add_intent_listener(self._on_intent)
+        self.breakout_engine.warmup(self.api)
+        
         logger.info("Bot 2025 initialized successfully")
     
-    def is_session_active(self, session_name: str) -> bool:
-        """Check if a trading session is currently active"""
+    def is_session_active(self, session_name: str, at_ms: int = None) -> bool:
+        """Check if a trading session is active now (or at ``at_ms``)"""
         if not self.sessions.get(session_name, {}).get('enabled', False):
             return False
-        
-        session_config = self.sessions[session_name]
-        current_time = datetime.now(self.timezone)
-        
-        if session_name == 'us_session':
-            return self._is_us_session_active(current_time, session_config)
-        elif session_name == 'asian_session':
-            return self._is_asian_session_active(current_time, session_config)
-        
-        return False
+        return self.calendar.window_at(session_name, at_ms) is not None
     
-    def _is_us_session_active(self, current_time: datetime, config: Dict) -> bool:
-        """Check if US session is active based on daylight saving time"""
-        month = current_time.month
-        current_time_str = current_time.strftime("%H:%M")
-        
-        # Check if it's daylight saving time
-        if month in config.get('daylight_saving', {}).get('months', []):
-            start_time = config['daylight_saving']['start_time']
-            end_time = config['daylight_saving']['end_time']
-        else:
-            start_time = config['standard_time']['start_time']
-            end_time = config['standard_time']['end_time']
-        
-        return start_time <= current_time_str <= end_time
+    def on_candle(self, symbol: str, candle: Tuple) -> List[Dict]:
+        """Feed one closed (time, open, high, low, close, volume) 1M candle; returns range boxes completed on it"""
+        get_timeframe_resampler(self.book_exchange).on_candle(symbol, candle)
+        self.breakout_engine.feed(symbol, candle)
+        completed = []
+        for box in self.range_tracker.update(symbol, candle[0], candle[2], candle[3]):
+            completed.append(self._publish_range_box(box))
+        return completed
     
-    def _is_asian_session_active(self, current_time: datetime, config: Dict) -> bool:
-        """Check if Asian session is active"""
-        current_time_str = current_time.strftime("%H:%M")
-        start_time = config['start_time']
-        end_time = config['end_time']
-        
-        # Handle session that crosses midnight
-        if start_time > end_time:  # e.g., 19:30 -> 01:30
-            return current_time_str >= start_time or current_time_str <= end_time
-        else:
-            return start_time <= current_time_str <= end_time
+    def add_intent_listener(self, callback):
+        """Register ``callback(intent)`` for trades the breakout engine opens (the order layer)"""
+        self.breakout_engine.add_intent_listener(callback)
     
-    def calculate_range_box(self, symbol: str, session_name: str, market_data: pd.DataFrame) -> Dict:
-        """Calculate range box for a session"""
-        if not self.is_session_active(session_name):
-            return {}
-        
-        session_config = self.sessions[session_name]
-        lookback_minutes = session_config.get('range_box_lookback', 90)
-        
-        # Get the first 90 minutes of data for the session
-        session_start = self._get_session_start_time(session_name)
-        session_data = market_data[market_data.index >= session_start]
-        
-        if len(session_data) < 2:
-            return {}
-        
-        # Calculate high and low for the lookback period
-        lookback_data = session_data.head(lookback_minutes)
-        high = lookback_data['high'].max()
-        low = lookback_data['low'].min()
-        
+    def _on_intent(self, intent: Dict):
+        self._record_trade(intent['symbol'], intent['session'], intent['signal'], intent['entry_price'],
+                           intent['size'], intent['risk_params'])
+    
+    def _publish_range_box(self, box: RangeBox) -> Dict:
         range_box = {
-            'symbol': symbol,
-            'session': session_name,
-            'high': high,
-            'low': low,
-            'range': high - low,
-            'session_start': session_start,
+            'symbol': box.symbol,
+            'session': box.session,
+            'high': box.high,
+            'low': box.low,
+            'range': box.high - box.low,
+            'session_start': datetime.fromtimestamp(box.open_ms / 1000, self.timezone),
             'calculated_at': datetime.now(),
-            'lookback_minutes': lookback_minutes
+            'lookback_minutes': (box.end_ms - box.open_ms) // 60_000,
+            'candles': box.candles,
+            'complete': box.frozen
         }
-        
-        self.range_boxes[f"{symbol}_{session_name}"] = range_box
-        
-        if self.config.get('logging', {}).get('log_box_levels', False):
-            logger.info(f"Range box calculated for {symbol} {session_name}: High={high:.4f}, Low={low:.4f}")
-        
+        self.range_boxes[f"{box.symbol}_{box.session}"] = range_box
+        if box.frozen and self.config.get('logging', {}).get('log_box_levels', False):
+            logger.info(f"Range box calculated for {box.symbol} {box.session}: High={box.high:.4f}, Low={box.low:.4f}")
         return range_box
     
-    def _get_session_start_time(self, session_name: str) -> datetime:
-        """Get the start time of the current session"""
-        current_time = datetime.now(self.timezone)
-        
-        if session_name == 'us_session':
-            return self._get_us_session_start(current_time)
-        elif session_name == 'asian_session':
-            return self._get_asian_session_start(current_time)
-        
-        return current_time
-    
-    def _get_us_session_start(self, current_time: datetime) -> datetime:
-        """Get US session start time"""
-        month = current_time.month
+    def calculate_range_box(self, symbol: str, session_name: str, market_data: pd.DataFrame = None) -> Dict:
+        """Range box of the current session, backfilled from the local 1M candle store or ``market_data``"""
+        now_ms = int(time.time() * 1000)
+        window = self.calendar.window_at(session_name, now_ms)
+        if window is None or not self.sessions.get(session_name, {}).get('enabled', False):
+            return {}
         
-        if month in self.sessions['us_session']['daylight_saving']['months']:
-            start_time_str = self.sessions['us_session']['daylight_saving']['start_time']
+        box = self.range_tracker.get(symbol, session_name)
+        if box is None or box.open_ms != window.open_ms or not box.covers_start:
+            # First look at this session (or the live feed started mid-lookback): rebuild from the open
+            self.range_tracker.reset(symbol, session_name)
+            start_ms = window.open_ms
+        elif not box.frozen:
+            # Still incomplete: fold in whatever the live feed has not delivered yet
+            start_ms = box.last_ms + 60_000
         else:
-            start_time_str = self.sessions['us_session']['standard_time']['start_time']
-        
-        # Parse time and set to today
-        hour, minute = map(int, start_time_str.split(':'))
-        session_start = current_time.replace(hour=hour, minute=minute, second=0, microsecond=0)
-        
-        # If session start is in the future, use yesterday
-        if session_start > current_time:
-            session_start -= timedelta(days=1)
-        
-        return session_start
+            return self._publish_range_box(box)
+        
+        lookback_end = window.open_ms + self.range_tracker.lookbacks[session_name] * 60_000 - 1
+        if start_ms <= lookback_end:
+            if market_data is None:
+                candles = get_candle_store().read_range(symbol, '1M', start_ms, lookback_end,
+                                                        exchange=self.book_exchange)
+                times, highs, lows = candles['time'], candles['high'], candles['low']
+            else:
+                times = market_data.index.asi8 // 1_000_000
+                in_box = (times >= start_ms) & (times <= lookback_end)
+                times = times[in_box]
+                highs = market_data['high'].to_numpy()[in_box]
+                lows = market_data['low'].to_numpy()[in_box]
+            for open_ms, high, low in zip(times, highs, lows):
+                self.range_tracker.update(symbol, int(open_ms), float(high), float(low))
+        
+        box = self.range_tracker.get(symbol, session_name)
+        if box is None or box.candles < 2:
+            return {}
+        return self._publish_range_box(box)
     
-    def _get_asian_session_start(self, current_time: datetime) -> datetime:
-        """Get Asian session start time"""
-        start_time_str = self.sessions['asian_session']['start_time']
-        hour, minute = map(int, start_time_str.split(':'))
-        
-        # Asian session starts in the evening
-        session_start = current_time.replace(hour=hour, minute=minute, second=0, microsecond=0)
-        
-        # If session start is in the future, use yesterday
-        if session_start > current_time:
-            session_start -= timedelta(days=1)
-        
-        return session_start
+    def _get_session_start_time(self, session_name: str) -> Optional[datetime]:
+        """Start of the current (or most recent) window of a session"""
+        window = self.calendar.last_window(session_name)
+        return datetime.fromtimestamp(window.open_ms / 1000, self.timezone) if window else None
     
     def check_breakout_conditions(self, symbol: str, session_name: str, current_price: float, 
-                                 market_data: pd.DataFrame) -> Dict:
+                                 market_data: pd.DataFrame, size: float = None) -> Dict:
         """Check if breakout conditions are met"""
         if not self.breakout.get('enabled', False):
             return {'valid': False, 'reason': 'Breakout trading disabled'}
+        if market_data is None:
+            market_data = self._recent_candles(symbol)
         
         # Check if session is active
-        if not self.is_session_active(session_name):
+        now_ms = int(time.time() * 1000)
+        window = self.calendar.window_at(session_name, now_ms)
+        if window is None or not self.sessions.get(session_name, {}).get('enabled', False):
             return {'valid': False, 'reason': f'{session_name} not active'}
         
         # Check cooldown
@@ -194,10 +186,15 @@ class Bot2025:
         if not self._check_max_trades(symbol, session_name):
             return {'valid': False, 'reason': 'Max trades per session reached'}
         
-        # Get range box
-        range_box = self.range_boxes.get(f"{symbol}_{session_name}")
-        if not range_box:
+        # Get range box: only a completed box of this session window counts
+        box = self.range_tracker.get(symbol, session_name)
+        if box is None or box.open_ms != window.open_ms:
             return {'valid': False, 'reason': 'Range box not calculated'}
+        if not box.frozen:
+            return {'valid': False, 'reason': 'Range box still forming'}
+        range_box = self.range_boxes.get(f"{symbol}_{session_name}")
+        if not range_box or not range_box['complete']:
+            range_box = self._publish_range_box(box)
         
         # Check breakout conditions
         buffer = self.breakout.get('buffer_percentage', 0.05) / 100
@@ -223,7 +220,7 @@ class Bot2025:
             return filter_result
         
         # Check anti-fake breakout
-        if not self._check_anti_fake_breakout(current_price, range_box, breakout_signal):
+        if not self._check_anti_fake_breakout(current_price, range_box, breakout_signal, symbol, size):
             return {'valid': False, 'reason': 'Anti-fake breakout check failed'}
         
         return {
@@ -234,6 +231,11 @@ class Bot2025:
             'filters': filter_result
         }
     
+    def _recent_candles(self, symbol: str) -> pd.DataFrame:
+        """Latest 1M candles, enough for the confirmation and volume checks"""
+        limit = max(self.breakout.get('confirmation_candles', 1), self.volume_filter.get('ema_period', 20))
+        return get_timeframe_resampler(self.book_exchange).get_frame(self.api, symbol, '1M', limit)
+    
     def _check_cooldown(self, symbol: str, session_name: str) -> bool:
         """Check if cooldown period has passed"""
         cooldown_minutes = self.breakout.get('cooldown_minutes', 30)
@@ -274,7 +276,7 @@ class Bot2025:
         """Check all trading filters"""
         # Check MTF RSI
         if self.mtf_rsi.get('enabled', False):
-            rsi_result = self._check_mtf_rsi(market_data, signal)
+            rsi_result = self._check_mtf_rsi(symbol, signal)
             if not rsi_result['valid']:
                 return rsi_result
         
@@ -286,28 +288,37 @@ class Bot2025:
         
         return {'valid': True, 'filters_passed': ['MTF_RSI', 'VOLUME']}
     
-    def _check_mtf_rsi(self, market_data: pd.DataFrame, signal: str) -> Dict:
-        """Check multi-timeframe RSI conditions"""
-        # This would require market data from different timeframes
-        # For now, we'll use the current timeframe data as a placeholder
+    def _check_mtf_rsi(self, symbol: str, signal: str) -> Dict:
+        """Check multi-timeframe RSI conditions on timeframes resampled from the 1M base series.
         
+        LONG needs the long-timeframe RSI at or above its threshold and the short-timeframe RSI at or
+        above its threshold; SHORT needs both at or below theirs. The reduced version checks only the
+        long timeframe.
+        """
         thresholds = self.mtf_rsi.get('thresholds', {})
+        timeframes = self.mtf_rsi.get('timeframes', {})
+        period = self.mtf_rsi.get('period', 14)
+        resampler = get_timeframe_resampler(self.book_exchange)
+        rsi_short = resampler.indicator(self.api, symbol, timeframes.get('short', '5m'), 'rsi', period=period)
+        rsi_long = resampler.indicator(self.api, symbol, timeframes.get('long', '1h'), 'rsi', period=period)
+        if rsi_long is None or (rsi_short is None and not self.mtf_rsi.get('reduced_version', False)):
+            return {'valid': False, 'reason': 'Insufficient data for MTF RSI'}
         
         if signal == 'LONG':
             short_threshold = thresholds.get('long_conditions', {}).get('short_tf', 30)
             long_threshold = thresholds.get('long_conditions', {}).get('long_tf', 50)
-            
-            # Simplified check - would need actual RSI calculation
-            # For now, return True as placeholder
-            return {'valid': True, 'rsi_conditions': 'LONG conditions met'}
-        
+            long_ok = rsi_long >= long_threshold
+            short_ok = self.mtf_rsi.get('reduced_version', False) or rsi_short >= short_threshold
         else:  # SHORT
             short_threshold = thresholds.get('short_conditions', {}).get('short_tf', 70)
             long_threshold = thresholds.get('short_conditions', {}).get('long_tf', 50)
-            
-            # Simplified check - would need actual RSI calculation
-            # For now, return True as placeholder
-            return {'valid': True, 'rsi_conditions': 'SHORT conditions met'}
+            long_ok = rsi_long <= long_threshold
+            short_ok = self.mtf_rsi.get('reduced_version', False) or rsi_short <= short_threshold
+        
+        if long_ok and short_ok:
+            return {'valid': True, 'rsi_conditions': f'{signal} conditions met', 'rsi_short': rsi_short, 'rsi_long': rsi_long}
+        return {'valid': False, 'reason': f'MTF RSI {rsi_short} / {rsi_long} fails {signal} thresholds '
+                                          f'{short_threshold} / {long_threshold}'}
     
     def _check_volume_filter(self, market_data: pd.DataFrame) -> Dict:
         """Check volume filter conditions"""
@@ -325,20 +336,41 @@ class Bot2025:
         else:
             return {'valid': False, 'reason': f'Volume {current_volume} < {ema_volume * multiplier}'}
     
-    def _check_anti_fake_breakout(self, current_price: float, range_box: Dict, signal: str) -> bool:
+    def _check_anti_fake_breakout(self, current_price: float, range_box: Dict, signal: str,
+                                  symbol: str = None, size: float = None) -> bool:
         """Check anti-fake breakout conditions"""
-        if not self.anti_fake.get('retest_enabled', False):
-            return True
-        
         max_slippage = self.anti_fake.get('max_slippage', 0.05) / 100
         min_distance = self.anti_fake.get('min_distance_from_box', 0.02) / 100
         
-        if signal == 'LONG':
-            distance_from_high = (current_price - range_box['high']) / range_box['high']
-            return distance_from_high >= min_distance and distance_from_high <= max_slippage
-        else:  # SHORT
-            distance_from_low = (range_box['low'] - current_price) / range_box['low']
-            return distance_from_low >= min_distance and distance_from_low <= max_slippage
+        if self.anti_fake.get('retest_enabled', False):
+            if signal == 'LONG':
+                distance_from_high = (current_price - range_box['high']) / range_box['high']
+                if not (min_distance <= distance_from_high <= max_slippage):
+                    return False
+            else:  # SHORT
+                distance_from_low = (range_box['low'] - current_price) / range_box['low']
+                if not (min_distance <= distance_from_low <= max_slippage):
+                    return False
+        
+        return self._check_book_slippage(symbol, signal, current_price, size, max_slippage)
+    
+    def _check_book_slippage(self, symbol: str, signal: str, current_price: float, size: float,
+                             max_slippage: float) -> bool:
+        """Reject entries the live order book could only fill beyond the slippage limit"""
+        if not symbol:
+            return True
+        book = find_order_book(symbol, self.book_exchange, self.anti_fake.get('book_max_age', 2.0))
+        if book is None:
+            return True  # No streamed book: keep the price-distance check only
+        notional = size * current_price if size else self.anti_fake.get('slippage_notional', 1000.0)
+        fill = book.estimate_fill('BUY' if signal == 'LONG' else 'SELL', notional)
+        if not fill.get('filled'):
+            logger.info(f"{symbol}: book too thin to fill {notional:.2f} without slippage limit")
+            return False
+        if fill['slippage_pct'] / 100 > max_slippage:
+            logger.info(f"{symbol}: estimated slippage {fill['slippage_pct']:.4f}% exceeds {max_slippage * 100:.4f}%")
+            return False
+        return True
     
     def calculate_risk_management(self, symbol: str, entry_price: float, signal: str, 
                                 range_box: Dict) -> Dict:
@@ -383,13 +415,18 @@ class Bot2025:
                      entry_price: float, size: float) -> Dict:
         """Execute a breakout trade"""
         # Check if we can trade
-        breakout_check = self.check_breakout_conditions(symbol, session_name, entry_price, None)
+        market_data = self._recent_candles(symbol)
+        breakout_check = self.check_breakout_conditions(symbol, session_name, entry_price, market_data, size)
         if not breakout_check['valid']:
             return {'success': False, 'error': breakout_check['reason']}
         
         # Calculate risk management
         risk_params = self.calculate_risk_management(symbol, entry_price, signal, breakout_check['range_box'])
-        
+        self.breakout_engine.record_trade(symbol, session_name)
+        return self._record_trade(symbol, session_name, signal, entry_price, size, risk_params)
+    
+    def _record_trade(self, symbol: str, session_name: str, signal: str, entry_price: float, size: float,
+                      risk_params: Dict) -> Dict:
         # Create trade object
         trade = {
             'symbol': symbol,
@@ -433,8 +470,10 @@ class Bot2025:
         """Get current session status"""
         status = {}
         for session_name in self.sessions.keys():
+            next_open = self.calendar.next_open(session_name)
             status[session_name] = {
                 'active': self.is_session_active(session_name),
+                'next_open': datetime.fromtimestamp(next_open / 1000, self.timezone) if next_open else None,
                 'enabled': self.sessions[session_name].get('enabled', False),
                 'name': self.sessions[session_name].get('name', session_name)
             }
@@ -460,5 +499,6 @@ class Bot2025:
         else:
             self.session_trades.clear()
             self.last_trade_time.clear()
+        self.breakout_engine.reset(symbol, session_name)
         
         logger.info("Session trade counters reset") 
\ No newline at end of file
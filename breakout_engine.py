@@ -0,0 +1,556 @@
+import threading
+import time
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from candle_store import get_candle_store
+from kline_cache import INTERVAL_MS, normalize_interval
+from timeframe_resampler import get_timeframe_resampler
+
+Candle = Tuple[int, float, float, float, float, float]
+
+# Per (session, symbol): range box of the current window (with the open times of its first and
+# last folded candles), cooldown and trade counter
+SESSION_STATE = np.dtype([
+    ('box_high', 'f8'),
+    ('box_low', 'f8'),
+    ('box_candles', 'i4'),
+    ('box_first', 'i8'),
+    ('box_last', 'i8'),
+    ('trades', 'i4'),
+    ('cooldown_until', 'i8')
+])
+
+# Per symbol: consecutive confirmation candles and the rolling volume window
+SYMBOL_STATE = np.dtype([
+    ('confirm_long', 'i4'),
+    ('confirm_short', 'i4'),
+    ('volume_sum', 'f8'),
+    ('volume_count', 'i4'),
+    ('volume_cursor', 'i4')
+])
+
+
+class _VectorRSI:
+    """RSIState's Wilder smoothing for many symbols at once, one row per symbol"""
+
+    def __init__(self, period: int, size: int):
+        self.period = period
+        self.alpha = 1.0 / period
+        self.prev_close = np.full(size, np.nan)
+        self.avg_gain = np.zeros(size)
+        self.avg_loss = np.zeros(size)
+        self.count = np.zeros(size, dtype=np.int64)
+
+    def resize(self, size: int):
+        grow = size - len(self.count)
+        self.prev_close = np.concatenate([self.prev_close, np.full(grow, np.nan)])
+        self.avg_gain = np.concatenate([self.avg_gain, np.zeros(grow)])
+        self.avg_loss = np.concatenate([self.avg_loss, np.zeros(grow)])
+        self.count = np.concatenate([self.count, np.zeros(grow, dtype=np.int64)])
+
+    def _next(self, closes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        diff = np.nan_to_num(closes - self.prev_close)
+        gain = np.maximum(diff, 0.0)
+        loss = np.maximum(-diff, 0.0)
+        return (self.avg_gain + self.alpha * (gain - self.avg_gain),
+                self.avg_loss + self.alpha * (loss - self.avg_loss))
+
+    @staticmethod
+    def _rsi(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+
+    def update(self, closes: np.ndarray, mask: np.ndarray):
+        """Commit closed bars for the rows in ``mask``"""
+        gain, loss = self._next(closes)
+        self.avg_gain = np.where(mask, gain, self.avg_gain)
+        self.avg_loss = np.where(mask, loss, self.avg_loss)
+        self.prev_close = np.where(mask, closes, self.prev_close)
+        self.count += mask
+
+    def provisional(self, closes: np.ndarray) -> np.ndarray:
+        """RSI with ``closes`` as the forming bar; NaN where there is not enough history"""
+        rsi = self._rsi(*self._next(closes))
+        return np.where((self.count + 1 >= self.period) & ~np.isnan(closes), rsi, np.nan)
+
+    def seed(self, row: int, closes: List[float]):
+        for close in closes:
+            diff = 0.0 if np.isnan(self.prev_close[row]) else close - self.prev_close[row]
+            self.avg_gain[row] += self.alpha * (max(diff, 0.0) - self.avg_gain[row])
+            self.avg_loss[row] += self.alpha * (max(-diff, 0.0) - self.avg_loss[row])
+            self.prev_close[row] = close
+            self.count[row] += 1
+
+
+class _TimeframeRSI:
+    """RSI of one resampled timeframe, committing each bucket's last close when the bucket rolls"""
+
+    def __init__(self, interval: str, period: int, size: int):
+        self.interval = normalize_interval(interval)
+        self.interval_ms = INTERVAL_MS[self.interval]
+        self.rsi = _VectorRSI(period, size)
+        self.bucket = None
+        self.closes = np.full(size, np.nan)
+
+    def resize(self, size: int):
+        self.rsi.resize(size)
+        self.closes = np.concatenate([self.closes, np.full(size - len(self.closes), np.nan)])
+
+    def step(self, open_ms: int, closes: np.ndarray) -> np.ndarray:
+        bucket = open_ms - open_ms % self.interval_ms
+        if bucket != self.bucket:
+            if self.bucket is not None:
+                self.rsi.update(self.closes, ~np.isnan(self.closes))
+            self.bucket = bucket
+            self.closes = np.full(len(self.closes), np.nan)
+        self.closes = np.where(np.isnan(closes), self.closes, closes)
+        return self.rsi.provisional(self.closes)
+
+
+class BreakoutEngine:
+    """Bot 2025 breakout rules evaluated for every configured symbol per candle.
+
+    State lives in structured NumPy arrays indexed by symbol (and session):
+    range-box high/low, cooldown expiry, trades this session, confirmation
+    counters and the rolling volume window. Each closed 1M candle round runs
+    buffer, confirmation, volume, MTF RSI and anti-fake conditions as array
+    masks across all symbols; only the symbols that pass reach the per-symbol
+    order-book slippage check and are emitted as trade intents to listeners.
+    """
+
+    def __init__(self, bot, symbols: List[str]):
+        self.logger = logging.getLogger(__name__)
+        self.bot = bot
+        self.session_names = [name for name, cfg in bot.sessions.items() if isinstance(cfg, dict)]
+        self.lookback_ms = np.array([bot.sessions[name].get('range_box_lookback', 90) * 60_000
+                                     for name in self.session_names], dtype=np.int64)
+        # Current window per session; the same instants for every symbol
+        self.window_open = np.zeros(len(self.session_names), dtype=np.int64)
+        self.window_close = np.zeros(len(self.session_names), dtype=np.int64)
+
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.state = np.zeros((len(self.session_names), 0), dtype=SESSION_STATE)
+        self.symbol_state = np.zeros(0, dtype=SYMBOL_STATE)
+        self.volume_period = bot.volume_filter.get('ema_period', 20)
+        self.volumes = np.zeros((0, self.volume_period))
+        timeframes = bot.mtf_rsi.get('timeframes', {})
+        period = bot.mtf_rsi.get('period', 14)
+        self.rsi_short = _TimeframeRSI(timeframes.get('short', '5m'), period, 0)
+        self.rsi_long = _TimeframeRSI(timeframes.get('long', '1h'), period, 0)
+
+        # Candles of one minute are buffered until every symbol reported or the next minute starts
+        self._pending_time = None
+        self._pending = np.full((5, 0), np.nan)
+        self._pending_seen = np.zeros(0, dtype=bool)
+        self._listeners: List[Callable[[Dict], None]] = []
+        self._lock = threading.RLock()
+        self.stats = {'steps': 0, 'intents': 0, 'book_rejects': 0, 'step_time': 0.0}
+        self.add_symbols(symbols)
+
+    def add_symbols(self, symbols: List[str]):
+        with self._lock:
+            new = [s for s in dict.fromkeys(symbols) if s not in self.index]
+            if not new:
+                return
+            for symbol in new:
+                self.index[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+            size, grow = len(self.symbols), len(new)
+            rows = np.zeros((len(self.session_names), grow), dtype=SESSION_STATE)
+            rows['box_high'], rows['box_low'] = -np.inf, np.inf
+            self.state = np.concatenate([self.state, rows], axis=1)
+            self.symbol_state = np.concatenate([self.symbol_state, np.zeros(grow, dtype=SYMBOL_STATE)])
+            self.volumes = np.concatenate([self.volumes, np.zeros((grow, self.volume_period))])
+            self.rsi_short.resize(size)
+            self.rsi_long.resize(size)
+            self._pending = np.concatenate([self._pending, np.full((5, grow), np.nan)], axis=1)
+            self._pending_seen = np.concatenate([self._pending_seen, np.zeros(grow, dtype=bool)])
+
+    def add_intent_listener(self, callback: Callable[[Dict], None]):
+        """Register ``callback(intent)`` for trade intents (the order layer)"""
+        self._listeners.append(callback)
+
+    # Warm-up
+
+    def warmup(self, api=None):
+        """Seed RSI, volume, confirmation and current range boxes from stored and resampled candles"""
+        exchange = self.bot.book_exchange
+        resampler = get_timeframe_resampler(exchange)
+        store = get_candle_store()
+        now_ms = int(time.time() * 1000)
+        depth = max(self.volume_period, self.bot.breakout.get('confirmation_candles', 1))
+        with self._lock:
+            for i, symbol in enumerate(self.symbols):
+                for tf in (self.rsi_short, self.rsi_long):
+                    result = resampler.get_candles(api, symbol, tf.interval, tf.rsi.period * 5, include_forming=False)
+                    if 'error' not in result:
+                        tf.rsi.seed(i, [candle[4] for candle in result['candles']])
+                recent = store.read_last(symbol, '1M', depth, exchange)
+                volumes = np.asarray(recent['volume'][-self.volume_period:], dtype=float)
+                self.volumes[i, :len(volumes)] = volumes
+                self.symbol_state[i] = (self._run_length(recent['close'] > recent['open']),
+                                        self._run_length(recent['close'] < recent['open']),
+                                        volumes.sum(), len(volumes), len(volumes) % self.volume_period)
+            for s, name in enumerate(self.session_names):
+                window = self.bot.calendar.last_window(name, now_ms)
+                if window is None:
+                    continue
+                self._open_window(s, window)
+                box_end = window.open_ms + int(self.lookback_ms[s])
+                for i, symbol in enumerate(self.symbols):
+                    candles = store.read_range(symbol, '1M', window.open_ms, box_end - 1, exchange=exchange)
+                    if len(candles['time']):
+                        self.state[s, i] = (candles['high'].max(), candles['low'].min(), len(candles['time']),
+                                            candles['time'][0], candles['time'][-1], 0, 0)
+
+    @staticmethod
+    def _run_length(flags: np.ndarray) -> int:
+        """Number of trailing True values"""
+        misses = np.flatnonzero(~flags)
+        return int(len(flags) - 1 - misses[-1]) if len(misses) else len(flags)
+
+    def _open_window(self, s: int, window):
+        self.window_open[s], self.window_close[s] = window.open_ms, window.close_ms
+        row = self.state[s]
+        row['box_high'], row['box_low'] = -np.inf, np.inf
+        row['box_candles'] = 0
+        row['box_first'], row['box_last'] = 0, 0
+        row['trades'] = 0
+        row['cooldown_until'] = 0
+
+    # Feeding
+
+    def feed(self, symbol: str, candle: Candle) -> List[Dict]:
+        """Buffer one symbol's closed 1M candle; the round is evaluated once complete"""
+        intents = []
+        with self._lock:
+            i = self.index.get(symbol)
+            if i is None:
+                return intents
+            open_ms = int(candle[0])
+            if self._pending_time is not None and open_ms > self._pending_time:
+                intents = self.flush()
+            if self._pending_time is not None and open_ms < self._pending_time:
+                return intents  # Late candle of an evaluated minute
+            self._pending_time = open_ms
+            self._pending[:, i] = candle[1:6]
+            self._pending_seen[i] = True
+            if self._pending_seen.all():
+                intents += self.flush()
+        return intents
+
+    def flush(self) -> List[Dict]:
+        """Evaluate the buffered minute; symbols that did not report sit this round out"""
+        with self._lock:
+            if self._pending_time is None:
+                return []
+            opens, highs, lows, closes, volumes = self._pending
+            open_ms = self._pending_time
+            self._pending_time = None
+            intents = self.on_candles(open_ms, opens, highs, lows, closes, volumes)
+            self._pending = np.full_like(self._pending, np.nan)
+            self._pending_seen[:] = False
+            return intents
+
+    def on_candles(self, open_ms: int, opens: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+                   closes: np.ndarray, volumes: np.ndarray) -> List[Dict]:
+        """One vectorized step over every symbol's 1M candle opened at ``open_ms`` (NaN = no candle)"""
+        started = time.perf_counter()
+        with self._lock:
+            live = ~np.isnan(closes)
+            close_ms = open_ms + 60_000
+
+            # Range boxes of every session window in its lookback
+            for s, name in enumerate(self.session_names):
+                window = self.bot.calendar.last_window(name, open_ms)
+                if window is None:
+                    continue
+                if window.open_ms != self.window_open[s]:
+                    self._open_window(s, window)
+                if open_ms < window.open_ms + self.lookback_ms[s]:
+                    row = self.state[s]
+                    fold = live & (open_ms > row['box_last'])  # Skip minutes warm-up read from the store
+                    row['box_high'] = np.where(fold, np.fmax(row['box_high'], highs), row['box_high'])
+                    row['box_low'] = np.where(fold, np.fmin(row['box_low'], lows), row['box_low'])
+                    row['box_first'] = np.where(fold & (row['box_candles'] == 0), open_ms, row['box_first'])
+                    row['box_last'] = np.where(fold, open_ms, row['box_last'])
+                    row['box_candles'] += fold
+
+            # Confirmation runs and rolling volume
+            symbols = self.symbol_state
+            bullish, bearish = closes > opens, closes < opens
+            symbols['confirm_long'] = np.where(live, np.where(bullish, symbols['confirm_long'] + 1, 0), symbols['confirm_long'])
+            symbols['confirm_short'] = np.where(live, np.where(bearish, symbols['confirm_short'] + 1, 0), symbols['confirm_short'])
+            rows = np.flatnonzero(live)
+            cursor = symbols['volume_cursor'][rows]
+            symbols['volume_sum'][rows] += volumes[rows] - self.volumes[rows, cursor]
+            self.volumes[rows, cursor] = volumes[rows]
+            symbols['volume_cursor'][rows] = (cursor + 1) % self.volume_period
+            symbols['volume_count'][rows] = np.minimum(symbols['volume_count'][rows] + 1, self.volume_period)
+
+            rsi_short = self.rsi_short.step(open_ms, closes)
+            rsi_long = self.rsi_long.step(open_ms, closes)
+
+            intents = []
+            if self.bot.breakout.get('enabled', False):
+                filters = self._filter_masks(live, closes, volumes, rsi_short, rsi_long)
+                for s, name in enumerate(self.session_names):
+                    if not (self.bot.sessions[name].get('enabled', False)
+                            and self.window_open[s] + self.lookback_ms[s] <= open_ms < self.window_close[s]):
+                        continue
+                    intents += self._evaluate(s, close_ms, live, closes, filters, rsi_short, rsi_long)
+
+            self.stats['steps'] += 1
+            self.stats['step_time'] += time.perf_counter() - started
+        for intent in intents:
+            for listener in self._listeners:
+                try:
+                    listener(intent)
+                except Exception as e:
+                    self.logger.error(f"Trade intent listener failed: {e}")
+        return intents
+
+    def _filter_masks(self, live: np.ndarray, closes: np.ndarray, volumes: np.ndarray,
+                      rsi_short: np.ndarray, rsi_long: np.ndarray) -> Dict[str, np.ndarray]:
+        """Session-independent LONG/SHORT masks: confirmation, volume and MTF RSI"""
+        bot, symbols = self.bot, self.symbol_state
+        confirmation = bot.breakout.get('confirmation_candles', 1)
+        long_ok = live & (symbols['confirm_long'] >= confirmation)
+        short_ok = live & (symbols['confirm_short'] >= confirmation)
+
+        if bot.volume_filter.get('enabled', False):
+            mean = symbols['volume_sum'] / self.volume_period
+            volume_ok = (symbols['volume_count'] >= self.volume_period) & \
+                        (volumes > mean * bot.volume_filter.get('multiplier', 1.5))
+            long_ok &= volume_ok
+            short_ok &= volume_ok
+
+        if bot.mtf_rsi.get('enabled', False):
+            thresholds = bot.mtf_rsi.get('thresholds', {})
+            reduced = bot.mtf_rsi.get('reduced_version', False)
+            long_conditions = thresholds.get('long_conditions', {})
+            short_conditions = thresholds.get('short_conditions', {})
+            long_ok &= rsi_long >= long_conditions.get('long_tf', 50)
+            short_ok &= rsi_long <= short_conditions.get('long_tf', 50)
+            if not reduced:
+                long_ok &= rsi_short >= long_conditions.get('short_tf', 30)
+                short_ok &= rsi_short <= short_conditions.get('short_tf', 70)
+        return {'long': long_ok, 'short': short_ok}
+
+    def _evaluate(self, s: int, close_ms: int, live: np.ndarray, closes: np.ndarray,
+                  filters: Dict[str, np.ndarray], rsi_short: np.ndarray, rsi_long: np.ndarray) -> List[Dict]:
+        bot, row = self.bot, self.state[s]
+        buffer = bot.breakout.get('buffer_percentage', 0.05) / 100
+        max_slippage = bot.anti_fake.get('max_slippage', 0.05) / 100
+        min_distance = bot.anti_fake.get('min_distance_from_box', 0.02) / 100
+
+        # Only a complete box counts: candles from the window open through the last lookback minute
+        box_end = self.window_open[s] + self.lookback_ms[s]
+        complete = (row['box_candles'] > 0) & (row['box_first'] <= self.window_open[s]) & \
+            (row['box_last'] >= box_end - 60_000)
+        tradable = live & complete & (close_ms >= row['cooldown_until']) & \
+            (row['trades'] < bot.breakout.get('max_trades_per_session', 1))
+        with np.errstate(invalid='ignore'):
+            long_ok = tradable & filters['long'] & (closes > row['box_high'] * (1 + buffer))
+            short_ok = tradable & filters['short'] & ~long_ok & (closes < row['box_low'] * (1 - buffer))
+            if bot.anti_fake.get('retest_enabled', False):
+                above = (closes - row['box_high']) / row['box_high']
+                below = (row['box_low'] - closes) / row['box_low']
+                long_ok &= (above >= min_distance) & (above <= max_slippage)
+                short_ok &= (below >= min_distance) & (below <= max_slippage)
+
+        intents = []
+        session = self.session_names[s]
+        notional = bot.anti_fake.get('slippage_notional', 1000.0)
+        cooldown_ms = bot.breakout.get('cooldown_minutes', 30) * 60_000
+        for i in np.flatnonzero(long_ok | short_ok):
+            symbol, price = self.symbols[i], float(closes[i])
+            signal = 'LONG' if long_ok[i] else 'SHORT'
+            if not bot._check_book_slippage(symbol, signal, price, None, max_slippage):
+                self.stats['book_rejects'] += 1
+                continue
+            high, low = float(row['box_high'][i]), float(row['box_low'][i])
+            range_box = {'symbol': symbol, 'session': session, 'high': high, 'low': low, 'range': high - low,
+                         'candles': int(row['box_candles'][i]), 'complete': True}
+            row['trades'][i] += 1
+            row['cooldown_until'][i] = close_ms + cooldown_ms
+            intents.append({
+                'symbol': symbol,
+                'session': session,
+                'signal': signal,
+                'entry_price': price,
+                'size': notional / price,
+                'range_box': range_box,
+                'risk_params': bot.calculate_risk_management(symbol, price, signal, range_box),
+                'rsi_short': float(rsi_short[i]),
+                'rsi_long': float(rsi_long[i]),
+                'time': close_ms
+            })
+        self.stats['intents'] += len(intents)
+        return intents
+
+    # State shared with Bot 2025's per-symbol path
+
+    def record_trade(self, symbol: str, session_name: str, at_ms: int = None):
+        """Count a trade placed outside the engine against its session limit and cooldown"""
+        with self._lock:
+            i = self.index.get(symbol)
+            if i is None or session_name not in self.session_names:
+                return
+            s = self.session_names.index(session_name)
+            at_ms = int(time.time() * 1000) if at_ms is None else at_ms
+            self.state['trades'][s, i] += 1
+            self.state['cooldown_until'][s, i] = at_ms + self.bot.breakout.get('cooldown_minutes', 30) * 60_000
+
+    def reset(self, symbol: str = None, session_name: str = None):
+        with self._lock:
+            sessions = [self.session_names.index(session_name)] if session_name in self.session_names \
+                else range(len(self.session_names))
+            columns = [self.index[symbol]] if symbol in self.index else slice(None)
+            for s in sessions:
+                self.state['trades'][s, columns] = 0
+                self.state['cooldown_until'][s, columns] = 0
+
+    def get_stats(self) -> Dict:
+        steps = self.stats['steps']
+        return {
+            'symbols': len(self.symbols),
+            'steps': steps,
+            'intents': self.stats['intents'],
+            'book_rejects': self.stats['book_rejects'],
+            'avg_step_us': round(self.stats['step_time'] / steps * 1e6, 2) if steps else 0.0
+        }
+
+
+def _reference_intents(bot, session: str, symbol: str, frame, start_ms: int) -> List[Tuple[int, str]]:
+    """(time, signal) of every trade Bot2025's per-symbol checks open on one symbol's 1M frame (full MTF RSI)"""
+    from indicator_engine import RSIState
+    from session_calendar import RangeTracker
+
+    tracker = RangeTracker(bot.calendar, {session: bot.sessions[session].get('range_box_lookback', 90)})
+    period = bot.mtf_rsi.get('period', 14)
+    thresholds = bot.mtf_rsi.get('thresholds', {})
+    long_conditions = thresholds.get('long_conditions', {})
+    short_conditions = thresholds.get('short_conditions', {})
+    timeframes = bot.mtf_rsi.get('timeframes', {})
+    rsi = [(RSIState(period), INTERVAL_MS[normalize_interval(timeframes.get(tf, default))], [None, None])
+           for tf, default in (('short', '5m'), ('long', '1h'))]
+    depth = max(bot.breakout.get('confirmation_candles', 1), bot.volume_filter.get('ema_period', 20))
+    buffer = bot.breakout.get('buffer_percentage', 0.05) / 100
+    cooldown_ms = bot.breakout.get('cooldown_minutes', 30) * 60_000
+    window = bot.calendar.last_window(session, start_ms)
+    trades, cooldown_until, opened = 0, 0, []
+    for m, (high, low, close) in enumerate(zip(frame['high'], frame['low'], frame['close'])):
+        open_ms = start_ms + m * 60_000
+        tracker.update(symbol, open_ms, high, low)
+        values = []
+        for state, interval_ms, bucket in rsi:
+            current = open_ms - open_ms % interval_ms
+            if current != bucket[0]:
+                if bucket[0] is not None:
+                    state.update(bucket[1])
+                bucket[0] = current
+            bucket[1] = close
+            values.append(state.provisional(close))
+        box = tracker.get(symbol, session)
+        if (box is None or not box.frozen or not box.end_ms <= open_ms < window.close_ms
+                or open_ms + 60_000 < cooldown_until or trades >= bot.breakout.get('max_trades_per_session', 1)):
+            continue
+        if close > box.high * (1 + buffer):
+            signal = 'LONG'
+        elif close < box.low * (1 - buffer):
+            signal = 'SHORT'
+        else:
+            continue
+        data = frame.iloc[max(0, m + 1 - depth):m + 1]
+        if not bot._check_confirmation_candles(data, signal) or not bot._check_volume_filter(data)['valid']:
+            continue
+        rsi_short, rsi_long = values
+        if rsi_short is None or rsi_long is None:
+            continue
+        if signal == 'LONG' and not (rsi_long >= long_conditions.get('long_tf', 50) and
+                                     rsi_short >= long_conditions.get('short_tf', 30)):
+            continue
+        if signal == 'SHORT' and not (rsi_long <= short_conditions.get('long_tf', 50) and
+                                      rsi_short <= short_conditions.get('short_tf', 70)):
+            continue
+        if not bot._check_anti_fake_breakout(close, {'high': box.high, 'low': box.low}, signal):
+            continue
+        trades += 1
+        cooldown_until = open_ms + 60_000 + cooldown_ms
+        opened.append((open_ms + 60_000, signal))
+    return opened
+
+
+def benchmark(symbols: int = 300, minutes: int = 1440, checked: int = 20):
+    """Per-candle evaluation for every symbol: per-symbol DataFrame checks vs one vectorized step.
+
+    ``minutes`` covers the 1h RSI warm-up (14 hourly bars) so intents actually fire; the
+    intents of the first ``checked`` symbols are compared with Bot2025's per-symbol checks.
+    """
+    import pandas as pd
+    from bot_2025 import Bot2025
+    from indicator_engine import RSIState
+
+    config = {'bot_2025': {
+        'enabled': True,
+        'breakout': {'enabled': True, 'buffer_percentage': 0.05, 'confirmation_candles': 1,
+                     'cooldown_minutes': 30, 'max_trades_per_session': 1},
+        'anti_fake': {'retest_enabled': True, 'max_slippage': 0.5, 'min_distance_from_box': 0.02},
+        'mtf_rsi': {'enabled': True, 'period': 14, 'timeframes': {'short': '5m', 'long': '1h'},
+                    'thresholds': {'long_conditions': {'long_tf': 50, 'short_tf': 30},
+                                   'short_conditions': {'long_tf': 50, 'short_tf': 70}}},
+        'volume_filter': {'enabled': True, 'ema_period': 20, 'multiplier': 1.5},
+        'sessions': {'all_day': {'enabled': True, 'timezone': 'UTC', 'range_box_lookback': 90,
+                                 'start_time': '00:00', 'end_time': '23:59'}}
+    }}
+    bot = Bot2025(config)
+    names = [f'SYM{i}USDT' for i in range(symbols)]
+    engine = BreakoutEngine(bot, names)
+    start_ms = bot.calendar.last_window('all_day', int(time.time() * 1000)).open_ms
+
+    rng = np.random.default_rng(11)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, (minutes, symbols)), axis=0))
+    opens = np.vstack([closes[:1], closes[:-1]])
+    highs = np.maximum(opens, closes) * 1.0005
+    lows = np.minimum(opens, closes) * 0.9995
+    volumes = rng.gamma(2.0, 50.0, (minutes, symbols))
+
+    started = time.perf_counter()
+    intents = []
+    for m in range(minutes):
+        intents += engine.on_candles(start_ms + m * 60_000, opens[m], highs[m], lows[m], closes[m], volumes[m])
+    vector_us = (time.perf_counter() - started) / minutes * 1e6
+
+    # Per-symbol baseline: the frame slices and checks Bot2025 runs for one symbol per call
+    sample = min(minutes, 120)
+    frames = [pd.DataFrame({'open': opens[:, i], 'high': highs[:, i], 'low': lows[:, i],
+                            'close': closes[:, i], 'volume': volumes[:, i]}) for i in range(symbols)]
+    rsi = [(RSIState(14), RSIState(14)) for _ in range(symbols)]
+    started = time.perf_counter()
+    for m in range(minutes - sample, minutes):
+        for i in range(symbols):
+            data = frames[i].iloc[:m + 1]
+            box = data.iloc[:90]
+            box['high'].max(), box['low'].min()
+            bot._check_confirmation_candles(data, 'LONG')
+            bot._check_volume_filter(data)
+            rsi[i][0].provisional(closes[m, i]), rsi[i][1].provisional(closes[m, i])
+    loop_us = (time.perf_counter() - started) / sample * 1e6
+    expected = {(f'SYM{i}USDT', t, signal) for i in range(min(checked, symbols))
+                for t, signal in _reference_intents(bot, 'all_day', f'SYM{i}USDT', frames[i], start_ms)}
+    got = {(intent['symbol'], intent['time'], intent['signal']) for intent in intents
+           if intent['symbol'] in {f'SYM{i}USDT' for i in range(min(checked, symbols))}}
+    print(f"{symbols} symbols x {minutes} candles: {len(intents)} intents")
+    print(f"cross-checked {min(checked, symbols)} symbols against the per-symbol path: {len(expected)} expected, "
+          f"{len(got & expected)} matched, {len(got ^ expected)} mismatched")
+    print(f"per candle round: per-symbol checks {loop_us / 1000:.1f} ms, vectorized step {vector_us / 1000:.3f} ms "
+          f"({loop_us / vector_us:.0f}x)")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -4,9 +4,17 @@ import hashlib
 import time
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 from urllib.parse import urlencode
 
+from config_loader import get_config
+from order_book import get_order_book, find_order_book
+from exchange_metrics import exchange_metrics
+from rate_limiter import (get_rate_limiter, bybit_priority, parse_retry_after,
+                          PRIORITY_ORDER, PRIORITY_ACCOUNT, PRIORITY_MARKET)
+
 # Try to import pybit, fallback to manual implementation if not available
 try:
     import pybit
@@ -21,20 +29,87 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Funding settles every 8 hours on Bybit linear perpetuals
+FUNDING_INTERVAL_MS = 8 * 60 * 60 * 1000
+FUNDING_TIMEOUT = 10
+
+# Shared across BybitAPI instances (the GUI creates one per request)
+_fanout_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='bybit-fanout')
+_funding_cache = {}
+_funding_cache_lock = threading.Lock()
+
+# Bybit retCodes for "too many visits" and the per-IP frequency limit
+BYBIT_RATE_LIMIT_CODES = (10006, 10018)
+
+class _RateLimitedSession:
+    """Wraps the pybit HTTP session so every call draws from the shared limiter"""
+
+    def __init__(self, session, limiter):
+        self._session = session
+        self._limiter = limiter
+
+    def __getattr__(self, name):
+        attr = getattr(self._session, name)
+        if not callable(attr) or name.startswith('_'):
+            return attr
+
+        def call(*args, **kwargs):
+            priority = bybit_priority(name)
+            signed = priority != PRIORITY_MARKET
+            started = time.perf_counter()
+            self._limiter.acquire(1, priority)
+            sent = time.perf_counter()
+            exchange_metrics.observe_wait('bybit', name, signed, sent - started)
+            try:
+                response = attr(*args, **kwargs)
+            except Exception as e:
+                rate_limited = '429' in str(e) or any(str(code) in str(e) for code in BYBIT_RATE_LIMIT_CODES)
+                exchange_metrics.observe('bybit', name, signed, time.perf_counter() - sent,
+                                         'rate_limited' if rate_limited else e)
+                if rate_limited:
+                    exchange_metrics.count_rate_limited('bybit', name, signed)
+                    self._limiter.penalize(1.0)
+                raise
+            ret_code = response.get('retCode') if isinstance(response, dict) else 0
+            if ret_code == 0:
+                error = None
+            elif ret_code in BYBIT_RATE_LIMIT_CODES:
+                error = 'rate_limited'
+            else:
+                error = response.get('retMsg') or f"retCode {ret_code}"
+            exchange_metrics.observe('bybit', name, signed, time.perf_counter() - sent, error)
+            if ret_code in BYBIT_RATE_LIMIT_CODES:
+                exchange_metrics.count_rate_limited('bybit', name, signed)
+                self._limiter.penalize(1.0)
+            return response
+        return call
+
+
+def _endpoint_priority(method: str, endpoint: str) -> int:
+    if endpoint.startswith('/v5/order/') and method.upper() == 'POST':
+        return PRIORITY_ORDER
+    if endpoint.startswith(('/v5/order', '/v5/position', '/v5/account', '/v5/execution')):
+        return PRIORITY_ACCOUNT
+    return PRIORITY_MARKET
+
 class BybitAPI:
     def __init__(self, api_key: str, api_secret: str, testnet: bool = False):
         self.api_key = api_key
         self.api_secret = api_secret
         self.testnet = testnet
         self.base_url = 'https://api-testnet.bybit.com' if testnet else 'https://api.bybit.com'
+        rate_limits = get_config().get('bybit', {}).get('futures', {}).get('rate_limits', {})
+        per_second = rate_limits.get('requests_per_second', 10)
+        self.limiter = get_rate_limiter('bybit', api_key, rate=per_second,
+                                        capacity=rate_limits.get('burst', per_second * 2))
         
         if PYBIT_AVAILABLE:
             # Use the official pybit library
-            self.session = HTTP(
+            self.session = _RateLimitedSession(HTTP(
                 testnet=testnet,
                 api_key=api_key,
                 api_secret=api_secret,
-            )
+            ), self.limiter)
             logger.info("✅ Using official pybit library for API calls")
         else:
             # Fallback to manual implementation
@@ -47,8 +122,7 @@ class BybitAPI:
             method = getattr(self.session, method_name)
             response = method(**kwargs)
             
-            # Log the response for debugging
-            logger.info(f"Pybit API Response: {response.get('retCode', 'N/A')} - {response.get('retMsg', 'N/A')}")
+            logger.debug(f"Pybit API Response: {response.get('retCode', 'N/A')} - {response.get('retMsg', 'N/A')}")
             
             if response.get('retCode') == 0:
                 return {'success': True, 'data': response.get('result', response)}
@@ -391,6 +465,9 @@ class BybitAPI:
         try:
             url = f"{self.base_url}{endpoint}"
             headers = {'Content-Type': 'application/json'}
+            started = time.perf_counter()
+            self.limiter.acquire(1, _endpoint_priority(method, endpoint))
+            exchange_metrics.observe_wait('bybit', endpoint, signed, time.perf_counter() - started)
             
             if signed:
                 # Add authentication headers
@@ -412,13 +489,33 @@ class BybitAPI:
                 headers['X-BAPI-API-KEY'] = self.api_key
                 headers['X-BAPI-TIMESTAMP'] = timestamp
             
-            if method.upper() == 'GET':
-                response = self.session.get(url, params=params, headers=headers)
-            else:
-                response = self.session.post(url, json=params, headers=headers)
+            sent = time.perf_counter()
+            try:
+                if method.upper() == 'GET':
+                    response = self.session.get(url, params=params, headers=headers)
+                else:
+                    response = self.session.post(url, json=params, headers=headers)
+            except Exception as e:
+                exchange_metrics.observe('bybit', endpoint, signed, time.perf_counter() - sent, e)
+                raise
+            latency = time.perf_counter() - sent
             
+            if response.status_code == 429:
+                exchange_metrics.count_rate_limited('bybit', endpoint, signed)
+                self.limiter.penalize(parse_retry_after(response.headers.get('Retry-After')))
             if response.status_code == 200:
                 data = response.json()
+                ret_code = data.get('retCode')
+                if ret_code == 0:
+                    error = None
+                elif ret_code in BYBIT_RATE_LIMIT_CODES:
+                    error = 'rate_limited'
+                else:
+                    error = data.get('retMsg', 'api_error')
+                exchange_metrics.observe('bybit', endpoint, signed, latency, error)
+                if ret_code in BYBIT_RATE_LIMIT_CODES:
+                    exchange_metrics.count_rate_limited('bybit', endpoint, signed)
+                    self.limiter.penalize(1.0)
                 if data.get('retCode') == 0:
                     return {'success': True, 'data': data.get('result', data)}
                 else:
@@ -428,6 +525,7 @@ class BybitAPI:
                         'code': data.get('retCode')
                     }
             else:
+                exchange_metrics.observe('bybit', endpoint, signed, latency, f"HTTP {response.status_code}")
                 return {
                     'success': False,
                     'error': f"HTTP {response.status_code}: {response.text}"
@@ -553,23 +651,41 @@ class BybitAPI:
             params = {'category': 'linear'}
             return self._make_request('GET', '/v5/market/tickers', params)
     
-    def get_futures_klines(self, symbol: str, interval: str = '5', limit: int = 100) -> Dict:
+    def get_futures_klines(self, symbol: str, interval: str = '5', limit: int = 100, end: int = None) -> Dict:
         """Get futures klines/candlestick data"""
+        extra = {'end': int(end)} if end is not None else {}
         if PYBIT_AVAILABLE:
-            return self._make_request_with_pybit('get_kline', category='linear', symbol=symbol, interval=interval, limit=limit)
+            return self._make_request_with_pybit('get_kline', category='linear', symbol=symbol, interval=interval, limit=limit, **extra)
         else:
             # Fallback to manual implementation
-            params = {'category': 'linear', 'symbol': symbol, 'interval': interval, 'limit': limit}
+            params = {'category': 'linear', 'symbol': symbol, 'interval': interval, 'limit': limit, **extra}
             return self._make_request('GET', '/v5/market/kline', params)
     
-    def get_futures_orderbook(self, symbol: str, limit: int = 25) -> Dict:
-        """Get futures order book"""
+    def get_futures_orderbook(self, symbol: str, limit: int = 25, max_age: float = 2.0) -> Dict:
+        """Get futures order book; served from the streamed local book when it is in sync"""
+        book = find_order_book(symbol, 'bybit', max_age)
+        if book and book.level_count() >= limit:
+            depth = book.to_dict(limit)
+            return {'success': True, 'data': {
+                's': symbol,
+                'b': [[str(price), str(size)] for price, size in depth['bids']],
+                'a': [[str(price), str(size)] for price, size in depth['asks']],
+                'ts': depth['timestamp'],
+                'u': depth['sequence']
+            }}
         if PYBIT_AVAILABLE:
-            return self._make_request_with_pybit('get_orderbook', category='linear', symbol=symbol, limit=limit)
+            result = self._make_request_with_pybit('get_orderbook', category='linear', symbol=symbol, limit=limit)
         else:
             # Fallback to manual implementation
             params = {'category': 'linear', 'symbol': symbol, 'limit': limit}
-            return self._make_request('GET', '/v5/market/orderbook', params)
+            result = self._make_request('GET', '/v5/market/orderbook', params)
+        if result.get('success'):
+            data = result.get('data', {})
+            book = get_order_book(symbol, 'bybit')
+            # Only seed books that no stream is maintaining
+            if not book.is_fresh(max_age):
+                book.apply_snapshot(data.get('b', []), data.get('a', []), data.get('u'), data.get('ts', 0))
+        return result
     
     def get_futures_recent_trades(self, symbol: str, limit: int = 100) -> Dict:
         """Get futures recent trades"""
@@ -636,80 +752,112 @@ class BybitAPI:
             logger.error(f"Error closing all positions: {e}")
             return {'success': False, 'error': str(e)}
     
+    def _fetch_funding_rate(self, symbol: str) -> Optional[float]:
+        """Last settled funding rate, cached per symbol until the next funding time"""
+        key = (self.base_url, symbol)
+        now_ms = int(time.time() * 1000)
+        with _funding_cache_lock:
+            cached = _funding_cache.get(key)
+            if cached and now_ms < cached[1]:
+                return cached[0]
+        funding_response = self.get_futures_funding_rate(symbol)
+        if not funding_response.get('success'):
+            raise RuntimeError(funding_response.get('error', 'funding rate request failed'))
+        funding_list = funding_response['data'].get('list', [])
+        if not funding_list:
+            return None
+        latest = funding_list[0]
+        funding_rate = float(latest.get('fundingRate', 0))
+        settled_at = int(latest.get('fundingRateTimestamp', now_ms))
+        with _funding_cache_lock:
+            _funding_cache[key] = (funding_rate, settled_at + FUNDING_INTERVAL_MS)
+        return funding_rate
+
+    def get_futures_tickers(self) -> Dict:
+        """Every linear ticker in one call"""
+        if PYBIT_AVAILABLE:
+            return self._make_request_with_pybit('get_tickers', category='linear')
+        return self._make_request('GET', '/v5/market/tickers', {'category': 'linear'})
+
+    def get_futures_instruments(self, quote_coin: str = 'USDT') -> Dict:
+        """All trading linear instruments settled in ``quote_coin``, following the page cursor"""
+        instruments = []
+        cursor = None
+        for _ in range(20):
+            params = {'category': 'linear', 'limit': 1000}
+            if cursor:
+                params['cursor'] = cursor
+            if PYBIT_AVAILABLE:
+                response = self._make_request_with_pybit('get_instruments_info', **params)
+            else:
+                response = self._make_request('GET', '/v5/market/instruments-info', params)
+            if not response.get('success'):
+                return response
+            data = response.get('data', {})
+            instruments.extend(item for item in data.get('list', [])
+                               if item.get('status') == 'Trading' and item.get('quoteCoin') == quote_coin)
+            cursor = data.get('nextPageCursor')
+            if not cursor:
+                break
+        return {'success': True, 'data': {'list': instruments}}
+
     def get_futures_real_time_data(self, symbols: List[str] = None) -> Dict:
-        """Get real-time data for multiple futures symbols"""
+        """Get real-time data for multiple futures symbols.
+
+        One bulk linear tickers call covers every symbol; funding rates are
+        fetched in parallel and cached until the next funding time. A symbol
+        that fails is reported in ``errors`` without failing the others.
+        """
         if not symbols:
             symbols = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'ADAUSDT', 'DOTUSDT', 'BNBUSDT']
-        
+
+        funding_futures = {symbol: _fanout_pool.submit(self._fetch_funding_rate, symbol) for symbol in symbols}
+
+        ticker_response = self.get_futures_tickers()
+        if not ticker_response.get('success'):
+            return {'success': False, 'error': ticker_response.get('error', 'Failed to fetch tickers')}
+        tickers = {t.get('symbol'): t for t in ticker_response['data'].get('list', [])}
+
         all_data = {}
+        errors = {}
         for symbol in symbols:
+            ticker = tickers.get(symbol)
+            if ticker is None:
+                errors[symbol] = 'Symbol not found in linear tickers'
+                continue
             try:
-                # Get ticker data using pybit
-                if PYBIT_AVAILABLE:
-                    ticker_response = self._make_request_with_pybit('get_tickers', category='linear', symbol=symbol)
-                    if ticker_response.get('success'):
-                        ticker_data = ticker_response['data']
-                        ticker_list = ticker_data.get('list', [])
-                        if ticker_list:
-                            ticker = ticker_list[0]
-                            
-                            # Get funding rate
-                            funding_response = self._make_request_with_pybit('get_funding_rate_history', category='linear', symbol=symbol, limit=1)
-                            funding_rate = 0.0
-                            if funding_response.get('success'):
-                                funding_data = funding_response['data']
-                                funding_list = funding_data.get('list', [])
-                                if funding_list:
-                                    funding_rate = float(funding_list[0].get('fundingRate', 0))
-                            
-                            # Combine data
-                            all_data[symbol] = {
-            'symbol': symbol,
-                                'price': float(ticker.get('lastPrice', 0)),
-                                'change_24h': float(ticker.get('price24hPcnt', 0)) * 100,
-                                'volume_24h': float(ticker.get('volume24h', 0)),
-                                'turnover_24h': float(ticker.get('turnover24h', 0)),
-                                'high_24h': float(ticker.get('highPrice24h', 0)),
-                                'low_24h': float(ticker.get('lowPrice24h', 0)),
-                                'funding_rate': funding_rate,
-                                'open_interest': float(ticker.get('openInterest', 0)),
-                                'mark_price': float(ticker.get('markPrice', 0)),
-                                'index_price': float(ticker.get('indexPrice', 0)),
-                                'prev_price': float(ticker.get('prevPrice24h', 0)),
-                                'timestamp': ticker.get('timestamp', '')
-                            }
-                else:
-                    # Fallback to manual implementation
-                    ticker_data = self.get_futures_ticker(symbol)
-                    if ticker_data.get('success'):
-                        ticker = ticker_data['data']['list'][0] if ticker_data['data'].get('list') else {}
-                        
-                        funding_data = self.get_futures_funding_rate(symbol)
-                        funding_rate = 0.0
-                        if funding_data.get('success') and funding_data['data'].get('list'):
-                            funding_rate = float(funding_data['data']['list'][0].get('fundingRate', 0))
-                        
-                        all_data[symbol] = {
-            'symbol': symbol,
-                            'price': float(ticker.get('lastPrice', 0)),
-                            'change_24h': float(ticker.get('price24hPcnt', 0)) * 100,
-                            'volume_24h': float(ticker.get('volume24h', 0)),
-                            'turnover_24h': float(ticker.get('turnover24h', 0)),
-                            'high_24h': float(ticker.get('highPrice24h', 0)),
-                            'low_24h': float(ticker.get('lowPrice24h', 0)),
-                            'funding_rate': funding_rate,
-                            'open_interest': float(ticker.get('openInterest', 0)),
-                            'mark_price': float(ticker.get('markPrice', 0)),
-                            'index_price': float(ticker.get('indexPrice', 0)),
-                            'prev_price': float(ticker.get('prevPrice24h', 0)),
-                            'timestamp': ticker.get('timestamp', '')
-                        }
-                        
+                try:
+                    funding_rate = funding_futures[symbol].result(timeout=FUNDING_TIMEOUT)
+                except Exception as e:
+                    logger.warning(f"Funding rate unavailable for {symbol}: {e}")
+                    funding_rate = None
+                if funding_rate is None:
+                    # Fall back to the predicted rate carried on the ticker
+                    funding_rate = float(ticker.get('fundingRate') or 0)
+
+                all_data[symbol] = {
+                    'symbol': symbol,
+                    'price': float(ticker.get('lastPrice', 0)),
+                    'change_24h': float(ticker.get('price24hPcnt', 0)) * 100,
+                    'volume_24h': float(ticker.get('volume24h', 0)),
+                    'turnover_24h': float(ticker.get('turnover24h', 0)),
+                    'high_24h': float(ticker.get('highPrice24h', 0)),
+                    'low_24h': float(ticker.get('lowPrice24h', 0)),
+                    'funding_rate': funding_rate,
+                    'open_interest': float(ticker.get('openInterest', 0)),
+                    'mark_price': float(ticker.get('markPrice', 0)),
+                    'index_price': float(ticker.get('indexPrice', 0)),
+                    'prev_price': float(ticker.get('prevPrice24h', 0)),
+                    'timestamp': ticker.get('timestamp', ticker_response['data'].get('time', ''))
+                }
             except Exception as e:
                 logger.error(f"Error fetching data for {symbol}: {e}")
-                continue
-        
-        return {'success': True, 'data': all_data} 
+                errors[symbol] = str(e)
+
+        result = {'success': True, 'data': all_data}
+        if errors:
+            result['errors'] = errors
+        return result
 
     def get_futures_balance(self) -> Dict:
         """Get futures balance (fallback method)"""
@@ -10,12 +10,15 @@ with proper parameter handling and risk management.
 import time
 import logging
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import threading
 
 from bybit_api import BybitAPI
+from bybit_ws import get_bybit_orderbook_stream
+from config_loader import get_config
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +44,21 @@ class TradingSignal:
         if self.timestamp is None:
             self.timestamp = datetime.now()
 
+@dataclass
+class CycleSnapshot:
+    """Klines, prices and balance fetched once per trading cycle and shared by every stage"""
+    prices: Dict[str, List[float]] = field(default_factory=dict)  # Kline closes per symbol
+    last_prices: Dict[str, float] = field(default_factory=dict)
+    total_balance: float = 0.0
+    available_balance: float = 0.0
+    balance_ok: bool = False
+    fetch_ms: float = 0.0
+    timestamp: datetime = None
+    
+    def __post_init__(self):
+        if self.timestamp is None:
+            self.timestamp = datetime.now()
+
 @dataclass
 class PositionInfo:
     """Position information data structure"""
@@ -56,11 +74,30 @@ class PositionInfo:
     position_value: float
     timestamp: datetime
 
+class _CountingAPI:
+    """Wraps the exchange client and counts the API calls made through it"""
+    
+    def __init__(self, api):
+        self._api = api
+        self._lock = threading.Lock()
+        self.calls = 0
+    
+    def __getattr__(self, name):
+        attr = getattr(self._api, name)
+        if not callable(attr) or name.startswith('_'):
+            return attr
+        
+        def call(*args, **kwargs):
+            with self._lock:
+                self.calls += 1
+            return attr(*args, **kwargs)
+        return call
+
 class BybitFuturesBot:
     """Bybit Futures Auto Trading Bot with V5 API"""
     
     def __init__(self, api_key: str, api_secret: str, testnet: bool = True):
-        self.api = BybitAPI(api_key, api_secret, testnet)
+        self.api = _CountingAPI(BybitAPI(api_key, api_secret, testnet))
         self.testnet = testnet
         self.is_running = False
         self.trading_enabled = False
@@ -88,6 +125,17 @@ class BybitFuturesBot:
         self.ema_fast = 12
         self.ema_slow = 26
         
+        # Cycle pipeline: one concurrent fetch per cycle, then signals, sizing and SL/TP from the snapshot
+        auto_config = get_config().get('bybit', {}).get('futures', {}).get('auto_trading', {})
+        self.symbols = auto_config.get('symbols') or ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+        self.cycle_seconds = auto_config.get('cycle_seconds', 30)
+        self.kline_interval = str(auto_config.get('kline_interval', '5'))
+        self.kline_limit = auto_config.get('kline_limit', 100)
+        self.fetch_workers = auto_config.get('fetch_workers', 8)
+        self._fetch_pool = ThreadPoolExecutor(max_workers=self.fetch_workers, thread_name_prefix='bybit-bot-fetch')
+        self.cycle_stats = {'cycles': 0, 'last_cycle_ms': 0.0, 'last_fetch_ms': 0.0,
+                            'last_requests': 0, 'total_cycle_ms': 0.0}
+        
         logger.info(f"Bybit Futures Bot initialized (testnet: {testnet})")
     
     def start_trading(self):
@@ -98,10 +146,18 @@ class BybitFuturesBot:
         
         self.is_running = True
         self.trading_enabled = True
+        if self._fetch_pool is None:
+            self._fetch_pool = ThreadPoolExecutor(max_workers=self.fetch_workers, thread_name_prefix='bybit-bot-fetch')
         self.trading_thread = threading.Thread(target=self._trading_loop)
         self.trading_thread.daemon = True
         self.trading_thread.start()
         
+        # Local order books for slippage checks and depth reads
+        try:
+            get_bybit_orderbook_stream(self.symbols)
+        except Exception as e:
+            logger.warning(f"Order book stream unavailable, falling back to REST: {e}")
+        
         logger.info("Auto trading bot started")
         return True
     
@@ -112,6 +168,9 @@ class BybitFuturesBot:
         
         if self.trading_thread and self.trading_thread.is_alive():
             self.trading_thread.join(timeout=5)
+        if self._fetch_pool is not None:
+            self._fetch_pool.shutdown(wait=False, cancel_futures=True)
+            self._fetch_pool = None
         
         logger.info("Auto trading bot stopped")
     
@@ -119,81 +178,106 @@ class BybitFuturesBot:
         """Main trading loop"""
         while self.is_running:
             try:
+                started = time.perf_counter()
                 if self.trading_enabled:
-                    # Update market data
-                    self._update_market_data()
-                    
-                    # Check for trading signals
-                    signals = self._generate_trading_signals()
-                    
-                    # Execute signals
-                    for signal in signals:
-                        if self._should_execute_signal(signal):
-                            self._execute_trading_signal(signal)
-                    
-                    # Manage existing positions
-                    self._manage_positions()
-                    
-                    # Risk management checks
-                    self._risk_management_checks()
+                    self.run_cycle()
                 
-                # Wait before next iteration
-                time.sleep(30)  # 30 second intervals
+                # Wait out the rest of the cycle
+                time.sleep(max(1.0, self.cycle_seconds - (time.perf_counter() - started)))
                 
             except Exception as e:
                 logger.error(f"Error in trading loop: {e}")
                 time.sleep(60)  # Wait longer on error
     
-    def _update_market_data(self):
-        """Update market data for all trading symbols"""
+    def run_cycle(self) -> Dict:
+        """One trading cycle: fetch, signals, execution, position and risk management"""
+        started = time.perf_counter()
+        calls_before = self.api.calls
+        snapshot = self._update_market_data()
+        
+        # Check for trading signals
+        signals = self._generate_trading_signals(snapshot)
+        
+        # Execute signals
+        for signal in signals:
+            if self._should_execute_signal(signal, snapshot):
+                self._execute_trading_signal(signal, snapshot)
+        
+        # Manage existing positions
+        self._manage_positions()
+        
+        # Risk management checks
+        self._risk_management_checks(snapshot)
+        
+        requests = self.api.calls - calls_before
+        cycle_ms = (time.perf_counter() - started) * 1000
+        self.cycle_stats['cycles'] += 1
+        self.cycle_stats['last_cycle_ms'] = round(cycle_ms, 1)
+        self.cycle_stats['last_fetch_ms'] = round(snapshot.fetch_ms, 1)
+        self.cycle_stats['last_requests'] = requests
+        self.cycle_stats['total_cycle_ms'] += cycle_ms
+        return {'signals': len(signals), 'cycle_ms': cycle_ms, 'requests': requests}
+    
+    def _update_market_data(self) -> CycleSnapshot:
+        """Fetch klines for every symbol concurrently, plus all tickers and the balance in one call each"""
+        started = time.perf_counter()
+        snapshot = CycleSnapshot()
         try:
-            symbols = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
-            
-            for symbol in symbols:
-                # Get ticker data
-                ticker = self.api.get_futures_ticker(symbol)
-                if ticker.get('success'):
-                    # Update market data
-                    pass
-                
-                # Get klines for technical analysis
-                klines = self.api.get_futures_klines(symbol, '5', 100)
-                if klines.get('success'):
-                    # Update klines data
-                    pass
+            klines = {symbol: self._fetch_pool.submit(self.api.get_futures_klines, symbol, self.kline_interval,
+                                                      self.kline_limit)
+                      for symbol in self.symbols}
+            balance = self._fetch_pool.submit(self.api.get_futures_balance)
+            
+            ticker_response = self.api.get_futures_tickers()
+            if ticker_response.get('success'):
+                wanted = set(self.symbols)
+                for ticker in ticker_response.get('data', {}).get('list', []):
+                    if ticker.get('symbol') in wanted:
+                        snapshot.last_prices[ticker['symbol']] = float(ticker.get('lastPrice', 0))
+            
+            for symbol, future in klines.items():
+                try:
+                    response = future.result()
+                except Exception as e:
+                    logger.error(f"Error fetching klines for {symbol}: {e}")
+                    continue
+                if response.get('success'):
+                    snapshot.prices[symbol] = self._extract_prices_from_klines(response)
+            
+            balance_response = balance.result()
+            balance_data = balance_response.get('data', {}).get('list', []) if balance_response.get('success') else []
+            if balance_data:
+                snapshot.total_balance = float(balance_data[0].get('totalWalletBalance', 0))
+                snapshot.available_balance = float(balance_data[0].get('availableToWithdraw', 0))
+                snapshot.balance_ok = True
                     
         except Exception as e:
             logger.error(f"Error updating market data: {e}")
+        snapshot.fetch_ms = (time.perf_counter() - started) * 1000
+        return snapshot
     
-    def _generate_trading_signals(self) -> List[TradingSignal]:
+    def _generate_trading_signals(self, snapshot: CycleSnapshot = None) -> List[TradingSignal]:
         """Generate trading signals based on technical analysis"""
         signals = []
+        snapshot = snapshot or self._update_market_data()
         
         try:
-            symbols = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
-            
-            for symbol in symbols:
-                # Get klines data
-                klines_response = self.api.get_futures_klines(symbol, '5', 100)
-                
-                if not klines_response.get('success'):
-                    continue
-                
+            for symbol in self.symbols:
                 # Extract price data
-                prices = self._extract_prices_from_klines(klines_response)
-                if len(prices) < 50:
+                prices = snapshot.prices.get(symbol, [])
+                if len(prices) < 50 or snapshot.last_prices.get(symbol, 0) <= 0:
                     continue
                 
                 # Generate signals based on strategies
-                signal = self._rsi_strategy(symbol, prices)
+                signal = self._rsi_strategy(symbol, prices, snapshot)
                 if signal:
                     signals.append(signal)
                 
-                signal = self._ema_crossover_strategy(symbol, prices)
+                signal = self._ema_crossover_strategy(symbol, prices, snapshot)
                 if signal:
                     signals.append(signal)
                 
-                signal = self._volume_price_strategy(symbol, prices)
+                signal = self._volume_price_strategy(symbol, prices, snapshot)
                 if signal:
                     signals.append(signal)
                     
@@ -202,7 +286,8 @@ class BybitFuturesBot:
         
         return signals
     
-    def _rsi_strategy(self, symbol: str, prices: List[float]) -> Optional[TradingSignal]:
+    def _rsi_strategy(self, symbol: str, prices: List[float],
+                      snapshot: CycleSnapshot = None) -> Optional[TradingSignal]:
         """RSI-based trading strategy"""
         try:
             if len(prices) < self.rsi_period + 1:
@@ -219,9 +304,9 @@ class BybitFuturesBot:
                     symbol=symbol,
                     side="Buy",
                     order_type="Market",
-                    quantity=self._calculate_position_size(symbol),
-                    stop_loss=self._calculate_stop_loss(symbol, "Buy"),
-                    take_profit=self._calculate_take_profit(symbol, "Buy"),
+                    quantity=self._calculate_position_size(symbol, snapshot),
+                    stop_loss=self._calculate_stop_loss(symbol, "Buy", snapshot),
+                    take_profit=self._calculate_take_profit(symbol, "Buy", snapshot),
                     leverage=self.default_leverage,
                     strategy="RSI_OVERSOLD",
                     confidence=0.7
@@ -233,9 +318,9 @@ class BybitFuturesBot:
                     symbol=symbol,
                     side="Sell",
                     order_type="Market",
-                    quantity=self._calculate_position_size(symbol),
-                    stop_loss=self._calculate_stop_loss(symbol, "Sell"),
-                    take_profit=self._calculate_take_profit(symbol, "Sell"),
+                    quantity=self._calculate_position_size(symbol, snapshot),
+                    stop_loss=self._calculate_stop_loss(symbol, "Sell", snapshot),
+                    take_profit=self._calculate_take_profit(symbol, "Sell", snapshot),
                     leverage=self.default_leverage,
                     strategy="RSI_OVERBOUGHT",
                     confidence=0.7
@@ -246,7 +331,8 @@ class BybitFuturesBot:
         
         return None
     
-    def _ema_crossover_strategy(self, symbol: str, prices: List[float]) -> Optional[TradingSignal]:
+    def _ema_crossover_strategy(self, symbol: str, prices: List[float],
+                                snapshot: CycleSnapshot = None) -> Optional[TradingSignal]:
         """EMA crossover trading strategy"""
         try:
             if len(prices) < self.ema_slow + 1:
@@ -271,9 +357,9 @@ class BybitFuturesBot:
                     symbol=symbol,
                     side="Buy",
                     order_type="Market",
-                    quantity=self._calculate_position_size(symbol),
-                    stop_loss=self._calculate_stop_loss(symbol, "Buy"),
-                    take_profit=self._calculate_take_profit(symbol, "Buy"),
+                    quantity=self._calculate_position_size(symbol, snapshot),
+                    stop_loss=self._calculate_stop_loss(symbol, "Buy", snapshot),
+                    take_profit=self._calculate_take_profit(symbol, "Buy", snapshot),
                     leverage=self.default_leverage,
                     strategy="EMA_CROSSOVER_BULL",
                     confidence=0.8
@@ -285,9 +371,9 @@ class BybitFuturesBot:
                     symbol=symbol,
                     side="Sell",
                     order_type="Market",
-                    quantity=self._calculate_position_size(symbol),
-                    stop_loss=self._calculate_stop_loss(symbol, "Sell"),
-                    take_profit=self._calculate_take_profit(symbol, "Sell"),
+                    quantity=self._calculate_position_size(symbol, snapshot),
+                    stop_loss=self._calculate_stop_loss(symbol, "Sell", snapshot),
+                    take_profit=self._calculate_take_profit(symbol, "Sell", snapshot),
                     leverage=self.default_leverage,
                     strategy="EMA_CROSSOVER_BEAR",
                     confidence=0.8
@@ -298,7 +384,8 @@ class BybitFuturesBot:
         
         return None
     
-    def _volume_price_strategy(self, symbol: str, prices: List[float]) -> Optional[TradingSignal]:
+    def _volume_price_strategy(self, symbol: str, prices: List[float],
+                               snapshot: CycleSnapshot = None) -> Optional[TradingSignal]:
         """Volume and price action strategy"""
         try:
             if len(prices) < 20:
@@ -314,9 +401,9 @@ class BybitFuturesBot:
                     symbol=symbol,
                     side="Buy",
                     order_type="Market",
-                    quantity=self._calculate_position_size(symbol),
-                    stop_loss=self._calculate_stop_loss(symbol, "Buy"),
-                    take_profit=self._calculate_take_profit(symbol, "Buy"),
+                    quantity=self._calculate_position_size(symbol, snapshot),
+                    stop_loss=self._calculate_stop_loss(symbol, "Buy", snapshot),
+                    take_profit=self._calculate_take_profit(symbol, "Buy", snapshot),
                     leverage=self.default_leverage,
                     strategy="VOLUME_PRICE_BULL",
                     confidence=0.6
@@ -328,9 +415,9 @@ class BybitFuturesBot:
                     symbol=symbol,
                     side="Sell",
                     order_type="Market",
-                    quantity=self._calculate_position_size(symbol),
-                    stop_loss=self._calculate_stop_loss(symbol, "Sell"),
-                    take_profit=self._calculate_take_profit(symbol, "Sell"),
+                    quantity=self._calculate_position_size(symbol, snapshot),
+                    stop_loss=self._calculate_stop_loss(symbol, "Sell", snapshot),
+                    take_profit=self._calculate_take_profit(symbol, "Sell", snapshot),
                     leverage=self.default_leverage,
                     strategy="VOLUME_PRICE_BEAR",
                     confidence=0.6
@@ -341,7 +428,7 @@ class BybitFuturesBot:
         
         return None
     
-    def _should_execute_signal(self, signal: TradingSignal) -> bool:
+    def _should_execute_signal(self, signal: TradingSignal, snapshot: CycleSnapshot = None) -> bool:
         """Check if signal should be executed"""
         try:
             # Check if trading is enabled
@@ -369,7 +456,7 @@ class BybitFuturesBot:
                 return False
             
             # Check if we have enough balance
-            if not self._check_balance_for_trade(signal):
+            if not self._check_balance_for_trade(signal, snapshot):
                 logger.warning(f"Insufficient balance for {signal.symbol} trade")
                 return False
             
@@ -379,7 +466,7 @@ class BybitFuturesBot:
             logger.error(f"Error checking signal execution: {e}")
             return False
     
-    def _execute_trading_signal(self, signal: TradingSignal):
+    def _execute_trading_signal(self, signal: TradingSignal, snapshot: CycleSnapshot = None):
         """Execute a trading signal"""
         try:
             logger.info(f"Executing signal: {signal.side} {signal.quantity} {signal.symbol}")
@@ -412,6 +499,11 @@ class BybitFuturesBot:
                 # Update daily trade count
                 self.daily_trades += 1
                 
+                # Later signals of this cycle see the margin this order took
+                if snapshot is not None:
+                    price = snapshot.last_prices.get(signal.symbol, 0)
+                    snapshot.available_balance -= signal.quantity * price / signal.leverage
+                
                 # Store order information
                 if 'data' in order_result:
                     order_data = order_result['data']
@@ -521,7 +613,7 @@ class BybitFuturesBot:
         except Exception as e:
             logger.error(f"Error closing position: {e}")
     
-    def _risk_management_checks(self):
+    def _risk_management_checks(self, snapshot: CycleSnapshot = None):
         """Perform risk management checks"""
         try:
             # Check daily loss limit
@@ -534,18 +626,13 @@ class BybitFuturesBot:
             total_position_value = sum(pos.position_value for pos in self.positions.values())
             
             # Get account balance
-            balance_response = self.api.get_futures_balance()
-            if balance_response.get('success'):
-                balance_data = balance_response.get('data', {}).get('list', [])
-                if balance_data:
-                    total_balance = float(balance_data[0].get('totalWalletBalance', 0))
-                    
-                    if total_balance > 0:
-                        position_concentration = total_position_value / total_balance
-                        
-                        if position_concentration > 0.8:  # 80% of balance
-                            logger.warning("Position concentration too high, reducing risk")
-                            self._reduce_position_risk()
+            total_balance, _ = self._get_balances(snapshot)
+            if total_balance > 0:
+                position_concentration = total_position_value / total_balance
+                
+                if position_concentration > 0.8:  # 80% of balance
+                    logger.warning("Position concentration too high, reducing risk")
+                    self._reduce_position_risk()
             
         except Exception as e:
             logger.error(f"Error in risk management checks: {e}")
@@ -568,19 +655,34 @@ class BybitFuturesBot:
         except Exception as e:
             logger.error(f"Error reducing position risk: {e}")
     
-    def _calculate_position_size(self, symbol: str) -> float:
+    def _get_last_price(self, symbol: str, snapshot: CycleSnapshot = None) -> float:
+        """Last traded price from the cycle snapshot, or a ticker call without one"""
+        if snapshot is not None:
+            return snapshot.last_prices.get(symbol, 0.0)
+        ticker_response = self.api.get_futures_ticker(symbol)
+        if not ticker_response.get('success'):
+            return 0.0
+        ticker_data = ticker_response.get('data', {}).get('list', [])
+        return float(ticker_data[0].get('lastPrice', 0)) if ticker_data else 0.0
+    
+    def _get_balances(self, snapshot: CycleSnapshot = None) -> Tuple[float, float]:
+        """(total wallet, available) balance from the cycle snapshot, or a balance call without one"""
+        if snapshot is not None:
+            return snapshot.total_balance, snapshot.available_balance
+        balance_response = self.api.get_futures_balance()
+        if not balance_response.get('success'):
+            return 0.0, 0.0
+        balance_data = balance_response.get('data', {}).get('list', [])
+        if not balance_data:
+            return 0.0, 0.0
+        return (float(balance_data[0].get('totalWalletBalance', 0)),
+                float(balance_data[0].get('availableToWithdraw', 0)))
+    
+    def _calculate_position_size(self, symbol: str, snapshot: CycleSnapshot = None) -> float:
         """Calculate position size based on risk management"""
         try:
             # Get account balance
-            balance_response = self.api.get_futures_balance()
-            if not balance_response.get('success'):
-                return 0.01  # Default minimum size
-            
-            balance_data = balance_response.get('data', {}).get('list', [])
-            if not balance_data:
-                return 0.01
-            
-            total_balance = float(balance_data[0].get('totalWalletBalance', 0))
+            total_balance, _ = self._get_balances(snapshot)
             
             if total_balance <= 0:
                 return 0.01
@@ -589,23 +691,18 @@ class BybitFuturesBot:
             position_value = total_balance * self.max_position_size
             
             # Get current price
-            ticker_response = self.api.get_futures_ticker(symbol)
-            if ticker_response.get('success'):
-                ticker_data = ticker_response.get('data', {}).get('list', [])
-                if ticker_data:
-                    current_price = float(ticker_data[0].get('lastPrice', 0))
-                    
-                    if current_price > 0:
-                        # Calculate quantity in contracts
-                        quantity = position_value / current_price
-                        
-                        # Round to appropriate precision
-                        if symbol == 'BTCUSDT':
-                            return round(quantity, 3)  # 3 decimal places for BTC
-                        elif symbol == 'ETHUSDT':
-                            return round(quantity, 2)  # 2 decimal places for ETH
-                        else:
-                            return round(quantity, 1)  # 1 decimal place for others
+            current_price = self._get_last_price(symbol, snapshot)
+            if current_price > 0:
+                # Calculate quantity in contracts
+                quantity = position_value / current_price
+                
+                # Round to appropriate precision
+                if symbol == 'BTCUSDT':
+                    return round(quantity, 3)  # 3 decimal places for BTC
+                elif symbol == 'ETHUSDT':
+                    return round(quantity, 2)  # 2 decimal places for ETH
+                else:
+                    return round(quantity, 1)  # 1 decimal place for others
             
             return 0.01  # Default minimum size
             
@@ -613,19 +710,11 @@ class BybitFuturesBot:
             logger.error(f"Error calculating position size: {e}")
             return 0.01
     
-    def _calculate_stop_loss(self, symbol: str, side: str) -> float:
+    def _calculate_stop_loss(self, symbol: str, side: str, snapshot: CycleSnapshot = None) -> float:
         """Calculate stop loss price"""
         try:
             # Get current price
-            ticker_response = self.api.get_futures_ticker(symbol)
-            if not ticker_response.get('success'):
-                return 0
-            
-            ticker_data = ticker_response.get('data', {}).get('list', [])
-            if not ticker_data:
-                return 0
-            
-            current_price = float(ticker_data[0].get('lastPrice', 0))
+            current_price = self._get_last_price(symbol, snapshot)
             
             if current_price <= 0:
                 return 0
@@ -648,19 +737,11 @@ class BybitFuturesBot:
             logger.error(f"Error calculating stop loss: {e}")
             return 0
     
-    def _calculate_take_profit(self, symbol: str, side: str) -> float:
+    def _calculate_take_profit(self, symbol: str, side: str, snapshot: CycleSnapshot = None) -> float:
         """Calculate take profit price"""
         try:
             # Get current price
-            ticker_response = self.api.get_futures_ticker(symbol)
-            if not ticker_response.get('success'):
-                return 0
-            
-            ticker_data = ticker_response.get('data', {}).get('list', [])
-            if not ticker_data:
-                return 0
-            
-            current_price = float(ticker_data[0].get('lastPrice', 0))
+            current_price = self._get_last_price(symbol, snapshot)
             
             if current_price <= 0:
                 return 0
@@ -683,30 +764,16 @@ class BybitFuturesBot:
             logger.error(f"Error calculating take profit: {e}")
             return 0
     
-    def _check_balance_for_trade(self, signal: TradingSignal) -> bool:
+    def _check_balance_for_trade(self, signal: TradingSignal, snapshot: CycleSnapshot = None) -> bool:
         """Check if we have enough balance for the trade"""
         try:
             # Get account balance
-            balance_response = self.api.get_futures_balance()
-            if not balance_response.get('success'):
+            if snapshot is not None and not snapshot.balance_ok:
                 return False
-            
-            balance_data = balance_response.get('data', {}).get('list', [])
-            if not balance_data:
-                return False
-            
-            available_balance = float(balance_data[0].get('availableToWithdraw', 0))
+            _, available_balance = self._get_balances(snapshot)
             
             # Calculate required margin
-            ticker_response = self.api.get_futures_ticker(signal.symbol)
-            if not ticker_response.get('success'):
-                return False
-            
-            ticker_data = ticker_response.get('data', {}).get('list', [])
-            if not ticker_data:
-                return False
-            
-            current_price = float(ticker_data[0].get('lastPrice', 0))
+            current_price = self._get_last_price(signal.symbol, snapshot)
             
             if current_price <= 0:
                 return False
@@ -815,6 +882,11 @@ class BybitFuturesBot:
             'open_positions': len(self.positions),
             'open_orders': len(self.orders),
             'testnet': self.testnet,
+            'symbols': len(self.symbols),
+            'cycles': self.cycle_stats['cycles'],
+            'last_cycle_ms': self.cycle_stats['last_cycle_ms'],
+            'last_fetch_ms': self.cycle_stats['last_fetch_ms'],
+            'last_cycle_requests': self.cycle_stats['last_requests'],
             'timestamp': datetime.now().isoformat()
         }
     
@@ -891,6 +963,83 @@ class BybitFuturesBot:
         except Exception as e:
             logger.error(f"Error updating trading configuration: {e}")
 
+def benchmark(symbols: int = 30, latency_ms: float = 40.0):
+    """Cycle latency and request count: per-stage refetching vs one concurrent fetch per cycle"""
+    import numpy as np
+
+    # Both runs see the same candles for every symbol, whatever order the fetches run in
+    rng = np.random.default_rng(5)
+    closes = {f'SYM{i}USDT': 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 100))) for i in range(symbols)}
+
+    class _LatencyAPI:
+        """Answers like BybitAPI after ``latency_ms``; counts requests"""
+
+        def __init__(self):
+            self.requests = 0
+            self.lock = threading.Lock()
+
+        def _call(self, data):
+            with self.lock:
+                self.requests += 1
+            time.sleep(latency_ms / 1000)
+            return {'success': True, 'data': data}
+
+        def get_futures_klines(self, symbol, interval='5', limit=100, end=None):
+            return self._call({'list': [[0, c, c, c, c, 1.0, c] for c in closes[symbol][-limit:]]})
+
+        def get_futures_ticker(self, symbol):
+            return self._call({'list': [{'symbol': symbol, 'lastPrice': '100'}]})
+
+        def get_futures_tickers(self):
+            return self._call({'list': [{'symbol': f'SYM{i}USDT', 'lastPrice': '100'} for i in range(500)]})
+
+        def get_futures_balance(self):
+            return self._call({'list': [{'totalWalletBalance': '100000', 'availableToWithdraw': '100000'}]})
+
+        def get_futures_positions(self):
+            return self._call({'list': []})
+
+        def set_futures_leverage(self, symbol, leverage):
+            return self._call({})
+
+        def place_futures_order(self, **kwargs):
+            return self._call({'orderId': None})
+
+    bot = BybitFuturesBot('key', 'secret', testnet=True)
+    bot.symbols = [f'SYM{i}USDT' for i in range(symbols)]
+    bot.trading_enabled = True
+
+    # Before: market data fetched and dropped, klines refetched, ticker and balance refetched per signal
+    api = _LatencyAPI()
+    bot.api = _CountingAPI(api)
+    started = time.perf_counter()
+    signals = []
+    for symbol in bot.symbols:
+        api.get_futures_ticker(symbol)
+        api.get_futures_klines(symbol, '5', 100)
+    for symbol in bot.symbols:
+        prices = bot._extract_prices_from_klines(api.get_futures_klines(symbol, '5', 100))
+        for strategy in (bot._rsi_strategy, bot._ema_crossover_strategy, bot._volume_price_strategy):
+            signal = strategy(symbol, prices)
+            if signal:
+                signals.append(signal)
+    for signal in signals:
+        if bot._should_execute_signal(signal):
+            bot._execute_trading_signal(signal)
+    bot._manage_positions()
+    bot._risk_management_checks()
+    before_ms = (time.perf_counter() - started) * 1000
+    print(f"before: {symbols} symbols, {len(signals)} signals, {api.requests} requests, {before_ms:.0f} ms")
+
+    api = _LatencyAPI()
+    bot.api = _CountingAPI(api)
+    bot.daily_trades = 0
+    result = bot.run_cycle()
+    print(f"after:  {symbols} symbols, {result['signals']} signals, {result['requests']} requests "
+          f"({api.requests} served), "
+          f"{result['cycle_ms']:.0f} ms (fetch {bot.cycle_stats['last_fetch_ms']:.0f} ms)")
+
+
 # Example usage
 if __name__ == "__main__":
     # Initialize bot
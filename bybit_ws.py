@@ -0,0 +1,193 @@
+import asyncio
+import json
+import threading
+import time
+import logging
+import websockets
+from typing import Dict, List, Optional
+
+from config_loader import get_config
+from market_state import MarketState, get_market_state
+from order_book import OrderBook, get_order_book
+from pionex_ws import PionexWebSocket
+
+
+class BybitOrderBookStream(PionexWebSocket):
+    """Bybit v5 public ``orderbook.<depth>.<symbol>`` stream feeding local OrderBooks.
+
+    Reuses the Pionex client's connect/backoff/receive loop. Bybit sends one
+    snapshot per subscription followed by deltas whose update id ``u`` must
+    increase by one; on a gap the book is invalidated and the topic is
+    resubscribed, which makes Bybit send a fresh snapshot. Symbols added with
+    ``subscribe_trades`` also stream ``publicTrade.<symbol>`` into the
+    'bybit' MarketState.
+    """
+
+    thread_name = 'bybit-ws'
+    HEARTBEAT_INTERVAL = 20
+
+    def __init__(self, testnet: bool = False, depth: int = 50, url: str = None, books: Dict[str, OrderBook] = None,
+                 market_state: MarketState = None):
+        default_url = ('wss://stream-testnet.bybit.com/v5/public/linear' if testnet
+                       else 'wss://stream.bybit.com/v5/public/linear')
+        super().__init__(url=url or default_url, market_state=market_state or get_market_state('bybit'))
+        self.depth = depth
+        self.books = books
+        self._heartbeat_task = None
+        self._resyncing = set()
+
+    def _book(self, symbol: str) -> OrderBook:
+        if self.books is not None:
+            return self.books.setdefault(symbol, OrderBook(symbol, 'bybit'))
+        return get_order_book(symbol, 'bybit')
+
+    def _topic(self, symbol: str) -> str:
+        return f"orderbook.{self.depth}.{symbol.upper()}"
+
+    async def _subscribe_topic(self, topic: str):
+        self.subscriptions.add(topic)
+        if self.ws and self.connected:
+            await self.ws.send(json.dumps({'op': 'subscribe', 'args': [topic]}))
+            self.logger.info(f"Subscribed to {topic}")
+
+    async def subscribe_symbol(self, symbol: str, depth_limit: int = None):
+        await self._subscribe_topic(self._topic(symbol))
+
+    def _subscribe_topics(self, topics: List[str]):
+        for topic in topics:
+            if self._loop and self._loop.is_running():
+                asyncio.run_coroutine_threadsafe(self._subscribe_topic(topic), self._loop)
+            else:
+                self.subscriptions.add(topic)
+
+    def subscribe_symbols(self, symbols: List[str], depth_limit: int = None):
+        self._subscribe_topics([self._topic(symbol) for symbol in symbols])
+
+    def subscribe_trades(self, symbols: List[str]):
+        """Stream the symbols' public trades into ``self.market_state``"""
+        self._subscribe_topics([f"publicTrade.{symbol.upper()}" for symbol in symbols])
+
+    async def _resubscribe_all(self):
+        self._resyncing.clear()
+        if self.subscriptions:
+            await self.ws.send(json.dumps({'op': 'subscribe', 'args': sorted(self.subscriptions)}))
+        # Invalidate every book until its new snapshot arrives
+        for topic in self.subscriptions:
+            if topic.startswith('orderbook.'):
+                self._book(topic.split('.')[-1]).invalidate()
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.ensure_future(self._heartbeat())
+
+    async def _heartbeat(self):
+        """Bybit drops idle public connections unless it sees an application-level ping"""
+        while not self._stop:
+            await asyncio.sleep(self.HEARTBEAT_INTERVAL)
+            if self.ws and self.connected:
+                try:
+                    await self.ws.send(json.dumps({'op': 'ping'}))
+                except Exception:
+                    pass
+
+    async def _resync(self, topic: str, symbol: str):
+        try:
+            await self.ws.send(json.dumps({'op': 'unsubscribe', 'args': [topic]}))
+            await self.ws.send(json.dumps({'op': 'subscribe', 'args': [topic]}))
+        except Exception as e:
+            self.logger.error(f"Resync of {topic} failed: {e}")
+
+    async def _on_message(self, message: str):
+        try:
+            data = json.loads(message)
+        except (TypeError, ValueError):
+            self.stats['decode_errors'] += 1
+            return
+        self.stats['messages'] += 1
+        self.stats['last_message_at'] = time.time()
+        topic = data.get('topic', '')
+        if topic.startswith('publicTrade.') and 'data' in data:
+            # Replay in trade-time order so listeners see every print as it happened
+            for trade in sorted(data['data'], key=lambda t: t.get('T', 0)):
+                self.market_state.update_trade(trade.get('s', topic.split('.')[-1]), trade.get('p', 0),
+                                               trade.get('v', 0), trade.get('S', '').upper(), trade.get('T', 0))
+            return
+        if not topic.startswith('orderbook.') or 'data' not in data:
+            if data.get('success') is False:
+                self.logger.error(f"Bybit stream error: {data.get('ret_msg')}")
+            return
+        payload = data['data']
+        symbol = payload.get('s', topic.split('.')[-1])
+        book = self._book(symbol)
+        update_id = payload.get('u')
+        timestamp = data.get('ts', 0)
+        # u == 1 means the server restarted its book: treat it as a snapshot
+        if data.get('type') == 'snapshot' or update_id == 1:
+            book.apply_snapshot(payload.get('b', []), payload.get('a', []), update_id, timestamp)
+            self._resyncing.discard(topic)
+        elif not book.apply_delta(payload.get('b', []), payload.get('a', []), update_id, timestamp=timestamp):
+            # Deltas keep arriving until the new snapshot does; resubscribe only once
+            if topic not in self._resyncing:
+                self._resyncing.add(topic)
+                self.stats['sequence_gaps'] += 1
+                if self.ws and self.connected:
+                    asyncio.ensure_future(self._resync(topic, symbol))
+
+
+# Shared Bybit book stream, one connection per process
+_shared_stream = None
+_shared_stream_lock = threading.Lock()
+
+def get_bybit_orderbook_stream(symbols: List[str] = None) -> Optional[BybitOrderBookStream]:
+    """Start (once) the shared Bybit order-book stream and subscribe ``symbols``; None when disabled"""
+    global _shared_stream
+    config = get_config()
+    if not config.get('websocket', {}).get('enabled', True):
+        return None
+    with _shared_stream_lock:
+        if _shared_stream is None:
+            _shared_stream = BybitOrderBookStream(
+                testnet=config.get('bybit', {}).get('testnet', False),
+                depth=config.get('websocket', {}).get('bybit_book_depth', 50)
+            )
+        if symbols:
+            _shared_stream.subscribe_symbols(symbols)
+        _shared_stream.start()
+        return _shared_stream
+
+
+async def _stub_server_demo(port: int = 8766):
+    """Snapshot, deltas, a dropped update and the resulting resync against a local stub"""
+    served = {'subscribes': 0}
+
+    async def handler(ws, *args):
+        async for raw in ws:
+            msg = json.loads(raw)
+            if msg.get('op') != 'subscribe':
+                continue
+            served['subscribes'] += 1
+            topic = msg['args'][0]
+            base = 100 * served['subscribes']
+            await ws.send(json.dumps({'topic': topic, 'type': 'snapshot', 'ts': 1, 'data': {
+                's': 'BTCUSDT', 'b': [['30000', '1'], ['29999', '2']], 'a': [['30001', '1'], ['30002', '2']],
+                'u': base}}))
+            for step in range(1, 6):
+                if served['subscribes'] == 1 and step == 3:
+                    continue  # Dropped update
+                await ws.send(json.dumps({'topic': topic, 'type': 'delta', 'ts': 1 + step, 'data': {
+                    's': 'BTCUSDT', 'b': [[str(30000 - step * 0.25), '0.5']], 'a': [], 'u': base + step}}))
+
+    async with websockets.serve(handler, 'localhost', port):
+        books = {}
+        stream = BybitOrderBookStream(url=f'ws://localhost:{port}', books=books)
+        await stream.subscribe_symbol('BTCUSDT')
+        task = asyncio.ensure_future(stream.run())
+        await asyncio.sleep(1.0)
+        await stream.disconnect()
+        task.cancel()
+        book = books['BTCUSDT']
+        print(f"subscribes={served['subscribes']} gaps={stream.stats['sequence_gaps']} book={book.stats}")
+        print(f"synced={book.synced} seq={book.sequence} best_bid={book.best_bid()} best_ask={book.best_ask()}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(_stub_server_demo())
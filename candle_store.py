@@ -0,0 +1,352 @@
+import json
+import os
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from kline_cache import INTERVAL_MS, kline_cache, kline_open_time, normalize_interval
+
+COLUMNS = ('time', 'open', 'high', 'low', 'close', 'volume')
+DTYPES = {'time': np.int64, 'open': np.float64, 'high': np.float64, 'low': np.float64,
+          'close': np.float64, 'volume': np.float64}
+
+# Pionex interval codes -> Bybit v5 kline intervals
+BYBIT_INTERVALS = {
+    '1M': '1', '5M': '5', '15M': '15', '30M': '30', '1H': '60',
+    '4H': '240', '12H': '720', '1D': 'D'
+}
+
+PAGE_SIZE = 500
+
+
+def _kline_values(kline) -> Optional[Tuple]:
+    """(time, open, high, low, close, volume) from a list-style or dict-style kline"""
+    try:
+        if isinstance(kline, dict):
+            return (kline_open_time(kline), float(kline['open']), float(kline['high']),
+                    float(kline['low']), float(kline['close']), float(kline['volume']))
+        return (int(kline[0]), float(kline[1]), float(kline[2]),
+                float(kline[3]), float(kline[4]), float(kline[5]))
+    except (TypeError, ValueError, KeyError, IndexError):
+        return None
+
+
+def _fetch_pionex_page(api, symbol: str, interval: str, end_ms: int, limit: int) -> Dict:
+    response = api.get_klines(symbol, interval, limit, end_time=end_ms)
+    if 'error' in response:
+        return {'error': response['error']}
+    data = response.get('data')
+    rows = data.get('klines', []) if isinstance(data, dict) else (data or [])
+    return {'rows': rows}
+
+
+def _fetch_bybit_page(api, symbol: str, interval: str, end_ms: int, limit: int) -> Dict:
+    response = api.get_futures_klines(symbol, BYBIT_INTERVALS.get(interval, '1'), limit, end=end_ms)
+    if 'error' in response and response.get('success') is not True:
+        return {'error': response['error']}
+    data = response.get('data', response.get('result', {}))
+    return {'rows': data.get('list', []) if isinstance(data, dict) else []}
+
+
+class _Series:
+    """Append-only column files for one (exchange, symbol, interval) plus a small JSON index"""
+
+    def __init__(self, path: Path, interval_ms: int):
+        self.path = path
+        self.interval_ms = interval_ms
+        self.lock = threading.Lock()
+        self.count = 0
+        self.exhausted = False
+        self._views = None
+        self.path.mkdir(parents=True, exist_ok=True)
+        index_file = self.path / 'index.json'
+        if index_file.exists():
+            with open(index_file, 'r') as f:
+                index = json.load(f)
+            self.count = int(index.get('count', 0))
+            self.exhausted = bool(index.get('exhausted', False))
+
+    def _column_file(self, name: str) -> Path:
+        return self.path / f"{name}.bin"
+
+    def _write_index(self):
+        index = {
+            'count': self.count,
+            'interval_ms': self.interval_ms,
+            'first_time': int(self.views()['time'][0]) if self.count else None,
+            'last_time': int(self.views()['time'][-1]) if self.count else None,
+            'exhausted': self.exhausted
+        }
+        tmp = self.path / 'index.json.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp, self.path / 'index.json')
+
+    def views(self) -> Dict[str, np.ndarray]:
+        """Read-only memory-mapped column arrays (no copies)"""
+        if self._views is None:
+            if self.count == 0:
+                self._views = {name: np.empty(0, dtype=DTYPES[name]) for name in COLUMNS}
+            else:
+                self._views = {name: np.memmap(self._column_file(name), dtype=DTYPES[name], mode='r',
+                                               shape=(self.count,)) for name in COLUMNS}
+        return self._views
+
+    def first_time(self) -> Optional[int]:
+        return int(self.views()['time'][0]) if self.count else None
+
+    def last_time(self) -> Optional[int]:
+        return int(self.views()['time'][-1]) if self.count else None
+
+    def append(self, columns: Dict[str, np.ndarray]):
+        n = len(columns['time'])
+        if n == 0:
+            return
+        self._views = None
+        for name in COLUMNS:
+            column_file = self._column_file(name)
+            with open(column_file, 'ab') as f:
+                # Drop bytes past the indexed count left by an interrupted append
+                f.truncate(self.count * np.dtype(DTYPES[name]).itemsize)
+                f.write(np.ascontiguousarray(columns[name], dtype=DTYPES[name]).tobytes())
+        self.count += n
+        self._write_index()
+
+    def prepend(self, columns: Dict[str, np.ndarray]):
+        """Insert older candles in front (rewrites the files; only used when backfilling deeper history)"""
+        if len(columns['time']) == 0:
+            return
+        existing = {name: np.array(view) for name, view in self.views().items()}
+        self._views = None
+        for name in COLUMNS:
+            merged = np.concatenate((np.asarray(columns[name], dtype=DTYPES[name]), existing[name]))
+            tmp = self.path / f"{name}.bin.tmp"
+            merged.tofile(tmp)
+            os.replace(tmp, self._column_file(name))
+        self.count += len(columns['time'])
+        self._write_index()
+
+
+class CandleStore:
+    """On-disk columnar store of closed candles, per exchange, symbol and interval.
+
+    Each series is a set of raw little-endian column files (time as int64 ms,
+    OHLCV as float64) that only ever grow at the end, plus an index.json with
+    the row count. Reads memory-map the columns and slice them by time with a
+    binary search, so range queries do not copy or parse anything. ``sync``
+    pages backwards through the exchange klines endpoint and only requests
+    candles missing after the last stored one.
+    """
+
+    def __init__(self, root: str = 'data/candles'):
+        self.root = Path(root)
+        self.logger = logging.getLogger(__name__)
+        self._series: Dict[Tuple[str, str, str], _Series] = {}
+        self._lock = threading.Lock()
+        self._sync_thread = None
+        self._stop_event = threading.Event()
+        self.stats = {'syncs': 0, 'pages': 0, 'candles_written': 0, 'errors': 0}
+
+    def _get_series(self, symbol: str, interval: str, exchange: str) -> _Series:
+        interval = normalize_interval(interval)
+        key = (exchange, symbol, interval)
+        with self._lock:
+            if key not in self._series:
+                self._series[key] = _Series(self.root / exchange / symbol / interval,
+                                            INTERVAL_MS.get(interval, 60_000))
+            return self._series[key]
+
+    def _fetch_range(self, api, symbol: str, interval: str, exchange: str,
+                     end_ms: int, stop_ms: int, max_candles: int) -> Dict:
+        """Page backwards from ``end_ms`` until ``stop_ms`` is covered or ``max_candles`` were read"""
+        fetch_page = _fetch_bybit_page if exchange == 'bybit' else _fetch_pionex_page
+        rows = {}
+        exhausted = False
+        while len(rows) < max_candles:
+            # Never ask for more than is still missing: a one-minute tail is a 2-row request
+            limit = min(PAGE_SIZE, max_candles - len(rows))
+            page = fetch_page(api, symbol, interval, end_ms, limit)
+            self.stats['pages'] += 1
+            if 'error' in page:
+                return page
+            values = [v for v in (_kline_values(row) for row in page['rows']) if v and v[0] is not None]
+            new_values = [v for v in values if v[0] not in rows]
+            for v in new_values:
+                rows[v[0]] = v
+            if not new_values or len(values) < limit:
+                exhausted = True
+                break
+            oldest = min(v[0] for v in values)
+            if oldest <= stop_ms:
+                break
+            end_ms = oldest - 1
+        return {'rows': rows, 'exhausted': exhausted}
+
+    @staticmethod
+    def _to_columns(values: List[Tuple]) -> Dict[str, np.ndarray]:
+        values = sorted(values)
+        return {name: np.array([v[i] for v in values], dtype=DTYPES[name]) for i, name in enumerate(COLUMNS)}
+
+    def sync(self, api, symbol: str, interval: str, min_bars: int = 0, exchange: str = 'pionex') -> Dict:
+        """Bring a series up to the last closed candle, backfilling to at least ``min_bars`` rows"""
+        series = self._get_series(symbol, interval, exchange)
+        interval_ms = series.interval_ms
+        with series.lock:
+            now_ms = int(time.time() * 1000)
+            last_closed_open = (now_ms // interval_ms - 1) * interval_ms
+            written = 0
+
+            last_time = series.last_time()
+            forming = None
+            if last_time is None or last_time < last_closed_open:
+                if last_time is None:
+                    stop_ms, max_candles = last_closed_open - (max(min_bars, 1) - 1) * interval_ms, max(min_bars, 1)
+                else:
+                    stop_ms = last_time + interval_ms
+                    max_candles = (last_closed_open - last_time) // interval_ms
+                # One extra row for the forming candle the window ending now also returns
+                result = self._fetch_range(api, symbol, interval, exchange, now_ms, stop_ms, max_candles + 1)
+                if 'error' in result:
+                    self.stats['errors'] += 1
+                    self.logger.warning(f"Candle sync failed for {symbol} {interval}: {result['error']}")
+                    return {'error': result['error'], 'count': series.count}
+                # Only closed candles newer than what is stored; the forming candle is left to the live cache
+                fresh = [v for t, v in result['rows'].items()
+                         if t <= last_closed_open and (last_time is None or t > last_time)]
+                forming = result['rows'].get(last_closed_open + interval_ms)
+                if last_time is None and result['exhausted']:
+                    series.exhausted = True
+                if fresh:
+                    series.append(self._to_columns(fresh))
+                    written += len(fresh)
+
+            if series.count < min_bars and not series.exhausted and series.count:
+                first_time = series.first_time()
+                missing = min_bars - series.count
+                result = self._fetch_range(api, symbol, interval, exchange, first_time - 1,
+                                           first_time - missing * interval_ms, missing)
+                if 'error' in result:
+                    self.stats['errors'] += 1
+                    return {'error': result['error'], 'count': series.count}
+                older = [v for t, v in result['rows'].items() if t < first_time]
+                if result['exhausted'] or len(older) < missing:
+                    series.exhausted = True
+                series.prepend(self._to_columns(older))
+                written += len(older)
+
+            self.stats['syncs'] += 1
+            self.stats['candles_written'] += written
+            return {'count': series.count, 'written': written, 'last_time': series.last_time(), 'forming': forming}
+
+    def read_range(self, symbol: str, interval: str, start_ms: int = None, end_ms: int = None,
+                   exchange: str = 'pionex') -> Dict[str, np.ndarray]:
+        """Zero-copy column views for candles with start_ms <= open time <= end_ms"""
+        series = self._get_series(symbol, interval, exchange)
+        with series.lock:
+            views = series.views()
+        times = views['time']
+        lo = 0 if start_ms is None else int(np.searchsorted(times, start_ms, side='left'))
+        hi = len(times) if end_ms is None else int(np.searchsorted(times, end_ms, side='right'))
+        return {name: view[lo:hi] for name, view in views.items()}
+
+    def read_last(self, symbol: str, interval: str, count: int, exchange: str = 'pionex') -> Dict[str, np.ndarray]:
+        series = self._get_series(symbol, interval, exchange)
+        with series.lock:
+            views = series.views()
+        return {name: view[-count:] if count else view[:0] for name, view in views.items()}
+
+    @staticmethod
+    def to_frame(columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """Backtester-style DataFrame (open_time as datetime) from column views"""
+        df = pd.DataFrame({name: np.array(columns[name]) for name in COLUMNS[1:]})
+        df.insert(0, 'open_time', pd.to_datetime(np.array(columns['time']), unit='ms'))
+        return df
+
+    def get_klines(self, api, symbol: str, interval: str, limit: int = 100, exchange: str = 'pionex') -> Dict:
+        """``api.get_klines``-shaped response: stored closed candles plus the live forming candle"""
+        interval = normalize_interval(interval)
+        sync = self.sync(api, symbol, interval, min_bars=limit, exchange=exchange)
+        columns = self.read_last(symbol, interval, limit, exchange)
+        klines = [[int(t), o, h, l, c, v] for t, o, h, l, c, v in
+                  zip(*(columns[name].tolist() for name in COLUMNS))]
+        if exchange == 'pionex':
+            live = kline_cache.get_candles(api, symbol, interval, 2)
+            for row in live.get('klines', []):
+                values = _kline_values(row)
+                if values and values[0] is not None and (not klines or values[0] > klines[-1][0]):
+                    klines.append(list(values))
+        if not klines and 'error' in sync:
+            return {'error': sync['error']}
+        return {
+            'result': True,
+            'data': {'klines': klines[-limit:]},
+            'timestamp': int(time.time() * 1000)
+        }
+
+    def start_background_sync(self, api, pairs: List[Tuple[str, str]], interval_seconds: float = 60.0,
+                              exchange: str = 'pionex'):
+        """Keep the given (symbol, interval) series synced from a daemon thread"""
+        if self._sync_thread and self._sync_thread.is_alive():
+            return
+        self._stop_event.clear()
+
+        def _loop():
+            while not self._stop_event.is_set():
+                for symbol, interval in pairs:
+                    try:
+                        self.sync(api, symbol, interval, exchange=exchange)
+                    except Exception as e:
+                        self.logger.error(f"Background candle sync error for {symbol} {interval}: {e}")
+                self._stop_event.wait(interval_seconds)
+
+        self._sync_thread = threading.Thread(target=_loop, daemon=True, name='candle-store-sync')
+        self._sync_thread.start()
+        self.logger.info(f"Background candle sync started for {len(pairs)} series")
+
+    def stop_background_sync(self):
+        self._stop_event.set()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self.stats, 'series': len(self._series)}
+
+
+# Global candle store shared by the backtester, Bot 2025 and the GUI
+candle_store = CandleStore()
+
+def get_candle_store() -> CandleStore:
+    return candle_store
+
+
+def benchmark(days: int = 365, root: str = None):
+    """Write a year of synthetic 1-minute candles and time range queries against it"""
+    import tempfile
+    root = root or tempfile.mkdtemp(prefix='candle_store_')
+    store = CandleStore(root)
+    n = days * 1440
+    start = 1_700_000_000_000 // 60_000 * 60_000
+    rng = np.random.default_rng(3)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    series = store._get_series('BTC_USDT', '1M', 'pionex')
+    t0 = time.perf_counter()
+    series.append({'time': start + np.arange(n, dtype=np.int64) * 60_000, 'open': close, 'high': close * 1.001,
+                   'low': close * 0.999, 'close': close, 'volume': rng.lognormal(3, 1, n)})
+    print(f"write {n} candles: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    reopened = CandleStore(root)
+    for span_days in (1, 30, days):
+        q_start = start + (days - span_days) * 86_400_000 // 2
+        t0 = time.perf_counter()
+        columns = reopened.read_range('BTC_USDT', '1M', q_start, q_start + span_days * 86_400_000)
+        high = float(columns['high'].max())
+        elapsed = (time.perf_counter() - t0) * 1000
+        print(f"range {span_days:3d}d -> {len(columns['time']):6d} rows, max high {high:.2f}: {elapsed:.2f} ms")
+
+
+if __name__ == '__main__':
+    benchmark()
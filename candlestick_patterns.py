@@ -0,0 +1,338 @@
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+# Patterns in the order analyze_candlestick_patterns reports them, with their signed weight
+PATTERN_WEIGHTS = (
+    ('bullish_engulfing', 2.0),
+    ('bearish_engulfing', -2.0),
+    ('hammer', 1.5),
+    ('shooting_star', -1.5),
+    ('doji', 0.5),
+    ('bullish_marubozu', 1.0),
+    ('bearish_marubozu', -1.0),
+    ('three_white_soldiers', 2.5),
+    ('three_black_crows', -2.5),
+    ('morning_star', 3.0),
+    ('evening_star', -3.0),
+)
+PATTERN_NAMES = [name for name, _ in PATTERN_WEIGHTS]
+
+
+def _shift(values: np.ndarray, periods: int, fill) -> np.ndarray:
+    shifted = np.empty_like(values)
+    shifted[:periods] = fill
+    shifted[periods:] = values[:-periods]
+    return shifted
+
+
+def scan_patterns(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> Dict[str, np.ndarray]:
+    """Boolean array per pattern for every bar, using the same rules as analyze_candlestick_patterns.
+
+    Bar ``i`` gets exactly the patterns the scalar function reports for
+    ``df.iloc[:i + 1]``; the first two bars never match (it needs three).
+    Opposite patterns are mutually exclusive with the bullish one winning,
+    mirroring its if/elif chains.
+    """
+    o = np.asarray(open_, dtype=np.float64)
+    h = np.asarray(high, dtype=np.float64)
+    l = np.asarray(low, dtype=np.float64)
+    c = np.asarray(close, dtype=np.float64)
+    count = len(c)
+    if count < 3:
+        return {name: np.zeros(count, dtype=bool) for name in PATTERN_NAMES}
+
+    body = np.abs(c - o)
+    candle_range = h - l
+    with np.errstate(divide='ignore', invalid='ignore'):
+        body_ratio = np.where(candle_range > 0, body / candle_range, 0.0)
+    bullish = c > o
+    bearish = c < o
+    prev_o, prev_c = _shift(o, 1, np.nan), _shift(c, 1, np.nan)
+    prev_body = _shift(body, 1, np.nan)
+    prev_ratio = _shift(body_ratio, 1, np.nan)
+    pre_o, pre_c = _shift(o, 2, np.nan), _shift(c, 2, np.nan)
+    valid = np.arange(count) >= 2
+
+    bullish_engulfing = valid & (o < prev_c) & (c > prev_o) & (body > prev_body * 1.2)
+    bearish_engulfing = valid & (o > prev_c) & (c < prev_o) & (body > prev_body * 1.2) & ~bullish_engulfing
+
+    hammer = (valid & (body_ratio < 0.3) & bullish &
+              ((h - c) < (o - l) * 0.3) & ((o - l) > body * 2))
+    shooting_star = (valid & (body_ratio < 0.3) & bearish &
+                     ((c - l) < (h - o) * 0.3) & ((h - o) > body * 2) & ~hammer)
+
+    doji = valid & (body_ratio < 0.1)
+
+    bullish_marubozu = valid & bullish & (body_ratio > 0.8) & (o == l) & (c == h)
+    bearish_marubozu = valid & bearish & (body_ratio > 0.8) & (o == h) & (c == l) & ~bullish_marubozu
+
+    strong_up = bullish & (c > o * 1.01)
+    strong_down = bearish & (c < o * 0.99)
+    three_white_soldiers = valid & strong_up & _shift(strong_up, 1, False) & _shift(strong_up, 2, False)
+    three_black_crows = (valid & strong_down & _shift(strong_down, 1, False) & _shift(strong_down, 2, False)
+                         & ~three_white_soldiers)
+
+    midpoint = (pre_o + pre_c) / 2
+    morning_star = valid & (pre_c < pre_o) & (prev_ratio < 0.3) & bullish & (c > midpoint)
+    evening_star = valid & (pre_c > pre_o) & (prev_ratio < 0.3) & bearish & (c < midpoint) & ~morning_star
+
+    return {
+        'bullish_engulfing': bullish_engulfing,
+        'bearish_engulfing': bearish_engulfing,
+        'hammer': hammer,
+        'shooting_star': shooting_star,
+        'doji': doji,
+        'bullish_marubozu': bullish_marubozu,
+        'bearish_marubozu': bearish_marubozu,
+        'three_white_soldiers': three_white_soldiers,
+        'three_black_crows': three_black_crows,
+        'morning_star': morning_star,
+        'evening_star': evening_star,
+    }
+
+
+def pattern_score(patterns: Dict[str, np.ndarray]) -> np.ndarray:
+    """Signed per-bar strength: positive is bullish, negative bearish"""
+    count = len(next(iter(patterns.values())))
+    score = np.zeros(count, dtype=np.float64)
+    for name, weight in PATTERN_WEIGHTS:
+        score += patterns[name] * weight
+    return score
+
+
+def describe_bar(patterns: Dict[str, np.ndarray], score: np.ndarray, index: int = -1) -> Dict:
+    """Result for one bar in the same shape as analyze_candlestick_patterns"""
+    count = len(score)
+    if index < 0:
+        index += count
+    if count < 3 or index < 2:
+        return {'pattern': 'none', 'signal': 'neutral', 'strength': 0}
+    detected = [name for name in PATTERN_NAMES if patterns[name][index]]
+    strength = float(score[index])
+    if strength > 1:
+        signal = 'bullish'
+    elif strength < -1:
+        signal = 'bearish'
+    else:
+        signal = 'neutral'
+    return {
+        'pattern': ', '.join(detected) if detected else 'none',
+        'signal': signal,
+        'strength': abs(strength),
+        'patterns_detected': detected
+    }
+
+
+def latest_patterns(df: pd.DataFrame) -> Dict:
+    """Patterns on the last bar only; scans just the three bars it depends on"""
+    if df.empty or len(df) < 3:
+        return {'pattern': 'none', 'signal': 'neutral', 'strength': 0}
+    tail = df.iloc[-3:]
+    patterns = scan_patterns(tail['open'].values, tail['high'].values, tail['low'].values, tail['close'].values)
+    return describe_bar(patterns, pattern_score(patterns))
+
+
+def _reference_patterns(df: pd.DataFrame) -> Dict:
+    """Original row-by-row pattern check, kept as the benchmark's cross-check reference"""
+    if df.empty or len(df) < 3:
+        return {'pattern': 'none', 'signal': 'neutral', 'strength': 0}
+    
+    # Get last few candles for pattern analysis
+    current = df.iloc[-1]
+    previous = df.iloc[-2]
+    pre_previous = df.iloc[-3] if len(df) >= 3 else previous
+    
+    patterns = []
+    signal_strength = 0
+    
+    # Calculate basic measurements
+    current_body = abs(current['close'] - current['open'])
+    current_range = current['high'] - current['low']
+    previous_body = abs(previous['close'] - previous['open'])
+    previous_range = previous['high'] - previous['low']
+    
+    # Body ratio for pin bars
+    current_body_ratio = current_body / current_range if current_range > 0 else 0
+    previous_body_ratio = previous_body / previous_range if previous_range > 0 else 0
+    
+    # 1. Engulfing Patterns
+    bullish_engulfing = (
+        current['open'] < previous['close'] and
+        current['close'] > previous['open'] and
+        current_body > previous_body * 1.2
+    )
+    
+    bearish_engulfing = (
+        current['open'] > previous['close'] and
+        current['close'] < previous['open'] and
+        current_body > previous_body * 1.2
+    )
+    
+    if bullish_engulfing:
+        patterns.append('bullish_engulfing')
+        signal_strength += 2
+    elif bearish_engulfing:
+        patterns.append('bearish_engulfing')
+        signal_strength -= 2
+    
+    # 2. Pin Bar Patterns (Hammer/Shooting Star)
+    # Hammer (bullish pin bar)
+    hammer = (
+        current_body_ratio < 0.3 and
+        current['close'] > current['open'] and
+        (current['high'] - current['close']) < (current['open'] - current['low']) * 0.3 and
+        (current['open'] - current['low']) > current_body * 2
+    )
+    
+    # Shooting star (bearish pin bar)
+    shooting_star = (
+        current_body_ratio < 0.3 and
+        current['close'] < current['open'] and
+        (current['close'] - current['low']) < (current['high'] - current['open']) * 0.3 and
+        (current['high'] - current['open']) > current_body * 2
+    )
+    
+    if hammer:
+        patterns.append('hammer')
+        signal_strength += 1.5
+    elif shooting_star:
+        patterns.append('shooting_star')
+        signal_strength -= 1.5
+    
+    # 3. Doji Patterns
+    doji = current_body_ratio < 0.1
+    if doji:
+        patterns.append('doji')
+        signal_strength += 0.5  # Neutral signal
+    
+    # 4. Marubozu (Strong trend candles)
+    bullish_marubozu = (
+        current['close'] > current['open'] and
+        current_body_ratio > 0.8 and
+        current['open'] == current['low'] and
+        current['close'] == current['high']
+    )
+    
+    bearish_marubozu = (
+        current['close'] < current['open'] and
+        current_body_ratio > 0.8 and
+        current['open'] == current['high'] and
+        current['close'] == current['low']
+    )
+    
+    if bullish_marubozu:
+        patterns.append('bullish_marubozu')
+        signal_strength += 1
+    elif bearish_marubozu:
+        patterns.append('bearish_marubozu')
+        signal_strength -= 1
+    
+    # 5. Three White Soldiers / Three Black Crows
+    if len(df) >= 3:
+        last_3 = df.iloc[-3:]
+        three_white_soldiers = all(
+            row['close'] > row['open'] and
+            row['close'] > row['open'] * 1.01  # At least 1% gain
+            for _, row in last_3.iterrows()
+        )
+        
+        three_black_crows = all(
+            row['close'] < row['open'] and
+            row['close'] < row['open'] * 0.99  # At least 1% loss
+            for _, row in last_3.iterrows()
+        )
+        
+        if three_white_soldiers:
+            patterns.append('three_white_soldiers')
+            signal_strength += 2.5
+        elif three_black_crows:
+            patterns.append('three_black_crows')
+            signal_strength -= 2.5
+    
+    # 6. Morning Star / Evening Star
+    if len(df) >= 3:
+        morning_star = (
+            pre_previous['close'] < pre_previous['open'] and  # First day bearish
+            previous_body_ratio < 0.3 and  # Second day small body
+            current['close'] > current['open'] and  # Third day bullish
+            current['close'] > (pre_previous['open'] + pre_previous['close']) / 2  # Closes above midpoint
+        )
+        
+        evening_star = (
+            pre_previous['close'] > pre_previous['open'] and  # First day bullish
+            previous_body_ratio < 0.3 and  # Second day small body
+            current['close'] < current['open'] and  # Third day bearish
+            current['close'] < (pre_previous['open'] + pre_previous['close']) / 2  # Closes below midpoint
+        )
+        
+        if morning_star:
+            patterns.append('morning_star')
+            signal_strength += 3
+        elif evening_star:
+            patterns.append('evening_star')
+            signal_strength -= 3
+    
+    # Determine overall signal
+    if signal_strength > 1:
+        signal = 'bullish'
+    elif signal_strength < -1:
+        signal = 'bearish'
+    else:
+        signal = 'neutral'
+    
+    return {
+        'pattern': ', '.join(patterns) if patterns else 'none',
+        'signal': signal,
+        'strength': abs(signal_strength),
+        'patterns_detected': patterns
+    }
+
+
+def _synthetic_candles(count: int, seed: int = 11) -> pd.DataFrame:
+    """Tick-rounded random walk with enough flat opens/closes to trigger every pattern"""
+    rng = np.random.default_rng(seed)
+    open_ = 30000 + np.cumsum(rng.normal(0, 60, count))
+    close = open_ + rng.normal(0, 1, count) * rng.choice([5, 60, 400], count, p=[0.2, 0.6, 0.2])
+    wick_up = np.abs(rng.normal(0, 80, count)) * rng.choice([0, 1], count, p=[0.15, 0.85])
+    wick_down = np.abs(rng.normal(0, 80, count)) * rng.choice([0, 1], count, p=[0.15, 0.85])
+    high = np.maximum(open_, close) + wick_up
+    low = np.minimum(open_, close) - wick_down
+    tick = 0.5
+    return pd.DataFrame({
+        'open': np.round(open_ / tick) * tick,
+        'high': np.round(high / tick) * tick,
+        'low': np.round(low / tick) * tick,
+        'close': np.round(close / tick) * tick
+    })
+
+
+def benchmark(candles: int = 1_000_000, checked_bars: int = 5000):
+    """Full-history scan speed on ``candles`` bars, plus an exact cross-check against the scalar version"""
+    df = _synthetic_candles(candles)
+
+    started = time.perf_counter()
+    patterns = scan_patterns(df['open'].values, df['high'].values, df['low'].values, df['close'].values)
+    score = pattern_score(patterns)
+    vector_seconds = time.perf_counter() - started
+
+    rng = np.random.default_rng(3)
+    bars = rng.choice(np.arange(2, candles), checked_bars, replace=False)
+    mismatches = 0
+    started = time.perf_counter()
+    for bar in bars:
+        expected = _reference_patterns(df.iloc[bar - 2:bar + 1])
+        if describe_bar(patterns, score, bar) != expected:
+            mismatches += 1
+    scalar_seconds = (time.perf_counter() - started) / checked_bars * candles
+
+    hits = {name: int(values.sum()) for name, values in patterns.items()}
+    print(f"{candles} candles: vectorized scan {vector_seconds:.3f}s, "
+          f"scalar function ~{scalar_seconds:.0f}s (extrapolated), {scalar_seconds / vector_seconds:.0f}x")
+    print(f"cross-checked {checked_bars} random bars against the row-by-row version: {mismatches} mismatches")
+    print(f"pattern counts: {hits}")
+
+
+if __name__ == '__main__':
+    benchmark()
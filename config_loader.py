@@ -1,26 +1,102 @@
 import yaml
 import threading
 import os
+from types import MappingProxyType
 
 # Look for config.yaml in current directory (parent of gui/)
 _CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.yaml')
 _config_cache = None
+_config_view = None
+_config_signature = None
 _config_lock = threading.Lock()
+_config_stats = {'parses': 0, 'hits': 0}
 
-def get_config():
-    global _config_cache
+
+def _file_signature():
+    """Return (mtime_ns, size) of config.yaml, used to detect on-disk changes"""
+    st = os.stat(_CONFIG_PATH)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _copy_tree(node):
+    """Fast deep copy for the plain dict/list/scalar trees produced by yaml.safe_load"""
+    if isinstance(node, dict):
+        return {k: _copy_tree(v) for k, v in node.items()}
+    if isinstance(node, list):
+        return [_copy_tree(v) for v in node]
+    return node
+
+
+def _freeze_tree(node):
+    """Build a read-only view: dicts become mappingproxies, lists become tuples"""
+    if isinstance(node, dict):
+        return MappingProxyType({k: _freeze_tree(v) for k, v in node.items()})
+    if isinstance(node, list):
+        return tuple(_freeze_tree(v) for v in node)
+    return node
+
+
+def _load_cached():
+    """Return (config, read-only view), re-parsing only when config.yaml changed"""
+    global _config_cache, _config_view, _config_signature
+    try:
+        signature = _file_signature()
+    except OSError as e:
+        raise RuntimeError(f'Failed to load config: {e}')
+    cached = (_config_cache, _config_view)
+    if cached[0] is not None and signature == _config_signature:
+        _config_stats['hits'] += 1
+        return cached
     with _config_lock:
+        if _config_cache is not None and signature == _config_signature:
+            _config_stats['hits'] += 1
+            return (_config_cache, _config_view)
         try:
             with open(_CONFIG_PATH, 'r') as f:
-                _config_cache = yaml.safe_load(f)
+                data = yaml.safe_load(f) or {}
         except Exception as e:
             raise RuntimeError(f'Failed to load config: {e}')
-        return _config_cache
+        _config_stats['parses'] += 1
+        _config_view = _freeze_tree(data)
+        _config_cache = data
+        _config_signature = signature
+        return (_config_cache, _config_view)
+
+
+def get_config():
+    """Return a private, mutable copy of config.yaml.
+
+    The file is parsed once and cached until its mtime/size changes or
+    reload_config() is called. Callers may modify (and safe_dump) the returned
+    dict without affecting the shared cached copy.
+    """
+    return _copy_tree(_load_cached()[0])
+
+
+def get_config_view():
+    """Return the shared read-only view of config.yaml (no copy).
+
+    Intended for hot paths that only read settings, e.g. indicator and
+    strategy calculations. Nested sections are mappingproxies and lists are
+    tuples, so accidental in-place edits raise instead of corrupting the cache.
+    """
+    return _load_cached()[1]
 
-# Optionally, add a reload_config() if you want to force reload
 
 def reload_config():
-    global _config_cache
+    global _config_cache, _config_view, _config_signature
     with _config_lock:
         _config_cache = None
-    return get_config() 
\ No newline at end of file
+        _config_view = None
+        _config_signature = None
+    return get_config()
+
+
+def get_config_stats():
+    """Return parse vs cache-hit counters for the config cache"""
+    total = _config_stats['parses'] + _config_stats['hits']
+    return {
+        'parses': _config_stats['parses'],
+        'hits': _config_stats['hits'],
+        'hit_rate': (_config_stats['hits'] / total) if total else 0.0
+    }
@@ -5,49 +5,189 @@ Copyright © 2024 Telegram-Airdrop-Bot
 https://github.com/Telegram-Airdrop-Bot/autotradebot
 
 Database operations for storing trading data, user settings, and logs.
+Backed by SQLite in WAL mode: every write is a single indexed insert in an
+atomic transaction, readers never block the writer, and history is kept in
+full (use clear_old_data to prune).
 """
 
 import os
 import json
+import sqlite3
+import threading
 import logging
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    symbol TEXT,
+    user_id INTEGER,
+    ts REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trades_symbol ON trades(symbol, id);
+CREATE INDEX IF NOT EXISTS idx_trades_user ON trades(user_id, id);
+CREATE INDEX IF NOT EXISTS idx_trades_ts ON trades(ts);
+
+CREATE TABLE IF NOT EXISTS trading_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    side TEXT,
+    quantity REAL,
+    price REAL,
+    order_id TEXT,
+    strategy TEXT,
+    status TEXT,
+    stop_loss REAL,
+    take_profit REAL,
+    ts REAL NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_user ON trading_history(user_id, id);
+CREATE INDEX IF NOT EXISTS idx_history_symbol ON trading_history(symbol, id);
+CREATE INDEX IF NOT EXISTS idx_history_ts ON trading_history(ts);
+
+CREATE TABLE IF NOT EXISTS settings (
+    user_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (user_id, key)
+);
+
+CREATE TABLE IF NOT EXISTS portfolio_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    total_value REAL,
+    total_pnl REAL,
+    positions_count INTEGER,
+    ts REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_user ON portfolio_snapshots(user_id, id);
+CREATE INDEX IF NOT EXISTS idx_snapshots_ts ON portfolio_snapshots(ts);
+
+CREATE TABLE IF NOT EXISTS logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_logs_ts ON logs(ts);
+
+CREATE TABLE IF NOT EXISTS active_strategies (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    strategy_type TEXT NOT NULL,
+    settings TEXT,
+    status TEXT NOT NULL DEFAULT 'Active',
+    created_at TEXT NOT NULL,
+    deactivated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_strategies_user ON active_strategies(user_id, status);
+
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    username TEXT,
+    first_name TEXT,
+    last_name TEXT,
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
 class Database:
-    """Simple file-based database for storing trading data"""
-    
+    """SQLite (WAL) database for storing trading data"""
+
     def __init__(self, db_dir='data'):
-        """Initialize database with file-based storage"""
+        """Initialize database storage"""
         self.db_dir = Path(db_dir)
         self.db_dir.mkdir(exist_ok=True)
-        
-        # Initialize data files
+        self.db_file = self.db_dir / 'trading.db'
+
+        # Legacy JSON files, imported once on first start
         self.trades_file = self.db_dir / 'trades.json'
         self.settings_file = self.db_dir / 'settings.json'
         self.portfolio_file = self.db_dir / 'portfolio.json'
         self.logs_file = self.db_dir / 'logs.json'
-        
-        # Create files if they don't exist
-        self._init_files()
-        
-        logger.info(f"Database initialized in {self.db_dir}")
-    
-    def _init_files(self):
-        """Initialize database files with empty structures"""
-        files_to_init = {
-            self.trades_file: [],
-            self.settings_file: {},
-            self.portfolio_file: {},
-            self.logs_file: []
-        }
-        
-        for file_path, default_data in files_to_init.items():
-            if not file_path.exists():
-                self._write_json(file_path, default_data)
-                logger.info(f"Created {file_path}")
-    
+
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._conn = sqlite3.connect(str(self.db_file), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+
+        self._migrate_json_files()
+
+        logger.info(f"Database initialized in {self.db_file}")
+
+    @contextmanager
+    def batch(self):
+        """Group several writes into one atomic transaction"""
+        with self._lock:
+            outer = self._batch_depth == 0
+            if outer:
+                self._conn.execute('BEGIN IMMEDIATE')
+            self._batch_depth += 1
+            try:
+                yield self
+            except Exception:
+                self._batch_depth -= 1
+                if outer:
+                    self._conn.execute('ROLLBACK')
+                raise
+            self._batch_depth -= 1
+            if outer:
+                self._conn.execute('COMMIT')
+
+    def _write(self, sql, params=()):
+        """Run one write statement in its own transaction (or the enclosing batch)"""
+        with self.batch():
+            return self._conn.execute(sql, params)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _migrate_json_files(self):
+        """Import data from the old JSON files the first time the SQLite database is opened"""
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+                return
+            try:
+                with self.batch():
+                    trades = self._read_json(self.trades_file) or []
+                    for trade in trades:
+                        self._insert_trade(trade)
+                    settings = self._read_json(self.settings_file) or {}
+                    for user_id, values in settings.items():
+                        for key, value in (values or {}).items():
+                            self._upsert_setting(user_id, key, value)
+                    portfolio = self._read_json(self.portfolio_file) or {}
+                    for snapshot in portfolio.get('snapshots', []):
+                        self._insert_snapshot(snapshot, snapshot.get('user_id'), snapshot.get('total_value'),
+                                              snapshot.get('total_pnl'), snapshot.get('positions_count'))
+                    logs = self._read_json(self.logs_file) or []
+                    for log in logs:
+                        self._insert_log(log)
+                    self._conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', ?)",
+                                       (datetime.now().isoformat(),))
+                if trades or settings or logs:
+                    logger.info(f"Imported {len(trades)} trades and {len(logs)} logs from JSON files")
+            except Exception as e:
+                logger.error(f"Error importing JSON data: {e}")
+
     def _read_json(self, file_path):
         """Read JSON data from file"""
         try:
@@ -58,198 +198,266 @@ class Database:
         except Exception as e:
             logger.error(f"Error reading {file_path}: {e}")
             return None
-    
-    def _write_json(self, file_path, data):
-        """Write JSON data to file"""
+
+    def _insert_trade(self, trade_data):
+        if 'timestamp' not in trade_data:
+            trade_data['timestamp'] = datetime.now().isoformat()
+        self._conn.execute(
+            'INSERT INTO trades (symbol, user_id, ts, data) VALUES (?, ?, ?, ?)',
+            (trade_data.get('symbol'), trade_data.get('user_id'), self._parse_timestamp(trade_data['timestamp']),
+             json.dumps(trade_data, default=str))
+        )
+
+    def _insert_log(self, log_data):
+        if 'timestamp' not in log_data:
+            log_data['timestamp'] = datetime.now().isoformat()
+        self._conn.execute('INSERT INTO logs (ts, data) VALUES (?, ?)',
+                           (self._parse_timestamp(log_data['timestamp']), json.dumps(log_data, default=str)))
+
+    def _insert_snapshot(self, data, user_id=None, total_value=None, total_pnl=None, positions_count=None):
+        if 'timestamp' not in data:
+            data['timestamp'] = datetime.now().isoformat()
+        self._conn.execute(
+            'INSERT INTO portfolio_snapshots (user_id, total_value, total_pnl, positions_count, ts, data) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (user_id, total_value, total_pnl, positions_count, self._parse_timestamp(data['timestamp']),
+             json.dumps(data, default=str))
+        )
+
+    def _upsert_setting(self, user_id, key, value):
+        self._conn.execute(
+            'INSERT INTO settings (user_id, key, value) VALUES (?, ?, ?) '
+            'ON CONFLICT(user_id, key) DO UPDATE SET value = excluded.value',
+            (str(user_id), key, json.dumps(value, default=str))
+        )
+
+    def add_trade(self, trade_data):
+        """Add a new trade to the database"""
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, default=str)
+            with self.batch():
+                self._insert_trade(trade_data)
+            logger.info(f"Trade added: {trade_data.get('symbol', 'Unknown')}")
             return True
         except Exception as e:
-            logger.error(f"Error writing {file_path}: {e}")
+            logger.error(f"Error adding trade: {e}")
             return False
-    
-    def add_trade(self, trade_data):
-        """Add a new trade to the database"""
+
+    def add_trades(self, trades):
+        """Add many trades in a single transaction"""
         try:
-            trades = self._read_json(self.trades_file) or []
-            
-            # Add timestamp if not present
-            if 'timestamp' not in trade_data:
-                trade_data['timestamp'] = datetime.now().isoformat()
-            
-            trades.append(trade_data)
-            
-            # Keep only last 1000 trades to prevent file from growing too large
-            if len(trades) > 1000:
-                trades = trades[-1000:]
-            
-            if self._write_json(self.trades_file, trades):
-                logger.info(f"Trade added: {trade_data.get('symbol', 'Unknown')}")
-                return True
-            return False
+            with self.batch():
+                for trade_data in trades:
+                    self._insert_trade(trade_data)
+            return True
         except Exception as e:
-            logger.error(f"Error adding trade: {e}")
+            logger.error(f"Error adding trades: {e}")
             return False
-    
+
     def get_recent_trades(self, limit=50):
         """Get recent trades from database"""
         try:
-            trades = self._read_json(self.trades_file) or []
-            return trades[-limit:] if trades else []
+            rows = self._query('SELECT data FROM trades ORDER BY id DESC LIMIT ?', (limit,))
+            return [json.loads(row['data']) for row in reversed(rows)]
         except Exception as e:
             logger.error(f"Error getting recent trades: {e}")
             return []
-    
+
     def get_trades_by_symbol(self, symbol, limit=50):
         """Get trades for a specific symbol"""
         try:
-            trades = self._read_json(self.trades_file) or []
-            symbol_trades = [trade for trade in trades if trade.get('symbol') == symbol]
-            return symbol_trades[-limit:] if symbol_trades else []
+            rows = self._query('SELECT data FROM trades WHERE symbol = ? ORDER BY id DESC LIMIT ?', (symbol, limit))
+            return [json.loads(row['data']) for row in reversed(rows)]
         except Exception as e:
             logger.error(f"Error getting trades for {symbol}: {e}")
             return []
-    
+
+    def add_trading_history(self, user_id, symbol, side, quantity, price, order_id=None, strategy=None,
+                            status=None, stop_loss=None, take_profit=None):
+        """Record an executed order for a user"""
+        try:
+            now = datetime.now()
+            self._write(
+                'INSERT INTO trading_history (user_id, symbol, side, quantity, price, order_id, strategy, status, '
+                'stop_loss, take_profit, ts, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (user_id, symbol, side, quantity, price, str(order_id) if order_id is not None else None, strategy,
+                 status, stop_loss, take_profit, now.timestamp(), now.isoformat())
+            )
+            logger.info(f"Trading history added for user {user_id}: {side} {symbol}")
+            return True
+        except Exception as e:
+            logger.error(f"Error adding trading history: {e}")
+            return False
+
+    def get_trading_history(self, user_id, limit=50):
+        """Get a user's most recent orders, newest first"""
+        try:
+            rows = self._query('SELECT * FROM trading_history WHERE user_id = ? ORDER BY id DESC LIMIT ?',
+                               (user_id, limit))
+            return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Error getting trading history: {e}")
+            return []
+
+    def add_user(self, user_id, username=None, first_name=None, last_name=None):
+        """Register a user (existing users keep their original record)"""
+        try:
+            self._write(
+                'INSERT INTO users (user_id, username, first_name, last_name, created_at) VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT(user_id) DO UPDATE SET username = excluded.username, '
+                'first_name = excluded.first_name, last_name = excluded.last_name',
+                (user_id, username, first_name, last_name, datetime.now().isoformat())
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Error adding user: {e}")
+            return False
+
     def save_user_setting(self, user_id, key, value):
         """Save user setting"""
         try:
-            settings = self._read_json(self.settings_file) or {}
-            
-            if str(user_id) not in settings:
-                settings[str(user_id)] = {}
-            
-            settings[str(user_id)][key] = value
-            
-            if self._write_json(self.settings_file, settings):
-                logger.info(f"Setting saved for user {user_id}: {key}")
-                return True
-            return False
+            with self.batch():
+                self._upsert_setting(user_id, key, value)
+            logger.info(f"Setting saved for user {user_id}: {key}")
+            return True
         except Exception as e:
             logger.error(f"Error saving user setting: {e}")
             return False
-    
+
     def get_user_settings(self, user_id):
         """Get all settings for a user"""
         try:
-            settings = self._read_json(self.settings_file) or {}
-            return settings.get(str(user_id), {})
+            rows = self._query('SELECT key, value FROM settings WHERE user_id = ?', (str(user_id),))
+            return {row['key']: json.loads(row['value']) for row in rows}
         except Exception as e:
             logger.error(f"Error getting user settings: {e}")
             return {}
-    
+
     def update_user_setting(self, user_id, key, value):
         """Update user setting (alias for save_user_setting)"""
         return self.save_user_setting(user_id, key, value)
-    
+
     def update_user_settings(self, user_id, settings_dict):
         """Update multiple user settings at once"""
         try:
-            settings = self._read_json(self.settings_file) or {}
-            
-            if str(user_id) not in settings:
-                settings[str(user_id)] = {}
-            
-            # Update multiple settings
-            for key, value in settings_dict.items():
-                settings[str(user_id)][key] = value
-            
-            if self._write_json(self.settings_file, settings):
-                logger.info(f"Updated {len(settings_dict)} settings for user {user_id}")
-                return True
-            return False
+            with self.batch():
+                for key, value in settings_dict.items():
+                    self._upsert_setting(user_id, key, value)
+            logger.info(f"Updated {len(settings_dict)} settings for user {user_id}")
+            return True
         except Exception as e:
             logger.error(f"Error updating user settings: {e}")
             return False
-    
+
     def save_portfolio_snapshot(self, portfolio_data):
         """Save portfolio snapshot"""
         try:
-            portfolio = self._read_json(self.portfolio_file) or {}
-            
-            # Add timestamp
             portfolio_data['timestamp'] = datetime.now().isoformat()
-            
-            # Keep only last 100 snapshots
-            snapshots = portfolio.get('snapshots', [])
-            snapshots.append(portfolio_data)
-            
-            if len(snapshots) > 100:
-                snapshots = snapshots[-100:]
-            
-            portfolio['snapshots'] = snapshots
-            portfolio['last_updated'] = datetime.now().isoformat()
-            
-            if self._write_json(self.portfolio_file, portfolio):
-                logger.info("Portfolio snapshot saved")
-                return True
-            return False
+            with self.batch():
+                self._insert_snapshot(portfolio_data, portfolio_data.get('user_id'))
+            logger.info("Portfolio snapshot saved")
+            return True
         except Exception as e:
             logger.error(f"Error saving portfolio snapshot: {e}")
             return False
-    
+
+    def add_portfolio_snapshot(self, user_id, total_value, total_pnl, positions_count, snapshot_data=None):
+        """Save a user's portfolio snapshot with its headline figures"""
+        try:
+            data = dict(snapshot_data or {})
+            data['timestamp'] = datetime.now().isoformat()
+            with self.batch():
+                self._insert_snapshot(data, user_id, total_value, total_pnl, positions_count)
+            return True
+        except Exception as e:
+            logger.error(f"Error adding portfolio snapshot: {e}")
+            return False
+
     def get_portfolio_history(self, limit=50):
         """Get portfolio history"""
         try:
-            portfolio = self._read_json(self.portfolio_file) or {}
-            snapshots = portfolio.get('snapshots', [])
-            return snapshots[-limit:] if snapshots else []
+            rows = self._query('SELECT data FROM portfolio_snapshots ORDER BY id DESC LIMIT ?', (limit,))
+            return [json.loads(row['data']) for row in reversed(rows)]
         except Exception as e:
             logger.error(f"Error getting portfolio history: {e}")
             return []
-    
+
+    def add_active_strategy(self, user_id, symbol, strategy_type, settings=None):
+        """Activate a strategy for a user, returning its id"""
+        try:
+            cursor = self._write(
+                'INSERT INTO active_strategies (user_id, symbol, strategy_type, settings, created_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (user_id, symbol, strategy_type, json.dumps(settings or {}, default=str), datetime.now().isoformat())
+            )
+            logger.info(f"Strategy {strategy_type} activated for user {user_id} on {symbol}")
+            return cursor.lastrowid
+        except Exception as e:
+            logger.error(f"Error adding active strategy: {e}")
+            return None
+
+    def deactivate_strategy(self, strategy_id):
+        """Mark a strategy as inactive"""
+        try:
+            cursor = self._write(
+                "UPDATE active_strategies SET status = 'Inactive', deactivated_at = ? WHERE id = ?",
+                (datetime.now().isoformat(), strategy_id)
+            )
+            return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"Error deactivating strategy: {e}")
+            return False
+
+    def get_active_strategies(self, user_id):
+        """Get a user's active strategies"""
+        try:
+            rows = self._query(
+                "SELECT * FROM active_strategies WHERE user_id = ? AND status = 'Active' ORDER BY id",
+                (user_id,)
+            )
+            strategies = []
+            for row in rows:
+                strategy = dict(row)
+                strategy['settings'] = json.loads(strategy['settings'] or '{}')
+                strategies.append(strategy)
+            return strategies
+        except Exception as e:
+            logger.error(f"Error getting active strategies: {e}")
+            return []
+
     def add_log(self, log_data):
         """Add log entry"""
         try:
-            logs = self._read_json(self.logs_file) or []
-            
-            # Add timestamp if not present
-            if 'timestamp' not in log_data:
-                log_data['timestamp'] = datetime.now().isoformat()
-            
-            logs.append(log_data)
-            
-            # Keep only last 1000 logs
-            if len(logs) > 1000:
-                logs = logs[-1000:]
-            
-            if self._write_json(self.logs_file, logs):
-                return True
-            return False
+            with self.batch():
+                self._insert_log(log_data)
+            return True
         except Exception as e:
             logger.error(f"Error adding log: {e}")
             return False
-    
+
     def get_recent_logs(self, limit=100):
         """Get recent logs"""
         try:
-            logs = self._read_json(self.logs_file) or []
-            return logs[-limit:] if logs else []
+            rows = self._query('SELECT data FROM logs ORDER BY id DESC LIMIT ?', (limit,))
+            return [json.loads(row['data']) for row in reversed(rows)]
         except Exception as e:
             logger.error(f"Error getting recent logs: {e}")
             return []
-    
+
     def clear_old_data(self, days=30):
         """Clear old data to prevent file bloat"""
         try:
             cutoff_date = datetime.now().timestamp() - (days * 24 * 60 * 60)
-            
-            # Clear old trades
-            trades = self._read_json(self.trades_file) or []
-            trades = [trade for trade in trades if self._parse_timestamp(trade.get('timestamp', 0)) > cutoff_date]
-            self._write_json(self.trades_file, trades)
-            
-            # Clear old logs
-            logs = self._read_json(self.logs_file) or []
-            logs = [log for log in logs if self._parse_timestamp(log.get('timestamp', 0)) > cutoff_date]
-            self._write_json(self.logs_file, logs)
-            
+
+            with self.batch():
+                for table in ('trades', 'logs', 'portfolio_snapshots', 'trading_history'):
+                    self._conn.execute(f'DELETE FROM {table} WHERE ts <= ?', (cutoff_date,))
+
             logger.info(f"Cleared data older than {days} days")
             return True
         except Exception as e:
             logger.error(f"Error clearing old data: {e}")
             return False
-    
+
     def _parse_timestamp(self, timestamp):
         """Parse timestamp to unix timestamp"""
         try:
@@ -262,47 +470,104 @@ class Database:
                 return 0
         except Exception:
             return 0
-    
+
     def get_database_stats(self):
         """Get database statistics"""
         try:
+            def count(sql):
+                return self._query(sql)[0][0]
+
             stats = {
-                'trades_count': len(self._read_json(self.trades_file) or []),
-                'settings_count': len(self._read_json(self.settings_file) or {}),
-                'portfolio_snapshots': len(self._read_json(self.portfolio_file) or {}),
-                'logs_count': len(self._read_json(self.logs_file) or []),
+                'trades_count': count('SELECT COUNT(*) FROM trades'),
+                'settings_count': count('SELECT COUNT(DISTINCT user_id) FROM settings'),
+                'portfolio_snapshots': count('SELECT COUNT(*) FROM portfolio_snapshots'),
+                'logs_count': count('SELECT COUNT(*) FROM logs'),
+                'trading_history_count': count('SELECT COUNT(*) FROM trading_history'),
+                'active_strategies': count("SELECT COUNT(*) FROM active_strategies WHERE status = 'Active'"),
                 'db_directory': str(self.db_dir),
+                'db_size_bytes': os.path.getsize(self.db_file) if self.db_file.exists() else 0,
                 'last_updated': datetime.now().isoformat()
             }
             return stats
         except Exception as e:
             logger.error(f"Error getting database stats: {e}")
             return {}
-    
+
     def backup_database(self, backup_dir='backup'):
-        """Create backup of database files"""
+        """Create a consistent backup of the database file"""
         try:
             backup_path = Path(backup_dir)
             backup_path.mkdir(exist_ok=True)
-            
+
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            
-            files_to_backup = [
-                self.trades_file,
-                self.settings_file,
-                self.portfolio_file,
-                self.logs_file
-            ]
-            
-            for file_path in files_to_backup:
-                if file_path.exists():
-                    backup_file = backup_path / f"{file_path.stem}_{timestamp}.json"
-                    with open(file_path, 'r', encoding='utf-8') as src:
-                        with open(backup_file, 'w', encoding='utf-8') as dst:
-                            dst.write(src.read())
-            
+            backup_file = backup_path / f"trading_{timestamp}.db"
+
+            with self._lock:
+                target = sqlite3.connect(str(backup_file))
+                try:
+                    self._conn.backup(target)
+                finally:
+                    target.close()
+
             logger.info(f"Database backup created in {backup_path}")
             return True
         except Exception as e:
             logger.error(f"Error creating backup: {e}")
-            return False 
\ No newline at end of file
+            return False
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def benchmark(n=100_000, legacy_n=2_000):
+    """Compare inserts and get_trades_by_symbol against the old JSON-rewrite storage"""
+    import tempfile
+    import time
+
+    symbols = ['BTC_USDT', 'ETH_USDT', 'SOL_USDT', 'XRP_USDT', 'DOGE_USDT']
+
+    def make_trade(i):
+        return {'symbol': symbols[i % len(symbols)], 'side': 'BUY' if i % 2 else 'SELL',
+                'quantity': 0.01, 'price': 30000 + i, 'user_id': i % 10}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Old storage: read the whole file, append, rewrite with indent=2 (capped at 1000 trades)
+        legacy_file = Path(tmp) / 'trades.json'
+        legacy_file.write_text('[]')
+        start = time.perf_counter()
+        for i in range(legacy_n):
+            trades = json.loads(legacy_file.read_text())
+            trades.append(make_trade(i))
+            trades = trades[-1000:]
+            legacy_file.write_text(json.dumps(trades, indent=2, default=str))
+        legacy_insert_us = (time.perf_counter() - start) / legacy_n * 1e6
+        start = time.perf_counter()
+        for _ in range(100):
+            trades = json.loads(legacy_file.read_text())
+            [t for t in trades if t.get('symbol') == 'ETH_USDT'][-50:]
+        legacy_query_us = (time.perf_counter() - start) / 100 * 1e6
+
+        db = Database(Path(tmp) / 'sqlite')
+        start = time.perf_counter()
+        for i in range(n):
+            db.add_trade(make_trade(i))
+        single_insert_us = (time.perf_counter() - start) / n * 1e6
+        start = time.perf_counter()
+        db.add_trades([make_trade(i) for i in range(n)])
+        batch_insert_us = (time.perf_counter() - start) / n * 1e6
+        start = time.perf_counter()
+        for _ in range(1000):
+            db.get_trades_by_symbol('ETH_USDT', 50)
+        query_us = (time.perf_counter() - start) / 1000 * 1e6
+        db.close()
+
+    print(f"JSON file : insert {legacy_insert_us:9.1f} us/trade ({legacy_n} inserts, file capped at 1000), "
+          f"get_trades_by_symbol {legacy_query_us:8.1f} us")
+    print(f"SQLite WAL: insert {single_insert_us:9.1f} us/trade ({n} single commits), "
+          f"{batch_insert_us:.1f} us/trade batched, get_trades_by_symbol {query_us:8.1f} us over {2 * n} trades")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    benchmark()
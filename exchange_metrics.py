@@ -0,0 +1,237 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+# Histogram bucket upper bounds in seconds (Prometheus 'le' labels)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.25, 0.4,
+                   0.6, 1.0, 1.5, 2.5, 5.0, 10.0, 30.0)
+
+# Classes classify_error produces; callers that already know the class can pass it directly
+ERROR_CLASSES = ('rate_limited', 'timeout', 'connection', 'http_4xx', 'http_5xx', 'api_error')
+
+
+def classify_error(error) -> str:
+    """Coarse error class for an exception or an ``{'error': ...}`` message"""
+    if isinstance(error, BaseException):
+        name = type(error).__name__
+        if 'Timeout' in name:
+            return 'timeout'
+        if 'Connection' in name:
+            return 'connection'
+        return name
+    text = str(error)
+    if text in ERROR_CLASSES:
+        return text
+    if text.startswith('HTTP 429'):
+        return 'rate_limited'
+    if text.startswith('HTTP 4'):
+        return 'http_4xx'
+    if text.startswith('HTTP 5'):
+        return 'http_5xx'
+    lowered = text.lower()
+    if 'timeout' in lowered or 'timed out' in lowered:
+        return 'timeout'
+    if 'connection' in lowered:
+        return 'connection'
+    return 'api_error'
+
+
+class Histogram:
+    """Fixed-bucket histogram: one bisect and two additions per observation"""
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def percentile(self, pct: float) -> float:
+        """Estimate by linear interpolation inside the bucket holding the percentile"""
+        if not self.count:
+            return 0.0
+        rank = pct * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = LATENCY_BUCKETS[index - 1] if index else 0.0
+                upper = LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else lower * 2
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return LATENCY_BUCKETS[-1]
+
+
+class _EndpointMetrics:
+    __slots__ = ('latency', 'wait', 'requests', 'retries', 'rate_limited', 'errors')
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.wait = Histogram()
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.errors: Dict[str, int] = {}
+
+
+class ExchangeMetrics:
+    """Latency, rate-limit wait, retry, 429 and error counters per (exchange, endpoint, signed).
+
+    Request latency is per HTTP attempt; the time spent queued in the shared
+    rate limiter is recorded separately so slow exchanges and a saturated
+    budget can be told apart. Recording is a dict lookup plus a few integer
+    updates under one lock.
+    """
+
+    def __init__(self):
+        self._series: Dict[Tuple[str, str, bool], _EndpointMetrics] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def _get(self, key: Tuple[str, str, bool]) -> _EndpointMetrics:
+        series = self._series.get(key)
+        if series is None:
+            series = self._series.setdefault(key, _EndpointMetrics())
+        return series
+
+    def observe(self, exchange: str, endpoint: str, signed: bool, seconds: float, error=None):
+        """One completed HTTP attempt; ``error`` is an exception, error message or class name"""
+        key = (exchange, endpoint, signed)
+        with self._lock:
+            series = self._get(key)
+            series.requests += 1
+            series.latency.observe(seconds)
+            if error is not None:
+                error_class = classify_error(error)
+                series.errors[error_class] = series.errors.get(error_class, 0) + 1
+
+    def observe_wait(self, exchange: str, endpoint: str, signed: bool, seconds: float):
+        with self._lock:
+            self._get((exchange, endpoint, signed)).wait.observe(seconds)
+
+    def count_retry(self, exchange: str, endpoint: str, signed: bool, rate_limited: bool = False):
+        with self._lock:
+            series = self._get((exchange, endpoint, signed))
+            series.retries += 1
+            if rate_limited:
+                series.rate_limited += 1
+
+    def count_rate_limited(self, exchange: str, endpoint: str, signed: bool):
+        with self._lock:
+            self._get((exchange, endpoint, signed)).rate_limited += 1
+
+    def count_error(self, exchange: str, endpoint: str, signed: bool, error):
+        """An error that did not come with a timed attempt (e.g. an exception before sending)"""
+        error_class = classify_error(error)
+        with self._lock:
+            series = self._get((exchange, endpoint, signed))
+            series.errors[error_class] = series.errors.get(error_class, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+            self.started_at = time.time()
+
+    def summary(self, top: int = None) -> List[Dict]:
+        """Per-endpoint summary sorted by request count"""
+        with self._lock:
+            rows = []
+            for (exchange, endpoint, signed), series in self._series.items():
+                errors = sum(series.errors.values())
+                rows.append({
+                    'exchange': exchange,
+                    'endpoint': endpoint,
+                    'signed': signed,
+                    'requests': series.requests,
+                    'p50_ms': round(series.latency.percentile(0.50) * 1000, 1),
+                    'p95_ms': round(series.latency.percentile(0.95) * 1000, 1),
+                    'p99_ms': round(series.latency.percentile(0.99) * 1000, 1),
+                    'wait_p95_ms': round(series.wait.percentile(0.95) * 1000, 1),
+                    'retries': series.retries,
+                    'rate_limited': series.rate_limited,
+                    'errors': dict(series.errors),
+                    'error_rate': round(errors / series.requests, 4) if series.requests else 0.0
+                })
+        rows.sort(key=lambda row: row['requests'], reverse=True)
+        return rows[:top] if top else rows
+
+    def render_prometheus(self) -> str:
+        """Text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            series = sorted(self._series.items())
+
+            def labels(key, **extra):
+                exchange, endpoint, signed = key
+                parts = [f'exchange="{exchange}"', f'endpoint="{endpoint}"', f'signed="{str(signed).lower()}"']
+                parts += [f'{name}="{value}"' for name, value in extra.items()]
+                return '{' + ','.join(parts) + '}'
+
+            for name, attr, help_text in (
+                    ('exchange_request_duration_seconds', 'latency', 'HTTP round-trip time per attempt'),
+                    ('exchange_rate_limit_wait_seconds', 'wait', 'Time queued in the shared rate limiter')):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, metrics in series:
+                    histogram = getattr(metrics, attr)
+                    cumulative = 0
+                    for bound, bucket_count in zip(LATENCY_BUCKETS, histogram.counts):
+                        cumulative += bucket_count
+                        lines.append(f"{name}_bucket{labels(key, le=bound)} {cumulative}")
+                    lines.append(f"{name}_bucket{labels(key, le='+Inf')} {histogram.count}")
+                    lines.append(f"{name}_sum{labels(key)} {histogram.total:.6f}")
+                    lines.append(f"{name}_count{labels(key)} {histogram.count}")
+
+            for name, attr, help_text in (
+                    ('exchange_requests_total', 'requests', 'HTTP attempts'),
+                    ('exchange_retries_total', 'retries', 'Attempts repeated after a retryable failure'),
+                    ('exchange_rate_limited_total', 'rate_limited', 'Responses rejected for rate limiting')):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for key, metrics in series:
+                    lines.append(f"{name}{labels(key)} {getattr(metrics, attr)}")
+
+            lines.append("# HELP exchange_errors_total Failed calls by error class")
+            lines.append("# TYPE exchange_errors_total counter")
+            for key, metrics in series:
+                for error_class, count in sorted(metrics.errors.items()):
+                    lines.append(f"exchange_errors_total{labels(key, error_class=error_class)} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry shared by every exchange client
+exchange_metrics = ExchangeMetrics()
+
+def get_exchange_metrics() -> ExchangeMetrics:
+    return exchange_metrics
+
+
+def benchmark(calls: int = 500_000):
+    """Per-call recording overhead on the hot path"""
+    import random
+    registry = ExchangeMetrics()
+    endpoints = ['/api/v1/market/klines', '/api/v1/market/tickers', '/api/v1/account/balances',
+                 '/api/v1/trade/order']
+    samples = [(endpoints[i % 4], i % 2 == 0, random.expovariate(1 / 0.08)) for i in range(calls)]
+
+    started = time.perf_counter()
+    for endpoint, signed, seconds in samples:
+        registry.observe('pionex', endpoint, signed, seconds)
+        registry.observe_wait('pionex', endpoint, signed, seconds / 10)
+    elapsed = time.perf_counter() - started
+    print(f"{calls} requests recorded (latency + wait): {elapsed / calls * 1e6:.2f} us per request")
+
+    started = time.perf_counter()
+    text = registry.render_prometheus()
+    print(f"/metrics render: {(time.perf_counter() - started) * 1000:.2f} ms, {len(text.splitlines())} lines")
+    for row in registry.summary():
+        print(f"  {row['endpoint']:<26} signed={row['signed']!s:<5} p50 {row['p50_ms']}ms "
+              f"p95 {row['p95_ms']}ms p99 {row['p99_ms']}ms")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -19,8 +19,8 @@ import time
 import json
 from datetime import datetime
 from pathlib import Path
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
-from flask_socketio import SocketIO, emit
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, g
+from flask_socketio import SocketIO, emit, join_room, leave_room
 import webbrowser
 from dotenv import load_dotenv
 import traceback
@@ -39,6 +39,8 @@ logger = logging.getLogger(__name__)
 from config_loader import get_config, reload_config
 from pionex_api import PionexAPI
 from trading_strategies import TradingStrategies
+from candle_store import get_candle_store
+from timeframe_resampler import get_timeframe_resampler
 
 # Import Bybit API for futures trading
 try:
@@ -67,7 +69,13 @@ from futures_trading import (
 from backtesting import (
     run_backtest, enable_paper_trading, disable_paper_trading, get_paper_trading_ledger
 )
-from pionex_ws import PionexWebSocket
+from pionex_ws import get_pionex_websocket
+from market_state import market_state
+from price_rooms import PriceRoomManager, room_name
+from rate_limiter import request_priority, get_all_limiter_stats, PRIORITY_BACKGROUND
+from market_scanner import get_market_scanner
+from response_cache import ResponseCache
+from exchange_metrics import exchange_metrics
 
 # Load environment variables
 load_dotenv()
@@ -82,6 +90,18 @@ app.config['TESTING'] = False
 # Configure SocketIO
 socketio = SocketIO(app, cors_allowed_origins="*", logger=True, engineio_logger=True)
 
+# Dashboard reads queue behind trading traffic on the shared exchange rate limiter
+@app.before_request
+def demote_exchange_priority():
+    g.rate_priority = request_priority(PRIORITY_BACKGROUND)
+    g.rate_priority.__enter__()
+
+@app.teardown_request
+def restore_exchange_priority(exc=None):
+    rate_priority = g.pop('rate_priority', None)
+    if rate_priority:
+        rate_priority.__exit__(None, None, None)
+
 # Error handling middleware
 @app.errorhandler(500)
 def internal_error(error):
@@ -120,11 +140,12 @@ class TradingBotGUI:
         # Initialize WebSocket for real-time data
         self.ws = None
         self.ws_connected = False
-        self.real_time_data = {}
-        self.ws_thread = None
+        self._rest_prices = {}
+        self.rest_fallback_interval = self.config.get('gui', {}).get('rest_fallback_interval', 5)
         
         # Start WebSocket connection
         self._start_websocket()
+        self._start_candle_sync()
         
         # Auto trading status
         self.auto_trading_enabled = False
@@ -634,21 +655,48 @@ class TradingBotGUI:
     def _start_websocket(self):
         """Start WebSocket connection for real-time data"""
         try:
-            self.ws = PionexWebSocket()
-            self.ws_connected = True
+            self.ws = get_pionex_websocket([self.config.get('trading_pair', 'BTC_USDT')])
+            self.ws_connected = self.ws is not None
             logger.info("WebSocket connection started")
         except Exception as e:
             logger.error(f"Error starting WebSocket: {e}")
             self.ws_connected = False
 
+    def _start_candle_sync(self):
+        """Keep the local candle store current for the trading pair and any configured symbols"""
+        settings = self.config.get('candle_store', {})
+        if not settings.get('background_sync', True):
+            return
+        symbols = list(dict.fromkeys([self.config.get('trading_pair', 'BTC_USDT')] + settings.get('symbols', [])))
+        pairs = [(symbol, interval) for symbol in symbols for interval in settings.get('intervals', ['1M'])]
+        try:
+            get_candle_store().start_background_sync(self.api, pairs, settings.get('sync_interval_seconds', 60))
+        except Exception as e:
+            logger.error(f"Error starting candle sync: {e}")
+
     def get_real_time_price(self, symbol: str) -> float:
-        """Get real-time price for a symbol"""
+        """Get real-time price for a symbol (REST only on a cold miss)"""
         try:
-            return self.api.get_real_time_price(symbol)
+            return market_state.get_price(symbol, self.api, self.api.stream_max_age)
         except Exception as e:
             logger.error(f"Error getting real-time price for {symbol}: {e}")
             return 0.0
 
+    def get_price_payload(self, symbol: str) -> dict:
+        """Price/depth payload for a Socket.IO room; REST fallback throttled per symbol"""
+        snapshot = market_state.get(symbol)
+        if snapshot and market_state.last_price(symbol, self.api.stream_max_age):
+            return {'price': snapshot.last_price, 'bids': [list(level) for level in snapshot.bids],
+                    'asks': [list(level) for level in snapshot.asks], 'timestamp': snapshot.trade_time}
+        now = time.time()
+        cached = self._rest_prices.get(symbol)
+        if cached and now - cached[0] < self.rest_fallback_interval:
+            return cached[1]
+        with request_priority(PRIORITY_BACKGROUND):
+            payload = {'price': self.get_real_time_price(symbol), 'timestamp': int(now * 1000)}
+        self._rest_prices[symbol] = (now, payload)
+        return payload
+
     def get_current_strategy(self):
         """Get current active strategy"""
         try:
@@ -774,6 +822,18 @@ class TradingBotGUI:
 # Initialize trading bot
 trading_bot = TradingBotGUI()
 
+# One upstream feed per watched symbol, fanned out to Socket.IO rooms
+price_rooms = PriceRoomManager(
+    socketio,
+    trading_bot.get_price_payload,
+    interval=trading_bot.config.get('gui', {}).get('price_push_interval', 0.5),
+    on_room_open=lambda symbol: get_pionex_websocket([symbol])
+)
+
+# Read-only dashboard routes share one coalescing cache; trade routes invalidate account views
+cache_ttls = trading_bot.config.get('gui', {}).get('response_cache_ttl', {})
+response_cache = ResponseCache(default_ttl=cache_ttls.get('default', 5))
+
 # Routes
 @app.route('/')
 def index():
@@ -834,19 +894,50 @@ def api_health():
             'timestamp': datetime.now().isoformat()
         }), 500
 
+@app.route('/api/rate-limits')
+def api_rate_limits():
+    """Queue depth and wait times of the shared exchange rate limiters"""
+    return jsonify({'success': True, 'data': get_all_limiter_stats()})
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus exposition of exchange latency, rate-limit wait, retries, 429s and errors"""
+    return app.response_class(exchange_metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/response-cache')
+def api_response_cache():
+    """Hit rate and upstream calls per route of the dashboard response cache"""
+    return jsonify({'success': True, 'data': response_cache.get_stats()})
+
+@app.route('/api/scanner')
+def api_scanner():
+    """Latest universe scan ranked by strategy signals (?exchange=pionex|bybit&top=20)"""
+    exchange = request.args.get('exchange', 'pionex')
+    if exchange not in ('pionex', 'bybit'):
+        return jsonify({'success': False, 'error': f'Unknown exchange: {exchange}'}), 400
+    scan_config = get_config().get('scanner', {})
+    summary = get_market_scanner().get_results(exchange, request.args.get('top', scan_config.get('top_n', 20), type=int),
+                                               scan_config.get('refresh_interval', 300))
+    if 'error' in summary:
+        return jsonify({'success': False, 'error': summary['error']})
+    return jsonify({'success': True, 'data': summary})
+
 @app.route('/api/balance')
+@response_cache.cached(ttl=cache_ttls.get('balance', 5), tags=('account',))
 def api_balance():
     """API endpoint for balance"""
     result = trading_bot.get_account_balance()
     return jsonify(result)
 
 @app.route('/api/positions')
+@response_cache.cached(ttl=cache_ttls.get('positions', 5), tags=('account',))
 def api_positions():
     """API endpoint for positions"""
     result = trading_bot.get_positions()
     return jsonify(result)
 
 @app.route('/api/portfolio')
+@response_cache.cached(ttl=cache_ttls.get('portfolio', 5), tags=('account',))
 def api_portfolio():
     """API endpoint for portfolio"""
     result = trading_bot.get_portfolio()
@@ -890,6 +981,7 @@ def api_auto_trading_status():
     return jsonify(result)
 
 @app.route('/api/trade', methods=['POST'])
+@response_cache.invalidates(('account',))
 def api_trade():
     """API endpoint for manual trading"""
     data = request.get_json()
@@ -916,6 +1008,7 @@ def api_validate_trade():
     return jsonify(result)
 
 @app.route('/api/analysis/<symbol>')
+@response_cache.cached(ttl=cache_ttls.get('analysis', 30))
 def api_analysis(symbol):
     """API endpoint for technical analysis"""
     result = trading_bot.get_technical_analysis(symbol)
@@ -939,57 +1032,20 @@ def api_chart_data(symbol):
         
         logger.info(f"Fetching chart data for symbol: {symbol} -> {formatted_symbol} with timeframe: {timeframe}")
         
-        # Try multiple intervals to get the best data, starting with requested timeframe
-        intervals_to_try = [timeframe, '5M', '1M', '15M', '1H']
+        # Every timeframe is aggregated from the shared 1M base series, so no interval probing is needed
         klines_data = []
-        successful_interval = None
-        
-        for interval in intervals_to_try:
-            try:
-                logger.info(f"Trying interval {interval} for {formatted_symbol}")
-                klines_response = trading_bot.api.get_klines(
-                    symbol=formatted_symbol,
-                    interval=interval,
-                    limit=100
-                )
-                
-                logger.info(f"Klines response for {formatted_symbol} with interval {interval}: {klines_response}")
-                
-                # Check for API errors
-                if 'error' in klines_response:
-                    logger.warning(f"API error for {formatted_symbol} with interval {interval}: {klines_response['error']}")
-                    continue
-                
-                # Check for code 0 (success) or other success indicators
-                if 'code' in klines_response and klines_response['code'] == 0:
-                    logger.info(f"API returned code 0 for {formatted_symbol} with interval {interval}")
-                    # This is a successful response, but we need to extract data
-                    if 'data' in klines_response:
-                        if isinstance(klines_response['data'], dict) and 'klines' in klines_response['data']:
-                            klines_data = klines_response['data']['klines']
-                        elif isinstance(klines_response['data'], list):
-                            klines_data = klines_response['data']
-                        successful_interval = interval
-                        break
-                
-                # Handle different response formats
-                if 'data' in klines_response:
-                    if isinstance(klines_response['data'], dict) and 'klines' in klines_response['data']:
-                        klines_data = klines_response['data']['klines']
-                    elif isinstance(klines_response['data'], list):
-                        klines_data = klines_response['data']
-                
-                if klines_data:
-                    logger.info(f"Successfully got {len(klines_data)} data points with interval {interval}")
-                    successful_interval = interval
-                    break
-                        
-            except Exception as e:
-                logger.warning(f"Failed to get klines with interval {interval}: {e}")
-                continue
+        successful_interval = timeframe.upper()
+        try:
+            klines_response = get_timeframe_resampler().get_klines(trading_bot.api, formatted_symbol, timeframe, 100)
+            if 'error' in klines_response:
+                logger.warning(f"No candles for {formatted_symbol} {timeframe}: {klines_response['error']}")
+            else:
+                klines_data = klines_response['data']['klines']
+        except Exception as e:
+            logger.warning(f"Failed to get klines for {formatted_symbol} {timeframe}: {e}")
         
         if not klines_data:
-            logger.warning(f"No klines data received for {formatted_symbol} with any interval")
+            logger.warning(f"No klines data received for {formatted_symbol}")
             # Try to get basic ticker data as fallback
             try:
                 ticker_response = trading_bot.api.get_ticker_price(formatted_symbol)
@@ -1080,6 +1136,7 @@ def api_chart_data(symbol):
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/api/market-data/<symbol>')
+@response_cache.cached(ttl=cache_ttls.get('market_data', 2))
 def api_market_data(symbol):
     """Get real-time market data for a symbol"""
     try:
@@ -1155,6 +1212,7 @@ def api_real_time_price(symbol):
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/api/24hr-ticker/<symbol>')
+@response_cache.cached(ttl=cache_ttls.get('ticker_24h', 10))
 def api_24hr_ticker(symbol):
     """Get 24-hour ticker statistics"""
     try:
@@ -1412,6 +1470,7 @@ def api_test_auto_trader():
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/api/futures/trade', methods=['POST'])
+@response_cache.invalidates(('account',))
 def api_futures_trade():
     """API endpoint for futures trading"""
     try:
@@ -1484,6 +1543,7 @@ def api_futures_leverage():
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/api/futures/close-position', methods=['POST'])
+@response_cache.invalidates(('account',))
 def api_futures_close_position():
     """API endpoint for closing futures position"""
     try:
@@ -1882,6 +1942,7 @@ def api_bybit_positions():
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/api/bybit/place-order', methods=['POST'])
+@response_cache.invalidates(('account',))
 def api_bybit_place_order():
     """API endpoint for placing Bybit orders"""
     try:
@@ -1929,6 +1990,7 @@ def api_bybit_place_order():
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/api/bybit/close-position', methods=['POST'])
+@response_cache.invalidates(('account',))
 def api_bybit_close_position():
     """API endpoint for closing Bybit positions"""
     try:
@@ -1962,6 +2024,7 @@ def api_bybit_close_position():
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/api/bybit/close-all-positions', methods=['POST'])
+@response_cache.invalidates(('account',))
 def api_bybit_close_all_positions():
     """API endpoint for closing all Bybit positions"""
     try:
@@ -2305,6 +2368,7 @@ def api_bybit_auto_trading_status():
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/api/bybit/auto-trading/execute', methods=['POST'])
+@response_cache.invalidates(('account',))
 def api_bybit_auto_trading_execute():
     """Execute auto trading logic"""
     try:
@@ -2515,6 +2579,7 @@ def send_telegram_notification():
 # ===== UNIFIED TRADING API ENDPOINTS =====
 
 @app.route('/api/bybit/unified/place-order', methods=['POST'])
+@response_cache.invalidates(('account',))
 def api_bybit_unified_place_order():
     """API endpoint for placing unified orders (spot/futures)"""
     try:
@@ -2569,6 +2634,7 @@ def api_bybit_unified_place_order():
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/api/bybit/unified/spot-order', methods=['POST'])
+@response_cache.invalidates(('account',))
 def api_bybit_unified_spot_order():
     """API endpoint for placing spot orders"""
     try:
@@ -2617,6 +2683,7 @@ def api_bybit_unified_spot_order():
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/api/bybit/unified/futures-order', methods=['POST'])
+@response_cache.invalidates(('account',))
 def api_bybit_unified_futures_order():
     """API endpoint for placing futures orders"""
     try:
@@ -2753,6 +2820,7 @@ def api_bybit_unified_ticker():
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/api/bybit/unified/cancel-order', methods=['POST'])
+@response_cache.invalidates(('account',))
 def api_bybit_unified_cancel_order():
     """API endpoint for cancelling unified orders"""
     try:
@@ -2884,15 +2952,26 @@ def handle_connect():
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle WebSocket disconnection"""
+    price_rooms.remove_client(request.sid)
     print('Client disconnected')
 
 @socketio.on('subscribe_price')
 def handle_subscribe_price(data):
-    """Handle price subscription"""
+    """Join the symbol's price room; updates are pushed by its shared feed"""
+    symbol = data.get('symbol')
+    if symbol:
+        join_room(room_name(symbol))
+        last = price_rooms.subscribe(request.sid, symbol)
+        if last:
+            emit('price_update', {'symbol': symbol, 'price': last['price'], 'timestamp': last.get('timestamp')})
+
+@socketio.on('unsubscribe_price')
+def handle_unsubscribe_price(data):
+    """Leave the symbol's price room"""
     symbol = data.get('symbol')
     if symbol:
-        # Subscribe to real-time price updates
-        emit('price_update', {'symbol': symbol, 'price': trading_bot.get_real_time_price(symbol)})
+        leave_room(room_name(symbol))
+        price_rooms.unsubscribe(request.sid, symbol)
 
 def main():
     """Main function to run the Flask application"""
@@ -0,0 +1,452 @@
+"""
+Incremental streaming indicators.
+
+Each indicator keeps O(1) running state and is advanced by one candle at a
+time instead of rebuilding a DataFrame and recomputing a whole ``ta`` series
+to read its last value. ``update()`` commits a closed candle; ``provisional()``
+returns the value for the still-forming candle without changing state.
+
+Results follow the ``ta`` library recurrences (RSI: Wilder smoothing,
+EMA/MACD: ``ewm(adjust=False)``, Bollinger: rolling mean/std with ddof=0,
+OBV: ``OnBalanceVolumeIndicator``) and match them within 1e-9 relative
+tolerance on the same input series. ATR is the simple average of the last
+``period`` true ranges, as in ``TradingStrategies.calculate_dynamic_stop_loss``.
+"""
+
+import threading
+import time
+import logging
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from kline_cache import INTERVAL_MS
+
+TOLERANCE = 1e-9
+
+
+class EMAState:
+    """Exponential moving average, ewm(span=period, adjust=False)"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.value = None
+        self.count = 0
+
+    def _next(self, x: float) -> float:
+        return x if self.value is None else self.value + self.alpha * (x - self.value)
+
+    def update(self, x: float) -> Optional[float]:
+        self.value = self._next(x)
+        self.count += 1
+        return self.current()
+
+    def provisional(self, x: float) -> Optional[float]:
+        return self._next(x) if self.count + 1 >= self.period else None
+
+    def current(self) -> Optional[float]:
+        return self.value if self.count >= self.period else None
+
+
+class RSIState:
+    """Relative Strength Index with Wilder smoothing (alpha = 1/period)"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.alpha = 1.0 / period
+        self.prev_close = None
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.count = 0
+
+    def _next(self, close: float) -> Tuple[float, float]:
+        if self.prev_close is None:
+            return 0.0, 0.0
+        diff = close - self.prev_close
+        gain = diff if diff > 0 else 0.0
+        loss = -diff if diff < 0 else 0.0
+        return (self.avg_gain + self.alpha * (gain - self.avg_gain),
+                self.avg_loss + self.alpha * (loss - self.avg_loss))
+
+    @staticmethod
+    def _rsi(avg_gain: float, avg_loss: float) -> float:
+        if avg_loss == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    def update(self, close: float) -> Optional[float]:
+        self.avg_gain, self.avg_loss = self._next(close)
+        self.prev_close = close
+        self.count += 1
+        return self.current()
+
+    def provisional(self, close: float) -> Optional[float]:
+        if self.count + 1 < self.period:
+            return None
+        return self._rsi(*self._next(close))
+
+    def current(self) -> Optional[float]:
+        return self._rsi(self.avg_gain, self.avg_loss) if self.count >= self.period else None
+
+
+class MACDState:
+    """MACD line, signal line and histogram built from three EMAs"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMAState(fast)
+        self.slow = EMAState(slow)
+        self.signal = EMAState(signal)
+
+    def update(self, close: float) -> Optional[Tuple[float, float, float]]:
+        fast = self.fast.update(close)
+        slow = self.slow.update(close)
+        if fast is None or slow is None:
+            return None
+        self.signal.update(fast - slow)
+        return self.current()
+
+    def provisional(self, close: float) -> Optional[Tuple[float, float, float]]:
+        fast = self.fast.provisional(close)
+        slow = self.slow.provisional(close)
+        if fast is None or slow is None:
+            return None
+        macd = fast - slow
+        signal = self.signal.provisional(macd)
+        if signal is None:
+            return None
+        return macd, signal, macd - signal
+
+    def current(self) -> Optional[Tuple[float, float, float]]:
+        if self.fast.current() is None or self.slow.current() is None:
+            return None
+        signal = self.signal.current()
+        if signal is None:
+            return None
+        macd = self.fast.value - self.slow.value
+        return macd, signal, macd - signal
+
+
+class BollingerState:
+    """Bollinger Bands from a rolling window sum / sum of squares (population std)"""
+
+    def __init__(self, period: int = 20, std_dev: float = 2.0):
+        self.period = period
+        self.std_dev = std_dev
+        self.window = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._updates = 0
+
+    def _bands(self, total: float, total_sq: float) -> Tuple[float, float, float]:
+        mean = total / self.period
+        var = max(total_sq / self.period - mean * mean, 0.0)
+        width = self.std_dev * var ** 0.5
+        return mean + width, mean, mean - width
+
+    def update(self, close: float) -> Optional[Tuple[float, float, float]]:
+        self.window.append(close)
+        self.total += close
+        self.total_sq += close * close
+        if len(self.window) > self.period:
+            old = self.window.popleft()
+            self.total -= old
+            self.total_sq -= old * old
+        self._updates += 1
+        if self._updates % (self.period * 50) == 0:
+            # Re-sum occasionally so floating point error cannot accumulate
+            self.total = sum(self.window)
+            self.total_sq = sum(x * x for x in self.window)
+        return self.current()
+
+    def provisional(self, close: float) -> Optional[Tuple[float, float, float]]:
+        size = len(self.window) + 1
+        total = self.total + close
+        total_sq = self.total_sq + close * close
+        if size > self.period:
+            old = self.window[0]
+            total -= old
+            total_sq -= old * old
+            size -= 1
+        if size < self.period:
+            return None
+        return self._bands(total, total_sq)
+
+    def current(self) -> Optional[Tuple[float, float, float]]:
+        if len(self.window) < self.period:
+            return None
+        return self._bands(self.total, self.total_sq)
+
+
+class ATRState:
+    """Average True Range as the simple mean of the last ``period`` true ranges"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close = None
+        self.ranges = deque()
+        self.total = 0.0
+
+    def _true_range(self, high: float, low: float) -> Optional[float]:
+        if self.prev_close is None:
+            return None
+        return max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        tr = self._true_range(high, low)
+        self.prev_close = close
+        if tr is not None:
+            self.ranges.append(tr)
+            self.total += tr
+            if len(self.ranges) > self.period:
+                self.total -= self.ranges.popleft()
+        return self.current()
+
+    def provisional(self, high: float, low: float, close: float) -> Optional[float]:
+        tr = self._true_range(high, low)
+        if tr is None:
+            return None
+        size = len(self.ranges) + 1
+        total = self.total + tr
+        if size > self.period:
+            total -= self.ranges[0]
+            size -= 1
+        return total / self.period if size >= self.period else None
+
+    def current(self) -> Optional[float]:
+        return self.total / self.period if len(self.ranges) >= self.period else None
+
+
+class OBVState:
+    """On-Balance Volume (volume is added unless close is below the previous close)"""
+
+    def __init__(self):
+        self.prev_close = None
+        self.value = 0.0
+        self.count = 0
+
+    def _next(self, close: float, volume: float) -> float:
+        if self.prev_close is not None and close < self.prev_close:
+            return self.value - volume
+        return self.value + volume
+
+    def update(self, close: float, volume: float) -> float:
+        self.value = self._next(close, volume)
+        self.prev_close = close
+        self.count += 1
+        return self.value
+
+    def provisional(self, close: float, volume: float) -> float:
+        return self._next(close, volume)
+
+    def current(self) -> Optional[float]:
+        return self.value if self.count else None
+
+
+def _make_state(name: str, params: Tuple):
+    kwargs = dict(params)
+    if name == 'rsi':
+        return RSIState(kwargs.get('period', 14))
+    if name == 'ema':
+        return EMAState(kwargs.get('period', 20))
+    if name == 'macd':
+        return MACDState(kwargs.get('fast', 12), kwargs.get('slow', 26), kwargs.get('signal', 9))
+    if name == 'bollinger':
+        return BollingerState(kwargs.get('period', 20), kwargs.get('std_dev', 2.0))
+    if name == 'atr':
+        return ATRState(kwargs.get('period', 14))
+    if name == 'obv':
+        return OBVState()
+    raise ValueError(f"Unknown indicator: {name}")
+
+
+def _feed(state, candle: Tuple, provisional: bool = False):
+    """Advance (or peek) one indicator with a (time, open, high, low, close, volume) candle"""
+    _, _, high, low, close, volume = candle
+    method = state.provisional if provisional else state.update
+    if isinstance(state, ATRState):
+        return method(high, low, close)
+    if isinstance(state, OBVState):
+        return method(close, volume)
+    if isinstance(state, EMAState) and getattr(state, 'source', 'close') == 'volume':
+        return method(volume)
+    return method(close)
+
+
+class _Series:
+    __slots__ = ('history', 'last_time', 'forming', 'indicators')
+
+    def __init__(self, history_size: int):
+        self.history = deque(maxlen=history_size)
+        self.last_time = None
+        self.forming = None
+        self.indicators = {}
+
+
+class IndicatorEngine:
+    """Running indicator state per (symbol, interval, indicator, params).
+
+    Closed candles are committed once; the forming candle is evaluated through
+    the provisional path. A short candle history is kept per series so that an
+    indicator registered later can be warmed up without another exchange call.
+    """
+
+    def __init__(self, history_size: int = 500):
+        self.history_size = history_size
+        self.logger = logging.getLogger(__name__)
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._lock = threading.Lock()
+
+    def _get_series(self, symbol: str, interval: str) -> _Series:
+        key = (symbol, interval.upper())
+        series = self._series.get(key)
+        if series is None:
+            series = _Series(self.history_size)
+            self._series[key] = series
+        return series
+
+    def _get_state(self, series: _Series, name: str, source: str, params: Dict):
+        key = (name, source, tuple(sorted(params.items())))
+        state = series.indicators.get(key)
+        if state is None:
+            state = _make_state(name, key[2])
+            if source != 'close':
+                state.source = source
+            for candle in series.history:
+                _feed(state, candle)
+            series.indicators[key] = state
+        return state
+
+    def on_candle(self, symbol: str, interval: str, candle: Tuple, closed: bool = True):
+        """Feed one (time, open, high, low, close, volume) candle into every indicator of the series"""
+        with self._lock:
+            series = self._get_series(symbol, interval)
+            open_time = candle[0]
+            if series.last_time is not None and open_time <= series.last_time:
+                return
+            if not closed:
+                series.forming = candle
+                return
+            series.history.append(candle)
+            series.last_time = open_time
+            series.forming = None
+            for state in series.indicators.values():
+                _feed(state, candle)
+
+    def sync(self, symbol: str, interval: str, candles: List[Tuple]):
+        """Commit every candle newer than the last one seen; the final candle is treated as forming"""
+        if not candles:
+            return
+        with self._lock:
+            series = self._get_series(symbol, interval)
+            last_time = series.last_time
+            interval_ms = INTERVAL_MS.get(interval.upper())
+            if last_time is not None and interval_ms and candles[0][0] > last_time + interval_ms:
+                # Missed candles between the stored state and this batch: rebuild from the batch
+                self._series[(symbol, interval.upper())] = _Series(self.history_size)
+                last_time = None
+        for candle in candles[:-1]:
+            if last_time is None or candle[0] > last_time:
+                self.on_candle(symbol, interval, candle, closed=True)
+        self.on_candle(symbol, interval, candles[-1], closed=False)
+
+    def value(self, symbol: str, interval: str, name: str, source: str = 'close', include_forming: bool = True, **params):
+        """Latest value of an indicator, using the forming candle if one is pending"""
+        with self._lock:
+            series = self._get_series(symbol, interval)
+            state = self._get_state(series, name, source, params)
+            if include_forming and series.forming is not None:
+                return _feed(state, series.forming, provisional=True)
+            return state.current()
+
+    def reset(self, symbol: str = None, interval: str = None):
+        with self._lock:
+            if symbol is None:
+                self._series.clear()
+                return
+            for key in list(self._series):
+                if key[0] == symbol and (interval is None or key[1] == interval.upper()):
+                    del self._series[key]
+
+
+def candles_from_frame(df) -> List[Tuple]:
+    """Convert a get_market_data() DataFrame into engine candles"""
+    times = df['timestamp'].values.astype('datetime64[ms]').astype('int64')
+    return list(zip(
+        times.tolist(),
+        df['open'].tolist(),
+        df['high'].tolist(),
+        df['low'].tolist(),
+        df['close'].tolist(),
+        df['volume'].tolist()
+    ))
+
+
+# Global engine shared by all strategies
+indicator_engine = IndicatorEngine()
+
+
+def benchmark(n_candles: int = 100, ticks: int = 2000):
+    """Compare per-tick cost of the streaming engine against a full ``ta`` recompute"""
+    import random
+    import pandas as pd
+    import ta
+
+    random.seed(1)
+    closes = [100.0]
+    for _ in range(n_candles + ticks - 1):
+        closes.append(closes[-1] * (1 + random.gauss(0, 0.002)))
+
+    # Accuracy: streaming vs ta on the same series
+    rsi = RSIState(14)
+    ema = EMAState(20)
+    macd = MACDState(12, 26, 9)
+    bb = BollingerState(20, 2.0)
+    for c in closes[:n_candles]:
+        rsi.update(c)
+        ema.update(c)
+        macd.update(c)
+        bb.update(c)
+    s = pd.Series(closes[:n_candles])
+    reference = {
+        'rsi': (rsi.current(), ta.momentum.RSIIndicator(s, window=14).rsi().iloc[-1]),
+        'ema': (ema.current(), ta.trend.EMAIndicator(s, window=20).ema_indicator().iloc[-1]),
+        'macd': (macd.current()[0], ta.trend.MACD(s, 26, 12, 9).macd().iloc[-1]),
+        'macd_signal': (macd.current()[1], ta.trend.MACD(s, 26, 12, 9).macd_signal().iloc[-1]),
+        'bb_upper': (bb.current()[0], ta.volatility.BollingerBands(s, 20, 2).bollinger_hband().iloc[-1]),
+    }
+    for name, (streamed, expected) in reference.items():
+        rel = abs(streamed - expected) / max(abs(expected), 1e-12)
+        print(f"{name:12s} streaming={streamed:.10f} ta={expected:.10f} rel_err={rel:.2e} "
+              f"{'OK' if rel <= TOLERANCE else 'MISMATCH'}")
+
+    # Per-tick cost
+    window = list(closes[:n_candles])
+    start = time.perf_counter()
+    for c in closes[n_candles:n_candles + 200]:
+        window = window[1:] + [c]
+        s = pd.Series(window)
+        ta.momentum.RSIIndicator(s, window=14).rsi().iloc[-1]
+        ta.trend.EMAIndicator(s, window=20).ema_indicator().iloc[-1]
+        ta.trend.MACD(s, 26, 12, 9).macd().iloc[-1]
+        ta.volatility.BollingerBands(s, 20, 2).bollinger_hband().iloc[-1]
+    full = (time.perf_counter() - start) / 200
+
+    start = time.perf_counter()
+    for c in closes[n_candles:]:
+        rsi.provisional(c)
+        ema.provisional(c)
+        macd.provisional(c)
+        bb.provisional(c)
+        rsi.update(c)
+        ema.update(c)
+        macd.update(c)
+        bb.update(c)
+    streaming = (time.perf_counter() - start) / ticks
+
+    print(f"full recompute ({n_candles} candles): {full * 1e6:9.1f} us/tick")
+    print(f"streaming update + provisional:      {streaming * 1e6:9.1f} us/tick "
+          f"({full / streaming:.0f}x faster)")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,235 @@
+import threading
+import time
+import logging
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Candle length per Pionex interval code, in milliseconds
+INTERVAL_MS = {
+    '1M': 60_000,
+    '5M': 300_000,
+    '15M': 900_000,
+    '30M': 1_800_000,
+    '1H': 3_600_000,
+    '4H': 14_400_000,
+    '8H': 28_800_000,
+    '12H': 43_200_000,
+    '1D': 86_400_000
+}
+
+
+def normalize_interval(interval: str) -> str:
+    """Convert '5m' / '1h' style intervals to the Pionex '5M' / '1H' codes"""
+    return interval.upper()
+
+
+def kline_open_time(kline) -> Optional[int]:
+    """Open time (ms) of a raw kline, either list-style or dict-style"""
+    try:
+        if isinstance(kline, dict):
+            value = kline.get('time', kline.get('openTime', kline.get('timestamp')))
+        else:
+            value = kline[0]
+        return int(value) if value is not None else None
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class _Entry:
+    __slots__ = ('candles', 'expires_at', 'exhausted', 'version', 'frames')
+
+    def __init__(self, max_candles: int):
+        self.candles = deque(maxlen=max_candles)
+        self.expires_at = 0
+        self.exhausted = False
+        self.version = 0
+        self.frames = {}
+
+
+class _Flight:
+    __slots__ = ('event', 'result')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+
+class KlineCache:
+    """Process-wide kline cache keyed by (symbol, interval).
+
+    Each key keeps the latest ``max_candles`` candles in a ring buffer. An
+    entry stays valid until the current candle closes; after that the next
+    reader fetches only the missing tail. Concurrent misses on the same key
+    are merged into a single exchange request.
+    """
+
+    def __init__(self, max_candles: int = 500):
+        self.max_candles = max_candles
+        self.logger = logging.getLogger(__name__)
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        self._inflight: Dict[Tuple[str, str], _Flight] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'merged': 0, 'errors': 0}
+
+    def _is_fresh(self, entry: Optional[_Entry], limit: int, now_ms: int) -> bool:
+        if entry is None or now_ms >= entry.expires_at:
+            return False
+        return len(entry.candles) >= limit or entry.exhausted
+
+    def _fetch_limit(self, entry: Optional[_Entry], limit: int, interval_ms: int, now_ms: int) -> int:
+        """Fetch only the missing tail when the buffer already covers the requested depth"""
+        if entry is None or not entry.candles or len(entry.candles) < limit:
+            return limit
+        last_open = kline_open_time(entry.candles[-1])
+        if last_open is None:
+            return limit
+        missing = (now_ms - last_open) // interval_ms + 1
+        return int(min(max(missing, 2), limit))
+
+    def _merge(self, entry: _Entry, rows: List, requested: int, interval_ms: int):
+        times = [kline_open_time(row) for row in rows]
+        if all(t is not None for t in times):
+            rows = [row for _, row in sorted(zip(times, rows), key=lambda pair: pair[0])]
+            first_new = min(times) if times else None
+            # Drop buffered candles that the new batch supersedes (including the formerly forming one)
+            while entry.candles and first_new is not None and (kline_open_time(entry.candles[-1]) or 0) >= first_new:
+                entry.candles.pop()
+            if entry.candles and first_new is not None:
+                last_kept = kline_open_time(entry.candles[-1])
+                if last_kept is None or first_new - last_kept > interval_ms:
+                    # Gap between buffer and new batch, start over
+                    entry.candles.clear()
+            entry.candles.extend(rows)
+        else:
+            entry.candles.clear()
+            entry.candles.extend(rows)
+        if len(rows) < requested:
+            entry.exhausted = True
+        entry.version += 1
+        entry.frames = {}
+
+    def _fetch(self, api, symbol: str, interval: str, fetch_limit: int) -> Dict:
+        response = api.get_klines(symbol, interval, fetch_limit)
+        if 'error' in response:
+            return response
+        data = response.get('data')
+        if isinstance(data, dict) and 'klines' in data:
+            rows = data['klines']
+        elif isinstance(data, list):
+            rows = data
+        else:
+            rows = []
+        return {'rows': list(rows or [])}
+
+    def get_candles(self, api, symbol: str, interval: str, limit: int = 100) -> Dict:
+        """Return {'klines': [...]} with the latest ``limit`` candles, or {'error': ...}"""
+        interval = normalize_interval(interval)
+        limit = max(1, min(limit, self.max_candles))
+        interval_ms = INTERVAL_MS.get(interval, 60_000)
+        key = (symbol, interval)
+        now_ms = int(time.time() * 1000)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if self._is_fresh(entry, limit, now_ms):
+                self.stats['hits'] += 1
+                return {'klines': list(entry.candles)[-limit:], 'version': entry.version}
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+                self.stats['misses'] += 1
+                fetch_limit = self._fetch_limit(entry, limit, interval_ms, now_ms)
+            else:
+                self.stats['merged'] += 1
+
+        if not leader:
+            flight.event.wait(timeout=60)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and (len(entry.candles) >= limit or entry.exhausted):
+                    return {'klines': list(entry.candles)[-limit:], 'version': entry.version}
+            # The merged fetch failed or was too shallow for this caller
+            if flight.result and 'error' in flight.result:
+                return {'error': flight.result['error']}
+            return self.get_candles(api, symbol, interval, limit)
+
+        try:
+            result = self._fetch(api, symbol, interval, fetch_limit)
+        except Exception as e:
+            self.logger.error(f"Error fetching klines for {symbol} ({interval}): {e}")
+            result = {'error': str(e)}
+
+        with self._lock:
+            if 'error' in result:
+                self.stats['errors'] += 1
+            else:
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = _Entry(self.max_candles)
+                    self._entries[key] = entry
+                self._merge(entry, result['rows'], fetch_limit, interval_ms)
+                # Valid until the currently forming candle closes
+                entry.expires_at = (int(time.time() * 1000) // interval_ms + 1) * interval_ms
+            flight.result = result
+            self._inflight.pop(key, None)
+        flight.event.set()
+
+        if 'error' in result:
+            return {'error': result['error']}
+        with self._lock:
+            return {'klines': list(entry.candles)[-limit:], 'version': entry.version}
+
+    def get_klines(self, api, symbol: str, interval: str = '1H', limit: int = 100) -> Dict:
+        """Drop-in replacement for ``api.get_klines`` that reads through the cache"""
+        result = self.get_candles(api, symbol, interval, limit)
+        if 'error' in result:
+            return {'error': result['error']}
+        return {
+            'result': True,
+            'data': {'klines': result['klines']},
+            'timestamp': int(time.time() * 1000)
+        }
+
+    def get_frame(self, api, symbol: str, interval: str, limit: int, builder: Callable[[List], object]):
+        """Return ``builder(klines)`` memoized per cached candle version (e.g. a DataFrame)"""
+        result = self.get_candles(api, symbol, interval, limit)
+        if 'error' in result:
+            return result
+        key = (symbol, normalize_interval(interval))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == result['version'] and limit in entry.frames:
+                return {'frame': entry.frames[limit]}
+        frame = builder(result['klines'])
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == result['version']:
+                entry.frames[limit] = frame
+        return {'frame': frame}
+
+    def invalidate(self, symbol: str = None, interval: str = None):
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                if key[0] == symbol and (interval is None or key[1] == normalize_interval(interval)):
+                    del self._entries[key]
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses'] + self.stats['merged']
+            return {
+                **self.stats,
+                'hit_rate': (self.stats['hits'] / lookups) if lookups else 0.0,
+                'keys': len(self._entries)
+            }
+
+
+# Global kline cache shared by strategies, GUI and Telegram bot
+kline_cache = KlineCache()
+
+def get_kline_cache() -> KlineCache:
+    return kline_cache
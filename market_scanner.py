@@ -0,0 +1,319 @@
+import os
+import threading
+import time
+import logging
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from config_loader import get_config
+from kline_cache import INTERVAL_MS, kline_cache
+from market_state import market_state
+from rate_limiter import request_priority, PRIORITY_BACKGROUND
+from trading_scheduler import get_signal_cache, get_trading_scheduler
+
+# Pionex interval codes -> Bybit kline intervals
+BYBIT_INTERVALS = {'1M': '1', '5M': '5', '15M': '15', '30M': '30', '1H': '60', '4H': '240', '1D': 'D'}
+BYBIT_PREFIX = 'bybit:'
+SIGNAL_VALUES = {'BUY': 1, 'LONG': 1, 'SELL': -1, 'SHORT': -1}
+
+
+class _BybitMarketData:
+    """Pionex-shaped market data view of Bybit linear contracts for TradingStrategies.
+
+    Symbols carry a ``bybit:`` prefix so kline cache, indicator engine and
+    signal cache entries never collide with the Pionex spot pair of the same
+    coin. Prices come from the scan's bulk ticker snapshot.
+    """
+
+    def __init__(self, bybit_api, tickers: Dict[str, Dict]):
+        self.bybit_api = bybit_api
+        self.tickers = tickers
+
+    def get_klines(self, symbol: str, interval: str = '5M', limit: int = 100, end_time: int = None) -> Dict:
+        response = self.bybit_api.get_futures_klines(symbol[len(BYBIT_PREFIX):],
+                                                     BYBIT_INTERVALS.get(interval.upper(), '5'), limit)
+        if not response.get('success'):
+            return {'error': response.get('error', 'Failed to fetch klines')}
+        rows = response.get('data', {}).get('list', [])
+        # Bybit returns newest first: [start, open, high, low, close, volume, turnover]
+        klines = [{'time': int(row[0]), 'open': row[1], 'high': row[2], 'low': row[3], 'close': row[4],
+                   'volume': row[5]} for row in reversed(rows)]
+        return {'data': {'klines': klines}}
+
+    def get_ticker_price(self, symbol: str) -> Dict:
+        ticker = self.tickers.get(symbol[len(BYBIT_PREFIX):])
+        if not ticker:
+            return {'error': f"Symbol {symbol} not found in ticker data"}
+        return {'data': {'price': ticker.get('lastPrice', '0')}}
+
+
+class MarketScanner:
+    """Ranks the whole tradable universe by the existing strategy signals.
+
+    One bulk ticker call pre-filters the universe by 24h quote volume; the
+    shortlist is evaluated concurrently at background priority so the shared
+    rate limiter keeps order traffic ahead of it. Signals go through the
+    shared signal cache, so symbols AutoTrader already evaluated this candle
+    cost nothing extra.
+    """
+
+    def __init__(self, pionex_api=None, bybit_api=None, config: Dict = None):
+        self.pionex_api = pionex_api
+        self.bybit_api = bybit_api
+        config = config if config is not None else get_config().get('scanner', {})
+        self.interval = config.get('interval', '5M')
+        self.min_quote_volume = config.get('min_quote_volume', 1_000_000)
+        self.max_symbols = config.get('max_symbols', 300)
+        self.quote = config.get('quote', 'USDT')
+        self.strategies = config.get('strategies', ['RSI_STRATEGY', 'VOLUME_FILTER', 'ADVANCED_STRATEGY'])
+        self.max_workers = config.get('max_workers', 16)
+        self.universe_ttl = config.get('universe_ttl', 3600)
+        self.logger = logging.getLogger(__name__)
+        self._universe: Dict[str, tuple] = {}  # exchange -> (fetched_at, set of symbols)
+        self._results: Dict[str, Dict] = {}
+        self._scan_lock = threading.Lock()
+
+    # ----- Universe -----
+
+    def _pionex_universe(self) -> Optional[set]:
+        cached = self._universe.get('pionex')
+        if cached and time.time() - cached[0] < self.universe_ttl:
+            return cached[1]
+        response = self.pionex_api.get_symbols()
+        if 'error' in response:
+            self.logger.error(f"Failed to load Pionex symbols: {response['error']}")
+            return cached[1] if cached else None
+        symbols = {item.get('symbol') for item in response.get('data', {}).get('symbols', [])
+                   if item.get('enable', True) and item.get('quoteCurrency', self.quote) == self.quote}
+        self._universe['pionex'] = (time.time(), symbols)
+        return symbols
+
+    def _bybit_universe(self) -> Optional[set]:
+        cached = self._universe.get('bybit')
+        if cached and time.time() - cached[0] < self.universe_ttl:
+            return cached[1]
+        response = self.bybit_api.get_futures_instruments(self.quote)
+        if not response.get('success'):
+            self.logger.error(f"Failed to load Bybit instruments: {response.get('error')}")
+            return cached[1] if cached else None
+        symbols = {item.get('symbol') for item in response['data'].get('list', [])}
+        self._universe['bybit'] = (time.time(), symbols)
+        return symbols
+
+    def shortlist(self, exchange: str) -> Dict:
+        """Universe filtered and ranked by 24h quote volume from one bulk ticker call"""
+        if exchange == 'bybit':
+            universe = self._bybit_universe()
+            response = self.bybit_api.get_futures_tickers()
+            if not response.get('success'):
+                return {'error': response.get('error', 'Failed to fetch tickers')}
+            tickers = {t.get('symbol'): t for t in response['data'].get('list', [])}
+            volume = {symbol: float(t.get('turnover24h', 0) or 0) for symbol, t in tickers.items()}
+        else:
+            universe = self._pionex_universe()
+            response = self.pionex_api.get_ticker()
+            if 'error' in response:
+                return {'error': response['error']}
+            ticker_list = response.get('data', {}).get('tickers', [])
+            # The same snapshot serves every strategy's price lookup during the scan
+            market_state.update_tickers(ticker_list)
+            tickers = {t.get('symbol'): t for t in ticker_list}
+            volume = {symbol: float(t.get('amount', 0) or 0) for symbol, t in tickers.items()}
+        if universe is None:
+            universe = {symbol for symbol in tickers if symbol and symbol.endswith(self.quote)}
+        candidates = sorted((symbol for symbol in universe
+                             if symbol in tickers and volume[symbol] >= self.min_quote_volume),
+                            key=lambda symbol: volume[symbol], reverse=True)
+        return {'universe': len(universe), 'symbols': candidates[:self.max_symbols],
+                'tickers': tickers, 'volume': volume}
+
+    # ----- Evaluation -----
+
+    def _breakout(self, df: pd.DataFrame) -> Optional[str]:
+        """Bot 2025 breakout rules on a rolling box: buffer, confirmation candles and volume filter"""
+        bot_config = get_config().get('bot_2025', {})
+        breakout = bot_config.get('breakout', {})
+        confirmation = breakout.get('confirmation_candles', 1)
+        lookback = breakout.get('scan_lookback', 20)
+        if len(df) < lookback + confirmation:
+            return None
+        box = df.iloc[-(lookback + confirmation):-confirmation]
+        recent = df.tail(confirmation)
+        buffer = breakout.get('buffer_percentage', 0.05) / 100
+        price = df['close'].iloc[-1]
+        if price > box['high'].max() * (1 + buffer) and (recent['close'] > recent['open']).all():
+            signal = 'LONG'
+        elif price < box['low'].min() * (1 - buffer) and (recent['close'] < recent['open']).all():
+            signal = 'SHORT'
+        else:
+            return None
+        volume_filter = bot_config.get('volume_filter', {})
+        if volume_filter.get('enabled', False):
+            period = volume_filter.get('ema_period', 20)
+            if df['volume'].iloc[-1] <= df['volume'].tail(period).mean() * volume_filter.get('multiplier', 1.5):
+                return None
+        return signal
+
+    def _evaluate(self, strategies, symbol: str, display_symbol: str, volume: float) -> Dict:
+        cache = get_signal_cache()
+        with request_priority(PRIORITY_BACKGROUND):
+            signals = {}
+            for strategy in self.strategies:
+                signal = cache.get(strategy, symbol,
+                                   lambda s=strategy: strategies.get_strategy_signal(s, symbol, 1.0))
+                signals[strategy] = {'action': signal.get('action', 'HOLD'), 'reason': signal.get('reason', '')}
+            df = strategies.get_market_data(symbol, self.interval, 100)
+        breakout = self._breakout(df) if not df.empty else None
+        patterns = strategies.analyze_candlestick_patterns(df) if not df.empty else {}
+        score = sum(SIGNAL_VALUES.get(item['action'], 0) for item in signals.values())
+        score += SIGNAL_VALUES.get(breakout, 0)
+        return {
+            'symbol': display_symbol,
+            'score': score,
+            'direction': 'LONG' if score > 0 else 'SHORT' if score < 0 else 'NEUTRAL',
+            'signals': signals,
+            'breakout': breakout,
+            'pattern': patterns.get('pattern', 'none'),
+            'price': float(df['close'].iloc[-1]) if not df.empty else 0.0,
+            'quote_volume_24h': volume
+        }
+
+    def scan(self, exchange: str = 'pionex') -> Dict:
+        """Full scan of one exchange; results are kept for ``get_results``"""
+        from trading_strategies import TradingStrategies
+        if (self.bybit_api if exchange == 'bybit' else self.pionex_api) is None:
+            return {'error': f'No {exchange} API configured for scanning'}
+        with self._scan_lock:
+            started = time.time()
+            listing = self.shortlist(exchange)
+            if 'error' in listing:
+                return listing
+            if exchange == 'bybit':
+                strategies = TradingStrategies(_BybitMarketData(self.bybit_api, listing['tickers']))
+                keyed = {f"{BYBIT_PREFIX}{symbol}": symbol for symbol in listing['symbols']}
+            else:
+                strategies = TradingStrategies(self.pionex_api)
+                keyed = {symbol: symbol for symbol in listing['symbols']}
+
+            results, errors = [], {}
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='scanner') as pool:
+                futures = {pool.submit(self._evaluate, strategies, key, symbol, listing['volume'][symbol]): symbol
+                           for key, symbol in keyed.items()}
+                for future in as_completed(futures):
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        errors[futures[future]] = str(e)
+            results.sort(key=lambda item: (abs(item['score']), item['quote_volume_24h']), reverse=True)
+
+            duration = time.time() - started
+            candle_seconds = INTERVAL_MS.get(self.interval, 300_000) / 1000
+            summary = {
+                'exchange': exchange,
+                'interval': self.interval,
+                'scanned_at': int(started * 1000),
+                'duration': round(duration, 2),
+                'within_candle': duration < candle_seconds,
+                'universe': listing['universe'],
+                'shortlisted': len(keyed),
+                'results': results,
+                'errors': errors
+            }
+            if not summary['within_candle']:
+                self.logger.warning(f"{exchange} scan took {duration:.0f}s, longer than one {self.interval} candle")
+            self._results[exchange] = summary
+            return summary
+
+    def schedule(self, exchanges: List[str], interval: float):
+        """Rescan each exchange every ``interval`` seconds on the shared trading scheduler"""
+        scheduler = get_trading_scheduler()
+        for exchange in exchanges:
+            scheduler.add_job(f"market-scan:{exchange}", lambda e=exchange: self.scan(e), interval,
+                              deadline=interval, first_run=0)
+
+    def get_results(self, exchange: str = 'pionex', top: int = None, max_age: float = None) -> Dict:
+        """Last scan, rescanning when there is none or it is older than ``max_age`` seconds"""
+        summary = self._results.get(exchange)
+        if summary is None or (max_age is not None and time.time() - summary['scanned_at'] / 1000 > max_age):
+            summary = self.scan(exchange)
+        if 'error' in summary or top is None:
+            return summary
+        return {**summary, 'results': summary['results'][:top]}
+
+
+# Shared scanner for the GUI, Telegram bot and scheduled scans
+market_scanner = None
+_scanner_lock = threading.Lock()
+
+def get_market_scanner() -> MarketScanner:
+    global market_scanner
+    with _scanner_lock:
+        if market_scanner is None:
+            from pionex_api import PionexAPI
+            try:
+                from bybit_api import BybitAPI
+                config = get_config().get('bybit', {})
+                # Scanning only reads public market data; keys are optional
+                bybit_api = BybitAPI(config.get('api_key') or os.getenv('BYBIT_API_KEY', ''),
+                                     config.get('api_secret') or os.getenv('BYBIT_API_SECRET', ''),
+                                     config.get('testnet', False))
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"Bybit scanning unavailable: {e}")
+                bybit_api = None
+            market_scanner = MarketScanner(PionexAPI(), bybit_api)
+            config = get_config().get('scanner', {})
+            if config.get('enabled', False):
+                exchanges = [e for e in config.get('exchanges', ['pionex']) if e != 'bybit' or bybit_api]
+                market_scanner.schedule(exchanges, config.get('refresh_interval', 300))
+        return market_scanner
+
+
+def benchmark(symbols: int = 400, latency: float = 0.05, rate: float = 10.0):
+    """Scan of a synthetic universe with per-request latency under a token-bucket limit"""
+    import numpy as np
+    from rate_limiter import TokenBucketLimiter
+
+    limiter = TokenBucketLimiter('scanner-bench', rate=rate, capacity=20)
+    calls = {'klines': 0, 'tickers': 0}
+    rng = np.random.default_rng(5)
+
+    class _StubApi:
+        def get_symbols(self):
+            return {'data': {'symbols': [{'symbol': f"C{i}_USDT", 'enable': True, 'quoteCurrency': 'USDT'}
+                                         for i in range(symbols)]}}
+
+        def get_ticker(self, symbol=None):
+            calls['tickers'] += 1
+            return {'data': {'tickers': [{'symbol': f"C{i}_USDT", 'close': '1.0', 'amount': str(5e6 - i * 1e4),
+                                          'time': int(time.time() * 1000)} for i in range(symbols)]}}
+
+        def get_klines(self, symbol, interval='5M', limit=100, end_time=None):
+            limiter.acquire(1, PRIORITY_BACKGROUND)
+            calls['klines'] += 1
+            time.sleep(latency)
+            now = int(time.time() * 1000) // 300_000 * 300_000
+            close = 1 + np.cumsum(rng.normal(0, 0.01, limit))
+            return {'data': {'klines': [{'time': now - (limit - i - 1) * 300_000, 'open': close[i - 1] if i else 1.0,
+                                         'high': close[i] * 1.004, 'low': close[i] * 0.996, 'close': close[i],
+                                         'volume': float(rng.uniform(100, 300))} for i in range(limit)]}}
+
+        def get_ticker_price(self, symbol):
+            return {'data': {'price': str(market_state.last_price(symbol) or 1.0)}}
+
+    kline_cache.invalidate()
+    scanner = MarketScanner(_StubApi(), config={'min_quote_volume': 1e6, 'max_symbols': symbols,
+                                                'max_workers': 16})
+    summary = scanner.scan('pionex')
+    print(f"{summary['universe']} symbols, {summary['shortlisted']} shortlisted: scan took {summary['duration']}s "
+          f"at {rate:.0f} req/s (one {scanner.interval} candle = {INTERVAL_MS[scanner.interval] / 1000:.0f}s, "
+          f"within candle: {summary['within_candle']})")
+    print(f"requests: {calls['tickers']} bulk ticker, {calls['klines']} klines; errors: {len(summary['errors'])}")
+    for item in summary['results'][:5]:
+        print(f"  {item['symbol']:<10} score {item['score']:+d} {item['direction']:<7} "
+              f"breakout={item['breakout']} pattern={item['pattern']}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    benchmark()
@@ -0,0 +1,181 @@
+import threading
+import time
+import logging
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+
+class MarketSnapshot(NamedTuple):
+    """Immutable view of one symbol; replaced wholesale on every update"""
+    symbol: str
+    last_price: float = 0.0
+    last_size: float = 0.0
+    last_side: str = ''
+    trade_time: int = 0
+    best_bid: float = 0.0
+    best_bid_size: float = 0.0
+    best_ask: float = 0.0
+    best_ask_size: float = 0.0
+    bids: tuple = ()
+    asks: tuple = ()
+    book_time: int = 0
+    open_24h: float = 0.0
+    high_24h: float = 0.0
+    low_24h: float = 0.0
+    volume_24h: float = 0.0
+    amount_24h: float = 0.0
+    change_24h: float = 0.0
+    stats_time: int = 0
+    live_at: float = 0.0  # Local time of the last streamed trade/book update
+    updated_at: float = 0.0
+
+    @property
+    def mid_price(self) -> float:
+        if self.best_bid and self.best_ask:
+            return (self.best_bid + self.best_ask) / 2
+        return self.last_price
+
+
+def normalize_symbol(symbol: str) -> str:
+    """Pionex spot symbols use BASE_QUOTE, e.g. BTCUSDT -> BTC_USDT"""
+    symbol = symbol.upper()
+    if '_' not in symbol:
+        for quote in ('USDT', 'USDC', 'BUSD'):
+            if symbol.endswith(quote) and len(symbol) > len(quote):
+                return f"{symbol[:-len(quote)]}_{quote}"
+    return symbol
+
+
+class MarketState:
+    """Shared in-memory market state fed by the websocket stream.
+
+    Writers serialize on a lock and publish a new immutable MarketSnapshot
+    per update; readers only do a dict lookup, so any thread can read
+    without locking. ``get_price`` falls back to REST only on a cold or
+    stale entry.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._snapshots: Dict[str, MarketSnapshot] = {}
+        self._write_lock = threading.Lock()
+        self.stats = {'updates': 0, 'hits': 0, 'rest_fallbacks': 0}
+        self._trade_listeners: List[Callable[[str, float, float, int], None]] = []
+
+    def _publish(self, symbol: str, **changes) -> MarketSnapshot:
+        symbol = normalize_symbol(symbol)
+        with self._write_lock:
+            current = self._snapshots.get(symbol) or MarketSnapshot(symbol=symbol)
+            snapshot = current._replace(updated_at=time.time(), **changes)
+            self._snapshots[symbol] = snapshot
+            self.stats['updates'] += 1
+        return snapshot
+
+    def update_trade(self, symbol: str, price: float, size: float = 0.0, side: str = '', timestamp: int = 0):
+        snapshot = self._publish(symbol, last_price=float(price), last_size=float(size), last_side=side,
+                                 trade_time=int(timestamp or time.time() * 1000), live_at=time.time())
+        for listener in self._trade_listeners:
+            try:
+                listener(snapshot.symbol, snapshot.last_price, snapshot.last_size, snapshot.trade_time)
+            except Exception as e:
+                self.logger.error(f"Trade listener failed for {symbol}: {e}")
+        return snapshot
+
+    def add_trade_listener(self, callback: Callable[[str, float, float, int], None]):
+        """Called with (symbol, price, size, timestamp) on every streamed trade"""
+        self._trade_listeners.append(callback)
+
+    def remove_trade_listener(self, callback: Callable[[str, float, float, int], None]):
+        # Rebind rather than mutate so a trade being dispatched keeps its listener list
+        self._trade_listeners = [listener for listener in self._trade_listeners if listener != callback]
+
+    def update_book(self, symbol: str, bids: List, asks: List, timestamp: int = 0):
+        bids = tuple((float(p), float(q)) for p, q in bids)
+        asks = tuple((float(p), float(q)) for p, q in asks)
+        changes = {'bids': bids, 'asks': asks, 'book_time': int(timestamp or time.time() * 1000),
+                   'live_at': time.time()}
+        if bids:
+            changes.update(best_bid=bids[0][0], best_bid_size=bids[0][1])
+        if asks:
+            changes.update(best_ask=asks[0][0], best_ask_size=asks[0][1])
+        return self._publish(symbol, **changes)
+
+    def update_ticker(self, symbol: str, ticker: Dict):
+        """24h statistics from a REST or stream ticker ({open, close, high, low, volume, amount, time})"""
+        open_24h = float(ticker.get('open', 0) or 0)
+        close = float(ticker.get('close', 0) or 0)
+        changes = {
+            'open_24h': open_24h,
+            'high_24h': float(ticker.get('high', 0) or 0),
+            'low_24h': float(ticker.get('low', 0) or 0),
+            'volume_24h': float(ticker.get('volume', 0) or 0),
+            'amount_24h': float(ticker.get('amount', 0) or 0),
+            'change_24h': ((close - open_24h) / open_24h * 100) if open_24h else 0.0,
+            'stats_time': int(ticker.get('time', 0) or time.time() * 1000)
+        }
+        return self._publish(symbol, **changes)
+
+    def update_tickers(self, tickers: List[Dict]):
+        """Bulk ticker snapshot: 24h stats plus the close as last price, aged by the ticker's own time"""
+        now = time.time()
+        for ticker in tickers:
+            symbol = ticker.get('symbol')
+            close = float(ticker.get('close', 0) or 0)
+            if not symbol or not close:
+                continue
+            stamped = int(ticker.get('time', 0) or now * 1000)
+            self.update_ticker(symbol, ticker)
+            current = self.get(symbol)
+            # Never overwrite a newer streamed trade with the ticker's close
+            if current.live_at and current.live_at > stamped / 1000:
+                continue
+            self._publish(symbol, last_price=close, trade_time=stamped, live_at=min(now, stamped / 1000))
+
+    def get(self, symbol: str) -> Optional[MarketSnapshot]:
+        """Latest snapshot for a symbol (lock-free)"""
+        return self._snapshots.get(normalize_symbol(symbol))
+
+    def last_price(self, symbol: str, max_age: float = None) -> float:
+        snapshot = self._snapshots.get(normalize_symbol(symbol))
+        if snapshot is None or not snapshot.last_price:
+            return 0.0
+        if max_age is not None and time.time() - snapshot.live_at > max_age:
+            return 0.0
+        return snapshot.last_price
+
+    def get_price(self, symbol: str, api=None, max_age: float = 30.0) -> float:
+        """Streamed price if fresh, otherwise one REST ticker call on a cold miss"""
+        price = self.last_price(symbol, max_age)
+        if price:
+            self.stats['hits'] += 1
+            return price
+        if api is None:
+            return 0.0
+        self.stats['rest_fallbacks'] += 1
+        try:
+            response = api.get_ticker_price(normalize_symbol(symbol))
+            if 'error' not in response:
+                return float(response.get('data', {}).get('price', 0) or 0)
+        except Exception as e:
+            self.logger.error(f"REST price fallback failed for {symbol}: {e}")
+        return 0.0
+
+    def symbols(self) -> List[str]:
+        return list(self._snapshots)
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, 'symbols': len(self._snapshots)}
+
+
+# Global market state shared by the websocket client, strategies, GUI and Telegram bot
+market_state = MarketState()
+
+# Other exchanges' streams get their own state: BTCUSDT on Bybit and BTC_USDT on Pionex normalize alike
+_market_states: Dict[str, MarketState] = {'pionex': market_state}
+_market_states_lock = threading.Lock()
+
+def get_market_state(exchange: str = 'pionex') -> MarketState:
+    state = _market_states.get(exchange)
+    if state is None:
+        with _market_states_lock:
+            state = _market_states.setdefault(exchange, MarketState())
+    return state
@@ -0,0 +1,315 @@
+import threading
+import time
+import logging
+import zlib
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+from market_state import normalize_symbol
+
+
+class _Side:
+    """One side of the book: a sorted key list plus a price -> size map.
+
+    Keys are stored so the best level is always at index 0 (bids use the
+    negated price). Size changes are a dict hit; adding or removing a level
+    is an O(log n) SortedList insert/remove.
+    """
+
+    def __init__(self, descending: bool):
+        self.sign = -1.0 if descending else 1.0
+        self.keys = SortedList()
+        self.sizes: Dict[float, float] = {}
+
+    def clear(self):
+        self.keys.clear()
+        self.sizes = {}
+
+    def set(self, price: float, size: float):
+        if size <= 0:
+            if self.sizes.pop(price, None) is not None:
+                self.keys.remove(self.sign * price)
+            return
+        if price not in self.sizes:
+            self.keys.add(self.sign * price)
+        self.sizes[price] = size
+
+    def best(self) -> Tuple[float, float]:
+        if not self.keys:
+            return 0.0, 0.0
+        price = self.sign * self.keys[0]
+        return price, self.sizes[price]
+
+    def levels(self, limit: int = None) -> List[Tuple[float, float]]:
+        keys = islice(self.keys, limit) if limit else self.keys
+        return [(self.sign * key, self.sizes[self.sign * key]) for key in keys]
+
+    def within(self, bound: float) -> List[Tuple[float, float]]:
+        """Levels at least as good as ``bound``"""
+        end = self.keys.bisect_right(self.sign * bound)
+        return self.levels(end) if end else []
+
+    def truncate(self, depth: int):
+        for key in self.keys[depth:]:
+            del self.sizes[self.sign * key]
+        del self.keys[depth:]
+
+
+class OrderBook:
+    """Local L2 replica for one symbol, kept current from snapshot + delta updates.
+
+    ``apply_snapshot`` replaces the book; ``apply_delta`` upserts levels (size
+    0 removes one) and enforces contiguous update ids. A gap marks the book
+    out of sync until the next snapshot so callers never trade on a book
+    with missing updates.
+    """
+
+    def __init__(self, symbol: str, exchange: str = 'pionex', max_depth: int = 500):
+        self.symbol = symbol
+        self.exchange = exchange
+        self.max_depth = max_depth
+        self.logger = logging.getLogger(__name__)
+        self._bids = _Side(descending=True)
+        self._asks = _Side(descending=False)
+        self._lock = threading.RLock()
+        self.sequence: Optional[int] = None
+        self.synced = False
+        self.timestamp = 0
+        self.updated_at = 0.0
+        self.stats = {'snapshots': 0, 'deltas': 0, 'gaps': 0, 'checksum_failures': 0}
+
+    def apply_snapshot(self, bids: List, asks: List, sequence: int = None, timestamp: int = 0):
+        with self._lock:
+            self._bids.clear()
+            self._asks.clear()
+            for price, size in bids:
+                self._bids.set(float(price), float(size))
+            for price, size in asks:
+                self._asks.set(float(price), float(size))
+            self.sequence = int(sequence) if sequence is not None else None
+            self.synced = True
+            self._touch(timestamp)
+            self.stats['snapshots'] += 1
+
+    def apply_delta(self, bids: List, asks: List, sequence: int = None, prev_sequence: int = None,
+                    timestamp: int = 0) -> bool:
+        """Apply an incremental update; returns False (and desyncs) when updates were missed"""
+        with self._lock:
+            if not self.synced:
+                return False
+            if sequence is not None and self.sequence is not None:
+                sequence = int(sequence)
+                if sequence <= self.sequence:
+                    return True  # Already applied
+                if prev_sequence is not None:
+                    contiguous = int(prev_sequence) == self.sequence
+                else:
+                    contiguous = sequence == self.sequence + 1
+                if not contiguous:
+                    self.synced = False
+                    self.stats['gaps'] += 1
+                    self.logger.warning(f"Order book gap on {self.exchange} {self.symbol}: "
+                                        f"{self.sequence} -> {sequence}, waiting for snapshot")
+                    return False
+            for price, size in bids:
+                self._bids.set(float(price), float(size))
+            for price, size in asks:
+                self._asks.set(float(price), float(size))
+            if sequence is not None:
+                self.sequence = int(sequence)
+            self._touch(timestamp)
+            self.stats['deltas'] += 1
+            return True
+
+    def _touch(self, timestamp: int):
+        if self.max_depth:
+            self._bids.truncate(self.max_depth)
+            self._asks.truncate(self.max_depth)
+        self.timestamp = int(timestamp or time.time() * 1000)
+        self.updated_at = time.time()
+
+    def invalidate(self):
+        """Mark the book unusable until the next snapshot"""
+        with self._lock:
+            self.synced = False
+
+    def checksum(self, levels: int = 25) -> int:
+        """CRC32 over interleaved top levels ("bid:size:ask:size:..."), as used by OKX-style feeds"""
+        with self._lock:
+            bids = self._bids.levels(levels)
+            asks = self._asks.levels(levels)
+        parts = []
+        for i in range(max(len(bids), len(asks))):
+            if i < len(bids):
+                parts.extend((f"{bids[i][0]:g}", f"{bids[i][1]:g}"))
+            if i < len(asks):
+                parts.extend((f"{asks[i][0]:g}", f"{asks[i][1]:g}"))
+        return zlib.crc32(':'.join(parts).encode()) & 0xffffffff
+
+    def verify_checksum(self, expected: int, levels: int = 25) -> bool:
+        if self.checksum(levels) == (int(expected) & 0xffffffff):
+            return True
+        self.stats['checksum_failures'] += 1
+        self.invalidate()
+        return False
+
+    def level_count(self) -> int:
+        """Levels available on the thinner side"""
+        return min(len(self._bids.keys), len(self._asks.keys))
+
+    def is_fresh(self, max_age: float = None) -> bool:
+        if not self.synced or not self._bids.keys or not self._asks.keys:
+            return False
+        return max_age is None or time.time() - self.updated_at <= max_age
+
+    # ----- Queries -----
+
+    def best_bid(self) -> Tuple[float, float]:
+        with self._lock:
+            return self._bids.best()
+
+    def best_ask(self) -> Tuple[float, float]:
+        with self._lock:
+            return self._asks.best()
+
+    def mid_price(self) -> float:
+        with self._lock:
+            bid, _ = self._bids.best()
+            ask, _ = self._asks.best()
+        return (bid + ask) / 2 if bid and ask else 0.0
+
+    def spread(self) -> float:
+        with self._lock:
+            bid, _ = self._bids.best()
+            ask, _ = self._asks.best()
+        return ask - bid if bid and ask else 0.0
+
+    def spread_pct(self) -> float:
+        mid = self.mid_price()
+        return self.spread() / mid * 100 if mid else 0.0
+
+    def depth_within(self, percentage: float) -> Dict:
+        """Size and notional resting within ``percentage``% of the mid on each side"""
+        with self._lock:
+            mid = self.mid_price()
+            if not mid:
+                return {'bid_size': 0.0, 'ask_size': 0.0, 'bid_notional': 0.0, 'ask_notional': 0.0}
+            bids = self._bids.within(mid * (1 - percentage / 100))
+            asks = self._asks.within(mid * (1 + percentage / 100))
+        return {
+            'bid_size': sum(size for _, size in bids),
+            'ask_size': sum(size for _, size in asks),
+            'bid_notional': sum(price * size for price, size in bids),
+            'ask_notional': sum(price * size for price, size in asks)
+        }
+
+    def imbalance(self, levels: int = 10) -> float:
+        """(bid size - ask size) / total over the top ``levels``; +1 is all bids, -1 all asks"""
+        with self._lock:
+            bid_size = sum(size for _, size in self._bids.levels(levels))
+            ask_size = sum(size for _, size in self._asks.levels(levels))
+        total = bid_size + ask_size
+        return (bid_size - ask_size) / total if total else 0.0
+
+    def estimate_fill(self, side: str, notional: float) -> Dict:
+        """Walk the book for a market order of ``notional`` quote value; returns VWAP and slippage vs touch"""
+        with self._lock:
+            levels = self._asks.levels() if side.upper() in ('BUY', 'LONG') else self._bids.levels()
+        if not levels:
+            return {'filled': False, 'error': 'Empty book'}
+        remaining = notional
+        cost = 0.0
+        quantity = 0.0
+        for price, size in levels:
+            take = min(size, remaining / price)
+            cost += take * price
+            quantity += take
+            remaining -= take * price
+            if remaining <= 1e-12:
+                break
+        vwap = cost / quantity if quantity else 0.0
+        touch = levels[0][0]
+        return {
+            'filled': remaining <= 1e-9,
+            'vwap': vwap,
+            'quantity': quantity,
+            'slippage_pct': abs(vwap - touch) / touch * 100 if touch else 0.0
+        }
+
+    def to_dict(self, limit: int = 20) -> Dict:
+        with self._lock:
+            bids = self._bids.levels(limit)
+            asks = self._asks.levels(limit)
+            mid, spread, imbalance = self.mid_price(), self.spread(), self.imbalance()
+        return {
+            'symbol': self.symbol,
+            'bids': [[price, size] for price, size in bids],
+            'asks': [[price, size] for price, size in asks],
+            'timestamp': self.timestamp,
+            'sequence': self.sequence,
+            'synced': self.synced,
+            'mid': mid,
+            'spread': spread,
+            'imbalance': imbalance
+        }
+
+
+# Local books shared by the streaming clients, strategies and GUI
+order_books: Dict[Tuple[str, str], OrderBook] = {}
+_order_books_lock = threading.Lock()
+
+def get_order_book(symbol: str, exchange: str = 'pionex') -> OrderBook:
+    """Return (creating on first use) the local book for ``symbol`` on ``exchange``"""
+    symbol = normalize_symbol(symbol) if exchange == 'pionex' else symbol.upper()
+    book = order_books.get((exchange, symbol))
+    if book is None:
+        with _order_books_lock:
+            book = order_books.setdefault((exchange, symbol), OrderBook(symbol, exchange))
+    return book
+
+def find_order_book(symbol: str, exchange: str = 'pionex', max_age: float = None) -> Optional[OrderBook]:
+    """Existing book only if it is in sync and fresher than ``max_age``"""
+    symbol = normalize_symbol(symbol) if exchange == 'pionex' else symbol.upper()
+    book = order_books.get((exchange, symbol))
+    return book if book is not None and book.is_fresh(max_age) else None
+
+
+def benchmark(levels: int = 1000, updates: int = 200000):
+    """Delta throughput and query latency on a deep synthetic book"""
+    import random
+    rng = random.Random(7)
+    book = OrderBook('BENCH_USDT', max_depth=0)
+    mid = 30000.0
+    book.apply_snapshot([[mid - 0.5 - i * 0.5, 1.0] for i in range(levels)],
+                        [[mid + 0.5 + i * 0.5, 1.0] for i in range(levels)], sequence=0)
+    deltas = []
+    for seq in range(1, updates + 1):
+        offset = rng.randint(0, levels) * 0.5
+        size = 0.0 if rng.random() < 0.3 else rng.random() * 3
+        if rng.random() < 0.5:
+            deltas.append(([[mid - 0.5 - offset, size]], [], seq))
+        else:
+            deltas.append(([], [[mid + 0.5 + offset, size]], seq))
+
+    started = time.perf_counter()
+    for bids, asks, seq in deltas:
+        book.apply_delta(bids, asks, sequence=seq)
+    elapsed = time.perf_counter() - started
+    print(f"{updates} deltas on a {levels}-level book: {elapsed:.2f}s "
+          f"({elapsed / updates * 1e6:.2f} us/update)")
+
+    for name, query in (('best bid/ask', lambda: (book.best_bid(), book.best_ask())),
+                        ('mid/spread', lambda: (book.mid_price(), book.spread())),
+                        ('depth within 0.5%', lambda: book.depth_within(0.5)),
+                        ('imbalance top 10', lambda: book.imbalance(10)),
+                        ('fill 50k USDT', lambda: book.estimate_fill('BUY', 50000))):
+        started = time.perf_counter()
+        for _ in range(10000):
+            query()
+        print(f"  {name:<18} {(time.perf_counter() - started) / 10000 * 1e6:8.2f} us")
+
+
+if __name__ == '__main__':
+    benchmark()
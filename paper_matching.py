@@ -0,0 +1,540 @@
+import heapq
+import itertools
+import threading
+import time
+import logging
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from config_loader import get_config
+
+ORDER_TYPES = ('MARKET', 'LIMIT', 'STOP', 'TAKE_PROFIT', 'TRAILING_STOP')
+
+
+class PaperOrder:
+    """One simulated order; ``price`` is the limit price or trigger level"""
+    __slots__ = ('order_id', 'account_id', 'symbol', 'side', 'order_type', 'size', 'price', 'trail',
+                 'reduce_only', 'oco', 'status', 'created_ts', 'active_ts', 'fill_price', 'fill_ts',
+                 'fee', 'reason', 'bracket')
+
+    def __init__(self, order_id: int, account_id: str, symbol: str, side: str, order_type: str, size: float,
+                 price: float = 0.0, trail: float = 0.0, reduce_only: bool = False, oco: int = None):
+        self.order_id = order_id
+        self.account_id = account_id
+        self.symbol = symbol
+        self.side = side
+        self.order_type = order_type
+        self.size = size
+        self.price = price
+        self.trail = trail
+        self.reduce_only = reduce_only
+        self.oco = oco
+        self.status = 'PENDING'
+        self.created_ts = 0
+        self.active_ts = 0
+        self.fill_price = 0.0
+        self.fill_ts = 0
+        self.fee = 0.0
+        self.reason = ''
+        self.bracket = None  # (stop_loss, take_profit, trail) placed once this entry fills
+
+    def to_dict(self) -> Dict:
+        return {
+            'order_id': self.order_id, 'account_id': self.account_id, 'symbol': self.symbol,
+            'side': self.side, 'type': self.order_type, 'size': self.size, 'price': self.price,
+            'trail': self.trail, 'reduce_only': self.reduce_only, 'oco': self.oco, 'status': self.status,
+            'fill_price': self.fill_price, 'fill_ts': self.fill_ts, 'fee': self.fee, 'reason': self.reason
+        }
+
+
+class PaperPosition:
+    """Net position per account and symbol; size is signed (negative = short)"""
+    __slots__ = ('size', 'entry_price', 'realized_pnl')
+
+    def __init__(self):
+        self.size = 0.0
+        self.entry_price = 0.0
+        self.realized_pnl = 0.0
+
+
+class PaperAccount:
+    def __init__(self, account_id: str, balance: float, leverage: float = 1.0):
+        self.account_id = account_id
+        self.balance = balance
+        self.starting_balance = balance
+        self.leverage = leverage
+        self.fees_paid = 0.0
+        self.positions: Dict[str, PaperPosition] = {}
+        self.open_orders: Dict[int, PaperOrder] = {}
+        self.fills: List[Dict] = []
+
+    def apply_fill(self, symbol: str, side: str, size: float, price: float, fee: float) -> float:
+        """Update the net position and cash balance; returns the realized PnL of the fill"""
+        position = self.positions.setdefault(symbol, PaperPosition())
+        signed = size if side == 'BUY' else -size
+        realized = 0.0
+        if position.size and (position.size > 0) != (signed > 0):
+            closed = min(abs(signed), abs(position.size))
+            direction = 1 if position.size > 0 else -1
+            realized = (price - position.entry_price) * closed * direction
+            position.size += closed * -direction
+            signed += closed * direction
+            if abs(position.size) < 1e-12:
+                position.size = 0.0
+                position.entry_price = 0.0
+        if abs(signed) > 1e-12:
+            total = position.size + signed
+            position.entry_price = (position.entry_price * position.size + price * signed) / total
+            position.size = total
+        position.realized_pnl += realized
+        self.balance += realized - fee
+        self.fees_paid += fee
+        return realized
+
+    def equity(self, prices: Dict[str, float]) -> float:
+        unrealized = sum(p.size * (prices.get(s, p.entry_price) - p.entry_price) for s, p in self.positions.items())
+        return self.balance + unrealized
+
+    def summary(self, prices: Dict[str, float]) -> Dict:
+        return {
+            'account_id': self.account_id,
+            'balance': self.balance,
+            'equity': self.equity(prices),
+            'fees_paid': self.fees_paid,
+            'open_orders': len(self.open_orders),
+            'positions': {s: {'size': p.size, 'entry_price': p.entry_price, 'realized_pnl': p.realized_pnl}
+                          for s, p in self.positions.items() if p.size},
+            'fills': len(self.fills)
+        }
+
+
+class _SymbolBook:
+    """Resting orders for one symbol.
+
+    Orders that fire when the price falls to their level (buy limits, sell
+    stops, buy take-profits) sit in a max-heap; the mirror image in a
+    min-heap, so a tick only looks at the two heap tops and every fill costs
+    one O(log n) pop. Cancelled orders are dropped lazily when they surface.
+
+    Trailing stops with the same trail distance are kept as pools of orders
+    sharing one high-water mark, in a deque ordered by that mark: a new
+    extreme merges pools at one end, triggers pop pools at the other, so
+    ratcheting thousands of trailing stops is amortized O(1) per tick.
+    """
+    __slots__ = ('symbol', 'falling', 'rising', 'trailing', 'pending', 'last_price', 'last_ts')
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.falling: List[Tuple[float, int, PaperOrder]] = []
+        self.rising: List[Tuple[float, int, PaperOrder]] = []
+        # (sign, trail) -> deque of [extreme, orders], ascending extreme in sign-adjusted price
+        self.trailing: Dict[Tuple[int, float], deque] = {}
+        self.pending: deque = deque()  # Orders waiting out the simulated latency, FIFO by active_ts
+        self.last_price = 0.0
+        self.last_ts = 0
+
+
+class PaperMatchingEngine:
+    """In-process matching simulator for paper trading.
+
+    Fed trade ticks (``on_tick``) or 1 s bars (``on_bar``) from a live stream
+    or a replay, it holds any number of paper accounts with market, limit,
+    stop, take-profit and trailing-stop orders. Orders become active after a
+    simulated latency; resting limits fill at their price with the maker fee,
+    triggered and market orders fill at the tick price with adverse slippage
+    and the taker fee. Entries can carry a stop-loss/take-profit/trailing
+    bracket that is placed as one-cancels-other exits when the entry fills.
+    """
+
+    def __init__(self, maker_fee: float = 0.0002, taker_fee: float = 0.00055, slippage_bps: float = 2.0,
+                 latency_ms: int = 50, starting_balance: float = 10000.0):
+        self.logger = logging.getLogger(__name__)
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.slippage = slippage_bps / 10000
+        self.latency_ms = latency_ms
+        self.starting_balance = starting_balance
+        self.accounts: Dict[str, PaperAccount] = {}
+        self._books: Dict[str, _SymbolBook] = {}
+        self._orders: Dict[int, PaperOrder] = {}
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._lock = threading.RLock()
+        self._listeners: List[Callable[[Dict], None]] = []
+        self.stats = {'ticks': 0, 'fills': 0, 'rejected': 0, 'tick_time': 0.0, 'max_tick_time': 0.0}
+
+    # Accounts and orders
+
+    def get_account(self, account_id: str, balance: float = None, leverage: float = 1.0) -> PaperAccount:
+        with self._lock:
+            account = self.accounts.get(account_id)
+            if account is None:
+                account = PaperAccount(account_id, self.starting_balance if balance is None else balance, leverage)
+                self.accounts[account_id] = account
+            return account
+
+    def _book(self, symbol: str) -> _SymbolBook:
+        book = self._books.get(symbol)
+        if book is None:
+            book = self._books[symbol] = _SymbolBook(symbol)
+        return book
+
+    def submit_order(self, account_id: str, symbol: str, side: str, order_type: str, size: float,
+                     price: float = 0.0, trail: float = 0.0, reduce_only: bool = None,
+                     stop_loss: float = None, take_profit: float = None, trailing: float = None,
+                     timestamp: int = None) -> Dict:
+        """Queue an order; it becomes active ``latency_ms`` after ``timestamp`` (default: the symbol's last tick)"""
+        side, order_type = side.upper(), order_type.upper()
+        if side not in ('BUY', 'SELL'):
+            return {'error': f'Invalid side: {side}'}
+        if order_type not in ORDER_TYPES:
+            return {'error': f'Invalid order type: {order_type}'}
+        if size <= 0:
+            return {'error': 'Order size must be positive'}
+        if order_type in ('LIMIT', 'STOP', 'TAKE_PROFIT') and price <= 0:
+            return {'error': f'{order_type} order needs a price'}
+        if order_type == 'TRAILING_STOP' and not 0 < trail < 1:
+            return {'error': 'Trailing stop needs a trail fraction between 0 and 1'}
+        if reduce_only is None:
+            reduce_only = order_type in ('STOP', 'TAKE_PROFIT', 'TRAILING_STOP')
+        with self._lock:
+            account = self.get_account(account_id)
+            book = self._book(symbol)
+            order = PaperOrder(next(self._ids), account_id, symbol, side, order_type, size, price, trail, reduce_only)
+            if stop_loss or take_profit or trailing:
+                order.bracket = (stop_loss, take_profit, trailing)
+            order.created_ts = book.last_ts if timestamp is None else timestamp
+            order.active_ts = order.created_ts + self.latency_ms
+            self._orders[order.order_id] = order
+            account.open_orders[order.order_id] = order
+            book.pending.append(order)
+            return {'success': True, 'order_id': order.order_id, 'active_ts': order.active_ts}
+
+    def cancel_order(self, account_id: str, order_id: int) -> Dict:
+        with self._lock:
+            order = self._orders.get(order_id)
+            if order is None or order.account_id != account_id:
+                return {'error': f'Unknown order: {order_id}'}
+            if order.status not in ('PENDING', 'NEW'):
+                return {'error': f'Order {order_id} is {order.status}'}
+            self._close(order, 'CANCELED', 'cancelled')
+            return {'success': True, 'order_id': order_id}
+
+    def cancel_all(self, account_id: str, symbol: str = None) -> int:
+        with self._lock:
+            account = self.accounts.get(account_id)
+            if account is None:
+                return 0
+            orders = [o for o in account.open_orders.values() if symbol is None or o.symbol == symbol]
+            for order in orders:
+                self._close(order, 'CANCELED', 'cancelled')
+            return len(orders)
+
+    def get_open_orders(self, account_id: str, symbol: str = None) -> List[Dict]:
+        with self._lock:
+            account = self.accounts.get(account_id)
+            if account is None:
+                return []
+            return [o.to_dict() for o in account.open_orders.values() if symbol is None or o.symbol == symbol]
+
+    def add_fill_listener(self, callback: Callable[[Dict], None]):
+        self._listeners.append(callback)
+
+    def _close(self, order: PaperOrder, status: str, reason: str):
+        order.status = status
+        order.reason = reason
+        account = self.accounts.get(order.account_id)
+        if account:
+            account.open_orders.pop(order.order_id, None)
+        # Resting entries stay in the heaps and are skipped when they surface
+        self._orders.pop(order.order_id, None)
+
+    # Matching
+
+    def _rest(self, book: _SymbolBook, order: PaperOrder):
+        if order.order_type == 'TRAILING_STOP':
+            sign = 1 if order.side == 'SELL' else -1
+            pools = book.trailing.setdefault((sign, order.trail), deque())
+            x = sign * book.last_price
+            self._ratchet(pools, x)
+            if pools and pools[0][0] == x:
+                pools[0][1].append(order)
+            else:
+                pools.appendleft([x, [order]])
+            order.price = book.last_price * (1 - sign * order.trail)
+            return
+        # Sell stops, buy limits and buy take-profits fire on the way down
+        falling = (order.side == 'BUY') != (order.order_type == 'STOP')
+        if falling:
+            heapq.heappush(book.falling, (-order.price, next(self._seq), order))
+        else:
+            heapq.heappush(book.rising, (order.price, next(self._seq), order))
+
+    @staticmethod
+    def _ratchet(pools: deque, x: float):
+        """Merge every pool whose extreme the price has just passed into one pool at ``x``"""
+        if pools and pools[0][0] <= x:
+            merged = []
+            while pools and pools[0][0] <= x:
+                merged.extend(pools.popleft()[1])
+            pools.appendleft([x, merged])
+
+    def _triggered(self, order: PaperOrder, price: float) -> bool:
+        falling = (order.side == 'BUY') != (order.order_type == 'STOP')
+        return price <= order.price if falling else price >= order.price
+
+    def _activate(self, book: _SymbolBook, order: PaperOrder, fills: List[Dict]):
+        if order.status != 'PENDING':
+            return
+        order.status = 'NEW'
+        price = book.last_price
+        if order.order_type == 'MARKET':
+            self._fill(book, order, price, True, fills)
+        elif order.order_type != 'TRAILING_STOP' and self._triggered(order, price):
+            # Marketable on arrival: a limit takes liquidity, capped at its price
+            if order.order_type == 'LIMIT':
+                fill = min(price * (1 + self.slippage), order.price) if order.side == 'BUY' else \
+                    max(price * (1 - self.slippage), order.price)
+                self._fill(book, order, fill, True, fills, slip=False)
+            else:
+                self._fill(book, order, price, True, fills)
+        else:
+            self._rest(book, order)
+
+    def _fill(self, book: _SymbolBook, order: PaperOrder, price: float, taker: bool, fills: List[Dict],
+              slip: bool = True):
+        if order.status != 'NEW':
+            return
+        account = self.accounts[order.account_id]
+        position = account.positions.get(order.symbol)
+        size = order.size
+        if order.reduce_only:
+            held = position.size if position else 0.0
+            if not held or (held > 0) == (order.side == 'BUY'):
+                self._close(order, 'CANCELED', 'no position to reduce')
+                return
+            size = min(size, abs(held))
+        elif order.size * price > account.balance * account.leverage:
+            self._close(order, 'REJECTED', 'insufficient margin')
+            self.stats['rejected'] += 1
+            return
+        if taker and slip:
+            price = price * (1 + self.slippage) if order.side == 'BUY' else price * (1 - self.slippage)
+        fee = size * price * (self.taker_fee if taker else self.maker_fee)
+        realized = account.apply_fill(order.symbol, order.side, size, price, fee)
+        order.size = size
+        order.fill_price = price
+        order.fill_ts = book.last_ts
+        order.fee = fee
+        self._close(order, 'FILLED', 'taker' if taker else 'maker')
+        self.stats['fills'] += 1
+        fill = {**order.to_dict(), 'realized_pnl': realized, 'balance': account.balance}
+        account.fills.append(fill)
+        fills.append(fill)
+        if order.oco is not None:
+            for sibling in [o for o in account.open_orders.values() if o.oco == order.oco]:
+                self._close(sibling, 'CANCELED', 'oco')
+        if order.bracket:
+            self._place_bracket(book, order, fills)
+
+    def _place_bracket(self, book: _SymbolBook, entry: PaperOrder, fills: List[Dict]):
+        """Exit orders live on the exchange side, so they rest immediately without latency"""
+        stop_loss, take_profit, trailing = entry.bracket
+        exit_side = 'SELL' if entry.side == 'BUY' else 'BUY'
+        account = self.accounts[entry.account_id]
+        for order_type, price, trail in (('STOP', stop_loss, 0.0), ('TAKE_PROFIT', take_profit, 0.0),
+                                         ('TRAILING_STOP', 0.0, trailing)):
+            if not (price or trail):
+                continue
+            order = PaperOrder(next(self._ids), entry.account_id, entry.symbol, exit_side, order_type,
+                               entry.size, price or 0.0, trail or 0.0, True, oco=entry.order_id)
+            order.created_ts = order.active_ts = book.last_ts
+            order.status = 'NEW'
+            self._orders[order.order_id] = order
+            account.open_orders[order.order_id] = order
+            if order_type != 'TRAILING_STOP' and self._triggered(order, book.last_price):
+                self._fill(book, order, book.last_price, True, fills)
+            else:
+                self._rest(book, order)
+
+    def _match(self, book: _SymbolBook, price: float, fills: List[Dict]):
+        # Snapshot: a filled trailing entry can rest its bracket under a new (sign, trail) key
+        for (sign, trail), pools in list(book.trailing.items()):
+            x = sign * price
+            self._ratchet(pools, x)
+            factor = 1 - trail if sign > 0 else 1 + trail
+            while pools and x <= pools[-1][0] * factor:
+                for order in pools.pop()[1]:
+                    self._fill(book, order, price, True, fills)
+        falling, rising = book.falling, book.rising
+        while falling and -falling[0][0] >= price:
+            order = heapq.heappop(falling)[2]
+            if order.order_type == 'LIMIT':
+                self._fill(book, order, order.price, False, fills)
+            else:
+                self._fill(book, order, price, True, fills)
+        while rising and rising[0][0] <= price:
+            order = heapq.heappop(rising)[2]
+            if order.order_type == 'LIMIT':
+                self._fill(book, order, order.price, False, fills)
+            else:
+                self._fill(book, order, price, True, fills)
+
+    def on_tick(self, symbol: str, price: float, size: float = 0.0, timestamp: int = None) -> List[Dict]:
+        """Process one trade tick; returns the fills it produced"""
+        if price <= 0:
+            return []
+        started = time.perf_counter()
+        fills: List[Dict] = []
+        with self._lock:
+            book = self._book(symbol)
+            book.last_price = price
+            book.last_ts = int(time.time() * 1000) if timestamp is None else int(timestamp)
+            pending = book.pending
+            while pending and pending[0].active_ts <= book.last_ts:
+                self._activate(book, pending.popleft(), fills)
+            self._match(book, price, fills)
+            elapsed = time.perf_counter() - started
+            self.stats['ticks'] += 1
+            self.stats['tick_time'] += elapsed
+            if elapsed > self.stats['max_tick_time']:
+                self.stats['max_tick_time'] = elapsed
+        for fill in fills:
+            for listener in self._listeners:
+                try:
+                    listener(fill)
+                except Exception as e:
+                    self.logger.error(f"Paper fill listener failed: {e}")
+        return fills
+
+    def on_bar(self, symbol: str, open_: float, high: float, low: float, close: float, timestamp: int,
+               duration_ms: int = 1000) -> List[Dict]:
+        """Replay a bar as four ticks: open, the nearer extreme first, then close"""
+        path = (open_, low, high, close) if close >= open_ else (open_, high, low, close)
+        fills = []
+        for step, price in enumerate(path):
+            fills.extend(self.on_tick(symbol, price, 0.0, timestamp + step * duration_ms // 4))
+        return fills
+
+    def replay(self, ticks: Iterable[Tuple[str, float, float, int]]) -> List[Dict]:
+        """Feed recorded (symbol, price, size, timestamp) ticks"""
+        fills = []
+        for symbol, price, size, timestamp in ticks:
+            fills.extend(self.on_tick(symbol, price, size, timestamp))
+        return fills
+
+    def attach(self, market_state=None):
+        """Consume live trades from the shared market state (fed by the Pionex stream)"""
+        if market_state is None:
+            from market_state import market_state
+        market_state.add_trade_listener(self.on_tick)
+
+    def last_prices(self) -> Dict[str, float]:
+        return {symbol: book.last_price for symbol, book in self._books.items()}
+
+    def get_account_summary(self, account_id: str) -> Dict:
+        with self._lock:
+            account = self.accounts.get(account_id)
+            if account is None:
+                return {'error': f'Unknown paper account: {account_id}'}
+            return account.summary(self.last_prices())
+
+    def get_stats(self) -> Dict:
+        ticks = self.stats['ticks']
+        return {
+            'ticks': ticks,
+            'fills': self.stats['fills'],
+            'rejected': self.stats['rejected'],
+            'accounts': len(self.accounts),
+            'open_orders': len(self._orders),
+            'avg_tick_us': round(self.stats['tick_time'] / ticks * 1e6, 2) if ticks else 0.0,
+            'max_tick_us': round(self.stats['max_tick_time'] * 1e6, 2)
+        }
+
+
+def engine_from_config(config: Dict = None) -> PaperMatchingEngine:
+    config = config if config is not None else get_config()
+    settings = config.get('backtesting', {}).get('paper_engine', {})
+    return PaperMatchingEngine(
+        maker_fee=settings.get('maker_fee', 0.0002),
+        taker_fee=settings.get('taker_fee', 0.00055),
+        slippage_bps=settings.get('slippage_bps', 2.0),
+        latency_ms=settings.get('latency_ms', 50),
+        starting_balance=settings.get('starting_balance', 10000.0)
+    )
+
+
+# Shared engine for paper accounts fed by the live market state
+_shared_engine = None
+_shared_engine_lock = threading.Lock()
+
+def get_paper_engine() -> PaperMatchingEngine:
+    global _shared_engine
+    with _shared_engine_lock:
+        if _shared_engine is None:
+            _shared_engine = engine_from_config()
+            _shared_engine.attach()
+        return _shared_engine
+
+
+def _check_trailing_entry_bracket():
+    """A trailing-stop entry whose fill rests a trailing exit under a new trail must not break matching"""
+    engine = PaperMatchingEngine(latency_ms=0, starting_balance=100_000.0)
+    engine.on_tick('BTCUSDT', 100.0, 0.0, 0)
+    engine.submit_order('a', 'BTCUSDT', 'BUY', 'TRAILING_STOP', 1.0, trail=0.01, reduce_only=False, trailing=0.02)
+    engine.submit_order('b', 'BTCUSDT', 'BUY', 'TRAILING_STOP', 1.0, trail=0.01, reduce_only=False)
+    engine.on_tick('BTCUSDT', 100.0, 0.0, 1)
+    fills = engine.on_tick('BTCUSDT', 102.0, 0.0, 2)
+    exits = engine.get_open_orders('a')
+    assert len(fills) == 2, fills
+    assert [o['type'] for o in exits] == ['TRAILING_STOP'] and exits[0]['side'] == 'SELL', exits
+
+
+def benchmark(accounts: int = 5000, ticks: int = 100_000):
+    """Many paper accounts with resting brackets on one symbol: processing time per tick"""
+    import random
+    _check_trailing_entry_bracket()
+    rng = random.Random(7)
+    engine = PaperMatchingEngine(latency_ms=50, starting_balance=100_000.0)
+    price, timestamp = 30000.0, 0
+    engine.on_tick('BTCUSDT', price, 0.0, timestamp)
+    for i in range(accounts):
+        side = 'BUY' if i % 2 == 0 else 'SELL'
+        entry = price * (1 + rng.uniform(-0.01, 0.01))
+        direction = 1 if side == 'BUY' else -1
+        engine.submit_order(f'acct{i}', 'BTCUSDT', side, 'LIMIT', 0.01, entry,
+                            stop_loss=entry * (1 - direction * rng.uniform(0.005, 0.02)),
+                            take_profit=entry * (1 + direction * rng.uniform(0.005, 0.03)),
+                            trailing=rng.choice((0.01, 0.02)) if i % 3 == 0 else None)
+    # The first tick after the latency activates every queued order at once
+    timestamp += 100
+    started = time.perf_counter()
+    engine.on_tick('BTCUSDT', price, 0.01, timestamp)
+    activation = time.perf_counter() - started
+    durations, busiest = [], (0, 0.0)
+    for _ in range(ticks):
+        timestamp += 100
+        price *= 1 + rng.gauss(0, 0.0004)
+        started = time.perf_counter()
+        fills = engine.on_tick('BTCUSDT', price, 0.01, timestamp)
+        elapsed = time.perf_counter() - started
+        durations.append(elapsed)
+        if elapsed > busiest[1]:
+            busiest = (len(fills), elapsed)
+        # Accounts re-enter as their brackets close, keeping thousands of orders resting
+        if engine.stats['fills'] and len(engine._orders) < accounts:
+            i = rng.randrange(accounts)
+            side = 'BUY' if i % 2 == 0 else 'SELL'
+            direction = 1 if side == 'BUY' else -1
+            engine.submit_order(f'acct{i}', 'BTCUSDT', side, 'MARKET', 0.01,
+                                stop_loss=price * (1 - direction * 0.01), take_profit=price * (1 + direction * 0.02))
+    durations.sort()
+    stats = engine.get_stats()
+    print(f"{accounts} accounts, {ticks} ticks, {stats['fills']} fills, {stats['open_orders']} orders resting")
+    print(f"activating {accounts} queued orders on one tick: {activation * 1000:.1f} ms")
+    print(f"per tick: mean {sum(durations) / ticks * 1e6:.1f} us, p50 {durations[ticks // 2] * 1e6:.1f} us, "
+          f"p99 {durations[int(ticks * 0.99)] * 1e6:.1f} us, max {busiest[1] * 1e6:.1f} us ({busiest[0]} fills)")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -5,8 +5,12 @@ Bybit Paper Trading Bot - Works Without Private API Access
 
 import time
 import logging
+import threading
 from datetime import datetime
 from bybit_api_v5_fixed import BybitAPIV5
+from paper_matching import engine_from_config
+from bybit_ws import get_bybit_orderbook_stream
+from market_state import get_market_state, normalize_symbol
 
 # Set up logging
 logging.basicConfig(
@@ -21,16 +25,25 @@ class PaperTradingBot:
         self.api_secret = api_secret
         self.api = BybitAPIV5(api_key, api_secret, testnet=False)
         
-        # Paper trading state
-        self.is_running = False
-        self.paper_balance = 10000.0  # Start with $10,000 paper money
-        self.positions = {}
-        self.orders = []
-        self.trade_history = []
-        
         # Trading configuration
         self.max_position_size = 0.02  # 2% of balance
         self.default_leverage = 3
+        self.max_entries_per_symbol = 3
+        self.tick_interval = 1.0  # Seconds between REST price polls for symbols without fresh streamed trades
+        self.stream_max_age = 5.0  # Streamed price older than this falls back to the REST poll
+        
+        # Paper trading state: orders, positions and fills live in the local matching simulator
+        self.is_running = False
+        self.engine = engine_from_config()
+        self.account_id = 'paper'
+        self.account = self.engine.get_account(self.account_id, 10000.0, self.default_leverage)  # $10,000 paper money
+        self.engine.add_fill_listener(self._on_fill)
+        self.trade_history = []
+        self._strategies = {}  # Entry order id -> strategy name
+        self._feed_thread = None
+        self._stream = None
+        self._streamed = {}  # Stream symbol -> bot symbol fed to the simulator
+        self.market_state = get_market_state('bybit')
         self.stop_loss_percentage = 1.0
         self.take_profit_percentage = 2.0
         self.max_daily_loss = 2.0
@@ -48,6 +61,12 @@ class PaperTradingBot:
         """Start paper trading"""
         self.is_running = True
         logger.info("Paper trading bot started")
+        # Streamed Bybit trades drive stops and targets; the REST poll covers symbols the stream doesn't
+        self.market_state.add_trade_listener(self._on_trade)
+        self._stream = get_bybit_orderbook_stream()
+        if self._feed_thread is None or not self._feed_thread.is_alive():
+            self._feed_thread = threading.Thread(target=self._tick_feed, name='paper-tick-feed', daemon=True)
+            self._feed_thread.start()
         
         while self.is_running:
             try:
@@ -57,13 +76,10 @@ class PaperTradingBot:
                 # Generate trading signals
                 signals = self._generate_trading_signals()
                 
-                # Execute paper trades
+                # Execute paper trades; exits are handled tick by tick in the simulator
                 for signal in signals:
                     self._execute_paper_trade(signal)
                 
-                # Manage existing positions
-                self._manage_paper_positions()
-                
                 # Wait before next iteration
                 time.sleep(30)  # 30 second intervals
                 
@@ -77,6 +93,7 @@ class PaperTradingBot:
     def stop_trading(self):
         """Stop paper trading"""
         self.is_running = False
+        self.market_state.remove_trade_listener(self._on_trade)
         logger.info("Paper trading bot stopped")
     
     def _update_market_data(self):
@@ -162,8 +179,12 @@ class PaperTradingBot:
         
         return signals
     
+    @property
+    def paper_balance(self) -> float:
+        return self.account.balance
+    
     def _execute_paper_trade(self, signal):
-        """Execute a paper trade based on signal"""
+        """Submit a paper market entry with its stop-loss/take-profit bracket"""
         try:
             symbol = signal['symbol']
             side = signal['side']
@@ -171,118 +192,110 @@ class PaperTradingBot:
             price = signal['price']
             strength = signal['strength']
             
-            # Check if we already have a position
-            if symbol in self.positions:
-                logger.info(f"Already have position in {symbol}, skipping signal")
+            # Each open entry keeps its own bracket; cap how many can stack on one symbol
+            open_orders = self.engine.get_open_orders(self.account_id, symbol)
+            entries = {o['order_id'] if not o['reduce_only'] else o['oco'] for o in open_orders}
+            if len(entries) >= self.max_entries_per_symbol:
+                logger.info(f"Already have {self.max_entries_per_symbol} entries in {symbol}, skipping signal")
                 return
             
             # Calculate position size
             position_value = self.paper_balance * self.max_position_size * strength
             quantity = position_value / price
+            direction = 1 if side == 'Buy' else -1
             
-            # Create paper position
-            position = {
-                'symbol': symbol,
-                'side': side,
-                'quantity': quantity,
-                'entry_price': price,
-                'entry_time': datetime.now(),
-                'strategy': strategy,
-                'stop_loss': price * (1 - self.stop_loss_percentage/100) if side == 'Buy' else price * (1 + self.stop_loss_percentage/100),
-                'take_profit': price * (1 + self.take_profit_percentage/100) if side == 'Buy' else price * (1 - self.take_profit_percentage/100),
-                'leverage': self.default_leverage
-            }
-            
-            self.positions[symbol] = position
-            
-            # Record trade
-            trade = {
-                'time': datetime.now(),
-                'symbol': symbol,
-                'side': side,
-                'quantity': quantity,
-                'price': price,
-                'strategy': strategy,
-                'type': 'OPEN'
-            }
-            self.trade_history.append(trade)
+            result = self.engine.submit_order(
+                self.account_id, symbol, side, 'MARKET', quantity,
+                stop_loss=price * (1 - direction * self.stop_loss_percentage / 100),
+                take_profit=price * (1 + direction * self.take_profit_percentage / 100),
+                timestamp=int(time.time() * 1000)
+            )
+            if 'error' in result:
+                logger.warning(f"Paper order rejected: {result['error']}")
+                return
+            self._strategies[result['order_id']] = strategy
+            self._stream_symbol(symbol)
             
-            logger.info(f"PAPER TRADE: {side} {quantity} {symbol} @ ${price:.2f} via {strategy}")
+            logger.info(f"PAPER ORDER: {side} {quantity} {symbol} @ ~${price:.2f} via {strategy}")
             
         except Exception as e:
             logger.error(f"Error executing paper trade: {e}")
     
+    def _stream_symbol(self, symbol: str):
+        """Subscribe the symbol's trades so every streamed tick reaches the simulator"""
+        stream_symbol = normalize_symbol(symbol)
+        if self._stream is None or stream_symbol in self._streamed:
+            return
+        self._streamed[stream_symbol] = symbol
+        self._stream.subscribe_trades([symbol])
+    
+    def _on_trade(self, symbol: str, price: float, size: float, timestamp: int):
+        """Market state trade listener: forward ticks for symbols this bot has orders in"""
+        bot_symbol = self._streamed.get(symbol)
+        if bot_symbol and self.is_running:
+            self.engine.on_tick(bot_symbol, price, size, timestamp)
+    
+    def _tick_feed(self):
+        """REST fallback: feed polled prices to the simulator for symbols without fresh streamed trades"""
+        while self.is_running:
+            self._manage_paper_positions()
+            time.sleep(self.tick_interval)
+    
     def _manage_paper_positions(self):
-        """Manage existing paper positions"""
+        """Push the latest price of every symbol with open orders or positions into the simulator"""
         try:
-            current_time = datetime.now()
-            
-            for symbol, position in list(self.positions.items()):
-                # Get current price
+            symbols = {o['symbol'] for o in self.engine.get_open_orders(self.account_id)}
+            symbols.update(s for s, p in self.account.positions.items() if p.size)
+            for symbol in symbols:
+                if self.market_state.last_price(symbol, self.stream_max_age):
+                    continue
                 ticker = self.api.get_futures_ticker(symbol)
                 if ticker.get('success') and ticker['data'].get('list'):
                     current_price = float(ticker['data']['list'][0].get('lastPrice', 0))
-                    
                     if current_price > 0:
-                        # Check stop loss
-                        if position['side'] == 'Buy':
-                            if current_price <= position['stop_loss']:
-                                self._close_paper_position(symbol, current_price, 'Stop Loss')
-                            elif current_price >= position['take_profit']:
-                                self._close_paper_position(symbol, current_price, 'Take Profit')
-                        else:  # Sell position
-                            if current_price >= position['stop_loss']:
-                                self._close_paper_position(symbol, current_price, 'Stop Loss')
-                            elif current_price <= position['take_profit']:
-                                self._close_paper_position(symbol, current_price, 'Take Profit')
+                        self.engine.on_tick(symbol, current_price)
         
         except Exception as e:
             logger.error(f"Error managing positions: {e}")
     
-    def _close_paper_position(self, symbol, price, reason):
-        """Close a paper position"""
-        try:
-            position = self.positions[symbol]
-            
-            # Calculate P&L
-            if position['side'] == 'Buy':
-                pnl = (price - position['entry_price']) * position['quantity']
-            else:
-                pnl = (position['entry_price'] - price) * position['quantity']
-            
-            # Update paper balance
-            self.paper_balance += pnl
-            
-            # Record closing trade
-            trade = {
-                'time': datetime.now(),
-                'symbol': symbol,
-                'side': 'Sell' if position['side'] == 'Buy' else 'Buy',
-                'quantity': position['quantity'],
-                'price': price,
-                'strategy': position['strategy'],
-                'type': 'CLOSE',
-                'reason': reason,
-                'pnl': pnl
-            }
-            self.trade_history.append(trade)
-            
-            # Remove position
-            del self.positions[symbol]
-            
-            logger.info(f"PAPER POSITION CLOSED: {symbol} @ ${price:.2f} - {reason} - PnL: ${pnl:.2f}")
-            
-        except Exception as e:
-            logger.error(f"Error closing paper position: {e}")
+    def _on_fill(self, fill):
+        """Record simulator fills in the trade history"""
+        if fill['account_id'] != self.account_id:
+            return
+        entry = not fill['reduce_only']
+        # Exits carry their entry's order id as their one-cancels-other group
+        strategy = self._strategies.get(fill['order_id'], '') if entry else self._strategies.pop(fill['oco'], '')
+        side = 'Buy' if fill['side'] == 'BUY' else 'Sell'
+        trade = {
+            'time': datetime.now(),
+            'symbol': fill['symbol'],
+            'side': side,
+            'quantity': fill['size'],
+            'price': fill['fill_price'],
+            'strategy': strategy,
+            'type': 'OPEN' if entry else 'CLOSE',
+            'fee': fill['fee']
+        }
+        if not entry:
+            trade['reason'] = {'STOP': 'Stop Loss', 'TAKE_PROFIT': 'Take Profit',
+                               'TRAILING_STOP': 'Trailing Stop'}.get(fill['type'], fill['type'])
+            trade['pnl'] = fill['realized_pnl']
+            logger.info(f"PAPER POSITION CLOSED: {fill['symbol']} @ ${fill['fill_price']:.2f} - {trade['reason']} "
+                        f"- PnL: ${fill['realized_pnl']:.2f}")
+        else:
+            logger.info(f"PAPER TRADE: {side} {fill['size']} {fill['symbol']} @ ${fill['fill_price']:.2f} via {strategy}")
+        self.trade_history.append(trade)
     
     def get_status(self):
         """Get bot status"""
+        summary = self.engine.get_account_summary(self.account_id)
         return {
             'is_running': self.is_running,
             'paper_balance': self.paper_balance,
-            'open_positions': len(self.positions),
+            'open_positions': len(summary['positions']),
             'total_trades': len(self.trade_history),
-            'positions': self.positions,
+            'positions': summary['positions'],
+            'open_orders': summary['open_orders'],
             'recent_trades': self.trade_history[-5:] if self.trade_history else []
         }
     
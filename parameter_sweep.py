@@ -0,0 +1,314 @@
+"""
+Parallel parameter sweeps for the vectorized backtester.
+
+The historical OHLCV is written once to a ``.npy`` file and every worker
+process memory-maps it read-only, so thousands of backtests share one copy
+of the data. Results are streamed to a JSONL file as they complete, which
+makes a sweep resumable: rerunning with the same results file skips every
+parameter set that is already recorded. The first line of the file records
+what the sweep ran on (strategy, symbol/interval, base parameters and a hash
+of the OHLCV data); a sweep that does not match it refuses to reuse the file.
+
+Example:
+    python parameter_sweep.py --symbol BTC_USDT --interval 5M --strategy RSI_STRATEGY \\
+        --param rsi_period=7,14,21 --param oversold=20:35:5 --param overbought=65:80:5 \\
+        --param stop_loss_percentage=1,1.5,2 --results sweeps/rsi.jsonl
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import logging
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from backtesting import SUPPORTED_STRATEGIES, default_backtest_params, vectorized_backtest
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+RANK_METRICS = ('sharpe', 'pnl', 'win_rate', 'max_drawdown_pct')
+
+
+def grid_combinations(grid: Dict[str, List]) -> List[Dict]:
+    """Cartesian product of a {param: [values]} grid"""
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def random_combinations(ranges: Dict[str, tuple], samples: int, seed: int = 0) -> List[Dict]:
+    """Uniform random samples from {param: (low, high)} ranges"""
+    rng = random.Random(seed)
+    combos = []
+    for _ in range(samples):
+        combos.append({name: _sample_value(low, high, rng.random()) for name, (low, high) in sorted(ranges.items())})
+    return combos
+
+
+def latin_hypercube_combinations(ranges: Dict[str, tuple], samples: int, seed: int = 0) -> List[Dict]:
+    """Latin-hypercube samples: each param range is split into ``samples`` strata, each used once"""
+    rng = random.Random(seed)
+    columns = {}
+    for name, (low, high) in sorted(ranges.items()):
+        strata = [(i + rng.random()) / samples for i in range(samples)]
+        rng.shuffle(strata)
+        columns[name] = [_sample_value(low, high, u) for u in strata]
+    return [{name: columns[name][i] for name in columns} for i in range(samples)]
+
+
+def _sample_value(low, high, u: float):
+    value = low + (high - low) * u
+    if isinstance(low, int) and isinstance(high, int):
+        return int(round(value))
+    return round(value, 6)
+
+
+def params_key(params: Dict) -> str:
+    return json.dumps(params, sort_keys=True)
+
+
+def ohlcv_matrix(ohlcv) -> np.ndarray:
+    return np.ascontiguousarray(np.column_stack([np.asarray(ohlcv[c], dtype=np.float64) for c in OHLCV_COLUMNS]))
+
+
+def save_ohlcv(ohlcv, path: str) -> str:
+    """Write OHLCV columns to a (n, 5) float64 .npy file for memory-mapped sharing"""
+    np.save(path, ohlcv if isinstance(ohlcv, np.ndarray) else ohlcv_matrix(ohlcv))
+    return path
+
+
+def pinned_data_path(results_path) -> Path:
+    """Where a sweep's OHLCV matrix is kept next to its results, so a resume runs on the same bars"""
+    results_path = Path(results_path)
+    return results_path.with_name(results_path.stem + '.ohlcv.npy')
+
+
+def pinned_ohlcv(results_path) -> Optional[np.ndarray]:
+    """The pinned matrix of a sweep that already has results; None for a new sweep"""
+    results_path, data_path = Path(results_path), pinned_data_path(results_path)
+    if not (results_path.exists() and results_path.stat().st_size and data_path.exists()):
+        return None
+    return np.load(data_path)
+
+
+def sweep_header(matrix: np.ndarray, strategy: str, base_params: Dict, initial_balance: float,
+                 symbol: str = None, interval: str = None) -> Dict:
+    """Identity of a sweep's inputs; results are only reused under an identical header"""
+    return {
+        'strategy': strategy,
+        'symbol': symbol,
+        'interval': interval,
+        'initial_balance': initial_balance,
+        'base_params': params_key(base_params),
+        'data_sha1': hashlib.sha1(matrix.tobytes()).hexdigest(),
+        'bars': int(len(matrix))
+    }
+
+
+# Per-worker state, set once by the pool initializer
+_worker = {}
+
+
+def _init_worker(data_path: str, strategy: str, base_params: Dict, initial_balance: float):
+    matrix = np.load(data_path, mmap_mode='r')
+    _worker['ohlcv'] = {c: matrix[:, i] for i, c in enumerate(OHLCV_COLUMNS)}
+    _worker['strategy'] = strategy
+    _worker['base_params'] = base_params
+    _worker['initial_balance'] = initial_balance
+
+
+def _run_chunk(chunk: List[Dict]) -> List[Dict]:
+    results = []
+    for overrides in chunk:
+        params = dict(_worker['base_params'])
+        params.update(overrides)
+        try:
+            result = vectorized_backtest(_worker['ohlcv'], _worker['strategy'], _worker['initial_balance'],
+                                         params, include_trades=False)
+        except Exception as e:
+            result = {'error': str(e)}
+        result['params'] = overrides
+        results.append(result)
+    return results
+
+
+def _load_done(results_path: Path, header: Dict) -> Dict[str, Dict]:
+    """Rows already recorded for this sweep; writes the header to a new or empty file"""
+    done = {}
+    if results_path.exists() and results_path.stat().st_size:
+        with open(results_path, 'r', encoding='utf-8') as f:
+            try:
+                recorded = json.loads(f.readline()).get('sweep')
+            except ValueError:
+                recorded = None
+            if recorded != header:
+                raise ValueError(f"{results_path} holds results of a different sweep "
+                                 f"(strategy, symbol/interval, parameters or data differ); use another results file")
+            for line in f:
+                try:
+                    row = json.loads(line)
+                    done[params_key(row['params'])] = row
+                except (ValueError, KeyError):
+                    continue  # Partial line from an interrupted run
+    else:
+        with open(results_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'sweep': header}) + '\n')
+    return done
+
+
+def run_parameter_sweep(ohlcv, strategy: str, combinations: Iterable[Dict], results_path: str,
+                        base_params: Dict = None, initial_balance: float = 1000.0,
+                        max_workers: Optional[int] = None, chunk_size: int = 16,
+                        rank_by: str = 'sharpe', symbol: str = None, interval: str = None) -> List[Dict]:
+    """Run backtests for every parameter combination in parallel and return them ranked.
+
+    Completed results are appended to ``results_path`` (JSONL) as they arrive;
+    combinations already present there are skipped, so an interrupted sweep
+    resumes where it stopped. The swept bars are pinned next to the results
+    file (``pinned_data_path``) and a resumed sweep runs on them, not on
+    ``ohlcv``. Raises ValueError when the file belongs to a sweep over another
+    strategy, symbol/interval, base parameters or data.
+    """
+    if strategy not in SUPPORTED_STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}")
+    results_path = Path(results_path)
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    base_params = base_params if base_params is not None else default_backtest_params()
+
+    # Resume on the bars the sweep started with; newly closed candles would change the data hash
+    data_path = str(pinned_data_path(results_path))
+    matrix = pinned_ohlcv(results_path)
+    if matrix is None:
+        matrix = ohlcv_matrix(ohlcv)
+        save_ohlcv(matrix, data_path)
+    else:
+        logger.info(f"Resuming sweep on the {len(matrix)} bars pinned in {data_path}")
+    done = _load_done(results_path, sweep_header(matrix, strategy, base_params, initial_balance, symbol, interval))
+    pending = [c for c in combinations if params_key(c) not in done]
+    logger.info(f"Sweep {strategy}: {len(done)} done, {len(pending)} pending")
+
+    if pending:
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        started = time.perf_counter()
+        completed = 0
+        # Workers memory-map the pinned matrix
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(data_path, strategy, base_params, initial_balance)) as pool, \
+                open(results_path, 'a', encoding='utf-8') as out:
+            futures = [pool.submit(_run_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                for row in future.result():
+                    out.write(json.dumps(row, default=float) + '\n')
+                    done[params_key(row['params'])] = row
+                    completed += 1
+                out.flush()
+        elapsed = time.perf_counter() - started
+        logger.info(f"Sweep finished {completed} backtests in {elapsed:.2f}s "
+                    f"({completed / elapsed if elapsed else 0:.0f}/s)")
+
+    return rank_results(list(done.values()), rank_by)
+
+
+def rank_results(results: List[Dict], rank_by: str = 'sharpe') -> List[Dict]:
+    """Sort results best-first; drawdown ranks ascending, everything else descending"""
+    valid = [r for r in results if 'error' not in r]
+    reverse = rank_by != 'max_drawdown_pct'
+    return sorted(valid, key=lambda r: r.get(rank_by, 0), reverse=reverse)
+
+
+def format_ranked_table(ranked: List[Dict], top: int = 20) -> str:
+    if not ranked:
+        return 'No results'
+    names = sorted(ranked[0]['params'])
+    header = ' '.join(f"{n[:14]:>14s}" for n in names) + f" {'sharpe':>8s} {'max_dd%':>8s} {'win%':>6s} {'pnl':>10s} {'trades':>6s}"
+    lines = [header, '-' * len(header)]
+    for row in ranked[:top]:
+        values = ' '.join(f"{row['params'][n]!s:>14.14s}" for n in names)
+        lines.append(f"{values} {row['sharpe']:8.2f} {row['max_drawdown_pct']:8.2f} "
+                     f"{row['win_rate'] * 100:6.1f} {row['pnl']:10.2f} {row['num_trades']:6d}")
+    return '\n'.join(lines)
+
+
+def _parse_number(text: str):
+    return int(text) if text.lstrip('-').isdigit() else float(text)
+
+
+def parse_param_spec(spec: str):
+    """Parse 'name=1,2,3' (list), 'name=start:stop:step' (inclusive grid) or 'name=low..high' (sampling range)"""
+    name, _, values = spec.partition('=')
+    if '..' in values:
+        low, high = values.split('..')
+        return name, (_parse_number(low), _parse_number(high))
+    if ':' in values:
+        start, stop, step = (_parse_number(v) for v in values.split(':'))
+        count = int(round((stop - start) / step)) + 1
+        return name, [round(start + i * step, 10) if isinstance(step, float) else start + i * step for i in range(count)]
+    return name, [_parse_number(v) for v in values.split(',')]
+
+
+def _load_history(args):
+    pinned = pinned_ohlcv(args.results)
+    if pinned is not None:
+        return pinned  # Resuming: the sweep's own bars rather than the latest candles
+    if args.csv:
+        import pandas as pd
+        return pd.read_csv(args.csv)
+    from backtesting import Backtester
+    backtester = Backtester()
+    return backtester.fetch_historical_klines(args.symbol, args.interval, args.limit)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Parallel parameter sweep for the vectorized backtester')
+    parser.add_argument('--strategy', default='RSI_STRATEGY', choices=SUPPORTED_STRATEGIES)
+    parser.add_argument('--symbol', default='BTC_USDT')
+    parser.add_argument('--interval', default='5M')
+    parser.add_argument('--limit', type=int, default=500, help='Number of historical candles to load')
+    parser.add_argument('--csv', help='Load OHLCV from a CSV file instead of the exchange')
+    parser.add_argument('--param', action='append', default=[], help="name=v1,v2 | name=start:stop:step | name=low..high")
+    parser.add_argument('--method', default='grid', choices=('grid', 'random', 'lhs'))
+    parser.add_argument('--samples', type=int, default=100, help='Samples for random/lhs')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=16)
+    parser.add_argument('--initial-balance', type=float, default=1000.0)
+    parser.add_argument('--results', default='logs/sweep_results.jsonl')
+    parser.add_argument('--rank-by', default='sharpe', choices=RANK_METRICS)
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    specs = dict(parse_param_spec(p) for p in args.param)
+    if args.method == 'grid':
+        grid = {name: (list(v) if isinstance(v, tuple) else v) for name, v in specs.items()}
+        combos = grid_combinations(grid)
+    else:
+        ranges = {name: (v if isinstance(v, tuple) else (min(v), max(v))) for name, v in specs.items()}
+        sampler = random_combinations if args.method == 'random' else latin_hypercube_combinations
+        combos = sampler(ranges, args.samples, args.seed)
+
+    ohlcv = _load_history(args)
+    if len(ohlcv) == 0:
+        print('No historical data available')
+        return 1
+
+    base_params = default_backtest_params(interval=args.interval)
+    try:
+        ranked = run_parameter_sweep(ohlcv, args.strategy, combos, args.results, base_params,
+                                     args.initial_balance, args.workers, args.chunk_size, args.rank_by,
+                                     symbol=None if args.csv else args.symbol, interval=args.interval)
+    except ValueError as e:
+        print(e)
+        return 1
+    print(format_ranked_table(ranked, args.top))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
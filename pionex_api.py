@@ -11,6 +11,12 @@ import os
 from dotenv import load_dotenv
 
 from config_loader import get_config
+from server_clock import get_server_clock
+from market_state import market_state
+from order_book import get_order_book, find_order_book
+from rate_limiter import get_rate_limiter, pionex_priority, parse_retry_after, PIONEX_WEIGHTS
+from account_state import get_account_state
+from exchange_metrics import exchange_metrics
 
 load_dotenv()  # Load .env variables
 
@@ -24,22 +30,41 @@ class PionexAPI:
         self.retry_backoff = self.config.get('api', {}).get('retry_backoff', 1.5)
         self.timeout = self.config.get('api', {}).get('timeout', 30)
         self.request_count = 0
-        self.last_request_time = 0
-        self.rate_limit_delay = 0.1
+        # One token bucket per account, shared with every other PionexAPI in the process
+        rate_config = self.config.get('api', {}).get('rate_limit', {})
+        self.limiter = get_rate_limiter(
+            'pionex', self.api_key,
+            rate=rate_config.get('requests_per_second', 10),
+            capacity=rate_config.get('burst', 20)
+        )
+        self.endpoint_weights = {**PIONEX_WEIGHTS, **rate_config.get('weights', {})}
+        # Balances and open orders cached per account, refreshed on order events
+        account_config = self.config.get('account_state', {})
+        self.account = get_account_state(
+            self.api_key,
+            ttl=account_config.get('ttl', 5),
+            poll_interval=account_config.get('order_poll_interval', 1.0),
+            watch_timeout=account_config.get('order_watch_timeout', 300)
+        )
         self.logger = logging.getLogger(__name__)
         self.session = requests.Session()
         self.session.headers.update({
             'Content-Type': 'application/json',
             'User-Agent': 'PionexTradingBot/1.0'
         })
-
-    def _rate_limit(self):
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last
-            time.sleep(sleep_time)
-        self.last_request_time = time.time()
+        self.clock = get_server_clock(
+            self.base_url,
+            self._fetch_server_time,
+            resync_interval=self.config.get('api', {}).get('clock_resync_interval', 300)
+        )
+        # Streamed prices older than this fall back to REST
+        self.stream_max_age = self.config.get('websocket', {}).get('max_price_age', 30)
+
+    def _rate_limit(self, method: str = 'GET', endpoint: str = '', signed: bool = False):
+        """Wait for the endpoint's weight from the shared limiter; order calls jump the queue"""
+        started = time.perf_counter()
+        self.limiter.acquire(self.endpoint_weights.get(endpoint, 1), pionex_priority(method, endpoint))
+        exchange_metrics.observe_wait('pionex', endpoint, signed, time.perf_counter() - started)
         self.request_count += 1
 
     def _generate_signature(self, params: Dict) -> str:
@@ -59,7 +84,7 @@ class PionexAPI:
     def _make_request(self, method: str, endpoint: str, params: Dict = None, signed: bool = False) -> Dict:
         import json as pyjson
         url = f"{self.base_url}{endpoint}"
-        self._rate_limit()
+        self._rate_limit(method, endpoint, signed)
         if params is None:
             params = {}
         headers = {
@@ -68,30 +93,13 @@ class PionexAPI:
         }
         body = ''
         if signed:
-            # Get exact server timestamp
-            server_timestamp = self._get_exact_server_timestamp()
-            params['timestamp'] = str(server_timestamp)
-            sorted_items = sorted(params.items())
-            query_string = '&'.join(f'{k}={v}' for k, v in sorted_items)
-            path_url = f"{endpoint}?{query_string}" if query_string else endpoint
-            sign_str = f"{method.upper()}{path_url}"
-            if method.upper() in ['POST', 'DELETE']:
-                # For POST requests, include timestamp in body for signature
-                body = pyjson.dumps(params, separators=(',', ':')) if params else ''
-                sign_str += body
-            signature = hmac.new(self.secret_key.encode(), sign_str.encode(), hashlib.sha256).hexdigest()
-            headers['PIONEX-KEY'] = self.api_key
-            headers['PIONEX-SIGNATURE'] = signature
-        # Debug prints
-        print(f"[DEBUG] Request: {method.upper()} {url}")
-        print(f"[DEBUG] Headers: {headers}")
-        if method.upper() == 'GET':
-            print(f"[DEBUG] Params: {params}")
-        else:
-            print(f"[DEBUG] Body: {pyjson.dumps(params, separators=(',', ':')) if params else ''}")
+            self._sign_request(method, endpoint, params, headers)
+        self.logger.debug(f"Request: {method.upper()} {url} params={params}")
         last_exception = None
+        timestamp_retried = False
         for attempt in range(self.retry_attempts):
             try:
+                request_start = time.monotonic()
                 if method.upper() == 'GET':
                     response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
                 elif method.upper() == 'POST':
@@ -108,76 +116,137 @@ class PionexAPI:
                     response = self.session.delete(url, data=pyjson.dumps(params), headers=headers, timeout=self.timeout)
                 else:
                     raise ValueError(f"Unsupported HTTP method: {method}")
+                exchange_metrics.observe('pionex', endpoint, signed, time.monotonic() - request_start,
+                                         None if response.status_code == 200 else f"HTTP {response.status_code}")
                 if response.status_code == 200:
                     data = response.json()
+                    if isinstance(data, dict):
+                        self.clock.observe(data.get('timestamp'), (time.monotonic() - request_start) * 1000)
                     if 'code' in data and data['code'] != 0:
                         error_msg = data.get('msg', 'Unknown API error')
+                        if signed and not timestamp_retried and self._is_timestamp_error(data):
+                            # Clock drifted out of the exchange's window: resync and re-sign once
+                            self.logger.warning(f"Timestamp rejected ({error_msg}), resyncing server clock")
+                            exchange_metrics.count_retry('pionex', endpoint, signed)
+                            timestamp_retried = True
+                            self.clock.invalidate()
+                            self._sign_request(method, endpoint, params, headers)
+                            continue
                         self.logger.error(f"API error: {error_msg} (code: {data['code']})")
+                        exchange_metrics.count_error('pionex', endpoint, signed, error_msg)
                         return {'error': error_msg, 'code': data['code']}
                     return data
                 elif response.status_code == 429:
-                    retry_after = int(response.headers.get('Retry-After', 60))
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'), 60)
                     self.logger.warning(f"Rate limited, waiting {retry_after}s")
-                    time.sleep(retry_after)
+                    # Pause every client sharing this account, then queue for a fresh slot
+                    self.limiter.penalize(retry_after)
+                    exchange_metrics.count_retry('pionex', endpoint, signed, rate_limited=True)
+                    self._rate_limit(method, endpoint, signed)
                     continue
                 elif response.status_code >= 500:
                     self.logger.warning(f"Server error {response.status_code}, attempt {attempt + 1}/{self.retry_attempts}")
                     if attempt < self.retry_attempts - 1:
+                        exchange_metrics.count_retry('pionex', endpoint, signed)
                         time.sleep(self.retry_backoff ** attempt)
                     continue
                 else:
+                    if signed and not timestamp_retried and 'TIMESTAMP' in response.text.upper():
+                        self.logger.warning(f"Timestamp rejected (HTTP {response.status_code}), resyncing server clock")
+                        exchange_metrics.count_retry('pionex', endpoint, signed)
+                        timestamp_retried = True
+                        self.clock.invalidate()
+                        self._sign_request(method, endpoint, params, headers)
+                        continue
                     error_msg = f"HTTP {response.status_code}: {response.text}"
                     self.logger.error(error_msg)
                     return {'error': error_msg}
-            except requests.exceptions.Timeout:
+            except requests.exceptions.Timeout as e:
                 last_exception = f"Request timeout (attempt {attempt + 1}/{self.retry_attempts})"
                 self.logger.warning(last_exception)
+                exchange_metrics.observe('pionex', endpoint, signed, time.monotonic() - request_start, e)
                 if attempt < self.retry_attempts - 1:
+                    exchange_metrics.count_retry('pionex', endpoint, signed)
                     time.sleep(self.retry_backoff ** attempt)
                 continue
             except requests.exceptions.ConnectionError as e:
                 last_exception = f"Connection error: {e} (attempt {attempt + 1}/{self.retry_attempts})"
                 self.logger.warning(last_exception)
+                exchange_metrics.observe('pionex', endpoint, signed, time.monotonic() - request_start, e)
                 if attempt < self.retry_attempts - 1:
+                    exchange_metrics.count_retry('pionex', endpoint, signed)
                     time.sleep(self.retry_backoff ** attempt)
                 continue
             except Exception as e:
                 last_exception = f"Request error: {e} (attempt {attempt + 1}/{self.retry_attempts})"
                 self.logger.error(last_exception)
+                exchange_metrics.count_error('pionex', endpoint, signed, e)
                 if attempt < self.retry_attempts - 1:
+                    exchange_metrics.count_retry('pionex', endpoint, signed)
                     time.sleep(self.retry_backoff ** attempt)
                 continue
         return {'error': f"All retry attempts failed. Last error: {last_exception}"}
 
-    def _get_exact_server_timestamp(self) -> int:
-        """Get exact server timestamp in milliseconds"""
+    def _sign_request(self, method: str, endpoint: str, params: Dict, headers: Dict):
+        """Stamp params with the server-clock timestamp and add signature headers"""
+        params['timestamp'] = str(self._get_exact_server_timestamp())
+        sorted_items = sorted(params.items())
+        query_string = '&'.join(f'{k}={v}' for k, v in sorted_items)
+        path_url = f"{endpoint}?{query_string}" if query_string else endpoint
+        sign_str = f"{method.upper()}{path_url}"
+        if method.upper() in ['POST', 'DELETE']:
+            # For POST requests, include timestamp in body for signature
+            sign_str += json.dumps(params, separators=(',', ':')) if params else ''
+        signature = hmac.new(self.secret_key.encode(), sign_str.encode(), hashlib.sha256).hexdigest()
+        headers['PIONEX-KEY'] = self.api_key
+        headers['PIONEX-SIGNATURE'] = signature
+
+    def _is_timestamp_error(self, data: Dict) -> bool:
+        """Check whether an API error means the request timestamp was rejected"""
+        message = f"{data.get('code', '')} {data.get('msg', '')}".upper()
+        return 'TIMESTAMP' in message or 'RECV_WINDOW' in message
+
+    def _fetch_server_time(self) -> Optional[int]:
+        """Read the server timestamp from a small public response (single-symbol ticker)"""
         try:
-            # Get server time from the ticker endpoint (public)
-            response = self.session.get(f"{self.base_url}/api/v1/market/tickers", timeout=5)
+            response = self.session.get(
+                f"{self.base_url}/api/v1/market/tickers",
+                params={'symbol': 'BTC_USDT'},
+                timeout=5
+            )
             if response.status_code == 200:
                 data = response.json()
-                if 'data' in data and 'timestamp' in data['data']:
-                    return data['data']['timestamp']  # Return as milliseconds
-                elif 'timestamp' in data:
-                    return data['timestamp']  # Return as milliseconds
+                if 'timestamp' in data:
+                    return int(data['timestamp'])
+                if isinstance(data.get('data'), dict) and 'timestamp' in data['data']:
+                    return int(data['data']['timestamp'])
         except Exception as e:
             self.logger.warning(f"Failed to get server time from ticker: {e}")
-        
-        # Fallback to local time in milliseconds
-        return int(time.time() * 1000)
+        return None
+
+    def _get_exact_server_timestamp(self) -> int:
+        """Get server timestamp in milliseconds from the local clock plus tracked offset"""
+        return self.clock.now_ms()
+
+    def get_clock_metrics(self) -> Dict:
+        """Server clock offset, last sync age and resync count"""
+        return self.clock.get_metrics()
 
     # --- Account Endpoints ---
-    def get_balances(self) -> Dict:
-        """GET /api/v1/account/balances"""
+    def get_balances(self, fresh: bool = False) -> Dict:
+        """GET /api/v1/account/balances (served from the shared account cache unless ``fresh``)"""
+        return self.account.get('balances', self._fetch_balances, fresh=fresh)
+
+    def _fetch_balances(self) -> Dict:
         return self._make_request('GET', '/api/v1/account/balances', signed=True)
 
     def get_assets(self) -> Dict:
         """GET /api/v1/account/assets"""
         return self._make_request('GET', '/api/v1/account/assets', signed=True)
 
-    def get_positions(self) -> Dict:
+    def get_positions(self, fresh: bool = False) -> Dict:
         """GET /api/v1/account/balances (as a proxy for positions)"""
-        return self._make_request('GET', '/api/v1/account/balances', signed=True)
+        return self.get_balances(fresh=fresh)
 
     # --- Order Endpoints ---
     def place_order(self, symbol: str, side: str, order_type: str, quantity: float, price: str = None, client_order_id: str = None, **kwargs) -> Dict:
@@ -193,7 +262,10 @@ class PionexAPI:
         if client_order_id:
             params['clientOrderId'] = client_order_id
         params.update(kwargs)
-        return self._make_request('POST', '/api/v1/trade/order', params, signed=True)
+        response = self._make_request('POST', '/api/v1/trade/order', params, signed=True)
+        if 'error' not in response:
+            self.account.on_order_placed((response.get('data') or {}).get('orderId'), symbol)
+        return response
 
     def get_order(self, order_id: int, symbol: str) -> Dict:
         """GET /api/v1/trade/order"""
@@ -208,14 +280,26 @@ class PionexAPI:
     def cancel_order(self, order_id: int, symbol: str) -> Dict:
         """DELETE /api/v1/trade/order"""
         params = {'orderId': order_id, 'symbol': symbol}
-        return self._make_request('DELETE', '/api/v1/trade/order', params, signed=True)
+        response = self._make_request('DELETE', '/api/v1/trade/order', params, signed=True)
+        if 'error' not in response:
+            self.account.invalidate()
+        return response
 
-    def get_open_orders(self, symbol: str = None) -> Dict:
-        """GET /api/v1/trade/openOrders"""
+    def get_open_orders(self, symbol: str = None, fresh: bool = False) -> Dict:
+        """GET /api/v1/trade/openOrders (cached per symbol in the shared account state)"""
         params = {}
         if symbol:
             params['symbol'] = symbol
-        return self._make_request('GET', '/api/v1/trade/openOrders', params, signed=True)
+        return self.account.get(f"open_orders:{symbol or '*'}",
+                                lambda: self._make_request('GET', '/api/v1/trade/openOrders', params, signed=True),
+                                fresh=fresh)
+
+    def watch_order(self, order_id, symbol: str, callback, timeout: float = None):
+        """Invoke ``callback(order)`` when the order fills, is canceled or rejected"""
+        self.account.watch_order(self, order_id, symbol, callback, timeout)
+
+    def get_account_cache_stats(self) -> Dict:
+        return self.account.get_stats()
 
     def get_all_orders(self, symbol: str = None, limit: int = 100) -> Dict:
         """GET /api/v1/trade/allOrders"""
@@ -259,7 +343,7 @@ class PionexAPI:
         """GET /api/v1/common/symbols"""
         return self._make_request('GET', '/api/v1/common/symbols')
 
-    def get_klines(self, symbol: str, interval: str = '1H', limit: int = 100) -> Dict:
+    def get_klines(self, symbol: str, interval: str = '1H', limit: int = 100, end_time: int = None) -> Dict:
         """GET /api/v1/market/klines"""
         # Convert interval format to match Pionex API requirements
         interval_map = {
@@ -282,6 +366,8 @@ class PionexAPI:
             'interval': api_interval,
             'limit': min(limit, 500)  # Ensure limit doesn't exceed 500
         }
+        if end_time is not None:
+            params['endTime'] = int(end_time)  # Page backwards through history
 
         response = self._make_request('GET', '/api/v1/market/klines', params)
 
@@ -325,7 +411,11 @@ class PionexAPI:
         return response
 
     def get_ticker_price(self, symbol: str) -> Dict:
-        """Get current ticker price for a symbol"""
+        """Get current ticker price for a symbol (streamed price first, REST on a cold miss)"""
+        streamed = market_state.last_price(symbol, max_age=self.stream_max_age)
+        if streamed:
+            return {'data': {'price': str(streamed)}, 'source': 'stream'}
+
         params = {'symbol': symbol}
         response = self._make_request('GET', '/api/v1/market/tickers', params)
 
@@ -335,6 +425,7 @@ class PionexAPI:
         if 'data' in response and isinstance(response['data'], dict) and 'tickers' in response['data']:
             for ticker in response['data']['tickers']:
                 if isinstance(ticker, dict) and ticker.get('symbol') == symbol:
+                    market_state.update_ticker(symbol, ticker)
                     return {'data': {'price': ticker.get('close', '0')}}
 
         # If not found in list, return error
@@ -548,8 +639,12 @@ class PionexAPI:
             }
 
     def get_market_depth(self, symbol: str, limit: int = 20) -> Dict:
-        """Get market depth (order book) for a symbol"""
+        """Get market depth (order book) for a symbol; served from the local book when streamed"""
         try:
+            book = find_order_book(symbol, 'pionex', self.stream_max_age)
+            if book and book.level_count() >= limit:
+                return dict(book.to_dict(limit), symbol=symbol, source='stream')
+
             depth_response = self.get_depth(symbol, limit)
             
             if 'error' in depth_response:
@@ -557,12 +652,10 @@ class PionexAPI:
             
             if 'data' in depth_response:
                 depth_data = depth_response['data']
-                return {
-                    'symbol': symbol,
-                    'bids': depth_data.get('bids', []),
-                    'asks': depth_data.get('asks', []),
-                    'timestamp': depth_data.get('timestamp', int(time.time() * 1000))
-                }
+                timestamp = depth_data.get('timestamp', int(time.time() * 1000))
+                book = get_order_book(symbol, 'pionex')
+                book.apply_snapshot(depth_data.get('bids', []), depth_data.get('asks', []), timestamp=timestamp)
+                return dict(book.to_dict(limit), symbol=symbol, source='rest')
             else:
                 return {'error': 'No depth data available'}
                 
@@ -1,75 +1,90 @@
 import asyncio
 import json
+import random
+import threading
+import time
 import logging
 import websockets
-from typing import Callable, Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional
+
+from config_loader import get_config
+from market_state import MarketState, get_market_state, normalize_symbol
+from order_book import get_order_book
+
+# websockets 14+ renamed the header argument of connect()
+_HEADERS_KWARG = 'additional_headers' if int(websockets.__version__.split('.')[0]) >= 14 else 'extra_headers'
+
 
 class PionexWebSocket:
-    def __init__(self, api_key=None, secret_key=None):
+    """Streaming client for the Pionex public websocket.
+
+    ``run()`` is the receive loop: it connects, replays every subscription,
+    answers server PINGs, decodes TRADE/DEPTH/TICKER messages into the shared
+    MarketState and dispatches them to registered handlers. When the socket
+    drops it reconnects with jittered exponential backoff.
+    """
+
+    thread_name = 'pionex-ws'
+
+    def __init__(self, api_key=None, secret_key=None, url: str = None, market_state: MarketState = None):
         self.api_key = api_key
         self.secret_key = secret_key
         self.ws = None
         self.connected = False
         self.logger = logging.getLogger(__name__)
-        
+        self.market_state = market_state or get_market_state()
+
         # Updated WebSocket URLs based on Pionex documentation
-        self.BASE_URLS = [
-            "wss://ws.pionex.com/ws",
-            "wss://api.pionex.com/ws",
-            "wss://api.pionex.com/stream",
-            "wss://ws.pionex.com"
+        self.BASE_URLS = [url] if url else [
+            "wss://ws.pionex.com/wsPub",
+            "wss://ws.pionex.com/ws"
         ]
-        
+
         self.current_url_index = 0
-        self.reconnect_delay = 5
+        self.reconnect_delay = 1
+        self.max_reconnect_delay = 60
         self.max_reconnect_attempts = 10
         self.reconnect_attempts = 0
         self.subscriptions = set()
         self.handlers: Dict[str, Callable[[Dict[str, Any]], None]] = {}
 
+        self._stop = False
+        self._loop = None
+        self._thread = None
+        self._last_seq: Dict[tuple, int] = {}
+        self.stats = {'messages': 0, 'reconnects': 0, 'sequence_gaps': 0, 'decode_errors': 0,
+                      'last_message_at': None}
+
     async def connect(self):
-        """Connect to WebSocket with fallback to REST API"""
-        try:
+        """Open the socket, cycling through the known URLs; returns False once all attempts fail"""
+        while not self._stop:
             url = self.BASE_URLS[self.current_url_index]
-            self.logger.info(f"Connecting to {url}")
-            
-            # Simplified headers for better compatibility
-            headers = {
-                'User-Agent': 'PionexTradingBot/1.0',
-                'Accept': '*/*'
-            }
-            
-            if self.api_key:
-                headers['X-API-Key'] = self.api_key
-            
-            self.ws = await websockets.connect(
-                url,
-                extra_headers=headers,
-                ping_interval=30,
-                ping_timeout=10,
-                close_timeout=10
-            )
-            
-            self.connected = True
-            self.reconnect_attempts = 0
-            self.logger.info(f"Successfully connected to {url}")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"WebSocket connection failed: {str(e)}")
-            self.connected = False
-            
-            # Try next URL
-            self.current_url_index = (self.current_url_index + 1) % len(self.BASE_URLS)
-            
-            if self.reconnect_attempts < self.max_reconnect_attempts:
+            try:
+                self.logger.info(f"Connecting to {url}")
+                headers = {'User-Agent': 'PionexTradingBot/1.0'}
+                if self.api_key:
+                    headers['X-API-Key'] = self.api_key
+                self.ws = await websockets.connect(url, ping_interval=30, ping_timeout=10, close_timeout=10,
+                                                   **{_HEADERS_KWARG: headers})
+                self.connected = True
+                self.reconnect_attempts = 0
+                self.logger.info(f"Successfully connected to {url}")
+                return True
+            except Exception as e:
+                self.logger.error(f"WebSocket connection failed: {str(e)}")
+                self.connected = False
+                self.current_url_index = (self.current_url_index + 1) % len(self.BASE_URLS)
                 self.reconnect_attempts += 1
-                self.logger.info(f"Retrying connection in {self.reconnect_delay} seconds...")
-                await asyncio.sleep(self.reconnect_delay)
-                return await self.connect()
-            else:
-                self.logger.warning("All WebSocket URLs failed. Falling back to REST API.")
-                return False
+                if self.max_reconnect_attempts and self.reconnect_attempts >= self.max_reconnect_attempts:
+                    self.logger.warning("All WebSocket URLs failed. Falling back to REST API.")
+                    return False
+                await asyncio.sleep(self._backoff_delay())
+        return False
+
+    def _backoff_delay(self) -> float:
+        """Full-jitter exponential backoff so many clients do not reconnect in lockstep"""
+        ceiling = min(self.max_reconnect_delay, self.reconnect_delay * (2 ** self.reconnect_attempts))
+        return random.uniform(0, ceiling)
 
     async def disconnect(self):
         self._stop = True
@@ -77,37 +92,171 @@ class PionexWebSocket:
             await self.ws.close()
         self.connected = False
 
+    async def run(self):
+        """Receive loop: stays connected until disconnect()/stop() is called"""
+        self._stop = False
+        while not self._stop:
+            if not await self.connect():
+                # Keep retrying slowly; REST fallbacks cover the gap meanwhile
+                self.reconnect_attempts = 0
+                await asyncio.sleep(self.max_reconnect_delay)
+                continue
+            self._last_seq.clear()
+            try:
+                await self._resubscribe_all()
+                async for message in self.ws:
+                    await self._on_message(message)
+            except websockets.ConnectionClosed as e:
+                self.logger.warning(f"WebSocket closed: {e}")
+            except Exception as e:
+                self.logger.error(f"WebSocket receive error: {e}")
+            finally:
+                self.connected = False
+            if not self._stop:
+                self.stats['reconnects'] += 1
+                self.reconnect_attempts += 1
+                await asyncio.sleep(self._backoff_delay())
+
+    def start(self) -> threading.Thread:
+        """Run the receive loop on a daemon thread with its own event loop"""
+        if self._thread and self._thread.is_alive():
+            return self._thread
+
+        def _runner():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self.run())
+            except Exception as e:
+                self.logger.error(f"WebSocket loop error: {e}")
+            finally:
+                self._loop.close()
+
+        self._thread = threading.Thread(target=_runner, daemon=True, name=self.thread_name)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop = True
+        if self._loop and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.disconnect(), self._loop)
+
     async def subscribe(self, channel: str, params: Dict[str, Any] = None):
         if not self.connected:
-            self.logger.warning("WebSocket not connected. Subscription will be sent after reconnect.")
-        sub_msg = {"event": "subscribe", "channel": channel}
+            self.logger.info("WebSocket not connected. Subscription will be sent after reconnect.")
+        sub_msg = {"op": "SUBSCRIBE", "topic": channel}
         if params:
             sub_msg.update(params)
-        self.subscriptions.add(json.dumps(sub_msg))
+        self.subscriptions.add(json.dumps(sub_msg, sort_keys=True))
         if self.ws and self.connected:
             await self.ws.send(json.dumps(sub_msg))
             self.logger.info(f"Subscribed to {channel} {params if params else ''}")
 
     async def unsubscribe(self, channel: str, params: Dict[str, Any] = None):
-        unsub_msg = {"event": "unsubscribe", "channel": channel}
+        unsub_msg = {"op": "UNSUBSCRIBE", "topic": channel}
         if params:
             unsub_msg.update(params)
         if self.ws and self.connected:
             await self.ws.send(json.dumps(unsub_msg))
             self.logger.info(f"Unsubscribed from {channel} {params if params else ''}")
-        self.subscriptions.discard(json.dumps(unsub_msg))
+        sub_msg = dict(unsub_msg, op="SUBSCRIBE")
+        self.subscriptions.discard(json.dumps(sub_msg, sort_keys=True))
+
+    async def subscribe_symbol(self, symbol: str, depth_limit: int = 10):
+        """Trades and top-of-book depth for one symbol"""
+        symbol = normalize_symbol(symbol)
+        await self.subscribe("TRADE", {"symbol": symbol})
+        await self.subscribe("DEPTH", {"symbol": symbol, "limit": depth_limit})
+
+    def subscribe_symbols(self, symbols: List[str], depth_limit: int = 10):
+        """Thread-safe: queue symbol subscriptions on the running loop (or for the next connect)"""
+        for symbol in symbols:
+            if self._loop and self._loop.is_running():
+                asyncio.run_coroutine_threadsafe(self.subscribe_symbol(symbol, depth_limit), self._loop)
+            else:
+                symbol = normalize_symbol(symbol)
+                self.subscriptions.add(json.dumps({"op": "SUBSCRIBE", "topic": "TRADE", "symbol": symbol}, sort_keys=True))
+                self.subscriptions.add(json.dumps({"op": "SUBSCRIBE", "topic": "DEPTH", "symbol": symbol,
+                                                   "limit": depth_limit}, sort_keys=True))
 
     async def _resubscribe_all(self):
-        for sub in self.subscriptions:
+        for sub in list(self.subscriptions):
             await self.ws.send(sub)
             self.logger.info(f"Resubscribed: {sub}")
 
+    def _check_sequence(self, topic: str, symbol: str, data: Dict) -> bool:
+        """Track per-stream sequence numbers; returns False for duplicates/out-of-order messages"""
+        seq = data.get('seq', data.get('sequence'))
+        if seq is None:
+            return True
+        key = (topic, symbol)
+        seq = int(seq)
+        last = self._last_seq.get(key)
+        if last is not None:
+            if seq <= last:
+                return False
+            if seq != last + 1:
+                self.stats['sequence_gaps'] += 1
+                self.logger.warning(f"Sequence gap on {topic} {symbol}: {last} -> {seq}")
+                if topic == 'DEPTH':
+                    get_order_book(symbol).invalidate()
+                if self.ws and self.connected:
+                    # Resubscribing makes the server send a fresh snapshot
+                    asyncio.ensure_future(self._resync(topic, symbol))
+        self._last_seq[key] = seq
+        return True
+
+    async def _resync(self, topic: str, symbol: str):
+        try:
+            for sub in list(self.subscriptions):
+                msg = json.loads(sub)
+                if msg.get('topic') == topic and msg.get('symbol') == symbol:
+                    await self.ws.send(json.dumps(dict(msg, op='UNSUBSCRIBE')))
+                    # The new subscription may restart its sequence numbers
+                    self._last_seq.pop((topic, symbol), None)
+                    await self.ws.send(sub)
+        except Exception as e:
+            self.logger.error(f"Resync of {topic} {symbol} failed: {e}")
+
+    def _apply(self, topic: str, symbol: str, data, timestamp: int):
+        """Decode a market message into the shared market state"""
+        if topic == 'TRADE':
+            trades = data if isinstance(data, list) else [data]
+            if trades:
+                # Pionex sends newest first
+                latest = max(trades, key=lambda t: int(t.get('timestamp', 0) or 0))
+                self.market_state.update_trade(symbol, latest.get('price', 0), latest.get('size', 0),
+                                               latest.get('side', ''), latest.get('timestamp', timestamp))
+        elif topic == 'DEPTH':
+            # Pionex pushes the full top-N book each time, so every message is a snapshot
+            bids, asks = data.get('bids', []), data.get('asks', [])
+            get_order_book(symbol).apply_snapshot(bids, asks, timestamp=timestamp)
+            self.market_state.update_book(symbol, bids, asks, timestamp)
+        elif topic == 'TICKER':
+            self.market_state.update_ticker(symbol, data)
+
     async def _on_message(self, message: str):
         try:
             data = json.loads(message)
-            channel = data.get("channel")
+        except (TypeError, ValueError):
+            self.stats['decode_errors'] += 1
+            self.logger.debug(f"Undecodable message: {message!r}")
+            return
+        try:
+            self.stats['messages'] += 1
+            self.stats['last_message_at'] = time.time()
+            if data.get('op') == 'PING':
+                await self.ws.send(json.dumps({'op': 'PONG', 'timestamp': data.get('timestamp', int(time.time() * 1000))}))
+                return
+            channel = data.get('topic', data.get('channel'))
+            symbol = data.get('symbol', '')
+            if channel and symbol and 'data' in data:
+                if not self._check_sequence(channel, symbol, data):
+                    return
+                self._apply(channel, symbol, data['data'], data.get('timestamp', 0))
             if channel and channel in self.handlers:
-                await self.handlers[channel](data)
+                result = self.handlers[channel](data)
+                if asyncio.iscoroutine(result):
+                    await result
             else:
                 self.logger.debug(f"Received message: {data}")
         except Exception as e:
@@ -116,7 +265,71 @@ class PionexWebSocket:
     def set_handler(self, channel: str, handler: Callable[[Dict[str, Any]], None]):
         self.handlers[channel] = handler
 
-# Example usage (to be integrated in main bot):
-# ws = PionexWebSocket(api_key, secret_key)
-# asyncio.run(ws.connect())
-# await ws.subscribe('market.ticker', {"symbol": "BTCUSDT"}) 
\ No newline at end of file
+    def get_stats(self) -> Dict:
+        last = self.stats['last_message_at']
+        return {
+            **self.stats,
+            'connected': self.connected,
+            'subscriptions': len(self.subscriptions),
+            'last_message_age': (time.time() - last) if last else None
+        }
+
+
+# Shared streaming client, one connection per process
+_shared_ws = None
+_shared_ws_lock = threading.Lock()
+
+def get_pionex_websocket(symbols: List[str] = None) -> Optional[PionexWebSocket]:
+    """Start (once) the shared websocket client and subscribe it to ``symbols``; None when disabled"""
+    global _shared_ws
+    ws_config = get_config().get('websocket', {})
+    if not ws_config.get('enabled', True):
+        return None
+    with _shared_ws_lock:
+        if _shared_ws is None:
+            _shared_ws = PionexWebSocket()
+        if symbols:
+            _shared_ws.subscribe_symbols(symbols, ws_config.get('depth_limit', 10))
+        _shared_ws.start()
+        return _shared_ws
+
+
+async def _stub_server_demo(port: int = 8765, messages: int = 200):
+    """Run the client against a local stub server that drops the connection mid-stream"""
+    served = {'connections': 0}
+
+    async def handler(ws, *args):
+        served['connections'] += 1
+        subs = [json.loads(await ws.recv()) for _ in range(2)]
+        symbol = subs[0]['symbol']
+        start = 0 if served['connections'] == 1 else messages // 2
+        for seq in range(start, messages):
+            if served['connections'] == 1 and seq == messages // 2:
+                await ws.close()  # Simulated disconnect
+                return
+            if seq == messages - 10:
+                seq += 1  # Simulated gap
+            await ws.send(json.dumps({'topic': 'TRADE', 'symbol': symbol, 'seq': seq, 'timestamp': seq,
+                                      'data': [{'price': str(30000 + seq), 'size': '0.1', 'side': 'BUY',
+                                                'timestamp': seq}]}))
+        await ws.send(json.dumps({'topic': 'DEPTH', 'symbol': symbol, 'data': {
+            'bids': [['29999', '1']], 'asks': [['30001', '2']]}}))
+        await asyncio.sleep(1)
+
+    async with websockets.serve(handler, 'localhost', port):
+        state = MarketState()
+        client = PionexWebSocket(url=f'ws://localhost:{port}', market_state=state)
+        client.reconnect_delay = 0.05
+        await client.subscribe_symbol('BTCUSDT')
+        task = asyncio.ensure_future(client.run())
+        await asyncio.sleep(1.5)
+        await client.disconnect()
+        task.cancel()
+        snapshot = state.get('BTC_USDT')
+        print(f"connections={served['connections']} stats={client.get_stats()}")
+        print(f"last_price={snapshot.last_price} bid={snapshot.best_bid} ask={snapshot.best_ask}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(_stub_server_demo())
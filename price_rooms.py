@@ -0,0 +1,171 @@
+import threading
+import time
+import logging
+from typing import Callable, Dict, Optional, Set
+
+
+def room_name(symbol: str) -> str:
+    return f"price:{symbol}"
+
+
+class PriceRoomManager:
+    """Fans one upstream price feed per symbol out to Socket.IO rooms.
+
+    Clients join the room for each symbol they watch. The first subscriber
+    starts a single background task for that symbol; it polls ``upstream``
+    every ``interval`` seconds and emits ``price_update``/``depth_update``
+    to the room only when the values changed. The task exits once the room
+    is empty, so upstream traffic depends on the number of watched symbols,
+    never on the number of connected clients.
+    """
+
+    def __init__(self, socketio, upstream: Callable[[str], Optional[Dict]], interval: float = 0.5,
+                 on_room_open: Callable[[str], None] = None):
+        self.socketio = socketio
+        self.upstream = upstream
+        self.interval = interval
+        self.on_room_open = on_room_open
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._rooms: Dict[str, Set[str]] = {}
+        self._client_symbols: Dict[str, Set[str]] = {}
+        self._tasks: Dict[str, int] = {}  # symbol -> generation of its running pump
+        self._generation = 0
+        self._last_payload: Dict[str, Dict] = {}
+        self.stats = {'upstream_reads': 0, 'price_events': 0, 'depth_events': 0, 'pumps_started': 0}
+
+    def subscribe(self, sid: str, symbol: str) -> Optional[Dict]:
+        """Register ``sid`` in the symbol's room; returns the latest payload for an immediate reply"""
+        start = False
+        with self._lock:
+            members = self._rooms.setdefault(symbol, set())
+            members.add(sid)
+            self._client_symbols.setdefault(sid, set()).add(symbol)
+            if symbol not in self._tasks:
+                self._generation += 1
+                self._tasks[symbol] = self._generation
+                start = True
+            last = self._last_payload.get(symbol)
+        if start:
+            if self.on_room_open:
+                try:
+                    self.on_room_open(symbol)
+                except Exception as e:
+                    self.logger.error(f"Room open hook failed for {symbol}: {e}")
+            self.stats['pumps_started'] += 1
+            self.socketio.start_background_task(self._pump, symbol, self._tasks[symbol])
+        return last
+
+    def unsubscribe(self, sid: str, symbol: str):
+        with self._lock:
+            self._rooms.get(symbol, set()).discard(sid)
+            self._client_symbols.get(sid, set()).discard(symbol)
+            if symbol in self._rooms and not self._rooms[symbol]:
+                del self._rooms[symbol]
+
+    def remove_client(self, sid: str):
+        """Drop a disconnected client from every room it joined"""
+        with self._lock:
+            symbols = self._client_symbols.pop(sid, set())
+        for symbol in symbols:
+            self.unsubscribe(sid, symbol)
+
+    def _room_active(self, symbol: str, generation: int) -> bool:
+        with self._lock:
+            if self._rooms.get(symbol):
+                return True
+            # Room emptied: retire this pump unless a newer one already took over
+            if self._tasks.get(symbol) == generation:
+                del self._tasks[symbol]
+                self._last_payload.pop(symbol, None)
+            return False
+
+    def _pump(self, symbol: str, generation: int):
+        room = room_name(symbol)
+        while self._room_active(symbol, generation):
+            try:
+                payload = self.upstream(symbol)
+                self.stats['upstream_reads'] += 1
+            except Exception as e:
+                self.logger.error(f"Upstream price read failed for {symbol}: {e}")
+                payload = None
+            if payload:
+                last = self._last_payload.get(symbol) or {}
+                if payload.get('price') != last.get('price'):
+                    self.socketio.emit('price_update', {'symbol': symbol, 'price': payload['price'],
+                                                        'timestamp': payload.get('timestamp')}, to=room)
+                    self.stats['price_events'] += 1
+                if 'bids' in payload and (payload.get('bids') != last.get('bids') or payload.get('asks') != last.get('asks')):
+                    self.socketio.emit('depth_update', {'symbol': symbol, 'bids': payload['bids'],
+                                                        'asks': payload.get('asks', []),
+                                                        'timestamp': payload.get('timestamp')}, to=room)
+                    self.stats['depth_events'] += 1
+                with self._lock:
+                    if self._tasks.get(symbol) == generation:
+                        self._last_payload[symbol] = payload
+            self.socketio.sleep(self.interval)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self.stats,
+                'rooms': {symbol: len(members) for symbol, members in self._rooms.items()},
+                'clients': len(self._client_symbols),
+                'active_pumps': len(self._tasks)
+            }
+
+
+def load_test(clients: int = 500, symbols=('BTC_USDT', 'ETH_USDT', 'SOL_USDT'), duration: float = 3.0,
+              interval: float = 0.2):
+    """Connect simulated Socket.IO clients and show upstream reads stay per-symbol"""
+    from flask import Flask, request
+    from flask_socketio import SocketIO, join_room
+
+    app = Flask(__name__)
+    socketio = SocketIO(app, async_mode='threading')
+    upstream_calls = {symbol: 0 for symbol in symbols}
+
+    def upstream(symbol):
+        upstream_calls[symbol] += 1
+        tick = int(time.time() / interval)
+        return {'price': 30000 + tick % 7, 'bids': [[29999, 1]], 'asks': [[30001, 1 + tick % 3]],
+                'timestamp': int(time.time() * 1000)}
+
+    manager = PriceRoomManager(socketio, upstream, interval=interval)
+
+    @socketio.on('subscribe_price')
+    def _subscribe(data):
+        join_room(room_name(data['symbol']))
+        manager.subscribe(request.sid, data['symbol'])
+
+    @socketio.on('disconnect')
+    def _disconnect(*args):
+        manager.remove_client(request.sid)
+
+    started = time.perf_counter()
+    test_clients = []
+    for i in range(clients):
+        client = socketio.test_client(app)
+        client.emit('subscribe_price', {'symbol': symbols[i % len(symbols)]})
+        test_clients.append(client)
+    connect_time = time.perf_counter() - started
+
+    time.sleep(duration)
+    received = sum(len(client.get_received()) for client in test_clients)
+    stats = manager.get_stats()
+    for client in test_clients:
+        client.disconnect()
+    time.sleep(interval * 3)
+
+    expected = len(symbols) * (duration / interval)
+    print(f"{clients} clients connected in {connect_time:.2f}s, {len(symbols)} symbols, {duration:.0f}s run")
+    print(f"upstream reads: {sum(upstream_calls.values())} (about {expected:.0f} expected for "
+          f"{len(symbols)} pumps at {interval}s, independent of client count)")
+    print(f"events delivered to clients: {received}; emits: {stats['price_events']} price, "
+          f"{stats['depth_events']} depth")
+    print(f"after disconnect: active pumps = {manager.get_stats()['active_pumps']}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    load_test()
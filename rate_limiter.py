@@ -0,0 +1,302 @@
+import asyncio
+import itertools
+import threading
+import time
+import logging
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+# Priority lanes: lower value is served first
+PRIORITY_ORDER = 0      # Order placement / cancel / amend
+PRIORITY_ACCOUNT = 1    # Balances, positions, fills
+PRIORITY_MARKET = 2     # Market data for strategies and analytics
+PRIORITY_BACKGROUND = 3 # GUI reads, scanners, candle backfill
+
+PRIORITY_NAMES = {PRIORITY_ORDER: 'order', PRIORITY_ACCOUNT: 'account',
+                  PRIORITY_MARKET: 'market', PRIORITY_BACKGROUND: 'background'}
+
+# Request weights per endpoint; anything unlisted costs 1
+PIONEX_WEIGHTS = {
+    '/api/v1/market/tickers': 1,
+    '/api/v1/market/depth': 1,
+    '/api/v1/market/trades': 1,
+    '/api/v1/market/klines': 1,
+    '/api/v1/trade/allOrders': 5,
+    '/api/v1/trade/openOrders': 5,
+    '/api/v1/trade/fills': 5,
+    '/api/v1/common/symbols': 5,
+}
+
+BYBIT_ORDER_METHODS = ('place_order', 'cancel_order', 'amend_order', 'cancel_all_orders', 'place_batch_order',
+                       'set_trading_stop')
+BYBIT_ACCOUNT_METHODS = ('get_wallet_balance', 'get_positions', 'get_open_orders', 'get_executions',
+                         'get_order_history', 'set_leverage', 'switch_margin_mode', 'get_fee_rates')
+
+
+def pionex_priority(method: str, endpoint: str) -> int:
+    if endpoint.startswith('/api/v1/trade/order') and method.upper() in ('POST', 'DELETE'):
+        return PRIORITY_ORDER
+    if endpoint.startswith(('/api/v1/trade', '/api/v1/account')):
+        return PRIORITY_ACCOUNT
+    return PRIORITY_MARKET
+
+
+def bybit_priority(method_name: str) -> int:
+    if method_name in BYBIT_ORDER_METHODS:
+        return PRIORITY_ORDER
+    if method_name in BYBIT_ACCOUNT_METHODS:
+        return PRIORITY_ACCOUNT
+    return PRIORITY_MARKET
+
+
+# Callers such as the GUI can demote every request made on their thread
+_context = threading.local()
+
+
+class request_priority:
+    """Context manager capping the priority of requests made inside it, e.g. GUI reads"""
+
+    def __init__(self, priority: int):
+        self.priority = priority
+
+    def __enter__(self):
+        self._previous = getattr(_context, 'priority', None)
+        _context.priority = self.priority
+        return self
+
+    def __exit__(self, *exc):
+        _context.priority = self._previous
+
+
+def effective_priority(priority: int) -> int:
+    floor = getattr(_context, 'priority', None)
+    # Order traffic is never demoted
+    if floor is None or priority == PRIORITY_ORDER:
+        return priority
+    return max(priority, floor)
+
+
+class TokenBucketLimiter:
+    """Weighted token bucket with strict priority lanes.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    Waiters queue FIFO within their lane and a waiter only draws tokens when
+    no higher-priority request is queued, so order traffic jumps ahead of
+    analytics under load. A 429/``Retry-After`` response drains the bucket
+    and pauses all lanes until the penalty expires.
+    """
+
+    def __init__(self, name: str, rate: float = 10.0, capacity: float = 20.0):
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.logger = logging.getLogger(__name__)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._cond = threading.Condition()
+        self._lanes: Dict[int, deque] = {p: deque() for p in PRIORITY_NAMES}
+        self._tickets = itertools.count()
+        self._waits = {p: deque(maxlen=1000) for p in PRIORITY_NAMES}
+        self.stats = {'granted': 0, 'weight': 0, 'throttled': 0, 'penalties': 0, 'timeouts': 0}
+
+    def _refill(self, now: float):
+        # Nothing accrues while paused after a 429
+        start = max(self._updated, self._blocked_until)
+        if now > start:
+            self._tokens = min(self.capacity, self._tokens + (now - start) * self.rate)
+        self._updated = now
+
+    def _enqueue(self, priority: int) -> Tuple[int, int]:
+        ticket = (priority, next(self._tickets))
+        self._lanes[priority].append(ticket)
+        return ticket
+
+    def _is_head(self, ticket: Tuple[int, int]) -> bool:
+        for priority in sorted(self._lanes):
+            lane = self._lanes[priority]
+            if lane:
+                return lane[0] == ticket
+        return False
+
+    def _try_take(self, ticket: Tuple[int, int], weight: float) -> Optional[float]:
+        """Take tokens for ``ticket`` (caller holds the lock); returns None if granted, else a wait hint"""
+        now = time.monotonic()
+        self._refill(now)
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if not self._is_head(ticket):
+            return 0.05
+        if self._tokens >= weight:
+            self._tokens -= weight
+            self._lanes[ticket[0]].popleft()
+            return None
+        return (weight - self._tokens) / self.rate
+
+    def _record(self, priority: int, weight: float, started: float):
+        waited = time.monotonic() - started
+        self._waits[priority].append(waited)
+        self.stats['granted'] += 1
+        self.stats['weight'] += weight
+        if waited > 0.001:
+            self.stats['throttled'] += 1
+        return waited
+
+    def _abandon(self, ticket: Tuple[int, int]):
+        try:
+            self._lanes[ticket[0]].remove(ticket)
+        except ValueError:
+            pass
+        self.stats['timeouts'] += 1
+
+    def acquire(self, weight: float = 1, priority: int = PRIORITY_MARKET, timeout: float = None) -> float:
+        """Block until ``weight`` tokens are granted; returns seconds waited (-1 on timeout)"""
+        weight = min(float(weight), self.capacity)
+        priority = effective_priority(priority)
+        started = time.monotonic()
+        deadline = started + timeout if timeout is not None else None
+        with self._cond:
+            ticket = self._enqueue(priority)
+            while True:
+                wait = self._try_take(ticket, weight)
+                if wait is None:
+                    self._cond.notify_all()
+                    return self._record(priority, weight, started)
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._abandon(ticket)
+                        self._cond.notify_all()
+                        return -1.0
+                    wait = min(wait, remaining)
+                self._cond.wait(wait)
+
+    async def acquire_async(self, weight: float = 1, priority: int = PRIORITY_MARKET, timeout: float = None) -> float:
+        """Same as acquire() but yields to the event loop instead of sleeping the thread"""
+        weight = min(float(weight), self.capacity)
+        priority = effective_priority(priority)
+        started = time.monotonic()
+        deadline = started + timeout if timeout is not None else None
+        with self._cond:
+            ticket = self._enqueue(priority)
+        while True:
+            with self._cond:
+                wait = self._try_take(ticket, weight)
+                if wait is None:
+                    self._cond.notify_all()
+                    return self._record(priority, weight, started)
+                if deadline is not None and time.monotonic() >= deadline:
+                    self._abandon(ticket)
+                    self._cond.notify_all()
+                    return -1.0
+            await asyncio.sleep(min(wait, 0.05))
+
+    def try_acquire(self, weight: float = 1) -> bool:
+        """Take tokens only if available right now and nobody is queued"""
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._blocked_until or any(self._lanes.values()) or self._tokens < weight:
+                return False
+            self._tokens -= weight
+            self.stats['granted'] += 1
+            self.stats['weight'] += weight
+            return True
+
+    def penalize(self, retry_after: float):
+        """Exchange said 429: empty the bucket and hold every lane for ``retry_after`` seconds"""
+        with self._cond:
+            until = time.monotonic() + max(float(retry_after), 0.0)
+            if until > self._blocked_until:
+                self._blocked_until = until
+            self._tokens = 0.0
+            self.stats['penalties'] += 1
+            self._cond.notify_all()
+        self.logger.warning(f"Rate limiter {self.name} paused for {retry_after}s after exchange rate limit")
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            self._refill(time.monotonic())
+            lanes = {}
+            for priority, name in PRIORITY_NAMES.items():
+                waits = sorted(self._waits[priority])
+                lanes[name] = {
+                    'queued': len(self._lanes[priority]),
+                    'wait_p50_ms': round(waits[len(waits) // 2] * 1000, 2) if waits else 0.0,
+                    'wait_p99_ms': round(waits[min(len(waits) - 1, int(len(waits) * 0.99))] * 1000, 2) if waits else 0.0,
+                    'wait_max_ms': round(waits[-1] * 1000, 2) if waits else 0.0
+                }
+            return {
+                'name': self.name,
+                'rate': self.rate,
+                'capacity': self.capacity,
+                'tokens': round(self._tokens, 2),
+                'queue_depth': sum(len(lane) for lane in self._lanes.values()),
+                'paused_for': round(max(0.0, self._blocked_until - time.monotonic()), 2),
+                'lanes': lanes,
+                **self.stats
+            }
+
+
+# One limiter per (exchange, key), shared by every client object in the process
+_limiters: Dict[Tuple[str, str], TokenBucketLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(exchange: str, key: str = None, rate: float = 10.0, capacity: float = 20.0) -> TokenBucketLimiter:
+    """Return the process-wide limiter for an exchange account (created on first use)"""
+    # Only a key prefix goes into the limiter name, which ends up in logs and /metrics
+    label = f"{key[:6]}***" if key else 'public'
+    with _limiters_lock:
+        limiter = _limiters.get((exchange, key or ''))
+        if limiter is None:
+            limiter = TokenBucketLimiter(f"{exchange}:{label}", rate, capacity)
+            _limiters[(exchange, key or '')] = limiter
+        return limiter
+
+def get_all_limiter_stats() -> Dict:
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.get_stats() for limiter in limiters}
+
+
+def parse_retry_after(value, default: float = 1.0) -> float:
+    """Retry-After may be seconds or absent; never trust it to be sane"""
+    try:
+        return min(max(float(value), 0.0), 120.0)
+    except (TypeError, ValueError):
+        return default
+
+
+def benchmark(clients: int = 8, requests_per_client: int = 40, rate: float = 50.0, capacity: float = 10.0):
+    """Several API clients hammering one limiter: total rate stays capped, orders wait least"""
+    limiter = TokenBucketLimiter('benchmark', rate, capacity)
+    lane_of = [PRIORITY_ORDER if i == 0 else PRIORITY_BACKGROUND if i % 2 else PRIORITY_MARKET
+               for i in range(clients)]
+
+    def client(i):
+        for _ in range(requests_per_client):
+            limiter.acquire(1, lane_of[i])
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    total = clients * requests_per_client
+    stats = limiter.get_stats()
+    print(f"{total} requests from {clients} clients in {elapsed:.2f}s -> {total / elapsed:.1f} req/s "
+          f"(limit {rate}/s + burst {capacity})")
+    for name, lane in stats['lanes'].items():
+        print(f"  {name:<10} p50 {lane['wait_p50_ms']:>8.1f} ms  p99 {lane['wait_p99_ms']:>8.1f} ms")
+
+    async def async_clients():
+        start = time.perf_counter()
+        await asyncio.gather(*(limiter.acquire_async(1, PRIORITY_MARKET) for _ in range(100)))
+        return time.perf_counter() - start
+    print(f"100 async acquisitions on one event loop thread: {asyncio.run(async_clients()):.2f}s")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,182 @@
+import functools
+import hashlib
+import threading
+import time
+import logging
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, Tuple
+
+from flask import current_app, request
+
+
+class _CachedResponse:
+    __slots__ = ('body', 'status', 'mimetype', 'etag', 'created', 'tags')
+
+    def __init__(self, body: bytes, status: int, mimetype: str, tags: Tuple[str, ...]):
+        self.body = body
+        self.status = status
+        self.mimetype = mimetype
+        self.etag = hashlib.md5(body).hexdigest()
+        self.created = time.time()
+        self.tags = tags
+
+
+class ResponseCache:
+    """Server-side cache for read-only GUI JSON routes.
+
+    Entries are keyed by path and query string and live for the route's TTL.
+    Concurrent requests for the same key while it is being computed wait for
+    that single upstream call instead of issuing their own, so the number of
+    exchange calls per refresh no longer grows with the number of open tabs.
+    Responses carry an ETag; a matching If-None-Match gets an empty 304.
+    Write routes drop entries by tag (e.g. every 'account' view after a trade).
+    """
+
+    def __init__(self, default_ttl: float = 5.0):
+        self.default_ttl = default_ttl
+        self.logger = logging.getLogger(__name__)
+        self._entries: Dict[str, _CachedResponse] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'not_modified': 0, 'invalidations': 0}
+        self.upstream_calls: Dict[str, int] = {}
+
+    def _compute(self, key: str, name: str, view: Callable, args, kwargs, tags) -> _CachedResponse:
+        response = current_app.make_response(view(*args, **kwargs))
+        with self._lock:
+            self.upstream_calls[name] = self.upstream_calls.get(name, 0) + 1
+        return _CachedResponse(response.get_data(), response.status_code, response.mimetype, tags)
+
+    def get(self, key: str, name: str, ttl: float, view: Callable, args, kwargs, tags) -> _CachedResponse:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.time() - entry.created <= ttl:
+                self.stats['hits'] += 1
+                return entry
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+                generation = self._generation
+                self.stats['misses'] += 1
+            else:
+                self.stats['coalesced'] += 1
+        if not owner:
+            return future.result()
+        try:
+            entry = self._compute(key, name, view, args, kwargs, tags)
+            with self._lock:
+                # Only successful responses are reused, and never one that raced an invalidation
+                if entry.status == 200 and generation == self._generation:
+                    self._entries[key] = entry
+            future.set_result(entry)
+            return entry
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def invalidate(self, tags: Iterable[str] = None):
+        """Drop entries carrying any of ``tags`` (everything when None)"""
+        tags = set(tags) if tags is not None else None
+        with self._lock:
+            self._generation += 1
+            for key in [k for k, e in self._entries.items() if tags is None or tags.intersection(e.tags)]:
+                del self._entries[key]
+            self.stats['invalidations'] += 1
+
+    def cached(self, ttl: float = None, tags: Iterable[str] = ('market',)):
+        """Decorator for a read-only Flask view"""
+        tags = tuple(tags)
+
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                key = request.full_path
+                entry = self.get(key, view.__name__, self.default_ttl if ttl is None else ttl,
+                                 view, args, kwargs, tags)
+                if entry.status == 200 and request.if_none_match.contains(entry.etag):
+                    with self._lock:
+                        self.stats['not_modified'] += 1
+                    response = current_app.response_class(status=304)
+                else:
+                    response = current_app.response_class(entry.body, status=entry.status, mimetype=entry.mimetype)
+                response.set_etag(entry.etag)
+                # Browsers revalidate every poll; unchanged data costs a 304 and no exchange call
+                response.headers['Cache-Control'] = 'no-cache'
+                return response
+            return wrapper
+        return decorator
+
+    def invalidates(self, tags: Iterable[str] = ('account',)):
+        """Decorator for a write view: drops tagged entries once it has run"""
+        tags = tuple(tags)
+
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                try:
+                    return view(*args, **kwargs)
+                finally:
+                    self.invalidate(tags)
+            return wrapper
+        return decorator
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            served = self.stats['hits'] + self.stats['misses'] + self.stats['coalesced']
+            return {
+                **self.stats,
+                'entries': len(self._entries),
+                'hit_rate': round((served - self.stats['misses']) / served, 3) if served else 0.0,
+                'upstream_calls': dict(self.upstream_calls)
+            }
+
+
+def load_test(tabs: int = 50, refreshes: int = 5, upstream_latency: float = 0.05):
+    """Many dashboard tabs polling at once: upstream calls per refresh with the cache"""
+    from concurrent.futures import ThreadPoolExecutor
+    from flask import Flask, jsonify
+
+    app = Flask(__name__)
+    cache = ResponseCache(default_ttl=5.0)
+    calls = {'balance': 0}
+
+    @app.route('/api/balance')
+    @cache.cached(ttl=5, tags=('account',))
+    def balance():
+        calls['balance'] += 1
+        time.sleep(upstream_latency)
+        return jsonify({'total': 100.0 + calls['balance']})
+
+    @app.route('/api/trade', methods=['POST'])
+    @cache.invalidates(('account',))
+    def trade():
+        return jsonify({'success': True})
+
+    client_etags = {}
+
+    def poll(tab):
+        with app.test_client() as client:
+            headers = {'If-None-Match': client_etags[tab]} if tab in client_etags else {}
+            response = client.get('/api/balance', headers=headers)
+            client_etags[tab] = response.headers.get('ETag', '').strip('"')
+            return response.status_code
+
+    with ThreadPoolExecutor(max_workers=tabs) as pool:
+        for refresh in range(refreshes):
+            statuses = list(pool.map(poll, range(tabs)))
+            print(f"refresh {refresh + 1}: {tabs} tabs -> {statuses.count(200)} x 200, "
+                  f"{statuses.count(304)} x 304, upstream calls so far {calls['balance']}")
+            if refresh == 2:
+                app.test_client().post('/api/trade')
+                print("  trade placed: account views invalidated")
+    print(f"stats: {cache.get_stats()}")
+
+
+if __name__ == '__main__':
+    load_test()
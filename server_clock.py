@@ -0,0 +1,142 @@
+import threading
+import time
+import logging
+from typing import Callable, Dict, Optional
+
+
+class ServerClock:
+    """Tracks the offset between the local clock and an exchange server clock.
+
+    The server is sampled occasionally (on a schedule or after the exchange
+    rejects a timestamp). Between samples, timestamps are derived from the
+    local monotonic clock plus the estimated offset, so signed requests no
+    longer need an extra round-trip just to read the server time.
+    """
+
+    def __init__(self, fetch_server_time: Callable[[], Optional[int]], resync_interval: float = 300.0,
+                 samples_per_sync: int = 3, name: str = 'exchange'):
+        self.fetch_server_time = fetch_server_time
+        self.resync_interval = resync_interval
+        self.samples_per_sync = max(1, samples_per_sync)
+        self.name = name
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        # Anchor: server time (ms) observed at a given local monotonic instant
+        self._anchor_server_ms = None
+        self._anchor_mono = None
+        self._offset_ms = 0.0
+        self._rtt_ms = None
+        self._drift_ppm = 0.0
+        self._last_sync_mono = None
+        self._needs_resync = True
+
+        self.resync_count = 0
+        self.sync_failures = 0
+        self.rejections = 0
+
+    def _sample(self):
+        """Take one server time sample, returning (server_ms, rtt_ms, mono_at_midpoint, wall_ms_at_midpoint)"""
+        t0 = time.monotonic()
+        server_ms = self.fetch_server_time()
+        t1 = time.monotonic()
+        if server_ms is None:
+            return None
+        mid = (t0 + t1) / 2
+        wall_ms = time.time() * 1000 - (t1 - mid) * 1000
+        return int(server_ms), (t1 - t0) * 1000, mid, wall_ms
+
+    def sync(self) -> bool:
+        """Resample the server clock, keeping the lowest-latency sample"""
+        best = None
+        for _ in range(self.samples_per_sync):
+            try:
+                sample = self._sample()
+            except Exception as e:
+                self.logger.warning(f"Server time sample failed for {self.name}: {e}")
+                sample = None
+            if sample and (best is None or sample[1] < best[1]):
+                best = sample
+
+        with self._lock:
+            if best is None:
+                self.sync_failures += 1
+                # Retry later instead of hammering the exchange on every request
+                self._last_sync_mono = time.monotonic()
+                self._needs_resync = False
+                return False
+
+            server_ms, rtt_ms, mono, wall_ms = best
+            offset_ms = server_ms - wall_ms
+            if self._last_sync_mono is not None and self._anchor_mono is not None:
+                elapsed = mono - self._anchor_mono
+                if elapsed >= 10:
+                    self._drift_ppm = (offset_ms - self._offset_ms) / (elapsed * 1000) * 1e6
+
+            self._anchor_server_ms = server_ms
+            self._anchor_mono = mono
+            self._offset_ms = offset_ms
+            self._rtt_ms = rtt_ms
+            self._last_sync_mono = time.monotonic()
+            self._needs_resync = False
+            self.resync_count += 1
+
+        self.logger.debug(f"{self.name} clock synced: offset={offset_ms:.1f}ms rtt={rtt_ms:.1f}ms")
+        return True
+
+    def observe(self, server_ms: Optional[int], rtt_ms: float):
+        """Passively refine the anchor from a server timestamp seen in a normal response"""
+        if not server_ms:
+            return
+        mono = time.monotonic() - rtt_ms / 2000
+        with self._lock:
+            # Only accept samples at least as tight as the current anchor
+            if self._anchor_mono is None or self._rtt_ms is None or rtt_ms > self._rtt_ms:
+                return
+            self._anchor_server_ms = int(server_ms)
+            self._anchor_mono = mono
+            self._offset_ms = server_ms - (time.time() * 1000 - rtt_ms / 2)
+
+    def invalidate(self):
+        """Force a resync on the next timestamp request (e.g. after a timestamp rejection)"""
+        with self._lock:
+            self.rejections += 1
+            self._needs_resync = True
+
+    def _is_stale(self) -> bool:
+        if self._needs_resync or self._last_sync_mono is None:
+            return True
+        return (time.monotonic() - self._last_sync_mono) >= self.resync_interval
+
+    def now_ms(self) -> int:
+        """Current server time estimate in milliseconds"""
+        if self._is_stale():
+            self.sync()
+        with self._lock:
+            if self._anchor_mono is None:
+                return int(time.time() * 1000)
+            return int(self._anchor_server_ms + (time.monotonic() - self._anchor_mono) * 1000)
+
+    def get_metrics(self) -> Dict:
+        with self._lock:
+            return {
+                'offset_ms': self._offset_ms,
+                'rtt_ms': self._rtt_ms,
+                'drift_ppm': self._drift_ppm,
+                'last_sync_age': (time.monotonic() - self._last_sync_mono) if self._last_sync_mono else None,
+                'resync_count': self.resync_count,
+                'sync_failures': self.sync_failures,
+                'timestamp_rejections': self.rejections
+            }
+
+
+# Shared clocks, one per exchange base URL
+_clocks = {}
+_clocks_lock = threading.Lock()
+
+def get_server_clock(key: str, fetch_server_time: Callable[[], Optional[int]], resync_interval: float = 300.0) -> ServerClock:
+    """Get or create the shared server clock for an exchange endpoint"""
+    with _clocks_lock:
+        if key not in _clocks:
+            _clocks[key] = ServerClock(fetch_server_time, resync_interval=resync_interval, name=key)
+        return _clocks[key]
@@ -0,0 +1,254 @@
+import threading
+import time
+import logging
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional
+
+import pytz
+
+DAY_MS = 86_400_000
+
+
+class SessionWindow(NamedTuple):
+    name: str
+    open_ms: int
+    close_ms: int
+
+
+def parse_timezone(name: str):
+    """'UTC-5' / 'UTC+8' style fixed offsets, otherwise an IANA zone name"""
+    name = (name or 'UTC').strip()
+    if name.upper().startswith('UTC') and len(name) > 3:
+        sign = -1 if name[3] == '-' else 1
+        hours, _, minutes = name[4:].partition(':')
+        return pytz.FixedOffset(sign * (int(hours) * 60 + int(minutes or 0)))
+    return pytz.timezone(name)
+
+
+def parse_clock(value):
+    """'HH:MM' string, or the minutes YAML 1.1 makes of an unquoted 19:30"""
+    if isinstance(value, int):
+        return divmod(value, 60)
+    hour, minute = str(value).split(':')[:2]
+    return int(hour), int(minute)
+
+
+class SessionCalendar:
+    """Session open/close instants precomputed per day from timezone rules.
+
+    Session times are read in the session's ``timezone``. A session with
+    ``daylight_saving``/``standard_time`` blocks picks the block for each day
+    from the real DST state of ``dst_timezone`` (New York by default) rather
+    than a month list. Windows are kept as sorted epoch-ms arrays covering a
+    few days around now, so "is the session open at t" is one bisect.
+    """
+
+    def __init__(self, sessions: Dict, horizon_days: int = 7):
+        self.logger = logging.getLogger(__name__)
+        self.sessions = sessions
+        self.horizon_days = horizon_days
+        self._opens: Dict[str, List[int]] = {}
+        self._closes: Dict[str, List[int]] = {}
+        self._built_from = 0
+        self._built_until = 0
+        self._lock = threading.Lock()
+
+    def _session_times(self, config: Dict, day) -> tuple:
+        if 'daylight_saving' in config or 'standard_time' in config:
+            rules = pytz.timezone(config.get('dst_timezone', 'America/New_York'))
+            noon = rules.localize(datetime(day.year, day.month, day.day, 12))
+            block = config.get('daylight_saving' if noon.dst() else 'standard_time', {})
+            return block.get('start_time'), block.get('end_time')
+        return config.get('start_time'), config.get('end_time')
+
+    def _build(self, around_ms: int):
+        opens: Dict[str, List[int]] = {}
+        closes: Dict[str, List[int]] = {}
+        first = datetime.fromtimestamp(around_ms / 1000, pytz.utc).date() - timedelta(days=2)
+        for name, config in self.sessions.items():
+            if not isinstance(config, dict):
+                continue
+            tz = parse_timezone(config.get('timezone', 'UTC'))
+            windows = []
+            for offset in range(self.horizon_days + 3):
+                day = first + timedelta(days=offset)
+                start, end = self._session_times(config, day)
+                if start is None or end is None:
+                    continue
+                start_h, start_m = parse_clock(start)
+                end_h, end_m = parse_clock(end)
+                open_at = tz.localize(datetime(day.year, day.month, day.day, start_h, start_m))
+                close_day = day + timedelta(days=1) if (end_h, end_m) <= (start_h, start_m) else day
+                close_at = tz.localize(datetime(close_day.year, close_day.month, close_day.day, end_h, end_m))
+                windows.append((int(open_at.timestamp() * 1000), int(close_at.timestamp() * 1000)))
+            windows.sort()
+            opens[name] = [w[0] for w in windows]
+            closes[name] = [w[1] for w in windows]
+        self._opens, self._closes = opens, closes
+        self._built_from = around_ms - DAY_MS
+        self._built_until = around_ms + (self.horizon_days - 1) * DAY_MS
+
+    def _ensure(self, t_ms: int):
+        if not self._built_from <= t_ms <= self._built_until:
+            with self._lock:
+                if not self._built_from <= t_ms <= self._built_until:
+                    self._build(t_ms)
+
+    def last_window(self, name: str, t_ms: int = None) -> Optional[SessionWindow]:
+        """The most recent window of ``name`` that opened at or before ``t_ms``"""
+        t_ms = int(time.time() * 1000) if t_ms is None else t_ms
+        self._ensure(t_ms)
+        opens = self._opens.get(name)
+        if not opens:
+            return None
+        index = bisect_right(opens, t_ms) - 1
+        if index < 0:
+            return None
+        return SessionWindow(name, opens[index], self._closes[name][index])
+
+    def window_at(self, name: str, t_ms: int = None) -> Optional[SessionWindow]:
+        """The window of ``name`` open at ``t_ms``, or None"""
+        t_ms = int(time.time() * 1000) if t_ms is None else t_ms
+        window = self.last_window(name, t_ms)
+        return window if window and t_ms < window.close_ms else None
+
+    def active_sessions(self, t_ms: int = None) -> List[SessionWindow]:
+        t_ms = int(time.time() * 1000) if t_ms is None else t_ms
+        return [w for w in (self.window_at(name, t_ms) for name in self.sessions) if w]
+
+    def next_open(self, name: str, t_ms: int = None) -> Optional[int]:
+        t_ms = int(time.time() * 1000) if t_ms is None else t_ms
+        self._ensure(t_ms)
+        opens = self._opens.get(name, [])
+        index = bisect_right(opens, t_ms)
+        return opens[index] if index < len(opens) else None
+
+
+class RangeBox:
+    """High/low of the first ``lookback`` minutes of one session window for one symbol"""
+    __slots__ = ('symbol', 'session', 'open_ms', 'end_ms', 'high', 'low', 'candles', 'first_ms', 'last_ms',
+                 'frozen')
+
+    def __init__(self, symbol: str, session: str, open_ms: int, end_ms: int):
+        self.symbol = symbol
+        self.session = session
+        self.open_ms = open_ms
+        self.end_ms = end_ms
+        self.high = float('-inf')
+        self.low = float('inf')
+        self.candles = 0
+        self.first_ms = 0  # Open times of the first and last folded candles
+        self.last_ms = 0
+        self.frozen = False
+
+    @property
+    def covers_start(self) -> bool:
+        return bool(self.candles) and self.first_ms <= self.open_ms
+
+
+class RangeTracker:
+    """Incremental range boxes per (symbol, session).
+
+    Each closed candle widens the box of every session whose lookback it
+    falls in. Candles are folded in time order and repeats are skipped, so
+    live candles and backfills can overlap. A box freezes only once its
+    candles run from the window open to the last lookback minute; after
+    that, reading it is a dict lookup.
+    """
+
+    def __init__(self, calendar: SessionCalendar, lookbacks: Dict[str, int]):
+        self.calendar = calendar
+        self.lookbacks = lookbacks  # session -> minutes
+        self.boxes: Dict[tuple, RangeBox] = {}
+
+    def update(self, symbol: str, open_ms: int, high: float, low: float) -> List[RangeBox]:
+        """Fold one candle in; returns the boxes that froze on it"""
+        frozen = []
+        for session, minutes in self.lookbacks.items():
+            window = self.calendar.last_window(session, open_ms)
+            if window is None or open_ms >= window.open_ms + minutes * 60_000:
+                continue
+            box = self.boxes.get((symbol, session))
+            if box is None or box.open_ms != window.open_ms:
+                box = RangeBox(symbol, session, window.open_ms, window.open_ms + minutes * 60_000)
+                self.boxes[(symbol, session)] = box
+            elif box.frozen or open_ms <= box.last_ms:
+                continue
+            if not box.candles:
+                box.first_ms = open_ms
+            if high > box.high:
+                box.high = high
+            if low < box.low:
+                box.low = low
+            box.candles += 1
+            box.last_ms = open_ms
+            if box.covers_start and open_ms >= box.end_ms - 60_000:
+                box.frozen = True
+                frozen.append(box)
+        return frozen
+
+    def get(self, symbol: str, session: str) -> Optional[RangeBox]:
+        """Current box for the symbol's session (frozen once complete)"""
+        return self.boxes.get((symbol, session))
+
+    def reset(self, symbol: str, session: str):
+        """Drop the box so it can be rebuilt from the window open"""
+        self.boxes.pop((symbol, session), None)
+
+
+def benchmark(symbols: int = 50, checks: int = 100_000):
+    """Session check plus range-box read per tick: calendar/tracker vs string compare and frame filtering"""
+    import numpy as np
+    import pandas as pd
+
+    sessions = {
+        'us_session': {'enabled': True, 'timezone': 'UTC-5', 'range_box_lookback': 90,
+                       'daylight_saving': {'start_time': '08:30', 'end_time': '15:00'},
+                       'standard_time': {'start_time': '09:30', 'end_time': '16:00'}},
+        'asian_session': {'enabled': True, 'timezone': 'UTC-5', 'range_box_lookback': 90,
+                          'start_time': '19:30', 'end_time': '01:30'}
+    }
+    calendar = SessionCalendar(sessions)
+    tracker = RangeTracker(calendar, {name: cfg['range_box_lookback'] for name, cfg in sessions.items()})
+    now_ms = int(time.time() * 1000) // 60_000 * 60_000
+    times = np.arange(now_ms - 2 * DAY_MS, now_ms, 60_000)
+    rng = np.random.default_rng(3)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, len(times))))
+    for i in range(symbols):
+        for t, c in zip(times, close):
+            tracker.update(f'SYM{i}', int(t), c * 1.001, c * 0.999)
+
+    tz = pytz.timezone('America/New_York')
+    started = time.perf_counter()
+    for _ in range(checks):
+        current = datetime.now(tz).strftime('%H:%M')
+        '08:30' <= current <= '15:00'
+    string_us = (time.perf_counter() - started) / checks * 1e6
+    started = time.perf_counter()
+    for _ in range(checks):
+        calendar.window_at('us_session', now_ms)
+    bisect_us = (time.perf_counter() - started) / checks * 1e6
+    print(f"session check: strftime compare {string_us:.2f} us, bisect {bisect_us:.2f} us")
+
+    frame = pd.DataFrame({'high': close * 1.001, 'low': close * 0.999},
+                         index=pd.to_datetime(times, unit='ms', utc=True))
+    window = calendar.last_window('us_session', now_ms)
+    session_start = pd.Timestamp(window.open_ms, unit='ms', tz='UTC')
+    started = time.perf_counter()
+    for i in range(symbols):
+        data = frame[frame.index >= session_start].head(90)
+        data['high'].max(), data['low'].min()
+    filter_us = (time.perf_counter() - started) / symbols * 1e6
+    started = time.perf_counter()
+    for _ in range(checks // symbols):
+        for i in range(symbols):
+            tracker.get(f'SYM{i}', 'us_session')
+    tracker_us = (time.perf_counter() - started) / checks * 1e6
+    print(f"range box per symbol: frame filter {filter_us:.1f} us, tracker {tracker_us:.2f} us")
+    print(f"{symbols} symbols per tick: {symbols * (string_us + filter_us) / 1000:.2f} ms -> "
+          f"{symbols * (bisect_us + tracker_us) / 1000:.3f} ms")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -235,6 +235,10 @@ function initializeSocket() {
     socket.on('connect', function() {
         console.log('Connected to server');
         updateConnectionStatus(true);
+        // Join the per-symbol price rooms; the server pushes updates as they change
+        ['BTC_USDT', 'ETH_USDT', 'DOT_USDT'].forEach(symbol => {
+            socket.emit('subscribe_price', {symbol: symbol});
+        });
     });
     
     socket.on('disconnect', function() {
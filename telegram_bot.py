@@ -17,6 +17,12 @@ from email.mime.text import MIMEText
 from config_loader import get_config, reload_config
 from pionex_api import PionexAPI
 from trading_strategies import TradingStrategies
+from kline_cache import kline_cache
+from candlestick_patterns import scan_patterns, PATTERN_WEIGHTS
+from market_scanner import get_market_scanner
+from timeframe_resampler import get_timeframe_resampler
+from exchange_metrics import exchange_metrics
+from async_bridge import get_async_bridge
 from database import Database
 from auto_trader import get_auto_trader, start_auto_trading, stop_auto_trading, restart_auto_trading, get_auto_trading_status
 from futures_trading import (
@@ -27,7 +33,8 @@ from futures_trading import (
 from backtesting import (
     run_backtest, enable_paper_trading, disable_paper_trading, get_paper_trading_ledger
 )
-from pionex_ws import PionexWebSocket
+from pionex_ws import get_pionex_websocket
+from market_state import market_state
 
 # Configure logging
 config = get_config()
@@ -44,15 +51,22 @@ class TradingBot:
         self.db = Database()
         self.auto_trading_users = set()
         self.config = get_config()
+        
+        # Blocking exchange/database calls run on a bounded pool so handlers never stall the event loop
+        telegram_config = self.config.get('telegram', {})
+        self.bridge = get_async_bridge(
+            'telegram',
+            max_workers=telegram_config.get('executor_workers', 16),
+            timeout=telegram_config.get('call_timeout', 15)
+        )
+        self.async_api = self.bridge.wrap(self.api, error_dicts=True)
+        self.async_db = self.bridge.wrap(self.db)
         self.user_param_update_state = {}  # user_id -> param being updated
         self.user_backtest_state = {}      # user_id -> dict for backtest param collection
         self.user_order_query_state = None  # user_id -> dict for order query state
         
-        # Initialize WebSocket for real-time data
+        # Real-time prices come from the shared websocket market state
         self.ws = None
-        self.ws_connected = False
-        self.real_time_data = {}
-        self.ws_thread = None
         
         # Start WebSocket connection
         self._start_websocket()
@@ -69,7 +83,7 @@ class TradingBot:
         if not self.check_auth(user_id):
             await update.message.reply_text("❌ You are not authorized to use this bot.")
             return
-        self.db.add_user(user_id, user.username, user.first_name, user.last_name)
+        await self.async_db.add_user(user_id, user.username, user.first_name, user.last_name)
         await update.message.reply_text(
             "🚀 Welcome to Pionex Trading Bot!\n\n"
             "This bot allows you to:\n"
@@ -201,6 +215,9 @@ class TradingBot:
         elif data == "technical_analysis":
             await self.show_technical_analysis(query)
         
+        elif data.startswith("market_scan"):
+            await self.show_market_scan(query, data.split("_")[-1] if data.count("_") > 1 else 'pionex')
+        
         elif data == "auto_trading":
             await self.show_auto_trading(query)
         
@@ -247,11 +264,11 @@ class TradingBot:
             await self.show_paper_trading_ledger(query)
         
         elif data == "enable_paper":
-            enable_paper_trading(user_id)
+            await self.bridge.run(enable_paper_trading, user_id)
             await query.edit_message_text("✅ Paper trading enabled!", reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Back", callback_data="paper_trading")]]))
         
         elif data == "disable_paper":
-            disable_paper_trading(user_id)
+            await self.bridge.run(disable_paper_trading, user_id)
             await query.edit_message_text("❌ Paper trading disabled!", reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Back", callback_data="paper_trading")]]))
         
         elif data.startswith("futures_"):
@@ -407,7 +424,7 @@ class TradingBot:
     async def show_balance(self, query):
         """Show account balance using /api/v1/account/balances format (all coins, sorted)"""
         try:
-            balance_response = self.api.get_balances()
+            balance_response = await self.async_api.get_balances()
             if 'error' in balance_response:
                 await self._safe_edit_message(
                     query,
@@ -446,7 +463,7 @@ class TradingBot:
     async def show_positions(self, query):
         """Show current positions"""
         try:
-            positions_response = self.api.get_positions()
+            positions_response = await self.async_api.get_positions()
             
             if 'error' in positions_response:
                 await query.edit_message_text(
@@ -494,8 +511,8 @@ class TradingBot:
         """Show portfolio overview"""
         try:
             # Get positions and calculate metrics
-            positions_response = self.api.get_positions()
-            balance_response = self.api.get_balances()
+            positions_response = await self.async_api.get_positions()
+            balance_response = await self.async_api.get_balances()
             
             if 'error' in positions_response or 'error' in balance_response:
                 await query.edit_message_text(
@@ -552,7 +569,7 @@ class TradingBot:
         """Show trading history"""
         try:
             user_id = query.from_user.id
-            history = self.db.get_trading_history(user_id, 10)
+            history = await self.async_db.get_trading_history(user_id, 10)
             
             history_text = "📋 Recent Trading History\n\n"
             
@@ -647,6 +664,7 @@ class TradingBot:
                 [InlineKeyboardButton("📊 Advanced Analysis", callback_data="analysis_advanced")],
                 [InlineKeyboardButton("📈 MACD Analysis", callback_data="analysis_macd")],
                 [InlineKeyboardButton("🕯️ Candlestick Patterns", callback_data="analysis_candlestick")],
+                [InlineKeyboardButton("🔎 Market Scanner", callback_data="market_scan_pionex")],
                 [InlineKeyboardButton("🔙 Back", callback_data="main_menu")]
             ]
             
@@ -665,7 +683,7 @@ class TradingBot:
         """Show auto trading options"""
         try:
             user_id = query.from_user.id
-            status = get_auto_trading_status(user_id)
+            status = await self.bridge.run(get_auto_trading_status, user_id)
             
             auto_text = "🤖 Auto Trading\n\n"
             auto_text += f"Status: {'✅ ACTIVE' if status.get('auto_trading_enabled', False) else '❌ INACTIVE'}\n"
@@ -726,7 +744,7 @@ class TradingBot:
         """Show strategy management"""
         try:
             user_id = query.from_user.id
-            active_strategies = self.db.get_active_strategies(user_id)
+            active_strategies = await self.async_db.get_active_strategies(user_id)
             
             strategy_text = "🎯 Trading Strategies\n\n"
             
@@ -756,25 +774,25 @@ class TradingBot:
         """Show bot status"""
         try:
             # Check API connection using account info
-            account_info = self.api.get_account_info()
+            account_info = await self.async_api.get_account_info()
             api_status = "✅ Connected" if 'error' not in account_info else "❌ Disconnected"
             
             # Get user settings
             user_id = query.from_user.id
-            settings = self.db.get_user_settings(user_id)
+            settings = await self.async_db.get_user_settings(user_id)
             
             # Get auto trading status
-            auto_trading_status = get_auto_trading_status(user_id)
+            auto_trading_status = await self.bridge.run(get_auto_trading_status, user_id)
             
             # Get recent API activity
-            balance_response = self.api.get_balances()
+            balance_response = await self.async_api.get_balances()
             balance_status = "✅ Working" if 'error' not in balance_response else "❌ Error"
             
             status_text = "📊 Bot Status\n\n"
             status_text += f"🔌 API Status: {api_status}\n"
             status_text += f"💰 Balance API: {balance_status}\n"
             status_text += f"🤖 Auto Trading: {'✅ ON' if auto_trading_status.get('auto_trading_enabled', False) else '❌ OFF'}\n"
-            status_text += f"📈 Active Strategies: {len(self.db.get_active_strategies(user_id))}\n"
+            status_text += f"📈 Active Strategies: {len(await self.async_db.get_active_strategies(user_id))}\n"
             status_text += f"⏰ Last Update: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
             
             # Add account details if available
@@ -824,8 +842,8 @@ class TradingBot:
         """Show futures trading options"""
         try:
             user_id = query.from_user.id
-            status = get_strategy_status(user_id)
-            metrics = get_performance_metrics(user_id)
+            status = await self.bridge.run(get_strategy_status, user_id)
+            metrics = await self.bridge.run(get_performance_metrics, user_id)
             
             futures_text = "🚀 Futures Trading\n\n"
             futures_text += f"Active Grids: {status.get('active_grids', 0)}\n"
@@ -916,7 +934,7 @@ class TradingBot:
         """Show paper trading menu"""
         try:
             user_id = query.from_user.id
-            ledger = get_paper_trading_ledger(user_id)
+            ledger = await self.bridge.run(get_paper_trading_ledger, user_id)
             
             # Calculate paper trading status from ledger
             enabled = len(ledger) > 0  # If there are trades, paper trading is active
@@ -969,7 +987,7 @@ class TradingBot:
         """Handle enable auto trading"""
         try:
             user_id = query.from_user.id
-            start_auto_trading(user_id)
+            await self.bridge.run(start_auto_trading, user_id)
             
             await query.edit_message_text(
                 "✅ Auto Trading Enabled\n\n"
@@ -992,7 +1010,7 @@ class TradingBot:
         """Handle disable auto trading"""
         try:
             user_id = query.from_user.id
-            stop_auto_trading(user_id)
+            await self.bridge.run(stop_auto_trading, user_id)
             
             await query.edit_message_text(
                 "❌ Auto Trading Disabled\n\n"
@@ -1012,7 +1030,7 @@ class TradingBot:
         """Handle restart auto trading"""
         try:
             user_id = query.from_user.id
-            restart_auto_trading(user_id)
+            await self.bridge.run(restart_auto_trading, user_id)
             
             await query.edit_message_text(
                 "🔄 Auto Trading Restarted\n\n"
@@ -1131,7 +1149,7 @@ class TradingBot:
         """Show paper trading ledger"""
         try:
             user_id = query.from_user.id
-            ledger = get_paper_trading_ledger(user_id)
+            ledger = await self.bridge.run(get_paper_trading_ledger, user_id)
             
             ledger_text = "📒 Paper Trading Ledger\n\n"
             
@@ -1270,7 +1288,7 @@ class TradingBot:
         """Show futures performance"""
         try:
             # Get performance metrics from futures trading
-            performance = get_performance_metrics(user_id)
+            performance = await self.bridge.run(get_performance_metrics, user_id)
             
             performance_text = "📈 Futures Performance\n\n"
             
@@ -1308,7 +1326,7 @@ class TradingBot:
         """Show futures dynamic limits"""
         try:
             # Get dynamic limits from futures trading
-            limits = get_dynamic_limits(user_id)
+            limits = await self.bridge.run(get_dynamic_limits, user_id)
             
             limits_text = "⚡ Futures Dynamic Limits\n\n"
             
@@ -1349,7 +1367,7 @@ class TradingBot:
             symbol = config.get('trading_pair', 'XRP_USDT')
             
             # Get liquidation risk from futures trading
-            risk = check_liquidation_risk(user_id, symbol)
+            risk = await self.bridge.run(check_liquidation_risk, user_id, symbol)
             
             risk_text = "⚠️ Futures Liquidation Risk\n\n"
             
@@ -1425,7 +1443,7 @@ class TradingBot:
         """Show liquidation risk analysis"""
         try:
             # Get account balances to assess risk
-            balance_response = self.api.get_balances()
+            balance_response = await self.async_api.get_balances()
             
             if 'error' in balance_response:
                 await query.edit_message_text(
@@ -1539,7 +1557,7 @@ class TradingBot:
         """Show portfolio risk analysis"""
         try:
             # Get account balances for portfolio risk assessment
-            balance_response = self.api.get_balances()
+            balance_response = await self.async_api.get_balances()
             
             if 'error' in balance_response:
                 await query.edit_message_text(
@@ -1620,7 +1638,7 @@ class TradingBot:
         """Show dynamic trading limits"""
         try:
             # Get account balances to calculate limits
-            balance_response = self.api.get_balances()
+            balance_response = await self.async_api.get_balances()
             
             if 'error' in balance_response:
                 await query.edit_message_text(
@@ -1695,7 +1713,7 @@ class TradingBot:
         """Show comprehensive risk metrics"""
         try:
             # Get account balances for risk metrics
-            balance_response = self.api.get_balances()
+            balance_response = await self.async_api.get_balances()
             
             if 'error' in balance_response:
                 await query.edit_message_text(
@@ -1796,7 +1814,7 @@ class TradingBot:
         """Handle trading pair selection"""
         try:
             # Get current price for the selected pair
-            ticker_response = self.api.get_ticker_price(symbol)
+            ticker_response = await self.async_api.get_ticker_price(symbol)
             
             if 'error' in ticker_response:
                 await query.edit_message_text(
@@ -2165,7 +2183,7 @@ class TradingBot:
         try:
             config = get_config()
             symbol = config.get('trading_pair', 'XRP_USDT')
-            current_price = self.get_real_time_price(symbol) or 0.5
+            current_price = await self.bridge.run(self.get_real_time_price, symbol) or 0.5
             
             order_text = "📊 Advanced Order Types\n\n"
             order_text += f"📈 Symbol: {symbol}\n"
@@ -2205,7 +2223,7 @@ class TradingBot:
         try:
             config = get_config()
             symbol = config.get('trading_pair', 'XRP_USDT')
-            current_price = self.get_real_time_price(symbol) or 0.5
+            current_price = await self.bridge.run(self.get_real_time_price, symbol) or 0.5
             
             bracket_text = "📊 Bracket Order Setup\n\n"
             bracket_text += f"📈 Symbol: {symbol}\n"
@@ -2241,7 +2259,7 @@ class TradingBot:
         try:
             config = get_config()
             symbol = config.get('trading_pair', 'XRP_USDT')
-            current_price = self.get_real_time_price(symbol) or 0.5
+            current_price = await self.bridge.run(self.get_real_time_price, symbol) or 0.5
             
             oco_text = "📊 OCO Order Setup\n\n"
             oco_text += f"📈 Symbol: {symbol}\n"
@@ -2329,8 +2347,8 @@ class TradingBot:
             config = get_config()
             
             # Get current price and try to get RSI data
-            ticker_response = self.api.get_ticker_price(symbol)
-            klines_response = self.api.get_klines(symbol, '5M', 100)  # Use 5M interval which works
+            ticker_response = await self.async_api.get_ticker_price(symbol)
+            klines_response = await self.bridge.run(kline_cache.get_klines, self.api, symbol, '5M', 100)  # Use 5M interval which works
             
             if 'error' in ticker_response:
                 await self._safe_edit_message(
@@ -2406,9 +2424,10 @@ class TradingBot:
         try:
             config = get_config()
             
-            # Get data for different timeframes using working intervals
-            klines_5m = self.api.get_klines(symbol, '5M', 100)  # 5-minute data
-            klines_30m = self.api.get_klines(symbol, '30M', 100)  # 30-minute data (closest to 1h)
+            # Both timeframes are aggregated locally from the one 1M base series
+            resampler = get_timeframe_resampler()
+            klines_5m = await self.bridge.run(resampler.get_candles, self.api, symbol, '5M', 100)  # 5-minute data
+            klines_30m = await self.bridge.run(resampler.get_candles, self.api, symbol, '30M', 100)  # 30-minute data
             
             if 'error' in klines_5m and 'error' in klines_30m:
                 await self._safe_edit_message(
@@ -2425,10 +2444,9 @@ class TradingBot:
             rsi_source_30m = "Default (no data)"
             
             # Calculate 5M RSI
-            if 'error' not in klines_5m and 'data' in klines_5m and 'klines' in klines_5m['data']:
+            if 'error' not in klines_5m:
                 try:
-                    klines_data = klines_5m['data']['klines']
-                    closes_5m = [float(k['close']) for k in klines_data]
+                    closes_5m = [candle[4] for candle in klines_5m['candles']]
                     rsi_5m = self.strategies.calculate_rsi(closes_5m, 14)
                     if rsi_5m and len(rsi_5m) > 0:
                         current_rsi_5m = rsi_5m[-1]
@@ -2438,10 +2456,9 @@ class TradingBot:
                     rsi_source_5m = "Fallback calculation"
             
             # Calculate 30M RSI
-            if 'error' not in klines_30m and 'data' in klines_30m and 'klines' in klines_30m['data']:
+            if 'error' not in klines_30m:
                 try:
-                    klines_data = klines_30m['data']['klines']
-                    closes_30m = [float(k['close']) for k in klines_data]
+                    closes_30m = [candle[4] for candle in klines_30m['candles']]
                     rsi_30m = self.strategies.calculate_rsi(closes_30m, 14)
                     if rsi_30m and len(rsi_30m) > 0:
                         current_rsi_30m = rsi_30m[-1]
@@ -2511,7 +2528,7 @@ class TradingBot:
             # symbol = config.get('trading_pair', 'BTCUSDT')  # REMOVED THIS LINE
             
             # Get recent klines with volume data - use 30M interval which works
-            klines_response = self.api.get_klines(symbol, '30M', 50)
+            klines_response = await self.bridge.run(kline_cache.get_klines, self.api, symbol, '30M', 50)
             
             if 'error' in klines_response:
                 await query.edit_message_text(
@@ -2592,8 +2609,8 @@ class TradingBot:
             # symbol = config.get('trading_pair', 'BTCUSDT')  # REMOVED THIS LINE
             
             # Get comprehensive market data - use 30M interval which works
-            klines_response = self.api.get_klines(symbol, '30M', 100)
-            ticker_response = self.api.get_ticker_price(symbol)
+            klines_response = await self.bridge.run(kline_cache.get_klines, self.api, symbol, '30M', 100)
+            ticker_response = await self.async_api.get_ticker_price(symbol)
             
             if 'error' in klines_response or 'error' in ticker_response:
                 await query.edit_message_text(
@@ -2712,7 +2729,7 @@ class TradingBot:
             # symbol = config.get('trading_pair', 'BTCUSDT')  # REMOVED THIS LINE
             
             # Get price data - use 30M interval which works
-            klines_response = self.api.get_klines(symbol, '30M', 100)
+            klines_response = await self.bridge.run(kline_cache.get_klines, self.api, symbol, '30M', 100)
             
             if 'error' in klines_response:
                 await query.edit_message_text(
@@ -2802,7 +2819,7 @@ class TradingBot:
             # symbol = config.get('trading_pair', 'BTCUSDT')  # REMOVED THIS LINE
             
             # Get recent candlestick data - use 30M interval which works
-            klines_response = self.api.get_klines(symbol, '30M', 20)
+            klines_response = await self.bridge.run(kline_cache.get_klines, self.api, symbol, '30M', 20)
             
             if 'error' in klines_response:
                 await query.edit_message_text(
@@ -2823,62 +2840,22 @@ class TradingBot:
                 current_price = float(klines_data[-1][4]) if klines_data else 0  # Close price
                 recent_candles = klines_data[-5:]  # Last 5 candles
             
-            patterns = []
+            # Scan every fetched candle at once and report the last five
+            if 'data' in klines_response and 'klines' in klines_response['data']:
+                ohlc = [(float(k.get('open', 0)), float(k.get('high', 0)), float(k.get('low', 0)), float(k.get('close', 0)))
+                        for k in klines_data]
+            else:
+                ohlc = [(float(k[1]), float(k[2]), float(k[3]), float(k[4])) for k in klines_data]
+            opens, highs, lows, closes = zip(*ohlc) if ohlc else ((), (), (), ())
+            detected = scan_patterns(opens, highs, lows, closes)
             
-            for i, candle in enumerate(recent_candles):
-                if 'data' in klines_response and 'klines' in klines_response['data']:
-                    # New format
-                    open_price = float(candle.get('open', 0))
-                    high_price = float(candle.get('high', 0))
-                    low_price = float(candle.get('low', 0))
-                    close_price = float(candle.get('close', 0))
-                else:
-                    # Old format
-                    open_price = float(candle[1])
-                    high_price = float(candle[2])
-                    low_price = float(candle[3])
-                    close_price = float(candle[4])
-                
-                # Basic candlestick patterns
-                body_size = abs(close_price - open_price)
-                upper_shadow = high_price - max(open_price, close_price)
-                lower_shadow = min(open_price, close_price) - low_price
-                
-                if close_price > open_price:  # Bullish candle
-                    if body_size > (upper_shadow + lower_shadow) * 0.6:
-                        patterns.append(f"Candle {i+1}: Strong Bullish")
-                    elif lower_shadow > body_size * 2:
-                        patterns.append(f"Candle {i+1}: Hammer (Bullish)")
-                else:  # Bearish candle
-                    if body_size > (upper_shadow + lower_shadow) * 0.6:
-                        patterns.append(f"Candle {i+1}: Strong Bearish")
-                    elif upper_shadow > body_size * 2:
-                        patterns.append(f"Candle {i+1}: Shooting Star (Bearish)")
-            
-            # Check for engulfing patterns
-            if len(recent_candles) >= 2:
-                prev_candle = recent_candles[-2]
-                curr_candle = recent_candles[-1]
-                
-                if 'data' in klines_response and 'klines' in klines_response['data']:
-                    # New format
-                    prev_open = float(prev_candle.get('open', 0))
-                    prev_close = float(prev_candle.get('close', 0))
-                    curr_open = float(curr_candle.get('open', 0))
-                    curr_close = float(curr_candle.get('close', 0))
-                else:
-                    # Old format
-                    prev_open = float(prev_candle[1])
-                    prev_close = float(prev_candle[4])
-                    curr_open = float(curr_candle[1])
-                    curr_close = float(curr_candle[4])
-                
-                if curr_close > curr_open and prev_close < prev_open:  # Bullish engulfing
-                    if curr_open < prev_close and curr_close > prev_open:
-                        patterns.append("Bullish Engulfing Pattern")
-                elif curr_close < curr_open and prev_close > prev_open:  # Bearish engulfing
-                    if curr_open > prev_close and curr_close < prev_open:
-                        patterns.append("Bearish Engulfing Pattern")
+            patterns = []
+            first = max(0, len(ohlc) - len(recent_candles))
+            for i in range(len(recent_candles)):
+                for name, weight in PATTERN_WEIGHTS:
+                    if detected[name][first + i]:
+                        bias = 'Neutral' if name == 'doji' else 'Bullish' if weight > 0 else 'Bearish'
+                        patterns.append(f"Candle {i+1}: {name.replace('_', ' ').title()} ({bias})")
             
             analysis_text = f"🕯️ Candlestick Analysis - {symbol}\n\n"
             analysis_text += f"💰 Current Price: ${current_price:.2f}\n"
@@ -2923,11 +2900,83 @@ class TradingBot:
                 reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Back", callback_data="main_menu")]])
             )
 
+    async def metrics_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Summarize exchange latency, retries, 429s and errors since startup"""
+        if not self.check_auth(update.effective_user.id):
+            await update.message.reply_text("❌ You are not authorized to use this bot.")
+            return
+        rows = exchange_metrics.summary(top=10)
+        if not rows:
+            await update.message.reply_text("📈 No exchange requests recorded yet.")
+            return
+        uptime = (time.time() - exchange_metrics.started_at) / 60
+        metrics_text = f"📈 Exchange Metrics (last {uptime:.0f} min)\n\n"
+        for row in rows:
+            lock = "🔐" if row['signed'] else "🌐"
+            metrics_text += f"{lock} {row['exchange']} {row['endpoint']}\n"
+            metrics_text += f"   {row['requests']} req • p50 {row['p50_ms']}ms • p95 {row['p95_ms']}ms • p99 {row['p99_ms']}ms\n"
+            metrics_text += f"   wait p95 {row['wait_p95_ms']}ms • retries {row['retries']} • 429s {row['rate_limited']}"
+            if row['errors']:
+                errors = ', '.join(f"{name}: {count}" for name, count in row['errors'].items())
+                metrics_text += f" • errors {errors}"
+            metrics_text += "\n\n"
+        await update.message.reply_text(metrics_text)
+
+    async def show_market_scan(self, query, exchange: str = 'pionex'):
+        """Show the top symbols of the latest universe scan"""
+        try:
+            scanner = get_market_scanner()
+            await query.edit_message_text(f"🔎 Scanning {exchange.title()} markets...")
+            scan_config = self.config.get('scanner', {})
+            summary = await self.bridge.run_with_timeout(
+                scan_config.get('scan_timeout', 240), scanner.get_results,
+                exchange, scan_config.get('top_n', 10), scan_config.get('refresh_interval', 300)
+            )
+            
+            if 'error' in summary:
+                await query.edit_message_text(
+                    f"❌ Scan failed: {summary['error']}\n\n🔙 Back:",
+                    reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Back", callback_data="technical_analysis")]])
+                )
+                return
+            
+            scan_time = datetime.fromtimestamp(summary['scanned_at'] / 1000).strftime('%H:%M:%S')
+            scan_text = f"🔎 Market Scanner - {exchange.title()}\n\n"
+            scan_text += f"⏰ {scan_time} ({summary['interval']}), {summary['shortlisted']}/{summary['universe']} symbols in {summary['duration']}s\n\n"
+            
+            if summary['results']:
+                for item in summary['results']:
+                    icon = "🟢" if item['score'] > 0 else "🔴" if item['score'] < 0 else "⚪"
+                    scan_text += f"{icon} {item['symbol']}: {item['direction']} ({item['score']:+d})"
+                    if item['breakout']:
+                        scan_text += f" • breakout {item['breakout']}"
+                    scan_text += f"\n   ${item['price']:.4f} • vol ${item['quote_volume_24h'] / 1e6:.1f}M\n"
+            else:
+                scan_text += "No symbols passed the volume filter\n"
+            
+            other = 'bybit' if exchange == 'pionex' else 'pionex'
+            keyboard = [
+                [InlineKeyboardButton("🔄 Refresh", callback_data=f"market_scan_{exchange}")],
+                [InlineKeyboardButton(f"🔎 Scan {other.title()}", callback_data=f"market_scan_{other}")],
+                [InlineKeyboardButton("🔙 Back", callback_data="technical_analysis")]
+            ]
+            
+            await query.edit_message_text(
+                scan_text,
+                reply_markup=InlineKeyboardMarkup(keyboard)
+            )
+            
+        except Exception as e:
+            await query.edit_message_text(
+                f"❌ Error in market scan: {str(e)}\n\n🔙 Back to main menu:",
+                reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Back", callback_data="main_menu")]])
+            )
+
     async def show_active_strategies(self, query):
         """Show active trading strategies"""
         try:
             user_id = query.from_user.id
-            active_strategies = self.db.get_active_strategies(user_id)
+            active_strategies = await self.async_db.get_active_strategies(user_id)
             
             strategies_text = "🎯 Active Strategies\n\n"
             
@@ -2958,8 +3007,8 @@ class TradingBot:
             user_id = query.from_user.id
             
             # Get current portfolio data
-            positions_response = self.api.get_positions()
-            balance_response = self.api.get_balances()
+            positions_response = await self.async_api.get_positions()
+            balance_response = await self.async_api.get_balances()
             
             if 'error' in positions_response or 'error' in balance_response:
                 await query.edit_message_text(
@@ -3077,7 +3126,7 @@ class TradingBot:
                 'settings': self.config.copy()
             }
             
-            self.db.add_active_strategy(user_id, strategy_data['symbol'], strategy_data['strategy_type'], strategy_data['settings'])
+            await self.async_db.add_active_strategy(user_id, strategy_data['symbol'], strategy_data['strategy_type'], strategy_data['settings'])
             
             activation_text = f"✅ Strategy Activated!\n\n"
             activation_text += f"🎯 Strategy: {strategy.upper()}\n"
@@ -4009,99 +4058,21 @@ class TradingBot:
     def _start_websocket(self):
         """Start WebSocket connection for real-time data"""
         try:
-            self.ws = PionexWebSocket()
-            self.ws_thread = threading.Thread(target=self._websocket_loop, daemon=True)
-            self.ws_thread.start()
+            self.ws = get_pionex_websocket([self.config.get('trading_pair', 'BTC_USDT')])
             logger.info("WebSocket connection started")
         except Exception as e:
             logger.error(f"Failed to start WebSocket: {e}")
-            # Continue without WebSocket - bot will still function
-            self.ws_connected = False
-    
-    def _websocket_loop(self):
-        """WebSocket event loop"""
-        try:
-            asyncio.run(self._ws_connect())
-        except Exception as e:
-            logger.error(f"WebSocket loop error: {e}")
-            # Set connected to False if WebSocket fails
-            self.ws_connected = False
-    
-    async def _ws_connect(self):
-        """Connect to WebSocket and handle messages"""
-        try:
-            await self.ws.connect()
-            self.ws_connected = True
-            
-            # Subscribe to market data
-            await self.ws.subscribe("market.ticker")
-            await self.ws.subscribe("market.depth")
-            
-            # Set up message handlers
-            self.ws.set_handler("market.ticker", self._handle_ticker)
-            self.ws.set_handler("market.depth", self._handle_depth)
-            
-            logger.info("WebSocket connected and subscribed to market data")
-        except Exception as e:
-            logger.error(f"WebSocket connection error: {e}")
-            self.ws_connected = False
-            # Don't retry immediately - let the bot function without real-time data
-            logger.info("Bot will continue without real-time WebSocket data")
-    
-    def _handle_ticker(self, data):
-        """Handle real-time ticker data"""
-        try:
-            if 'data' in data:
-                ticker_data = data['data']
-                symbol = ticker_data.get('symbol', '')
-                if symbol:
-                    self.real_time_data[symbol] = {
-                        'price': float(ticker_data.get('close', 0)),
-                        'change': float(ticker_data.get('change', 0)),
-                        'volume': float(ticker_data.get('volume', 0)),
-                        'timestamp': time.time()
-                    }
-                    logger.debug(f"Updated real-time data for {symbol}: {self.real_time_data[symbol]}")
-        except Exception as e:
-            logger.error(f"Error handling ticker data: {e}")
-    
-    def _handle_depth(self, data):
-        """Handle real-time order book data"""
-        try:
-            if 'data' in data:
-                depth_data = data['data']
-                symbol = depth_data.get('symbol', '')
-                if symbol:
-                    # Store order book data
-                    self.real_time_data[f"{symbol}_depth"] = {
-                        'bids': depth_data.get('bids', []),
-                        'asks': depth_data.get('asks', []),
-                        'timestamp': time.time()
-                    }
-        except Exception as e:
-            logger.error(f"Error handling depth data: {e}")
+            # Continue without WebSocket - prices fall back to REST
+            self.ws = None
     
     def get_real_time_price(self, symbol: str) -> float:
-        """Get real-time price for a symbol"""
-        if symbol in self.real_time_data:
-            return self.real_time_data[symbol].get('price', 0)
-        
-        # Fallback to API call if WebSocket is not available
-        if not self.ws_connected:
-            try:
-                ticker_response = self.api.get_ticker_price(symbol)
-                if 'error' not in ticker_response and 'data' in ticker_response:
-                    tickers = ticker_response['data'].get('tickers', [])
-                    if tickers:
-                        return float(tickers[0].get('close', 0))
-            except Exception as e:
-                logger.error(f"Error getting price from API: {e}")
-        
-        return 0
+        """Get real-time price for a symbol (REST only on a cold miss)"""
+        return market_state.get_price(symbol, self.api, self.api.stream_max_age)
     
     def get_real_time_data(self, symbol: str) -> dict:
         """Get real-time data for a symbol"""
-        return self.real_time_data.get(symbol, {})
+        snapshot = market_state.get(symbol)
+        return snapshot._asdict() if snapshot else {}
     
     def send_email_notification(self, subject: str, message: str, user_id: int = None):
         """Send email notification"""
@@ -4356,12 +4327,12 @@ class TradingBot:
             symbol = config.get('trading_pair', 'XRP_USDT')
             
             # Get current price
-            current_price = self.get_real_time_price(symbol) or 0.5
+            current_price = await self.bridge.run(self.get_real_time_price, symbol) or 0.5
             upper_price = current_price * 1.02  # 2% above current
             lower_price = current_price * 0.98  # 2% below current
             
             # Create futures grid
-            result = create_futures_grid(
+            result = await self.bridge.run(create_futures_grid,
                 user_id=user_id,
                 symbol=symbol,
                 grid_type="LONG_SHORT",
@@ -4407,12 +4378,12 @@ class TradingBot:
             symbol = config.get('trading_pair', 'XRP_USDT')
             
             # Get current price
-            current_price = self.get_real_time_price(symbol) or 0.5
+            current_price = await self.bridge.run(self.get_real_time_price, symbol) or 0.5
             upper_price = current_price * 1.02  # 2% above current
             lower_price = current_price * 0.98  # 2% below current
             
             # Create hedging grid
-            result = create_hedging_grid(
+            result = await self.bridge.run(create_hedging_grid,
                 user_id=user_id,
                 symbol=symbol,
                 upper_price=upper_price,
@@ -4520,7 +4491,7 @@ class TradingBot:
         try:
             config = get_config()
             symbol = config.get('trading_pair', 'XRP_USDT')
-            current_price = self.get_real_time_price(symbol) or 0.5
+            current_price = await self.bridge.run(self.get_real_time_price, symbol) or 0.5
             
             setup_text = "📈 Market Order Setup\n\n"
             setup_text += f"📊 Symbol: {symbol}\n"
@@ -4551,7 +4522,7 @@ class TradingBot:
         try:
             config = get_config()
             symbol = config.get('trading_pair', 'XRP_USDT')
-            current_price = self.get_real_time_price(symbol) or 0.5
+            current_price = await self.bridge.run(self.get_real_time_price, symbol) or 0.5
             
             setup_text = "📊 Limit Order Setup\n\n"
             setup_text += f"📊 Symbol: {symbol}\n"
@@ -4582,7 +4553,7 @@ class TradingBot:
         try:
             config = get_config()
             symbol = config.get('trading_pair', 'XRP_USDT')
-            current_price = self.get_real_time_price(symbol) or 0.5
+            current_price = await self.bridge.run(self.get_real_time_price, symbol) or 0.5
             
             setup_text = "📊 Bracket Order Setup\n\n"
             setup_text += f"📊 Symbol: {symbol}\n"
@@ -4617,7 +4588,7 @@ class TradingBot:
         try:
             config = get_config()
             symbol = config.get('trading_pair', 'XRP_USDT')
-            current_price = self.get_real_time_price(symbol) or 0.5
+            current_price = await self.bridge.run(self.get_real_time_price, symbol) or 0.5
             
             setup_text = "📊 OCO Order Setup\n\n"
             setup_text += f"📊 Symbol: {symbol}\n"
@@ -4650,7 +4621,7 @@ class TradingBot:
         """Handle enable paper trading"""
         try:
             user_id = query.from_user.id
-            enable_paper_trading(user_id)
+            await self.bridge.run(enable_paper_trading, user_id)
             
             await query.edit_message_text(
                 "✅ Paper trading enabled!\n\n"
@@ -4673,7 +4644,7 @@ class TradingBot:
         """Handle disable paper trading"""
         try:
             user_id = query.from_user.id
-            disable_paper_trading(user_id)
+            await self.bridge.run(disable_paper_trading, user_id)
             
             await query.edit_message_text(
                 "❌ Paper trading disabled!\n\n"
@@ -4702,6 +4673,7 @@ def main():
     
     # Add handlers
     application.add_handler(CommandHandler("start", bot.start))
+    application.add_handler(CommandHandler("metrics", bot.metrics_command))
     application.add_handler(CallbackQueryHandler(bot.handle_callback))
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, bot.handle_message))
     
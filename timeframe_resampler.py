@@ -0,0 +1,338 @@
+import threading
+import time
+import logging
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from candle_store import CandleStore, get_candle_store
+from config_loader import get_config
+from kline_cache import INTERVAL_MS, normalize_interval
+
+Candle = Tuple[int, float, float, float, float, float]  # (open time ms, open, high, low, close, volume)
+
+
+def aggregate(columns: Dict[str, np.ndarray], interval_ms: int, base_ms: int) -> Tuple[List[Candle], Optional[list]]:
+    """Vectorized OHLCV aggregation of base candles into UTC-aligned buckets.
+
+    Returns the complete bars and the still-open last bucket (or None). A
+    leading bucket that the base history only partly covers is dropped.
+    """
+    times = np.asarray(columns['time'], dtype=np.int64)
+    if not len(times):
+        return [], None
+    buckets = times - times % interval_ms
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(times)]
+    bars = list(zip(
+        buckets[starts].tolist(),
+        np.asarray(columns['open'])[starts].tolist(),
+        np.maximum.reduceat(np.asarray(columns['high']), starts).tolist(),
+        np.minimum.reduceat(np.asarray(columns['low']), starts).tolist(),
+        np.asarray(columns['close'])[ends - 1].tolist(),
+        np.add.reduceat(np.asarray(columns['volume']), starts).tolist()
+    ))
+    if len(bars) > 1 and times[0] != buckets[0]:
+        bars = bars[1:]
+    partial = None
+    if times[-1] + base_ms < buckets[-1] + interval_ms:
+        partial = list(bars.pop())
+    return bars, partial
+
+
+class _SymbolFrames:
+    __slots__ = ('lock', 'closed', 'partial', 'forming', 'last_time', 'depth', 'synced_minute')
+
+    def __init__(self, timeframes: Dict[str, int], max_bars: int):
+        self.lock = threading.RLock()
+        self.closed = {tf: deque(maxlen=max_bars) for tf in timeframes}
+        self.partial: Dict[str, Optional[list]] = {tf: None for tf in timeframes}
+        self.forming: Optional[list] = None  # Live base candle, from the last sync or streamed trades
+        self.last_time: Optional[int] = None  # Open time of the last closed base candle
+        self.depth = 0  # Base candles the aggregates cover (or were asked to)
+        self.synced_minute = None
+
+
+class TimeframeResampler:
+    """Higher timeframes derived in memory from one 1M base series per symbol.
+
+    The closed 1M candles come from the local candle store, which fetches
+    only the missing tail once per minute; every 5M/15M/30M/1H/4H/1D bar is
+    aggregated from them on UTC-aligned boundaries (the exchanges' own
+    boundaries), so analysing more timeframes costs no extra exchange calls.
+    The forming bar of each timeframe folds in the live base candle, which
+    streamed trades keep current between syncs. Histories deeper than
+    ``max_base_minutes`` of 1M candles fall back to the store's native series.
+    """
+
+    def __init__(self, store: CandleStore = None, exchange: str = 'pionex', max_bars: int = 500,
+                 max_base_minutes: int = 43_200):
+        self.logger = logging.getLogger(__name__)
+        self.store = store or get_candle_store()
+        self.exchange = exchange
+        self.base_interval = '1M'
+        self.base_ms = INTERVAL_MS[self.base_interval]
+        self.timeframes = {tf: ms for tf, ms in INTERVAL_MS.items() if ms > self.base_ms}
+        self.max_bars = max_bars
+        self.max_base_minutes = max_base_minutes
+        self._symbols: Dict[str, _SymbolFrames] = {}
+        self._lock = threading.Lock()
+        self.stats = {'syncs': 0, 'seeds': 0, 'candles': 0, 'trades': 0, 'reads': 0, 'native_reads': 0}
+
+    def _state(self, symbol: str) -> _SymbolFrames:
+        state = self._symbols.get(symbol)
+        if state is None:
+            with self._lock:
+                state = self._symbols.setdefault(symbol, _SymbolFrames(self.timeframes, self.max_bars))
+        return state
+
+    # Feeding
+
+    def _seed(self, symbol: str, state: _SymbolFrames, depth: int):
+        """Rebuild every timeframe from the last ``depth`` stored base candles in one vectorized pass"""
+        columns = self.store.read_last(symbol, self.base_interval, depth, self.exchange)
+        for tf, interval_ms in self.timeframes.items():
+            bars, partial = aggregate(columns, interval_ms, self.base_ms)
+            state.closed[tf].clear()
+            state.closed[tf].extend(bars[-self.max_bars:])
+            state.partial[tf] = partial
+        state.last_time = int(columns['time'][-1]) if len(columns['time']) else None
+        # Depth asked for, even if the store holds less, so a short history is not reseeded on every read
+        state.depth = depth
+        self.stats['seeds'] += 1
+
+    def on_candle(self, symbol: str, candle: Candle):
+        """Fold one closed base candle into every timeframe"""
+        state = self._state(symbol)
+        open_ms, open_, high, low, close, volume = candle
+        with state.lock:
+            if state.last_time is not None and open_ms <= state.last_time:
+                return
+            for tf, interval_ms in self.timeframes.items():
+                bucket = open_ms - open_ms % interval_ms
+                bar = state.partial[tf]
+                if bar is not None and bar[0] == bucket:
+                    if high > bar[2]:
+                        bar[2] = high
+                    if low < bar[3]:
+                        bar[3] = low
+                    bar[4] = close
+                    bar[5] += volume
+                else:
+                    if bar is not None:
+                        state.closed[tf].append(tuple(bar))
+                    bar = state.partial[tf] = [bucket, open_, high, low, close, volume]
+                # The bucket's last minute just closed, so the bar is final
+                if open_ms + self.base_ms >= bucket + interval_ms:
+                    state.closed[tf].append(tuple(bar))
+                    state.partial[tf] = None
+            state.last_time = open_ms
+            state.depth += 1
+            if state.forming is not None and state.forming[0] <= open_ms:
+                state.forming = None
+            self.stats['candles'] += 1
+
+    def on_trade(self, symbol: str, price: float, size: float = 0.0, timestamp: int = None):
+        """Keep the live base candle current from a trade tick (MarketState listener signature)"""
+        state = self._symbols.get(symbol)
+        if state is None or price <= 0:
+            return
+        timestamp = int(time.time() * 1000) if timestamp is None else int(timestamp)
+        open_ms = timestamp - timestamp % self.base_ms
+        with state.lock:
+            if state.last_time is not None and open_ms <= state.last_time:
+                return
+            forming = state.forming
+            if forming is None or forming[0] != open_ms:
+                state.forming = [open_ms, price, price, price, price, size]
+            else:
+                if price > forming[2]:
+                    forming[2] = price
+                if price < forming[3]:
+                    forming[3] = price
+                forming[4] = price
+                forming[5] += size
+        self.stats['trades'] += 1
+
+    def refresh(self, api, symbol: str, depth: int = 0):
+        """Sync the base series (one exchange call per closed minute at most) and fold new candles in"""
+        state = self._state(symbol)
+        now_minute = int(time.time() * 1000) // self.base_ms
+        with state.lock:
+            if state.synced_minute == now_minute and state.depth >= depth:
+                return
+            if api is not None:
+                result = self.store.sync(api, symbol, self.base_interval, min_bars=depth, exchange=self.exchange)
+                self.stats['syncs'] += 1
+                if 'error' in result and not result.get('count'):
+                    return
+                if result.get('forming'):
+                    state.forming = list(result['forming'])
+            if state.last_time is None or state.depth < depth:
+                self._seed(symbol, state, max(depth, state.depth, 1))
+            else:
+                columns = self.store.read_range(symbol, self.base_interval, state.last_time + 1,
+                                                exchange=self.exchange)
+                for candle in zip(*(columns[name].tolist() for name in ('time', 'open', 'high', 'low', 'close', 'volume'))):
+                    self.on_candle(symbol, candle)
+            state.synced_minute = now_minute
+
+    # Reading
+
+    def get_candles(self, api, symbol: str, interval: str, limit: int = 100, include_forming: bool = True) -> Dict:
+        """Latest ``limit`` candles of any timeframe as (time, open, high, low, close, volume) tuples"""
+        interval = normalize_interval(interval)
+        interval_ms = INTERVAL_MS.get(interval)
+        if interval_ms is None:
+            return {'error': f'Unsupported interval: {interval}'}
+        depth = (limit + 1) * (interval_ms // self.base_ms)
+        if depth > self.max_base_minutes:
+            return self._native_candles(api, symbol, interval, limit)
+        self.refresh(api, symbol, depth)
+        state = self._state(symbol)
+        with state.lock:
+            self.stats['reads'] += 1
+            if interval == self.base_interval:
+                columns = self.store.read_last(symbol, self.base_interval, limit, self.exchange)
+                candles = list(zip(*(columns[name].tolist() for name in ('time', 'open', 'high', 'low', 'close', 'volume'))))
+                current = state.forming if include_forming else None
+            else:
+                candles = list(state.closed[interval])[-limit:]
+                current = self._current_bar(state, interval, interval_ms) if include_forming else None
+            if current is not None:
+                candles = (candles + [tuple(current)])[-limit:]
+        if not candles:
+            return {'error': f'No candles for {symbol} {interval}'}
+        return {'candles': candles}
+
+    def _current_bar(self, state: _SymbolFrames, interval: str, interval_ms: int) -> Optional[list]:
+        """The forming bar: closed minutes of the bucket plus the live base candle"""
+        bar, live = state.partial[interval], state.forming
+        if live is None:
+            return bar
+        bucket = live[0] - live[0] % interval_ms
+        if bar is None or bar[0] != bucket:
+            return [bucket] + list(live[1:])
+        return [bar[0], bar[1], max(bar[2], live[2]), min(bar[3], live[3]), live[4], bar[5] + live[5]]
+
+    def _native_candles(self, api, symbol: str, interval: str, limit: int) -> Dict:
+        self.stats['native_reads'] += 1
+        if api is None:
+            columns = self.store.read_last(symbol, interval, limit, self.exchange)
+            klines = list(zip(*(columns[name].tolist() for name in ('time', 'open', 'high', 'low', 'close', 'volume'))))
+        else:
+            response = self.store.get_klines(api, symbol, interval, limit, self.exchange)
+            if 'error' in response:
+                return response
+            klines = [tuple(k[:6]) for k in response['data']['klines']]
+        return {'candles': klines} if klines else {'error': f'No candles for {symbol} {interval}'}
+
+    def get_klines(self, api, symbol: str, interval: str, limit: int = 100) -> Dict:
+        """``api.get_klines``-shaped response built from the resampled series"""
+        result = self.get_candles(api, symbol, interval, limit)
+        if 'error' in result:
+            return result
+        return {
+            'result': True,
+            'data': {'klines': [list(c) for c in result['candles']]},
+            'timestamp': int(time.time() * 1000)
+        }
+
+    def get_frame(self, api, symbol: str, interval: str, limit: int = 100) -> pd.DataFrame:
+        """get_market_data()-style DataFrame (timestamp, open, high, low, close, volume)"""
+        result = self.get_candles(api, symbol, interval, limit)
+        if 'error' in result:
+            return pd.DataFrame()
+        df = pd.DataFrame(result['candles'], columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+
+    def indicator(self, api, symbol: str, interval: str, name: str, limit: int = 100, **params) -> Optional[float]:
+        """Latest streaming-indicator value on a resampled timeframe"""
+        from indicator_engine import indicator_engine
+        result = self.get_candles(api, symbol, interval, limit)
+        if 'error' in result:
+            return None
+        indicator_engine.sync(symbol, normalize_interval(interval), result['candles'])
+        return indicator_engine.value(symbol, normalize_interval(interval), name, **params)
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, 'symbols': len(self._symbols)}
+
+
+# One resampler per exchange, shared by strategies, Bot 2025, the GUI and the Telegram bot
+resamplers: Dict[str, TimeframeResampler] = {}
+_resamplers_lock = threading.Lock()
+
+def get_timeframe_resampler(exchange: str = 'pionex') -> TimeframeResampler:
+    """Shared resampler for ``exchange``, listening to that exchange's streamed trades.
+
+    Trades only arrive for symbols subscribed on the exchange's stream
+    (``subscribe_trades`` on Bybit); other symbols are sync-only and their
+    forming bar is the one from the last 1M sync.
+    """
+    with _resamplers_lock:
+        if exchange not in resamplers:
+            config = get_config().get('resampler', {})
+            resampler = TimeframeResampler(
+                exchange=exchange,
+                max_bars=config.get('max_bars', 500),
+                max_base_minutes=config.get('max_base_minutes', 43_200)
+            )
+            if config.get('stream_trades', True):
+                from market_state import get_market_state
+                if exchange == 'pionex':
+                    get_market_state().add_trade_listener(resampler.on_trade)
+                else:
+                    # Market state keys are Pionex-style BTC_USDT; other exchanges key by BTCUSDT
+                    get_market_state(exchange).add_trade_listener(
+                        lambda symbol, *tick: resampler.on_trade(symbol.replace('_', ''), *tick))
+            resamplers[exchange] = resampler
+        return resamplers[exchange]
+
+
+def benchmark(days: int = 7, root: str = None):
+    """Seed and incremental cost, checked bar for bar against pandas resample"""
+    import tempfile
+
+    root = root or tempfile.mkdtemp(prefix='resampler_')
+    store = CandleStore(root)
+    n = days * 1440
+    start = (int(time.time() * 1000) // 86_400_000 - days) * 86_400_000 + 17 * 60_000
+    rng = np.random.default_rng(5)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.abs(rng.normal(0, 0.0005, n)) * close
+    columns = {'time': start + np.arange(n, dtype=np.int64) * 60_000, 'open': open_,
+               'high': np.maximum(open_, close) + spread, 'low': np.minimum(open_, close) - spread,
+               'close': close, 'volume': rng.lognormal(1, 1, n)}
+    seeded = n - 600
+    store._get_series('BTC_USDT', '1M', 'pionex').append({k: v[:seeded] for k, v in columns.items()})
+
+    resampler = TimeframeResampler(store, max_bars=100_000, max_base_minutes=n)
+    state = resampler._state('BTC_USDT')
+    started = time.perf_counter()
+    resampler._seed('BTC_USDT', state, seeded)
+    print(f"seed {seeded} 1M candles into {len(resampler.timeframes)} timeframes: "
+          f"{(time.perf_counter() - started) * 1000:.1f} ms")
+    tail = list(zip(*(columns[name][-600:].tolist() for name in ('time', 'open', 'high', 'low', 'close', 'volume'))))
+    started = time.perf_counter()
+    for candle in tail:
+        resampler.on_candle('BTC_USDT', candle)
+    print(f"incremental: {(time.perf_counter() - started) / len(tail) * 1e6:.1f} us per 1M candle (all timeframes)")
+
+    frame = pd.DataFrame({k: v for k, v in columns.items() if k != 'time'},
+                         index=pd.to_datetime(columns['time'], unit='ms'))
+    for tf in ('5M', '15M', '1H', '4H', '1D'):
+        expected = frame.resample(f"{INTERVAL_MS[tf] // 60_000}min").agg(
+            {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}).dropna()
+        got = list(state.closed[tf])
+        expected = expected[expected.index.astype('int64') // 1_000_000 >= got[0][0]].iloc[:len(got)]
+        mismatches = int(np.sum(~np.isclose(np.array([g[1:] for g in got]), expected.to_numpy())))
+        print(f"{tf:>4}: {len(got)} closed bars, {mismatches} mismatched values vs pandas resample")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,308 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Dict, Optional, Tuple
+
+from config_loader import get_config
+
+
+class _Job:
+    __slots__ = ('job_id', 'func', 'interval', 'deadline', 'jitter', 'running', 'started_at',
+                 'overdue', 'runs', 'skipped', 'timeouts', 'errors', 'last_duration', 'removed')
+
+    def __init__(self, job_id: str, func: Callable, interval: float, deadline: float, jitter: float):
+        self.job_id = job_id
+        self.func = func
+        self.interval = interval
+        self.deadline = deadline
+        self.jitter = jitter
+        self.running = False
+        self.started_at = 0.0
+        self.overdue = False
+        self.runs = 0
+        self.skipped = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.last_duration = 0.0
+        self.removed = False
+
+
+class TradingScheduler:
+    """One dispatcher thread and a bounded worker pool for every periodic trading job.
+
+    Jobs are kept in a heap ordered by next due time. Each run is rescheduled
+    with +/- ``jitter`` so thousands of jobs with the same interval spread
+    out instead of firing together. A job that is still running when it comes
+    due again is skipped, never stacked. A run that outlives its deadline is
+    counted as timed out; Python threads cannot be killed, so the job stays
+    blocked (and skipped) until that run actually returns.
+    """
+
+    def __init__(self, max_workers: int = 32, jitter: float = 0.1, default_deadline: float = 30.0):
+        self.max_workers = max_workers
+        self.jitter = jitter
+        self.default_deadline = default_deadline
+        self.logger = logging.getLogger(__name__)
+        self._jobs: Dict[str, _Job] = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = False
+        self._lags = []
+        self._durations = []
+        self.stats = {'dispatched': 0, 'completed': 0, 'skipped': 0, 'timeouts': 0, 'errors': 0}
+
+    def add_job(self, job_id: str, func: Callable, interval: float, deadline: float = None,
+                jitter: float = None, first_run: float = None) -> str:
+        """Schedule ``func()`` every ``interval`` seconds; replaces an existing job with the same id"""
+        job = _Job(job_id, func, float(interval), deadline or self.default_deadline,
+                   self.jitter if jitter is None else jitter)
+        # First run lands at a random point of the first interval unless asked otherwise
+        delay = random.uniform(0, job.interval) if first_run is None else first_run
+        with self._cond:
+            old = self._jobs.get(job_id)
+            if old:
+                old.removed = True
+            self._jobs[job_id] = job
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), job))
+            self._cond.notify()
+        self.start()
+        return job_id
+
+    def remove_job(self, job_id: str) -> bool:
+        with self._cond:
+            job = self._jobs.pop(job_id, None)
+            if job:
+                job.removed = True
+            return job is not None
+
+    def has_job(self, job_id: str) -> bool:
+        return job_id in self._jobs
+
+    def start(self):
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop = False
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='trading-job')
+            self._thread = threading.Thread(target=self._dispatch_loop, daemon=True, name='trading-scheduler')
+            self._thread.start()
+
+    def stop(self, wait: bool = False):
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        if self._pool:
+            self._pool.shutdown(wait=wait)
+
+    def _next_delay(self, job: _Job) -> float:
+        return job.interval * (1 + random.uniform(-job.jitter, job.jitter))
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                while not self._stop and (not self._heap or self._heap[0][0] > time.monotonic()):
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._cond.wait(timeout)
+                if self._stop:
+                    return
+                due, _, job = heapq.heappop(self._heap)
+                if job.removed:
+                    continue
+                now = time.monotonic()
+                heapq.heappush(self._heap, (now + self._next_delay(job), next(self._seq), job))
+                if job.running:
+                    if not job.overdue and now - job.started_at > job.deadline:
+                        job.overdue = True
+                        job.timeouts += 1
+                        self.stats['timeouts'] += 1
+                        self.logger.warning(f"Job {job.job_id} exceeded its {job.deadline:.0f}s deadline")
+                    job.skipped += 1
+                    self.stats['skipped'] += 1
+                    continue
+                job.running = True
+                job.overdue = False
+                job.started_at = now
+                self._record(self._lags, now - due)
+                self.stats['dispatched'] += 1
+            try:
+                self._pool.submit(self._run, job)
+            except RuntimeError:
+                return  # Pool shut down
+
+    def _run(self, job: _Job):
+        started = time.monotonic()
+        try:
+            job.func()
+        except Exception as e:
+            job.errors += 1
+            self.stats['errors'] += 1
+            self.logger.error(f"Job {job.job_id} failed: {e}")
+        finally:
+            duration = time.monotonic() - started
+            with self._cond:
+                job.running = False
+                job.runs += 1
+                job.last_duration = duration
+                self.stats['completed'] += 1
+                self._record(self._durations, duration)
+
+    @staticmethod
+    def _record(samples, value: float, keep: int = 2000):
+        samples.append(value)
+        if len(samples) > keep:
+            del samples[:len(samples) - keep]
+
+    @staticmethod
+    def _percentile(samples, pct: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            running = sum(1 for job in self._jobs.values() if job.running)
+            return {
+                **self.stats,
+                'jobs': len(self._jobs),
+                'running': running,
+                'max_workers': self.max_workers,
+                'dispatch_lag_p99_ms': round(self._percentile(self._lags, 0.99) * 1000, 2),
+                'run_time_p50_ms': round(self._percentile(self._durations, 0.5) * 1000, 2),
+                'run_time_p99_ms': round(self._percentile(self._durations, 0.99) * 1000, 2)
+            }
+
+    def get_job_stats(self, job_id: str) -> Optional[Dict]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        return {'interval': job.interval, 'running': job.running, 'runs': job.runs, 'skipped': job.skipped,
+                'timeouts': job.timeouts, 'errors': job.errors, 'last_duration': job.last_duration}
+
+
+class SharedSignalCache:
+    """Strategy signals computed once per (strategy, symbol, candle) and shared by every user.
+
+    The signal is evaluated for a unit balance; callers scale the quantity to
+    their own balance. Entries also expire after ``ttl`` seconds so the
+    embedded ticker price stays current within a candle. Concurrent callers
+    for the same key wait on the first caller's computation.
+    """
+
+    def __init__(self, ttl: float = 15.0, candle_seconds: int = 300):
+        self.ttl = ttl
+        self.candle_seconds = candle_seconds
+        self._entries: Dict[Tuple, Tuple[float, Dict]] = {}
+        self._inflight: Dict[Tuple, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'computed': 0, 'waited': 0}
+
+    def get(self, strategy: str, symbol: str, compute: Callable[[], Dict]) -> Dict:
+        now = time.time()
+        key = (strategy, symbol, int(now // self.candle_seconds))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] <= self.ttl:
+                self.stats['hits'] += 1
+                return entry[1]
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.stats['waited'] += 1
+        if not owner:
+            return future.result()
+        try:
+            result = compute()
+            with self._lock:
+                self._entries[key] = (time.time(), result)
+                self.stats['computed'] += 1
+                # Drop entries from earlier candles
+                for stale in [k for k in self._entries if k[2] < key[2]]:
+                    del self._entries[stale]
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self.stats, 'entries': len(self._entries)}
+
+
+# Process-wide scheduler and signal cache shared by all AutoTrader instances
+trading_scheduler = None
+signal_cache = None
+_init_lock = threading.Lock()
+
+def get_trading_scheduler() -> TradingScheduler:
+    global trading_scheduler
+    with _init_lock:
+        if trading_scheduler is None:
+            config = get_config().get('scheduler', {})
+            trading_scheduler = TradingScheduler(
+                max_workers=config.get('max_workers', 32),
+                jitter=config.get('jitter', 0.1),
+                default_deadline=config.get('job_deadline', 30)
+            )
+        return trading_scheduler
+
+def get_signal_cache() -> SharedSignalCache:
+    global signal_cache
+    with _init_lock:
+        if signal_cache is None:
+            signal_cache = SharedSignalCache(ttl=get_config().get('scheduler', {}).get('signal_ttl', 15))
+        return signal_cache
+
+
+def benchmark(users: int = 2000, symbols: int = 5, interval: float = 2.0, duration: float = 8.0,
+              io_ms: float = 5.0, max_workers: int = 64):
+    """Thousands of user-strategy jobs on one pool; shared signal work happens once per symbol"""
+    scheduler = TradingScheduler(max_workers=max_workers, jitter=0.2)
+    cache = SharedSignalCache(ttl=interval)
+    evaluations = {'count': 0}
+
+    def evaluate(symbol):
+        evaluations['count'] += 1
+        time.sleep(0.05)  # Klines + indicators
+        return {'action': 'BUY', 'symbol': symbol, 'quantity': 0.001, 'price': 30000.0}
+
+    def user_cycle(symbol):
+        signal = cache.get('RSI_STRATEGY', symbol, lambda: evaluate(symbol))
+        time.sleep(io_ms / 1000)  # Per-user balance read / sizing
+        return signal['quantity'] * 1000
+
+    threads_before = threading.active_count()
+    for i in range(users):
+        symbol = f"SYM{i % symbols}_USDT"
+        scheduler.add_job(f"user:{i}:{symbol}", lambda s=symbol: user_cycle(s), interval)
+    time.sleep(duration)
+    stats = scheduler.get_stats()
+    peak_threads = threading.active_count()
+    scheduler.stop()
+
+    runs = stats['completed']
+    print(f"{users} jobs, {interval}s interval, {duration}s run, {max_workers} workers")
+    print(f"  completed {runs} runs ({runs / duration:.0f}/s, ideal {users / interval:.0f}/s), "
+          f"skipped {stats['skipped']}, dispatch lag p99 {stats['dispatch_lag_p99_ms']} ms")
+    print(f"  threads: {threads_before} -> {peak_threads} (vs {users} with one thread per user)")
+    print(f"  shared signal evaluations: {evaluations['count']} for {runs} user cycles "
+          f"(cache {cache.get_stats()})")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    benchmark()
@@ -3,8 +3,12 @@ import numpy as np
 import ta
 from typing import Dict, List, Tuple
 from pionex_api import PionexAPI
-from config_loader import get_config
+from config_loader import get_config_view
+from kline_cache import kline_cache
+from indicator_engine import indicator_engine, candles_from_frame
 from indicators import bollinger_bands, on_balance_volume, support_resistance_levels, trendline_slope
+from candlestick_patterns import latest_patterns
+from timeframe_resampler import get_timeframe_resampler
 import time
 import logging
 
@@ -15,7 +19,7 @@ class TradingStrategies:
     
     def calculate_rsi(self, prices: List[float], period: int = None) -> List[float]:
         """Calculate RSI and return the full list of values"""
-        config = get_config()
+        config = get_config_view()
         if period is None:
             period = config['rsi']['period']
         if len(prices) < period:
@@ -26,7 +30,7 @@ class TradingStrategies:
     
     def calculate_ema(self, data: List[float], period: int = None) -> List[float]:
         """Calculate EMA and return the full list of values"""
-        config = get_config()
+        config = get_config_view()
         if period is None:
             period = config['volume_filter']['ema_period']
         if len(data) < period:
@@ -37,7 +41,7 @@ class TradingStrategies:
     
     def calculate_macd(self, prices: List[float], fast: int = None, slow: int = None, signal: int = None) -> Tuple[List[float], List[float], List[float]]:
         """Calculate MACD and return (macd_line, signal_line, histogram) as lists"""
-        config = get_config()
+        config = get_config_view()
         if fast is None:
             fast = config['macd']['fast']
         if slow is None:
@@ -66,160 +70,14 @@ class TradingStrategies:
             bb.bollinger_lband().tolist()
         )
     
+    def _latest_indicator(self, symbol: str, interval: str, df: pd.DataFrame, name: str, source: str = 'close', **params):
+        """Latest indicator value from the streaming engine, fed with any candles in df it has not seen"""
+        indicator_engine.sync(symbol, interval, candles_from_frame(df))
+        return indicator_engine.value(symbol, interval, name, source=source, **params)
+    
     def analyze_candlestick_patterns(self, df: pd.DataFrame) -> Dict:
         """Analyze candlestick patterns with enhanced recognition"""
-        if df.empty or len(df) < 3:
-            return {'pattern': 'none', 'signal': 'neutral', 'strength': 0}
-        
-        # Get last few candles for pattern analysis
-        current = df.iloc[-1]
-        previous = df.iloc[-2]
-        pre_previous = df.iloc[-3] if len(df) >= 3 else previous
-        
-        patterns = []
-        signal_strength = 0
-        
-        # Calculate basic measurements
-        current_body = abs(current['close'] - current['open'])
-        current_range = current['high'] - current['low']
-        previous_body = abs(previous['close'] - previous['open'])
-        previous_range = previous['high'] - previous['low']
-        
-        # Body ratio for pin bars
-        current_body_ratio = current_body / current_range if current_range > 0 else 0
-        previous_body_ratio = previous_body / previous_range if previous_range > 0 else 0
-        
-        # 1. Engulfing Patterns
-        bullish_engulfing = (
-            current['open'] < previous['close'] and
-            current['close'] > previous['open'] and
-            current_body > previous_body * 1.2
-        )
-        
-        bearish_engulfing = (
-            current['open'] > previous['close'] and
-            current['close'] < previous['open'] and
-            current_body > previous_body * 1.2
-        )
-        
-        if bullish_engulfing:
-            patterns.append('bullish_engulfing')
-            signal_strength += 2
-        elif bearish_engulfing:
-            patterns.append('bearish_engulfing')
-            signal_strength -= 2
-        
-        # 2. Pin Bar Patterns (Hammer/Shooting Star)
-        # Hammer (bullish pin bar)
-        hammer = (
-            current_body_ratio < 0.3 and
-            current['close'] > current['open'] and
-            (current['high'] - current['close']) < (current['open'] - current['low']) * 0.3 and
-            (current['open'] - current['low']) > current_body * 2
-        )
-        
-        # Shooting star (bearish pin bar)
-        shooting_star = (
-            current_body_ratio < 0.3 and
-            current['close'] < current['open'] and
-            (current['close'] - current['low']) < (current['high'] - current['open']) * 0.3 and
-            (current['high'] - current['open']) > current_body * 2
-        )
-        
-        if hammer:
-            patterns.append('hammer')
-            signal_strength += 1.5
-        elif shooting_star:
-            patterns.append('shooting_star')
-            signal_strength -= 1.5
-        
-        # 3. Doji Patterns
-        doji = current_body_ratio < 0.1
-        if doji:
-            patterns.append('doji')
-            signal_strength += 0.5  # Neutral signal
-        
-        # 4. Marubozu (Strong trend candles)
-        bullish_marubozu = (
-            current['close'] > current['open'] and
-            current_body_ratio > 0.8 and
-            current['open'] == current['low'] and
-            current['close'] == current['high']
-        )
-        
-        bearish_marubozu = (
-            current['close'] < current['open'] and
-            current_body_ratio > 0.8 and
-            current['open'] == current['high'] and
-            current['close'] == current['low']
-        )
-        
-        if bullish_marubozu:
-            patterns.append('bullish_marubozu')
-            signal_strength += 1
-        elif bearish_marubozu:
-            patterns.append('bearish_marubozu')
-            signal_strength -= 1
-        
-        # 5. Three White Soldiers / Three Black Crows
-        if len(df) >= 3:
-            last_3 = df.iloc[-3:]
-            three_white_soldiers = all(
-                row['close'] > row['open'] and
-                row['close'] > row['open'] * 1.01  # At least 1% gain
-                for _, row in last_3.iterrows()
-            )
-            
-            three_black_crows = all(
-                row['close'] < row['open'] and
-                row['close'] < row['open'] * 0.99  # At least 1% loss
-                for _, row in last_3.iterrows()
-            )
-            
-            if three_white_soldiers:
-                patterns.append('three_white_soldiers')
-                signal_strength += 2.5
-            elif three_black_crows:
-                patterns.append('three_black_crows')
-                signal_strength -= 2.5
-        
-        # 6. Morning Star / Evening Star
-        if len(df) >= 3:
-            morning_star = (
-                pre_previous['close'] < pre_previous['open'] and  # First day bearish
-                previous_body_ratio < 0.3 and  # Second day small body
-                current['close'] > current['open'] and  # Third day bullish
-                current['close'] > (pre_previous['open'] + pre_previous['close']) / 2  # Closes above midpoint
-            )
-            
-            evening_star = (
-                pre_previous['close'] > pre_previous['open'] and  # First day bullish
-                previous_body_ratio < 0.3 and  # Second day small body
-                current['close'] < current['open'] and  # Third day bearish
-                current['close'] < (pre_previous['open'] + pre_previous['close']) / 2  # Closes below midpoint
-            )
-            
-            if morning_star:
-                patterns.append('morning_star')
-                signal_strength += 3
-            elif evening_star:
-                patterns.append('evening_star')
-                signal_strength -= 3
-        
-        # Determine overall signal
-        if signal_strength > 1:
-            signal = 'bullish'
-        elif signal_strength < -1:
-            signal = 'bearish'
-        else:
-            signal = 'neutral'
-        
-        return {
-            'pattern': ', '.join(patterns) if patterns else 'none',
-            'signal': signal,
-            'strength': abs(signal_strength),
-            'patterns_detected': patterns
-        }
+        return latest_patterns(df)
     
     def get_market_data(self, symbol: str, interval: str = '1M', limit: int = 100) -> pd.DataFrame:
         """Get market data as DataFrame"""
@@ -237,40 +95,20 @@ class TradingStrategies:
             
             api_interval = interval_map.get(interval.lower(), interval.upper())
             
-            response = self.api.get_klines(symbol, api_interval, limit)
+            # Klines are shared process-wide; the DataFrame is built once per candle update
+            result = kline_cache.get_frame(self.api, symbol, api_interval, limit, self._klines_to_frame)
             
-            if 'error' in response:
-                self.logger.error(f"Error getting market data: {response['error']}")
+            if 'error' in result:
+                self.logger.error(f"Error getting market data: {result['error']}")
                 return pd.DataFrame()
             
-            # Extract klines data
-            klines_data = []
-            if 'data' in response:
-                if isinstance(response['data'], dict) and 'klines' in response['data']:
-                    klines_data = response['data']['klines']
-                elif isinstance(response['data'], list):
-                    klines_data = response['data']
-            
-            if not klines_data:
+            df = result['frame']
+            if df.empty:
                 self.logger.warning(f"No klines data received for {symbol}")
                 return pd.DataFrame()
             
-            # Convert to DataFrame
-            df = pd.DataFrame(klines_data, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume', 'close_time',
-                'quote_volume', 'trades', 'taker_buy_base', 'taker_buy_quote', 'ignore'
-            ])
-            
-            # Convert to numeric
-            numeric_columns = ['open', 'high', 'low', 'close', 'volume']
-            for col in numeric_columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            # Convert timestamp
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            
-            # Sort by timestamp
-            df = df.sort_values('timestamp').reset_index(drop=True)
+            # Callers get their own copy so the cached frame stays intact
+            df = df.copy()
             
             self.logger.info(f"Retrieved {len(df)} data points for {symbol} ({api_interval})")
             return df
@@ -279,6 +117,31 @@ class TradingStrategies:
             self.logger.error(f"Error getting market data for {symbol}: {e}")
             return pd.DataFrame()
     
+    def _klines_to_frame(self, klines_data: List) -> pd.DataFrame:
+        """Convert raw klines to a numeric, time-sorted DataFrame"""
+        if not klines_data:
+            return pd.DataFrame()
+
+        if isinstance(klines_data[0], dict):
+            # Pionex returns dict klines keyed by 'time'
+            klines_data = [{**k, 'timestamp': k.get('time', k.get('timestamp'))} for k in klines_data]
+
+        df = pd.DataFrame(klines_data, columns=[
+            'timestamp', 'open', 'high', 'low', 'close', 'volume', 'close_time',
+            'quote_volume', 'trades', 'taker_buy_base', 'taker_buy_quote', 'ignore'
+        ])
+        
+        # Convert to numeric
+        numeric_columns = ['open', 'high', 'low', 'close', 'volume']
+        for col in numeric_columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        
+        # Convert timestamp
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        
+        # Sort by timestamp
+        return df.sort_values('timestamp').reset_index(drop=True)
+    
     def get_basic_market_data(self, symbol: str) -> Dict:
         """Get basic market data when klines are not available"""
         try:
@@ -335,21 +198,22 @@ class TradingStrategies:
     
     def rsi_multi_timeframe_strategy(self, symbol: str, balance: float, position_size: float = None) -> Dict:
         """RSI Multi-timeframe Strategy"""
-        config = get_config()
+        config = get_config_view()
         try:
-            # Get market data for different timeframes
-            df_5m = self.get_market_data(symbol, '5M', 100)
-            df_1h = self.get_market_data(symbol, '1H', 100)
+            # Both timeframes are aggregated from the shared 1M base series: one exchange feed per symbol
+            resampler = get_timeframe_resampler()
+            df_5m = resampler.get_frame(self.api, symbol, '5M', 100)
+            df_1h = resampler.get_frame(self.api, symbol, '1H', 100)
             
             if df_5m.empty or df_1h.empty:
                 return {"action": "HOLD", "reason": "No market data available"}
             
             # Calculate RSI for different timeframes
-            rsi_5m_list = self.calculate_rsi(df_5m['close'].tolist(), config['rsi']['period'])
-            rsi_1h_list = self.calculate_rsi(df_1h['close'].tolist(), config['rsi']['period'])
+            rsi_5m = self._latest_indicator(symbol, '5M', df_5m, 'rsi', period=config['rsi']['period'])
+            rsi_1h = self._latest_indicator(symbol, '1H', df_1h, 'rsi', period=config['rsi']['period'])
             
-            rsi_5m = rsi_5m_list[-1] if rsi_5m_list else 50.0
-            rsi_1h = rsi_1h_list[-1] if rsi_1h_list else 50.0
+            rsi_5m = rsi_5m if rsi_5m is not None else 50.0
+            rsi_1h = rsi_1h if rsi_1h is not None else 50.0
             
             # Get current price - fix the response handling
             ticker_response = self.api.get_ticker_price(symbol)
@@ -428,7 +292,7 @@ class TradingStrategies:
 
     def volume_filter_strategy(self, symbol: str, balance: float, position_size: float = None) -> Dict:
         """Volume Filter Strategy"""
-        config = get_config()
+        config = get_config_view()
         try:
             # Get market data with working interval
             df = self.get_market_data(symbol, '5M', 100)
@@ -437,8 +301,10 @@ class TradingStrategies:
                 return {"action": "HOLD", "reason": "No market data available"}
             
             # Calculate volume EMA
-            volume_ema_list = self.calculate_ema(df['volume'].tolist(), config['volume_filter']['ema_period'])
-            volume_ema = volume_ema_list[-1] if volume_ema_list else df['volume'].iloc[-1]
+            volume_ema = self._latest_indicator(symbol, '5M', df, 'ema', source='volume',
+                                                period=config['volume_filter']['ema_period'])
+            if volume_ema is None:
+                volume_ema = df['volume'].iloc[-1]
             
             # Get current volume
             current_volume = df['volume'].iloc[-1] if not df.empty else 0
@@ -495,7 +361,7 @@ class TradingStrategies:
 
     def advanced_strategy(self, symbol: str, balance: float, position_size: float = None) -> Dict:
         """Advanced Strategy combining multiple indicators"""
-        config = get_config()
+        config = get_config_view()
         try:
             # Get market data with working interval
             df = self.get_market_data(symbol, '5M', 100)
@@ -504,15 +370,15 @@ class TradingStrategies:
                 return {"action": "HOLD", "reason": "No market data available"}
             
             # Calculate indicators
-            rsi_list = self.calculate_rsi(df['close'].tolist(), config['rsi']['period'])
-            rsi = rsi_list[-1] if rsi_list else 50.0
+            rsi = self._latest_indicator(symbol, '5M', df, 'rsi', period=config['rsi']['period'])
+            rsi = rsi if rsi is not None else 50.0
             
-            ema_list = self.calculate_ema(df['close'].tolist(), 20)
-            ema = ema_list[-1] if ema_list else df['close'].iloc[-1]
+            ema = self._latest_indicator(symbol, '5M', df, 'ema', period=20)
+            ema = ema if ema is not None else df['close'].iloc[-1]
             
-            macd_line, macd_signal, macd_histogram = self.calculate_macd(df['close'].tolist())
-            macd_current = macd_line[-1] if macd_line else 0
-            macd_signal_current = macd_signal[-1] if macd_signal else 0
+            macd = self._latest_indicator(symbol, '5M', df, 'macd', fast=config['macd']['fast'],
+                                          slow=config['macd']['slow'], signal=config['macd']['signal'])
+            macd_current, macd_signal_current = (macd[0], macd[1]) if macd else (0, 0)
             
             # Get current price - fix the response handling
             ticker_response = self.api.get_ticker_price(symbol)
@@ -600,7 +466,7 @@ class TradingStrategies:
     
     def rsi_strategy(self, symbol: str, balance: float, position_size: float = None) -> Dict:
         """RSI-based trading strategy"""
-        config = get_config()
+        config = get_config_view()
         try:
             # Get market data with working interval
             df = self.get_market_data(symbol, '5M', 100)
@@ -608,8 +474,8 @@ class TradingStrategies:
                 return {"action": "HOLD", "reason": "No market data available"}
             
             # Calculate RSI
-            rsi_list = self.calculate_rsi(df['close'].tolist(), config['rsi']['period'])
-            rsi = rsi_list[-1] if rsi_list else 50.0
+            rsi = self._latest_indicator(symbol, '5M', df, 'rsi', period=config['rsi']['period'])
+            rsi = rsi if rsi is not None else 50.0
             
             # Get current price
             ticker = self.api.get_ticker_price(symbol)
@@ -660,7 +526,7 @@ class TradingStrategies:
     
     def grid_trading_strategy(self, symbol: str, balance: float, grid_levels: int = None) -> Dict:
         """Grid trading strategy"""
-        config = get_config()
+        config = get_config_view()
         try:
             ticker = self.api.get_ticker_price(symbol)
             current_price = float(ticker.get('data', {}).get('price', 0)) if 'data' in ticker else 0
@@ -712,7 +578,7 @@ class TradingStrategies:
     
     def dca_strategy(self, symbol: str, balance: float, dca_amount: float = None) -> Dict:
         """Dollar Cost Averaging strategy"""
-        config = get_config()
+        config = get_config_view()
         try:
             ticker = self.api.get_ticker_price(symbol)
             current_price = float(ticker.get('data', {}).get('price', 0)) if 'data' in ticker else 0
@@ -740,7 +606,7 @@ class TradingStrategies:
     
     def get_strategy_signal(self, strategy: str, symbol: str, balance: float, **kwargs) -> Dict:
         """Get trading signal based on selected strategy"""
-        config = get_config()
+        config = get_config_view()
         if strategy == "RSI_STRATEGY":
             return self.rsi_strategy(symbol, balance, config['position_size'])
         elif strategy == "RSI_MULTI_TF":
@@ -787,7 +653,7 @@ class TradingStrategies:
     def calculate_trailing_stop(self, entry_price: float, current_price: float, 
                                trailing_percentage: float = None, tp_hit: bool = False) -> float:
         """Calculate trailing stop loss with enhanced logic"""
-        config = get_config()
+        config = get_config_view()
         if trailing_percentage is None:
             trailing_percentage = config['trailing_stop']['percentage']
         
@@ -807,7 +673,7 @@ class TradingStrategies:
     def calculate_dynamic_mobile_sl(self, entry_price: float, current_price: float, 
                                    tp_hit: bool = False, profit_lock_percentage: float = 0.5) -> float:
         """Calculate dynamic mobile stop loss that adjusts upward after TP"""
-        config = get_config()
+        config = get_config_view()
         
         if not tp_hit:
             # Use regular stop loss before TP is hit
@@ -840,7 +706,7 @@ class TradingStrategies:
     def should_update_trailing_stop(self, entry_price: float, current_price: float, 
                                    current_stop: float, trailing_percentage: float = None, tp_hit: bool = False) -> Tuple[bool, float]:
         """Check if trailing stop should be updated with enhanced logic"""
-        config = get_config()
+        config = get_config_view()
         if trailing_percentage is None:
             trailing_percentage = config['trailing_stop']['percentage']
         
@@ -867,7 +733,7 @@ class TradingStrategies:
             df = self.get_market_data(symbol, '5M', atr_period + 10)
             if df.empty or len(df) < atr_period:
                 # Fallback to percentage-based SL
-                config = get_config()
+                config = get_config_view()
                 return entry_price * (1 - config.get('stop_loss_percentage', 1.5) / 100)
             
             # Calculate ATR
@@ -883,7 +749,7 @@ class TradingStrategies:
                 true_ranges.append(max(tr1, tr2, tr3))
             
             if len(true_ranges) < atr_period:
-                config = get_config()
+                config = get_config_view()
                 return entry_price * (1 - config.get('stop_loss_percentage', 1.5) / 100)
             
             # Calculate ATR
@@ -893,7 +759,7 @@ class TradingStrategies:
             dynamic_sl = entry_price - (atr * multiplier)
             
             # Ensure minimum stop loss
-            config = get_config()
+            config = get_config_view()
             min_sl_percentage = config.get('stop_loss_percentage', 1.5)
             min_sl = entry_price * (1 - min_sl_percentage / 100)
             
@@ -901,7 +767,7 @@ class TradingStrategies:
             
         except Exception as e:
             self.logger.error(f"Error calculating dynamic stop loss: {e}")
-            config = get_config()
+            config = get_config_view()
             return entry_price * (1 - config.get('stop_loss_percentage', 1.5) / 100)
     
     def calculate_dynamic_take_profit(self, entry_price: float, current_price: float,
@@ -912,7 +778,7 @@ class TradingStrategies:
             df = self.get_market_data(symbol, '5M', atr_period + 10)
             if df.empty or len(df) < atr_period:
                 # Fallback to percentage-based TP
-                config = get_config()
+                config = get_config_view()
                 return entry_price * (1 + config.get('take_profit_percentage', 2.5) / 100)
             
             # Calculate ATR
@@ -928,7 +794,7 @@ class TradingStrategies:
                 true_ranges.append(max(tr1, tr2, tr3))
             
             if len(true_ranges) < atr_period:
-                config = get_config()
+                config = get_config_view()
                 return entry_price * (1 + config.get('take_profit_percentage', 2.5) / 100)
             
             # Calculate ATR
@@ -938,7 +804,7 @@ class TradingStrategies:
             dynamic_tp = entry_price + (atr * multiplier)
             
             # Ensure minimum take profit
-            config = get_config()
+            config = get_config_view()
             min_tp_percentage = config.get('take_profit_percentage', 2.5)
             min_tp = entry_price * (1 + min_tp_percentage / 100)
             
@@ -946,7 +812,7 @@ class TradingStrategies:
             
         except Exception as e:
             self.logger.error(f"Error calculating dynamic take profit: {e}")
-            config = get_config()
+            config = get_config_view()
             return entry_price * (1 + config.get('take_profit_percentage', 2.5) / 100)
 
     def calculate_on_balance_volume(self, prices: List[float], volumes: List[float]) -> Dict:
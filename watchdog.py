@@ -168,9 +168,11 @@ class Watchdog:
         """Check API connectivity"""
         try:
             from pionex_api import PionexAPI
+            from rate_limiter import request_priority, PRIORITY_BACKGROUND
             
             api = PionexAPI()
-            balances = api.get_balances()
+            with request_priority(PRIORITY_BACKGROUND):
+                balances = api.get_balances(fresh=True)
             if 'error' in balances:
                 self.logger.error(f"API connectivity issue: {balances['error']}")
                 self._handle_api_failure(balances['error'])